@@ -16,7 +16,7 @@ from django.db import transaction
 
 from accounts.models import Profile
 from threadline.models import EmailAlias, Settings
-from threadline.utils.prompt_config_manager import PromptConfigManager
+from threadline.utils.prompt_config_manager import get_prompt_config_manager
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +56,7 @@ class UserBootstrapService:
         language: str,
         scene: str | None,
     ) -> dict[str, Any]:
-        prompt_manager = PromptConfigManager()
+        prompt_manager = get_prompt_config_manager()
         return prompt_manager.generate_user_config(
             language=language,
             scene=scene or settings.DEFAULT_SCENE,
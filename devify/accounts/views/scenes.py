@@ -16,7 +16,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from threadline.utils.prompt_config_manager import PromptConfigManager
+from threadline.utils.prompt_config_manager import get_prompt_config_manager
 
 from ..serializers import SceneSerializer
 
@@ -53,7 +53,7 @@ class GetAvailableScenesView(APIView):
         language = request.query_params.get('language', 'en-US')
 
         try:
-            config_manager = PromptConfigManager()
+            config_manager = get_prompt_config_manager()
             available_scenes = config_manager.get_available_scenes()
 
             scenes = []
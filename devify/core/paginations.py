@@ -5,6 +5,11 @@ This module provides pagination classes that match the standard API response for
 with message field and clear pagination structure.
 """
 
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from utils.constrants import SUCCESS_CODE
@@ -53,4 +58,205 @@ class APIPagination(PageNumberPagination):
                     "previous": self.get_previous_link()
                 }
             }
-        })
\ No newline at end of file
+        })
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised for a cursor that is malformed or was issued for another ordering,
+    and for an ordering cursor pagination cannot page on.
+    """
+
+
+class KeysetPagination:
+    """
+    Opt-in cursor pagination keyed on (timestamp, id).
+
+    A request opts in by sending the ``cursor`` query parameter (empty for
+    the first page). Each page filters past the last row of the previous
+    one instead of using OFFSET, so every page costs the same, and the
+    total is only counted on request:
+
+    - ``total=none`` (default): no COUNT query, ``total`` is null
+    - ``total=capped``: count at most ``total_cap`` + 1 rows; a larger
+      result reports ``total_cap`` with ``totalCapped`` set ("1000+")
+    - ``total=exact``: full COUNT
+
+    Pages only go forward (infinite scroll). Pagination format:
+    {
+        "total": null,
+        "totalCapped": false,
+        "pageSize": 10,
+        "cursor": "eyJvIjo...",
+        "next": "?cursor=eyJvIjo...&page_size=10",
+        "previous": null,
+        "hasNext": true
+    }
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    total_query_param = 'total'
+    total_cap = 1000
+
+    def __init__(self, ordering_fields, default_ordering, page_size=None):
+        """
+        Args:
+            ordering_fields: Timestamp fields the list may be ordered by
+            default_ordering: Ordering used when the request asks for
+                none, e.g. '-received_at'
+            page_size: Default page size
+        """
+        self.ordering_fields = tuple(ordering_fields)
+        self.default_ordering = default_ordering
+        if page_size is not None:
+            self.page_size = page_size
+
+    @classmethod
+    def requested(cls, request):
+        """
+        Whether the client asked for cursor pagination.
+        """
+        return cls.cursor_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(
+                request.query_params.get(
+                    self.page_size_query_param, self.page_size
+                )
+            )
+        except (TypeError, ValueError):
+            size = self.page_size
+        return min(max(1, size), self.max_page_size)
+
+    def get_ordering(self, request):
+        """
+        Ordering requested for the cursor walk; the default when none is.
+
+        Raises:
+            InvalidCursor: For an ordering outside ordering_fields
+        """
+        ordering = request.query_params.get(self.ordering_query_param) or ''
+        if not ordering:
+            return self.default_ordering
+        if ordering.lstrip('-') not in self.ordering_fields:
+            raise InvalidCursor(
+                f"Cursor pagination does not support ordering by "
+                f"'{ordering}'"
+            )
+        return ordering
+
+    def encode_cursor(self, ordering, obj):
+        field = ordering.lstrip('-')
+        payload = {
+            'o': ordering,
+            'v': getattr(obj, field).isoformat(),
+            'i': obj.pk,
+        }
+        return base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+
+    def decode_cursor(self, ordering, cursor):
+        """
+        Decode a cursor into its (timestamp, id) position.
+
+        Raises:
+            InvalidCursor: For malformed cursors and cursors issued for
+                another ordering
+        """
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii'))
+            )
+            value = parse_datetime(payload['v'])
+            pk = int(payload['i'])
+        except (TypeError, ValueError, KeyError, UnicodeError) as exc:
+            raise InvalidCursor('Invalid cursor') from exc
+        if value is None or payload.get('o') != ordering:
+            raise InvalidCursor('Cursor does not match the list ordering')
+        return value, pk
+
+    def count(self, queryset, mode):
+        """
+        Count the filtered queryset for the requested total mode.
+
+        Returns:
+            tuple: (total or None, whether the total was capped)
+        """
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode == 'capped':
+            count = queryset.order_by()[:self.total_cap + 1].count()
+            if count > self.total_cap:
+                return self.total_cap, True
+            return count, False
+        return None, False
+
+    def paginate_queryset(self, queryset, request):
+        """
+        Return the rows of the requested page.
+
+        Raises:
+            InvalidCursor: See get_ordering and decode_cursor
+        """
+        self.request = request
+        self.ordering = self.get_ordering(request)
+        self.page_size_value = self.get_page_size(request)
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+
+        self.total, self.total_capped = self.count(
+            queryset, request.query_params.get(self.total_query_param)
+        )
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self.decode_cursor(self.ordering, cursor)
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{lookup}': value})
+                | Q(**{field: value, f'pk__{lookup}': pk})
+            )
+
+        prefix = '-' if descending else ''
+        rows = list(
+            queryset.order_by(f'{prefix}{field}', f'{prefix}pk')[
+                :self.page_size_value + 1
+            ]
+        )
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_cursor = (
+            self.encode_cursor(self.ordering, rows[-1])
+            if self.has_next
+            else None
+        )
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.next_cursor
+        params[self.page_size_query_param] = self.page_size_value
+        params.pop('page', None)
+        return f'?{params.urlencode()}'
+
+    def get_pagination(self):
+        """
+        Pagination block for the list response.
+        """
+        return {
+            'total': self.total,
+            'totalCapped': self.total_capped,
+            'pageSize': self.page_size_value,
+            'cursor': self.next_cursor,
+            'next': self.get_next_link(),
+            'previous': None,
+            'hasNext': self.has_next,
+        }
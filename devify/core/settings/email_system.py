@@ -54,6 +54,25 @@ THREADLINE_CONFIG_PATH = os.getenv(
     'THREADLINE_CONFIG_PATH', '/opt/devify/conf/threadline'
 )
 
+# THREADLINE_PROMPT_TOKEN_BUDGETS: Default prompt token budget per LLM node
+# - Use Case: Bound prompt size before the provider call; quoted replies
+#   and signatures are trimmed first, then the body is truncated
+# - Unit: Estimated tokens (local heuristic, no provider call)
+# - Default: 12000 (llm_email), 8000 (summary), 2000 (image_intent)
+# - Override: ThreadlineWorkflowConfig.task_config["token_budgets"]
+# - Note: Set a value to 0 to disable budgeting for that node
+THREADLINE_PROMPT_TOKEN_BUDGETS = {
+    'llm_email': int(
+        os.getenv('THREADLINE_LLM_EMAIL_TOKEN_BUDGET', '12000')
+    ),
+    'summary': int(
+        os.getenv('THREADLINE_SUMMARY_TOKEN_BUDGET', '8000')
+    ),
+    'image_intent': int(
+        os.getenv('THREADLINE_IMAGE_INTENT_TOKEN_BUDGET', '2000')
+    ),
+}
+
 # ============================
 # Haraka Email Server Integration
 # ============================
@@ -108,6 +127,306 @@ ATTACHMENT_BASE_URL = os.getenv('ATTACHMENT_BASE_URL', '')
 # - Note: Tasks exceeding this limit will be terminated
 TASK_TIMEOUT_MINUTES = int(os.getenv('TASK_TIMEOUT_MINUTES', '10'))
 
+# THREADLINE_BATCH_WORKFLOW_CONCURRENCY: Parallel workflow runs per batch task
+# - Use Case: Backlog reprocessing via process_email_workflow_batch
+# - Default: 4
+# - Recommendation: Keep within the LLM provider rate limit and the
+#   database connection pool size (each worker thread holds a connection)
+THREADLINE_BATCH_WORKFLOW_CONCURRENCY = int(
+    os.getenv('THREADLINE_BATCH_WORKFLOW_CONCURRENCY', '4')
+)
+
+# THREADLINE_LLM_BATCH: Deferred provider batch mode for LLM nodes
+# - Use Case: Non-urgent workloads (backlog reprocessing) are sent through
+#   the provider batch API (OpenAI-style /v1/batches JSONL) at lower cost;
+#   the workflow is checkpointed at the node and resumed when results land
+# - enabled: Master switch (default: False)
+# - trigger_sources: Workflow trigger sources that run deferred
+#   (default: 'command_batch')
+# - nodes: LLM nodes allowed to defer (default: 'llm_email,summary')
+# - api_base: Batch API base URL; empty uses the bound LLMConfig api_base
+# - completion_window: Provider completion window (default: '24h')
+# - max_requests_per_job: Requests per uploaded JSONL file (default: 1000)
+# - max_submit_attempts: Failed submissions after which a request is
+#   FAILED and its workflow resumes with the error (default: 5)
+# - checkpoint_refresh_sec: Interval at which the poll task refreshes the
+#   checkpoint TTL of threads waiting on results; keep it well below the
+#   checkpoint TTL (24h) (default: 3600)
+# - Override: ThreadlineWorkflowConfig.task_config["llm_batch"]
+# - Note: Requires the Redis checkpointer; emails stay PROCESSING while
+#   their requests are queued
+THREADLINE_LLM_BATCH = {
+    'enabled': os.getenv(
+        'THREADLINE_LLM_BATCH_ENABLED', 'false'
+    ).lower() == 'true',
+    'trigger_sources': [
+        source.strip()
+        for source in os.getenv(
+            'THREADLINE_LLM_BATCH_TRIGGER_SOURCES', 'command_batch'
+        ).split(',')
+        if source.strip()
+    ],
+    'nodes': [
+        node.strip()
+        for node in os.getenv(
+            'THREADLINE_LLM_BATCH_NODES', 'llm_email,summary'
+        ).split(',')
+        if node.strip()
+    ],
+    'api_base': os.getenv('THREADLINE_LLM_BATCH_API_BASE', ''),
+    'completion_window': os.getenv(
+        'THREADLINE_LLM_BATCH_COMPLETION_WINDOW', '24h'
+    ),
+    'max_requests_per_job': int(
+        os.getenv('THREADLINE_LLM_BATCH_MAX_REQUESTS_PER_JOB', '1000')
+    ),
+    'max_submit_attempts': int(
+        os.getenv('THREADLINE_LLM_BATCH_MAX_SUBMIT_ATTEMPTS', '5')
+    ),
+    'checkpoint_refresh_sec': int(
+        os.getenv('THREADLINE_LLM_BATCH_CHECKPOINT_REFRESH_SEC', '3600')
+    ),
+}
+
+# THREADLINE_LLM_STREAMING: Streaming mode for long LLM node calls
+# - Use Case: Report progress while the completion is generated and cut
+#   off runaway generations instead of waiting for the full response
+# - enabled: Master switch (default: False)
+# - nodes: Nodes that stream (default: 'llm_email,summary')
+# - progress_interval_sec: Minimum seconds between progress writes
+#   (default: 2)
+# - max_output_tokens: Per-node output guard in estimated tokens; the
+#   stream is closed once reached (0 disables the guard)
+# - Override: ThreadlineWorkflowConfig.task_config["llm_streaming"]
+THREADLINE_LLM_STREAMING = {
+    'enabled': os.getenv(
+        'THREADLINE_LLM_STREAMING_ENABLED', 'false'
+    ).lower() == 'true',
+    'nodes': [
+        node.strip()
+        for node in os.getenv(
+            'THREADLINE_LLM_STREAMING_NODES', 'llm_email,summary'
+        ).split(',')
+        if node.strip()
+    ],
+    'progress_interval_sec': float(
+        os.getenv('THREADLINE_LLM_STREAMING_PROGRESS_INTERVAL_SEC', '2')
+    ),
+    'max_output_tokens': {
+        'llm_email': int(
+            os.getenv('THREADLINE_LLM_EMAIL_MAX_OUTPUT_TOKENS', '8000')
+        ),
+        'summary': int(
+            os.getenv('THREADLINE_SUMMARY_MAX_OUTPUT_TOKENS', '4000')
+        ),
+    },
+}
+
+# THREADLINE_TASK_TRACER: TaskTracer write behaviour
+# - Use Case: Coalesce per-step task metadata writes for long workflows
+# - buffered: Keep steps in memory and flush on an interval/size and on
+#   complete/fail; progress percent goes through the cache on every step
+#   (default: False)
+# - flush_interval_sec: Max seconds between buffered flushes (default: 5)
+# - flush_max_steps: Max pending steps before a flush (default: 20)
+# - progress_cache_ttl_sec: TTL of the live progress cache key
+#   (default: 3600)
+# - step_storage: 'metadata' keeps steps in the TaskExecution metadata,
+#   'table' appends them to the TaskStep table (default: 'metadata')
+# - progress_live: Publish workflow progress to the cache and a Redis
+#   pub/sub channel per email and persist it on the EmailMessage only at
+#   complete/fail (default: False)
+# - progress_pubsub: Announce progress on the pub/sub channel used by the
+#   progress SSE endpoint (default: True)
+# - progress_redis_url: Redis for pub/sub (default: CELERY_BROKER_URL)
+# - progress_stream_timeout_sec: Max duration of one progress SSE
+#   response before the client reconnects. Each open stream holds a
+#   gunicorn worker thread (WORKERS x THREADS in total), so keep it
+#   short (default: 30)
+THREADLINE_TASK_TRACER = {
+    'buffered': os.getenv(
+        'THREADLINE_TASK_TRACER_BUFFERED', 'false'
+    ).lower() == 'true',
+    'flush_interval_sec': float(
+        os.getenv('THREADLINE_TASK_TRACER_FLUSH_INTERVAL_SEC', '5')
+    ),
+    'flush_max_steps': int(
+        os.getenv('THREADLINE_TASK_TRACER_FLUSH_MAX_STEPS', '20')
+    ),
+    'progress_cache_ttl_sec': int(
+        os.getenv('THREADLINE_PROGRESS_CACHE_TTL_SEC', '3600')
+    ),
+    'step_storage': os.getenv(
+        'THREADLINE_TASK_TRACER_STEP_STORAGE', 'metadata'
+    ),
+    'progress_live': os.getenv(
+        'THREADLINE_PROGRESS_LIVE', 'false'
+    ).lower() == 'true',
+    'progress_pubsub': os.getenv(
+        'THREADLINE_PROGRESS_PUBSUB', 'true'
+    ).lower() == 'true',
+    'progress_redis_url': os.getenv('THREADLINE_PROGRESS_REDIS_URL', ''),
+    'progress_stream_timeout_sec': int(
+        os.getenv('THREADLINE_PROGRESS_STREAM_TIMEOUT_SEC', '30')
+    ),
+}
+
+# THREADLINE_CHECKPOINT: LangGraph workflow checkpoint behaviour
+# - Use Case: Keep per-node checkpoint writes small for large emails
+# - slim_state: Checkpoint email bodies, prompt/issue configs and
+#   attachment OCR/LLM text by content hash; nodes resolve them from a
+#   per-run cache (default: False)
+# - slim_min_bytes: Values smaller than this stay inline (default: 1024)
+# - state_ref_ttl_sec: TTL of referenced values in the cache; keep it at
+#   least as long as the checkpoint TTL (default: 86400)
+# - measure_bytes: Record checkpoint_bytes on NODE_COMPLETE task steps;
+#   serializes the whole state once per node (default: False)
+# - policy: Default checkpointer of a workflow run: 'none', 'memory',
+#   'redis' or 'redis_expensive' (Redis, persisted only after the nodes
+#   in expensive_nodes) (default: 'redis')
+# - policy_by_trigger: Per trigger source overrides as
+#   'source:policy,...', e.g. 'api_retry:memory' (default: none)
+# - expensive_nodes: Nodes after which redis_expensive persists
+#   (default: 'image_intent,llm_email,summary')
+# - cleanup_scan_page_size: Checkpoint keys examined per SCAN round trip
+#   of the cleanup; the scan always covers every thread (default: 1000)
+# - resume_failed: Non-forced retries of a failed email resume from the
+#   last error-free checkpoint of the failed run instead of restarting
+#   the graph (default: True)
+# - resume_trigger_sources: Trigger sources that may resume
+#   (default: 'retry_task,api_retry,api_batch_retry')
+# - Note: Runs that may defer LLM calls to a provider batch always use
+#   'redis'
+THREADLINE_CHECKPOINT = {
+    'slim_state': os.getenv(
+        'THREADLINE_CHECKPOINT_SLIM_STATE', 'false'
+    ).lower() == 'true',
+    'slim_min_bytes': int(
+        os.getenv('THREADLINE_CHECKPOINT_SLIM_MIN_BYTES', '1024')
+    ),
+    'state_ref_ttl_sec': int(
+        os.getenv('THREADLINE_CHECKPOINT_STATE_REF_TTL_SEC', '86400')
+    ),
+    'measure_bytes': os.getenv(
+        'THREADLINE_CHECKPOINT_MEASURE_BYTES', 'false'
+    ).lower() == 'true',
+    'policy': os.getenv('THREADLINE_CHECKPOINT_POLICY', 'redis'),
+    'policy_by_trigger': {
+        source.strip(): policy.strip()
+        for source, _, policy in (
+            item.partition(':')
+            for item in os.getenv(
+                'THREADLINE_CHECKPOINT_POLICY_BY_TRIGGER', ''
+            ).split(',')
+        )
+        if source.strip() and policy.strip()
+    },
+    'expensive_nodes': [
+        node.strip()
+        for node in os.getenv(
+            'THREADLINE_CHECKPOINT_EXPENSIVE_NODES',
+            'image_intent,llm_email,summary',
+        ).split(',')
+        if node.strip()
+    ],
+    'cleanup_scan_page_size': int(
+        os.getenv('THREADLINE_CHECKPOINT_CLEANUP_SCAN_PAGE_SIZE', '1000')
+    ),
+    'resume_failed': os.getenv(
+        'THREADLINE_CHECKPOINT_RESUME_FAILED', 'true'
+    ).lower() == 'true',
+    'resume_trigger_sources': [
+        source.strip()
+        for source in os.getenv(
+            'THREADLINE_CHECKPOINT_RESUME_TRIGGER_SOURCES',
+            'retry_task,api_retry,api_batch_retry',
+        ).split(',')
+        if source.strip()
+    ],
+}
+
+# THREADLINE_RUNTIME_CONTEXT: Per-user workflow context cache
+# - Use Case: Skip the per-run Settings/subscription/timezone/runtime
+#   binding lookups in WorkflowPrepareNode
+# - enabled: Cache the context per user; signals on Settings, Profile,
+#   Subscription, Plan and ThreadlineWorkflowConfig invalidate it
+#   (default: True)
+# - ttl_sec: Max age of a cached context, bounding staleness after bulk
+#   updates that bypass signals (default: 300)
+THREADLINE_RUNTIME_CONTEXT = {
+    'enabled': os.getenv(
+        'THREADLINE_RUNTIME_CONTEXT_CACHE', 'true'
+    ).lower() == 'true',
+    'ttl_sec': int(os.getenv('THREADLINE_RUNTIME_CONTEXT_TTL_SEC', '300')),
+}
+
+# THREADLINE_EMAIL_MERGE: Email merge matcher tuning
+# - Use Case: Keep merge CPU bounded on large mailboxes
+# - simhash_prefilter: Skip RapidFuzz for same-subject bodies whose
+#   SimHash signatures differ in more than simhash_max_distance bits.
+#   Lossy (a short reply quoted in a long body can still reach the
+#   partial_ratio threshold), so it is opt-in (default: False)
+# - simhash_max_distance: Hamming distance limit out of 64 bits
+#   (default: 24)
+# - micro_batch: Fetched emails schedule one merge batch per user and
+#   window instead of one process_email_merge task each; the batch
+#   reconciles them in received_at order in one transaction
+#   (default: False)
+# - batch_window_sec: Delay collecting a user's new emails (default: 5)
+# - batch_max_size: Emails per batch; the rest go to a follow-up batch
+#   (default: 200)
+# - decision_cache: Memoize merge decisions per email, keyed by the email
+#   fingerprint and a per-user version bumped on every insert, merge or
+#   content change of the user's emails, so merge retries skip the
+#   candidate scan (default: False)
+# - decision_cache_ttl_sec: Max age of a memoized decision (default: 3600)
+# - rapidfuzz_workers: Threads RapidFuzz uses to score a candidate window.
+#   Celery and gunicorn already run one process per core, so -1 (all
+#   cores) oversubscribes the CPU (default: 1)
+THREADLINE_EMAIL_MERGE = {
+    'simhash_prefilter': os.getenv(
+        'THREADLINE_MERGE_SIMHASH_PREFILTER', 'false'
+    ).lower() == 'true',
+    'simhash_max_distance': int(
+        os.getenv('THREADLINE_MERGE_SIMHASH_MAX_DISTANCE', '24')
+    ),
+    'micro_batch': os.getenv(
+        'THREADLINE_MERGE_MICRO_BATCH', 'false'
+    ).lower() == 'true',
+    'batch_window_sec': int(
+        os.getenv('THREADLINE_MERGE_BATCH_WINDOW_SEC', '5')
+    ),
+    'batch_max_size': int(
+        os.getenv('THREADLINE_MERGE_BATCH_MAX_SIZE', '200')
+    ),
+    'decision_cache': os.getenv(
+        'THREADLINE_MERGE_DECISION_CACHE', 'false'
+    ).lower() == 'true',
+    'decision_cache_ttl_sec': int(
+        os.getenv('THREADLINE_MERGE_DECISION_CACHE_TTL_SEC', '3600')
+    ),
+    'rapidfuzz_workers': int(
+        os.getenv('THREADLINE_MERGE_RAPIDFUZZ_WORKERS', '1')
+    ),
+}
+
+# THREADLINE_SEARCH: Threadline, admin conversation and attachment search
+# - Use Case: Answer keyword searches from a full-text index on the
+#   SearchDocument table instead of LIKE scans over the text columns
+# - backend: 'auto' uses the database's full-text engine (MySQL
+#   FULLTEXT, PostgreSQL tsvector + GIN, SQLite FTS5); 'like' matches
+#   substrings of the search documents without an index (default: 'auto')
+# - min_token_length: Shorter tokens are left to the substring match; keep
+#   it at or above MySQL innodb_ft_min_token_size (default: 3)
+# - Note: CJK keywords are not segmented by the index and are matched by a
+#   substring scan of the searching user's documents
+THREADLINE_SEARCH = {
+    'backend': os.getenv('THREADLINE_SEARCH_BACKEND', 'auto'),
+    'min_token_length': int(
+        os.getenv('THREADLINE_SEARCH_MIN_TOKEN_LENGTH', '3')
+    ),
+}
+
 # ============================
 # Email Cleanup and Retention Policy
 # ============================
@@ -139,6 +139,53 @@ def ordering_param(default="created_at"):
     )
 
 
+def cursor_params():
+    """
+    Get keyset pagination parameters for API documentation.
+
+    Returns the parameters of the opt-in cursor mode of list endpoints
+    paginated with core.paginations.KeysetPagination.
+
+    Returns:
+        list: List of OpenApiParameter objects for cursor and total
+
+    Usage:
+        @extend_schema(
+            parameters=pagination_params() + cursor_params(),
+            responses={200: pagination_response(PostSerializer)}
+        )
+
+    Generated Parameters:
+        - cursor (string): Empty for the first page, then the returned
+          cursor; switches the endpoint to cursor pagination
+        - total (string): none (default), capped or exact
+    """
+    return [
+        OpenApiParameter(
+            name='cursor',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Cursor pagination: send empty for the first page, then "
+                "pagination.cursor of the previous page; ordering must be "
+                "one of the list's timestamp fields"
+            ),
+            required=False
+        ),
+        OpenApiParameter(
+            name='total',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Total in cursor mode: none (default), capped "
+                "(at most 1000, then totalCapped) or exact"
+            ),
+            required=False,
+            enum=['none', 'capped', 'exact']
+        )
+    ]
+
+
 def search_param():
     """
     Get search parameter for API documentation.
@@ -367,6 +414,8 @@ def pagination_response(serializer_class):
         - pageSize: Number of items per page
         - next: URL to next page (null if no next page)
         - previous: URL to previous page (null if no previous page)
+        - totalCapped, cursor, hasNext: Cursor mode only (see
+          cursor_params)
     """
     # Create pagination info serializer
     pagination_info_name = (
@@ -377,10 +426,12 @@ def pagination_response(serializer_class):
         (serializers.Serializer,),
         {
             'total': serializers.IntegerField(
-                help_text="Total number of items"
+                allow_null=True,
+                help_text="Total number of items (cursor mode: on request)"
             ),
             'page': serializers.IntegerField(
-                help_text="Current page number"
+                required=False,
+                help_text="Current page number (page mode)"
             ),
             'pageSize': serializers.IntegerField(
                 help_text="Number of items per page"
@@ -393,6 +444,19 @@ def pagination_response(serializer_class):
                 allow_null=True,
                 help_text="URL to previous page"
             ),
+            'totalCapped': serializers.BooleanField(
+                required=False,
+                help_text="Cursor mode: total stopped at the cap"
+            ),
+            'cursor': serializers.CharField(
+                required=False,
+                allow_null=True,
+                help_text="Cursor mode: cursor of the next page"
+            ),
+            'hasNext': serializers.BooleanField(
+                required=False,
+                help_text="Cursor mode: whether a next page exists"
+            ),
             '__module__': 'core.swagger'
         }
     )
@@ -0,0 +1,116 @@
+import base64
+import json
+
+import pytest
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.paginations import InvalidCursor, KeysetPagination
+from threadline.models import EmailTask
+
+
+def _request(**params):
+    return Request(APIRequestFactory().get("/", params))
+
+
+def _paginator():
+    return KeysetPagination(("created_at",), "-created_at", page_size=2)
+
+
+def _create_tasks(count, created_at=None):
+    tasks = [
+        EmailTask.objects.create(task_type=EmailTask.TaskType.IMAP_FETCH)
+        for _ in range(count)
+    ]
+    if created_at is not None:
+        EmailTask.objects.filter(pk__in=[t.pk for t in tasks]).update(
+            created_at=created_at
+        )
+    return tasks
+
+
+def _walk(ordering=""):
+    ids = []
+    cursor = ""
+    while True:
+        paginator = _paginator()
+        rows = paginator.paginate_queryset(
+            EmailTask.objects.all(),
+            _request(cursor=cursor, ordering=ordering),
+        )
+        ids.extend(row.pk for row in rows)
+        if not paginator.has_next:
+            return ids
+        cursor = paginator.next_cursor
+
+
+def _encode(payload):
+    return base64.urlsafe_b64encode(
+        json.dumps(payload).encode("utf-8")
+    ).decode("ascii")
+
+
+def test_equal_timestamps_are_paged_by_id(db):
+    tasks = _create_tasks(5, created_at=timezone.now())
+    ids = sorted(task.pk for task in tasks)
+
+    assert _walk() == ids[::-1]
+    assert _walk("created_at") == ids
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "bogus",
+        "!!!",
+        _encode(["not", "a", "dict"]),
+        _encode({"o": "-created_at", "v": "yesterday", "i": 1}),
+        _encode({"o": "-created_at", "v": "2026-01-01T00:00:00"}),
+        _encode({"o": "-created_at", "v": "2026-01-01T00:00:00", "i": "x"}),
+    ],
+)
+def test_malformed_cursor_is_rejected(db, cursor):
+    with pytest.raises(InvalidCursor):
+        _paginator().paginate_queryset(
+            EmailTask.objects.all(), _request(cursor=cursor)
+        )
+
+
+def test_cursor_from_another_ordering_is_rejected(db):
+    _create_tasks(3)
+    paginator = _paginator()
+    paginator.paginate_queryset(EmailTask.objects.all(), _request(cursor=""))
+
+    with pytest.raises(InvalidCursor):
+        _paginator().paginate_queryset(
+            EmailTask.objects.all(),
+            _request(cursor=paginator.next_cursor, ordering="created_at"),
+        )
+
+
+def test_unsupported_ordering_is_rejected(db):
+    with pytest.raises(InvalidCursor):
+        _paginator().paginate_queryset(
+            EmailTask.objects.all(), _request(cursor="", ordering="status")
+        )
+
+
+def test_total_modes(db):
+    _create_tasks(5)
+    queryset = EmailTask.objects.all()
+
+    paginator = _paginator()
+    paginator.paginate_queryset(queryset, _request(cursor="", total="exact"))
+    assert paginator.get_pagination()["total"] == 5
+    assert paginator.get_pagination()["totalCapped"] is False
+
+    paginator = _paginator()
+    paginator.total_cap = 3
+    paginator.paginate_queryset(queryset, _request(cursor="", total="capped"))
+    assert paginator.get_pagination()["total"] == 3
+    assert paginator.get_pagination()["totalCapped"] is True
+
+    paginator = _paginator()
+    paginator.paginate_queryset(queryset, _request(cursor=""))
+    assert paginator.get_pagination()["total"] is None
@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Dict, Optional, Tuple
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from agentcore_metering.adapters.django import (
     LLMTracker as AgentcoreLLMTracker,
@@ -11,6 +12,9 @@ from threadline.utils.llm import parse_json_response
 
 logger = logging.getLogger(__name__)
 
+# Streamed deltas are token-estimated in slices of this many characters.
+STREAM_ESTIMATE_SLICE_CHARS = 64
+
 
 class LLMTracker:
     """
@@ -32,6 +36,7 @@ class LLMTracker:
         state: Optional[Dict] = None,
         node_name: str = "unknown",
         model_uuid: Optional[str] = None,
+        tracking_tags: Optional[Dict[str, Any]] = None,
     ) -> Tuple[Any, Dict[str, Any]]:
         """
         Call LLM API with automatic usage tracking
@@ -47,6 +52,8 @@ class LLMTracker:
             max_retries: Maximum retry attempts (not implemented)
             state: EmailState dict (optional, for tracking)
             node_name: Name of the calling node (for tracking)
+            tracking_tags: Extra fields recorded with the call in
+                state["llm_calls"] (e.g. input mode, estimated tokens)
 
         Returns:
             (response_content, usage_dict)
@@ -82,6 +89,7 @@ class LLMTracker:
             state=state,
             node_name=node_name,
             model_uuid=model_uuid,
+            tracking_tags=tracking_tags,
         )
 
     @staticmethod
@@ -92,6 +100,7 @@ class LLMTracker:
         state: Optional[Dict] = None,
         node_name: str = "unknown",
         model_uuid: Optional[str] = None,
+        tracking_tags: Optional[Dict[str, Any]] = None,
     ) -> Tuple[Any, Dict[str, Any]]:
         """
         Call LLM API with prebuilt messages and automatic usage tracking.
@@ -126,20 +135,7 @@ class LLMTracker:
                         e,
                     )
 
-            if state is not None and settings.ENABLE_COST_TRACKING:
-                tracking_data = {
-                    "node": node_name,
-                    "model": usage["model"],
-                    "input_tokens": usage["prompt_tokens"],
-                    "output_tokens": usage["completion_tokens"],
-                    "total_tokens": usage["total_tokens"],
-                    "cached_tokens": usage.get("cached_tokens", 0),
-                    "reasoning_tokens": usage.get("reasoning_tokens", 0),
-                    "success": True,
-                    "error": None,
-                    "timestamp": timezone.now().isoformat(),
-                }
-                state.setdefault("llm_calls", []).append(tracking_data)
+            LLMTracker._track_success(state, node_name, usage, tracking_tags)
 
             logger.info(
                 "LLM call succeeded in %s: %s tokens "
@@ -154,20 +150,242 @@ class LLMTracker:
 
         except Exception as e:
             logger.error("LLM call failed in %s: %s", node_name, e)
+            LLMTracker._track_failure(
+                state, node_name, model_uuid, e, tracking_tags
+            )
+            raise
+
+    @staticmethod
+    def stream_and_track(
+        prompt: str,
+        content: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Streaming counterpart of call_and_track.
+
+        Builds the system/user messages and delegates to
+        stream_messages_and_track; see there for the keyword arguments.
+        """
+        if not prompt:
+            raise ValueError("Prompt cannot be empty")
+
+        messages = [{"role": "system", "content": prompt}]
+        if content:
+            messages.append({"role": "user", "content": content})
+
+        return LLMTracker.stream_messages_and_track(messages=messages, **kwargs)
+
+    @staticmethod
+    def stream_messages_and_track(
+        messages: list,
+        json_mode: bool = False,
+        state: Optional[Dict] = None,
+        node_name: str = "unknown",
+        model_uuid: Optional[str] = None,
+        tracking_tags: Optional[Dict[str, Any]] = None,
+        on_progress: Optional[Callable[[int, float], None]] = None,
+        progress_interval_sec: float = 2.0,
+        max_output_tokens: Optional[int] = None,
+        model_name: Optional[str] = None,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Call LLM API in streaming mode with progress and an output guard.
+
+        Content deltas are accumulated as they arrive. ``on_progress`` is
+        called with (estimated output tokens so far, elapsed seconds) at
+        most once per ``progress_interval_sec`` so progress writes stay
+        bounded. When the estimated output reaches ``max_output_tokens``
+        the stream is closed early; agentcore-metering records the partial
+        usage and the returned usage carries ``truncated=True``.
+
+        Args:
+            messages: Chat messages
+            json_mode: If True, request and parse a JSON response
+            state: EmailState dict (optional, for tracking)
+            node_name: Name of the calling node (for tracking)
+            model_uuid: LLMConfig UUID (optional)
+            tracking_tags: Extra fields recorded with the call
+            on_progress: Progress callback (tokens_so_far, elapsed_sec)
+            progress_interval_sec: Minimum seconds between callbacks
+            max_output_tokens: Output guard (estimated tokens), None to
+                disable
+            model_name: Model name used for the local token estimate
+
+        Returns:
+            (response_content, usage_dict) like call_messages_and_track
+        """
+        # Deferred: prompt_context lives in the threadline app.
+        from threadline.agents.prompt_context import estimate_tokens
+
+        if not messages:
+            raise ValueError("Messages cannot be empty")
+
+        started_at = time.monotonic()
+        last_progress_at = started_at
+        chunks = []
+        pending_text = ""
+        output_tokens = 0
+        truncated = False
+        usage = None
+
+        try:
+            ensure_default_llm_config()
 
-            model = str(model_uuid) if model_uuid else "unknown"
-            if state is not None and settings.ENABLE_COST_TRACKING:
-                state.setdefault("llm_calls", []).append(
-                    {
-                        "node": node_name,
-                        "model": model,
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "total_tokens": 0,
-                        "success": False,
-                        "error": str(e),
-                        "timestamp": timezone.now().isoformat(),
-                    }
+            stream = AgentcoreLLMTracker.call_and_track(
+                messages=messages,
+                json_mode=json_mode,
+                node_name=node_name,
+                state=state,
+                model_uuid=model_uuid,
+                stream=True,
+            )
+            while True:
+                try:
+                    kind, text = next(stream)
+                except StopIteration as stop:
+                    usage = stop.value
+                    break
+                if kind != "content":
+                    continue
+
+                chunks.append(text)
+                # Estimate in slices: re-estimating the whole output per
+                # delta is quadratic, per-delta rounding overcounts.
+                pending_text += text
+                if len(pending_text) < STREAM_ESTIMATE_SLICE_CHARS:
+                    continue
+                output_tokens += estimate_tokens(pending_text, model_name)
+                pending_text = ""
+                now = time.monotonic()
+                if (
+                    on_progress is not None
+                    and now - last_progress_at >= progress_interval_sec
+                ):
+                    last_progress_at = now
+                    on_progress(output_tokens, now - started_at)
+                if max_output_tokens and output_tokens >= max_output_tokens:
+                    truncated = True
+                    stream.close()
+                    break
+
+            output_tokens += estimate_tokens(pending_text, model_name)
+            response_content = "".join(chunks)
+            if usage is None:
+                # Closed early: the provider never sent the final usage
+                # chunk, so report the local estimate.
+                prompt_tokens = estimate_tokens(
+                    "\n".join(
+                        str(message.get("content") or "")
+                        for message in messages
+                    ),
+                    model_name,
                 )
+                usage = {
+                    "model": model_name or "unknown",
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": prompt_tokens + output_tokens,
+                    "estimated": True,
+                }
+            if truncated:
+                usage["truncated"] = True
+                logger.warning(
+                    "LLM stream in %s stopped at max_output_tokens=%s",
+                    node_name,
+                    max_output_tokens,
+                )
+
+            if json_mode:
+                try:
+                    response_content = parse_json_response(response_content)
+                except Exception as e:
+                    logger.warning(
+                        "Failed to parse streamed JSON response in %s: %s. "
+                        "Returning raw string.",
+                        node_name,
+                        e,
+                    )
 
+            LLMTracker._track_success(
+                state,
+                node_name,
+                usage,
+                {
+                    **(tracking_tags or {}),
+                    "streamed": True,
+                    "truncated": truncated,
+                },
+            )
+
+            logger.info(
+                "LLM stream succeeded in %s: %s tokens "
+                "(prompt=%s, completion=%s, elapsed_sec=%.2f)",
+                node_name,
+                usage["total_tokens"],
+                usage["prompt_tokens"],
+                usage["completion_tokens"],
+                time.monotonic() - started_at,
+            )
+
+            return response_content, usage
+
+        except Exception as e:
+            logger.error("LLM stream failed in %s: %s", node_name, e)
+            LLMTracker._track_failure(
+                state,
+                node_name,
+                model_uuid,
+                e,
+                {**(tracking_tags or {}), "streamed": True},
+            )
             raise
+
+    @staticmethod
+    def _track_success(
+        state: Optional[Dict],
+        node_name: str,
+        usage: Dict[str, Any],
+        tracking_tags: Optional[Dict[str, Any]],
+    ) -> None:
+        if state is None or not settings.ENABLE_COST_TRACKING:
+            return
+        state.setdefault("llm_calls", []).append(
+            {
+                "node": node_name,
+                "model": usage["model"],
+                "input_tokens": usage["prompt_tokens"],
+                "output_tokens": usage["completion_tokens"],
+                "total_tokens": usage["total_tokens"],
+                "cached_tokens": usage.get("cached_tokens", 0),
+                "reasoning_tokens": usage.get("reasoning_tokens", 0),
+                "success": True,
+                "error": None,
+                "timestamp": timezone.now().isoformat(),
+                **(tracking_tags or {}),
+            }
+        )
+
+    @staticmethod
+    def _track_failure(
+        state: Optional[Dict],
+        node_name: str,
+        model_uuid: Optional[str],
+        error: Exception,
+        tracking_tags: Optional[Dict[str, Any]],
+    ) -> None:
+        if state is None or not settings.ENABLE_COST_TRACKING:
+            return
+        state.setdefault("llm_calls", []).append(
+            {
+                "node": node_name,
+                "model": str(model_uuid) if model_uuid else "unknown",
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "total_tokens": 0,
+                "success": False,
+                "error": str(error),
+                "timestamp": timezone.now().isoformat(),
+                **(tracking_tags or {}),
+            }
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-19 01:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0003_alter_relaysubscription_target_type'),
+        ('threadline', '0044_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='relayevent',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='relay_event_user_created_idx'),
+        ),
+    ]
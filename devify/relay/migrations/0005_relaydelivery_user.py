@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_event_users(apps, schema_editor):
+    """
+    Backfill delivery owners from their events.
+    """
+    RelayDelivery = apps.get_model("relay", "RelayDelivery")
+    RelayEvent = apps.get_model("relay", "RelayEvent")
+    RelayDelivery.objects.filter(user__isnull=True).update(
+        user_id=Subquery(
+            RelayEvent.objects.filter(pk=OuterRef("event_id")).values(
+                "user_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0004_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relaydelivery',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='relay_deliveries', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.RunPython(
+            code=copy_event_users,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name='relaydelivery',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relay_deliveries', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='relaydelivery',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='relay_dlv_user_created_idx'),
+        ),
+    ]
@@ -127,6 +127,10 @@ class RelayEvent(models.Model):
         indexes = [
             models.Index(fields=["user", "status"]),
             models.Index(fields=["event_type", "status"]),
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="relay_event_user_created_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -147,6 +151,13 @@ class RelayDelivery(models.Model):
         related_name="deliveries",
         verbose_name=_("Event"),
     )
+    # Copied from the event so the delivery list pages on its own index.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="relay_deliveries",
+        verbose_name=_("User"),
+    )
     subscription = models.ForeignKey(
         RelaySubscription,
         on_delete=models.CASCADE,
@@ -199,6 +210,11 @@ class RelayDelivery(models.Model):
             models.Index(fields=["event", "status"]),
             models.Index(fields=["subscription", "status"]),
             models.Index(fields=["target_type", "status"]),
+            # Keyset pagination of the delivery list.
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="relay_dlv_user_created_idx",
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -209,3 +225,8 @@ class RelayDelivery(models.Model):
 
     def __str__(self) -> str:
         return f"{self.target_type} #{self.id}"
+
+    def save(self, *args, **kwargs):
+        if self.user_id is None and self.event_id is not None:
+            self.user_id = self.event.user_id
+        super().save(*args, **kwargs)
@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 from relay.models import RelayDelivery, RelaySubscription
+from threadline.services.merge_cluster import merge_cluster_queryset
 from threadline.utils.issues.merge_policy import is_retry_trigger_source
 
 NEW = "new"
@@ -36,30 +37,13 @@ def _email_message_id(email_message) -> int | None:
         return None
 
 
-def _walk_email_cluster(email_message) -> list:
-    if not email_message:
+def _email_cluster_ids(email_message) -> list[int]:
+    if _email_message_id(email_message) is None:
         return []
 
-    stack = [email_message]
-    visited: set[int] = set()
-    cluster: list = []
-
-    while stack:
-        current = stack.pop()
-        if not current or current.id in visited:
-            continue
-        visited.add(current.id)
-        cluster.append(current)
-
-        if getattr(current, "merged_into_id", None):
-            stack.append(current.merged_into)
-
-        merged_children = getattr(current, "merged_children", None)
-        if merged_children is not None:
-            for child in merged_children.all():
-                stack.append(child)
-
-    return cluster
+    return list(
+        merge_cluster_queryset(email_message).values_list("id", flat=True)
+    )
 
 
 def _latest_successful_delivery(subscription, email_message):
@@ -82,17 +66,7 @@ def _latest_successful_delivery(subscription, email_message):
 
 
 def _collect_related_issue_references(subscription, email_message) -> list[dict]:
-    cluster = _walk_email_cluster(email_message)
-    if not cluster:
-        return []
-
-    cluster_ids = [
-        cluster_email_message_id
-        for cluster_email_message_id in (
-            _email_message_id(item) for item in cluster
-        )
-        if cluster_email_message_id is not None
-    ]
+    cluster_ids = _email_cluster_ids(email_message)
     if not cluster_ids:
         return []
 
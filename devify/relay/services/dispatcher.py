@@ -46,6 +46,7 @@ class RelayDispatcher:
                 idempotency_key=idempotency_key,
                 defaults={
                     "event": event,
+                    "user_id": event.user_id,
                     "subscription": subscription,
                     "target_type": subscription.target_type,
                     "status": RelayDelivery.Status.PENDING,
@@ -143,6 +143,7 @@ def sync_legacy_issues_for_user(user) -> dict:
             )
             delivery = RelayDelivery.objects.create(
                 event=event,
+                user_id=event.user_id,
                 subscription=subscription,
                 target_type=subscription.target_type,
                 status=RelayDelivery.Status.SUCCESS,
@@ -15,6 +15,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from agentcore_task.adapters.django.models import TaskExecution
+from core.paginations import InvalidCursor, KeysetPagination
 from agentcore_metering.adapters.django.models import LLMConfig
 from relay.models import RelayAppConfig, RelayDelivery, RelayEvent, RelaySubscription
 from relay.serializers import (
@@ -39,6 +40,28 @@ def _response(data, message="ok", code=200, status_code=status.HTTP_200_OK):
     return Response({"code": code, "message": message, "data": data}, status=status_code)
 
 
+def _cursor_list_response(request, qs, serializer_class):
+    """
+    Keyset-paginated list response for clients that send ``cursor``.
+    """
+    paginator = KeysetPagination(("created_at",), "-created_at", page_size=20)
+    try:
+        items = paginator.paginate_queryset(qs, request)
+    except InvalidCursor as exc:
+        return _response(
+            None,
+            message=str(exc),
+            code=400,
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    return _response(
+        {
+            "items": serializer_class(items, many=True).data,
+            "pagination": paginator.get_pagination(),
+        }
+    )
+
+
 def _deep_merge_dicts(base, override):
     merged = dict(base or {})
     for key, value in (override or {}).items():
@@ -343,10 +366,12 @@ class RelayDeliveryListAPIView(APIView):
         except (TypeError, ValueError):
             page_size = 20
 
-        qs = RelayDelivery.objects.filter(event__user=request.user).select_related(
+        qs = RelayDelivery.objects.filter(user=request.user).select_related(
             "event",
             "subscription",
         )
+        if KeysetPagination.requested(request):
+            return _cursor_list_response(request, qs, RelayDeliverySerializer)
         total = qs.count()
         start = (page - 1) * page_size
         end = start + page_size
@@ -404,6 +429,8 @@ class RelayEventListAPIView(APIView):
             .select_related("email_message", "email_message__merged_into")
             .prefetch_related("deliveries")
         )
+        if KeysetPagination.requested(request):
+            return _cursor_list_response(request, qs, RelayEventListSerializer)
         total = qs.count()
         start = (page - 1) * page_size
         end = start + page_size
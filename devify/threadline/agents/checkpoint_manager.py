@@ -7,12 +7,35 @@ loading, and clearing checkpoints for state persistence and recovery.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
 
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Checkpoint policies selectable per trigger source (THREADLINE_CHECKPOINT).
+CHECKPOINT_POLICY_NONE = "none"
+CHECKPOINT_POLICY_MEMORY = "memory"
+CHECKPOINT_POLICY_REDIS = "redis"
+CHECKPOINT_POLICY_REDIS_EXPENSIVE = "redis_expensive"
+CHECKPOINT_POLICIES = (
+    CHECKPOINT_POLICY_NONE,
+    CHECKPOINT_POLICY_MEMORY,
+    CHECKPOINT_POLICY_REDIS,
+    CHECKPOINT_POLICY_REDIS_EXPENSIVE,
+)
+# Policies whose checkpoints survive the worker process; deferred (batch)
+# LLM calls and resumes need one of these.
+DURABLE_CHECKPOINT_POLICIES = (
+    CHECKPOINT_POLICY_REDIS,
+    CHECKPOINT_POLICY_REDIS_EXPENSIVE,
+)
+DEFAULT_RESUME_TRIGGER_SOURCES = ("retry_task", "api_retry", "api_batch_retry")
+DEFAULT_EXPENSIVE_NODES = ("image_intent", "llm_email", "summary")
+WORKFLOW_CHECKPOINT_NS = "email_processing"
+
 
 class CheckpointManager:
     """
@@ -54,6 +77,8 @@ class CheckpointManager:
 
         # Initialize context manager storage
         self._context_manager = None
+        self._maintenance_saver = None
+        self._maintenance_redis = None
 
     def get_checkpointer(self):
         """
@@ -190,44 +215,137 @@ class CheckpointManager:
         checkpoint_id: Optional[str] = None
     ) -> bool:
         """
-        Clear specific checkpoint or all checkpoints for a thread.
+        Clear all checkpoints and pending writes of a thread.
 
-        Note: RedisSaver does not support direct checkpoint clearing.
-        This method provides a workaround by setting TTL to 0 for immediate expiration.
+        RedisSaver only deletes whole threads, so a specific checkpoint_id
+        is not supported and the whole thread is cleared.
 
         Args:
             config: Configuration containing thread_id
-            checkpoint_id: Optional specific checkpoint ID to clear.
-                          If None, clears all checkpoints for the thread.
+            checkpoint_id: Ignored, see above
 
         Returns:
             bool: True if successful, False otherwise
         """
+        thread_id = (config.get("configurable") or {}).get("thread_id")
+        if not thread_id:
+            logger.warning("clear_checkpoint called without a thread_id")
+            return False
+        if checkpoint_id:
+            logger.info(
+                f"Clearing whole thread {thread_id}; single checkpoint "
+                f"deletion is not supported"
+            )
+
         try:
-            # RedisSaver does not support direct checkpoint clearing
-            # We can only rely on TTL expiration or manual Redis key deletion
-            logger.warning(
-                "Direct checkpoint clearing is not supported by RedisSaver. "
-                "Checkpoints will expire based on TTL configuration. "
-                "For immediate clearing, consider using Redis directly."
+            self._get_maintenance_saver().delete_thread(thread_id)
+            logger.info(f"Cleared checkpoints for thread: {thread_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to clear checkpoint {thread_id}: {e}")
+            return False
+
+    def list_thread_ids(
+        self,
+        checkpoint_ns: str = "",
+        page_size: int = 1000,
+    ) -> List[str]:
+        """
+        List thread ids that have checkpoints in a namespace.
+
+        Walks the checkpoint keys with a SCAN cursor, so every thread is
+        found however many checkpoints exist, and threads deleted while
+        the scan runs do not make it skip others.
+
+        Args:
+            checkpoint_ns: Checkpoint namespace to search. LangGraph stores
+                root graph checkpoints under the empty namespace whatever
+                the run config passes, so workflow threads live there.
+            page_size: Keys examined per SCAN round trip
+
+        Returns:
+            List[str]: Distinct thread ids
+        """
+        # Deferred: langgraph-redis (~2 s) only needed for cleanup.
+        from langgraph.checkpoint.redis.base import (
+            CHECKPOINT_PREFIX,
+            REDIS_KEY_SEPARATOR,
+        )
+        from langgraph.checkpoint.redis.util import (
+            from_storage_safe_id,
+            to_storage_safe_str,
+        )
+
+        # checkpoint:<thread_id>:<checkpoint_ns>:<checkpoint_id>
+        pattern = REDIS_KEY_SEPARATOR.join(
+            [CHECKPOINT_PREFIX, "*", to_storage_safe_str(checkpoint_ns), "*"]
+        )
+        thread_ids = []
+        seen = set()
+        for key in self._get_maintenance_redis().scan_iter(
+            match=pattern, count=page_size
+        ):
+            if isinstance(key, bytes):
+                key = key.decode()
+            parts = key.split(REDIS_KEY_SEPARATOR)
+            thread_id = from_storage_safe_id(
+                REDIS_KEY_SEPARATOR.join(parts[1:-2])
             )
+            if thread_id and thread_id not in seen:
+                seen.add(thread_id)
+                thread_ids.append(thread_id)
+        return thread_ids
 
-            # Alternative: List checkpoints to verify they exist
-            checkpoints = self.list_checkpoints(config)
-            if checkpoints:
-                logger.info(
-                    f"Found {len(checkpoints)} checkpoints for thread "
-                    f"{config.get('configurable', {}).get('thread_id')}. "
-                    "They will expire based on TTL settings."
-                )
-                return True
-            else:
-                logger.info("No checkpoints found for the specified thread")
-                return True
+    def _get_maintenance_redis(self):
+        """
+        Return the Redis client of the maintenance saver's server.
+        """
+        if self._maintenance_redis is None:
+            # Deferred: redis-py is only needed for cleanup.
+            import redis
+
+            self._maintenance_redis = redis.Redis.from_url(self.redis_url)
+        return self._maintenance_redis
+
+    def refresh_thread_ttl(self, thread_id: str) -> bool:
+        """
+        Reset the TTL of a thread's latest checkpoint.
 
+        Reading a checkpoint with ``refresh_on_read`` resets the TTL of
+        the checkpoint, its channel blobs and pending writes, which is
+        everything a resume of the thread needs.
+
+        Args:
+            thread_id: Thread whose checkpoint should be kept alive
+
+        Returns:
+            bool: True if the thread still had a checkpoint
+        """
+        config = {
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": ""}
+        }
+        try:
+            checkpoint = self._get_maintenance_saver().get_tuple(config)
         except Exception as e:
-            logger.error(f"Failed to clear checkpoint: {e}")
+            logger.warning(f"Failed to refresh checkpoint {thread_id}: {e}")
             return False
+        return checkpoint is not None
+
+    def _get_maintenance_saver(self):
+        """
+        Return a long-lived RedisSaver for cleanup operations.
+
+        Unlike get_checkpointer() this saver is reused across calls so a
+        cleanup run does not reconnect per thread.
+        """
+        if self._maintenance_saver is None:
+            # Deferred: langgraph-redis (~2 s) only needed for cleanup.
+            from langgraph.checkpoint.redis import RedisSaver
+
+            saver = RedisSaver(redis_url=self.redis_url, ttl=self.ttl_config)
+            saver.setup()
+            self._maintenance_saver = saver
+        return self._maintenance_saver
 
     def get_latest_checkpoint(
         self,
@@ -331,6 +449,294 @@ def create_checkpointer():
     return manager.get_checkpointer()
 
 
+def _checkpoint_config() -> Dict[str, Any]:
+    return dict(getattr(settings, "THREADLINE_CHECKPOINT", None) or {})
+
+
+def resolve_checkpoint_policy(trigger_source: Optional[str] = None) -> str:
+    """
+    Resolve the checkpoint policy for a workflow run.
+
+    THREADLINE_CHECKPOINT["policy_by_trigger"] overrides the default
+    policy per trigger source. Runs that may defer LLM calls to a
+    provider batch always get a durable (Redis) policy, because they are
+    resumed from the checkpoint later.
+
+    Args:
+        trigger_source: Source that triggered the run
+
+    Returns:
+        str: One of CHECKPOINT_POLICIES
+    """
+    config = _checkpoint_config()
+    by_trigger = config.get("policy_by_trigger") or {}
+    policy = (
+        by_trigger.get(trigger_source or "")
+        or config.get("policy")
+        or CHECKPOINT_POLICY_REDIS
+    )
+    if policy not in CHECKPOINT_POLICIES:
+        logger.warning(
+            f"Unknown checkpoint policy '{policy}', using "
+            f"'{CHECKPOINT_POLICY_REDIS}'"
+        )
+        policy = CHECKPOINT_POLICY_REDIS
+
+    if policy not in DURABLE_CHECKPOINT_POLICIES:
+        # Deferred: keep this module free of node-level imports.
+        from threadline.agents.llm_batch import resolve_llm_batch_config
+
+        batch_config = resolve_llm_batch_config()
+        if batch_config.get("enabled") and trigger_source in (
+            batch_config.get("trigger_sources") or ()
+        ):
+            policy = CHECKPOINT_POLICY_REDIS
+    return policy
+
+
+def is_resume_enabled() -> bool:
+    """
+    Whether retries may resume failed runs from their checkpoints.
+    """
+    return bool(_checkpoint_config().get("resume_failed", True))
+
+
+def is_resume_trigger_source(trigger_source: Optional[str]) -> bool:
+    """
+    Whether a retry from ``trigger_source`` may resume a failed run.
+    """
+    if not is_resume_enabled():
+        return False
+    sources = _checkpoint_config().get("resume_trigger_sources")
+    if sources is None:
+        sources = DEFAULT_RESUME_TRIGGER_SOURCES
+    return trigger_source in sources
+
+
+def get_expensive_nodes() -> tuple:
+    """
+    Return the graph nodes after which redis_expensive persists.
+    """
+    nodes = _checkpoint_config().get("expensive_nodes")
+    return tuple(nodes) if nodes else DEFAULT_EXPENSIVE_NODES
+
+
+_memory_checkpointer = None
+
+
+def get_memory_checkpointer():
+    """
+    Return the process-wide in-memory checkpointer.
+
+    Threads are deleted when their run finishes (see the workflow), so
+    the saver does not grow with the number of processed emails.
+    """
+    global _memory_checkpointer
+    if _memory_checkpointer is None:
+        # Deferred: langgraph is only needed when a workflow runs.
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        _memory_checkpointer = InMemorySaver()
+    return _memory_checkpointer
+
+
+# Pending writes that must reach the durable saver even when the
+# checkpoint they belong to was skipped: an interrupt (deferred batch
+# calls), a node exception, or a resume value.
+_DURABLE_WRITE_CHANNELS = {"__interrupt__", "__error__", "__resume__"}
+_TRACKED_THREADS_MAX = 1024
+
+
+def _has_durable_write(writes) -> bool:
+    return any(channel in _DURABLE_WRITE_CHANNELS for channel, _value in writes)
+
+
+def _checkpointer_base():
+    # Deferred: langgraph is only needed when a workflow runs.
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+
+    return BaseCheckpointSaver
+
+
+def create_expensive_node_checkpointer(saver, expensive_nodes: Iterable[str]):
+    """
+    Wrap a durable saver so it only persists after expensive nodes.
+
+    Args:
+        saver: Durable checkpoint saver (RedisSaver)
+        expensive_nodes: Graph node names whose results are worth
+            persisting
+
+    Returns:
+        BaseCheckpointSaver: Saver that skips the other checkpoints
+    """
+
+    class ExpensiveNodeCheckpointer(_checkpointer_base()):
+        """
+        Persist a checkpoint only after an expensive node completed.
+
+        Skipped checkpoints are held per thread; their channel versions
+        are merged into the next persisted one so no channel blob is
+        lost. Interrupt, error and resume writes flush the held
+        checkpoint first so deferred and failed runs can be resumed.
+
+        LangGraph saves checkpoints and writes from background threads,
+        so writes can arrive before the checkpoint they belong to; they
+        are held until that checkpoint is put.
+
+        The last checkpoint of a run is never followed by another put;
+        the runner calls release_thread once the graph returns so the
+        held state (a full EmailState) does not stay in memory.
+        """
+
+        def __init__(self):
+            super().__init__(serde=saver.serde)
+            self.saver = saver
+            self.expensive_nodes = frozenset(expensive_nodes)
+            self._lock = threading.Lock()
+            self._threads: "OrderedDict[tuple, Dict[str, Any]]" = (
+                OrderedDict()
+            )
+
+        @staticmethod
+        def _thread_key(config) -> tuple:
+            configurable = config.get("configurable") or {}
+            return (
+                configurable.get("thread_id"),
+                configurable.get("checkpoint_ns", ""),
+            )
+
+        def _thread(self, key) -> Dict[str, Any]:
+            thread = self._threads.get(key)
+            if thread is None:
+                thread = {
+                    "seen": {},
+                    "pending": None,
+                    "last_id": None,
+                    "early_writes": {},
+                }
+                self._threads[key] = thread
+                while len(self._threads) > _TRACKED_THREADS_MAX:
+                    self._threads.popitem(last=False)
+            self._threads.move_to_end(key)
+            return thread
+
+        def _persist(self, thread, config, checkpoint, metadata, versions):
+            pending = thread["pending"]
+            if pending is not None:
+                versions = {**pending["versions"], **versions}
+            thread["pending"] = None
+            return self.saver.put(config, checkpoint, metadata, versions)
+
+        def put(self, config, checkpoint, metadata, new_versions):
+            with self._lock:
+                thread = self._thread(self._thread_key(config))
+                seen = checkpoint.get("versions_seen") or {}
+                ran = {
+                    node
+                    for node, versions in seen.items()
+                    if versions != thread["seen"].get(node)
+                }
+                thread["seen"] = {
+                    node: dict(versions) for node, versions in seen.items()
+                }
+                thread["last_id"] = checkpoint["id"]
+                early_writes = thread["early_writes"].pop(
+                    checkpoint["id"], ()
+                )
+                if ran & self.expensive_nodes or any(
+                    _has_durable_write(writes[1]) for writes in early_writes
+                ):
+                    saved = self._persist(
+                        thread, config, checkpoint, metadata, new_versions
+                    )
+                else:
+                    # Writes of a skipped checkpoint are superseded by
+                    # the next one.
+                    early_writes = ()
+                    pending = thread["pending"]
+                    versions = dict(pending["versions"]) if pending else {}
+                    versions.update(new_versions)
+                    thread["pending"] = {
+                        "config": config,
+                        "checkpoint": checkpoint,
+                        "metadata": metadata,
+                        "versions": versions,
+                    }
+                    configurable = config.get("configurable") or {}
+                    saved = {
+                        "configurable": {
+                            "thread_id": configurable.get("thread_id"),
+                            "checkpoint_ns": configurable.get(
+                                "checkpoint_ns", ""
+                            ),
+                            "checkpoint_id": checkpoint["id"],
+                        }
+                    }
+            for args in early_writes:
+                self.saver.put_writes(*args)
+            return saved
+
+        def put_writes(self, config, writes, task_id, task_path=""):
+            with self._lock:
+                thread = self._thread(self._thread_key(config))
+                pending = thread["pending"]
+                checkpoint_id = (config.get("configurable") or {}).get(
+                    "checkpoint_id"
+                )
+                last_id = thread["last_id"]
+                if last_id and checkpoint_id and checkpoint_id > last_id:
+                    # Checkpoint ids sort by time: this one is still
+                    # being put.
+                    thread["early_writes"].setdefault(
+                        checkpoint_id, []
+                    ).append((config, writes, task_id, task_path))
+                    return
+                if (
+                    pending is not None
+                    and pending["checkpoint"]["id"] == checkpoint_id
+                ):
+                    if not _has_durable_write(writes):
+                        # Superseded by the next checkpoint.
+                        return
+                    self._persist(
+                        thread,
+                        pending["config"],
+                        pending["checkpoint"],
+                        pending["metadata"],
+                        {},
+                    )
+            self.saver.put_writes(config, writes, task_id, task_path)
+
+        def get_tuple(self, config):
+            return self.saver.get_tuple(config)
+
+        def list(self, config, *, filter=None, before=None, limit=None):
+            return self.saver.list(
+                config, filter=filter, before=before, limit=limit
+            )
+
+        def release_thread(self, thread_id):
+            """
+            Drop the held checkpoint and writes of a finished run.
+
+            Anything still held was superseded within the run or belongs
+            to its final checkpoint, which is not worth persisting.
+            """
+            with self._lock:
+                for key in [k for k in self._threads if k[0] == thread_id]:
+                    self._threads.pop(key, None)
+
+        def delete_thread(self, thread_id):
+            self.release_thread(thread_id)
+            self.saver.delete_thread(thread_id)
+
+        def get_next_version(self, current, channel):
+            return self.saver.get_next_version(current, channel)
+
+    return ExpensiveNodeCheckpointer()
+
+
 def create_thread_config(
     thread_id: str,
     checkpoint_id: Optional[str] = None
@@ -97,6 +97,13 @@ class EmailState(TypedDict, total=False):
     text_llm_config_uuid: str | None
     # Legacy single model UUID binding
     llm_config_uuid: str | None
+    # Model names of the bindings (used for local token estimation)
+    image_llm_model: str | None
+    text_llm_model: str | None
+    # Threadline workflow task_config (token budgets, node switches)
+    task_config: Dict[str, Any] | None
+    # Per-user context preloaded by batch runs (consumed by prepare node)
+    shared_context: Dict[str, Any] | None
     # User's timezone preference
     user_timezone: str | None
 
@@ -110,6 +117,8 @@ class EmailState(TypedDict, total=False):
     retry_language: str | None
     retry_scene: str | None
     trigger_source: str | None
+    # Checkpoint policy the run was compiled with (see checkpoint_manager)
+    checkpoint_policy: str | None
 
     # Credits-related fields
     credits_consumed: bool | None
@@ -174,9 +183,14 @@ def create_email_state(
         "retry_language": None,
         "retry_scene": None,
         "trigger_source": None,
+        "checkpoint_policy": None,
         "image_llm_config_uuid": None,
         "text_llm_config_uuid": None,
         "llm_config_uuid": None,
+        "image_llm_model": None,
+        "text_llm_model": None,
+        "task_config": None,
+        "shared_context": None,
         "created_at": current_time,
         "updated_at": current_time,
         "llm_calls": [],
@@ -0,0 +1,252 @@
+"""
+Deferred (provider batch) execution of LLM calls inside workflow nodes.
+
+In deferred mode a node does not call the provider. It interrupts the graph
+with the chat completion bodies it needs; the checkpointer keeps the state
+under the run's thread_id, the requests are queued for an OpenAI-style
+``/v1/batches`` job (see threadline.services.llm_batch), and the graph is
+resumed with the results once the job completes. On resume the node runs
+again from the top and ``request_deferred_completions`` returns the results
+instead of interrupting.
+
+This module is imported by nodes, so langgraph is only imported lazily.
+"""
+
+import logging
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from threadline.agents.checkpoint_manager import DURABLE_CHECKPOINT_POLICIES
+from threadline.utils.llm import parse_json_response
+
+logger = logging.getLogger(__name__)
+
+LLM_BATCH_INTERRUPT_KIND = "llm_batch"
+
+
+def resolve_llm_batch_config(
+    task_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Merge THREADLINE_LLM_BATCH with task_config["llm_batch"] overrides.
+
+    Args:
+        task_config: ThreadlineWorkflowConfig.task_config (optional)
+
+    Returns:
+        dict: Effective batch configuration
+    """
+    config = dict(getattr(settings, "THREADLINE_LLM_BATCH", None) or {})
+    overrides = (task_config or {}).get("llm_batch")
+    if isinstance(overrides, dict):
+        config.update(overrides)
+    return config
+
+
+def is_llm_batch_enabled(state: Dict[str, Any], node_key: str) -> bool:
+    """
+    Return True when ``node_key`` should run deferred for this workflow.
+
+    Deferred mode applies only when it is enabled, the node is listed and
+    the run was started by one of the configured trigger sources, so
+    interactive retries keep their realtime latency. Runs without a
+    durable checkpoint policy cannot be resumed and never defer.
+
+    Args:
+        state: EmailState dict
+        node_key: Node key in the batch config (llm_email, summary)
+
+    Returns:
+        bool: Whether the node should defer its LLM calls
+    """
+    config = resolve_llm_batch_config(state.get("task_config"))
+    if not config.get("enabled"):
+        return False
+    policy = state.get("checkpoint_policy")
+    if policy and policy not in DURABLE_CHECKPOINT_POLICIES:
+        return False
+    if node_key not in (config.get("nodes") or ()):
+        return False
+    return state.get("trigger_source") in (
+        config.get("trigger_sources") or ()
+    )
+
+
+def build_chat_request(
+    prompt: str,
+    content: Optional[str],
+    *,
+    model: Optional[str],
+    json_mode: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build the chat completion body for one batch line.
+
+    Args:
+        prompt: System prompt
+        content: User content (optional)
+        model: Provider model name; filled in at submit time when missing
+        json_mode: Request a JSON object response
+
+    Returns:
+        dict: /v1/chat/completions request body
+    """
+    messages = [{"role": "system", "content": prompt}]
+    if content:
+        messages.append({"role": "user", "content": content})
+    body: Dict[str, Any] = {"messages": messages}
+    if model:
+        body["model"] = model
+    if json_mode:
+        body["response_format"] = {"type": "json_object"}
+    return body
+
+
+def is_graph_interrupt(error: BaseException) -> bool:
+    """
+    Return True for LangGraph control-flow exceptions (interrupts).
+
+    Nodes catch broad exceptions to record node errors; these must be
+    re-raised so the graph can checkpoint and pause. langgraph is only
+    checked when it is already loaded, which is always the case while a
+    graph runs.
+    """
+    errors = sys.modules.get("langgraph.errors")
+    return errors is not None and isinstance(error, errors.GraphBubbleUp)
+
+
+def request_deferred_completions(
+    state: Dict[str, Any],
+    node_name: str,
+    requests: Dict[str, Dict[str, Any]],
+    *,
+    model_uuid: Optional[str] = None,
+    tracking_tags: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Tuple[Any, Dict[str, Any]]]:
+    """
+    Interrupt the graph with batch requests, or return their results.
+
+    The first execution raises a LangGraph interrupt carrying the request
+    bodies. When the workflow is resumed, the same call returns the
+    results keyed like ``requests`` and records them in state["llm_calls"]
+    the same way LLMTracker does for realtime calls.
+
+    Args:
+        state: EmailState dict
+        node_name: Name of the calling node (for tracking)
+        requests: Mapping of request key to
+            {"body": chat completion body, "json_mode": bool}
+        model_uuid: LLMConfig UUID the requests run against
+        tracking_tags: Extra fields recorded with each call
+
+    Returns:
+        dict: request key -> (response_content, usage) for successful
+            requests, or (None, {"error": message}) for failed ones
+    """
+    # Deferred: langgraph is only needed once a graph is running.
+    from langgraph.types import interrupt
+
+    resumed = interrupt(
+        {
+            "kind": LLM_BATCH_INTERRUPT_KIND,
+            "node_name": node_name,
+            "llm_config_uuid": model_uuid,
+            "requests": requests,
+        }
+    )
+
+    results = {}
+    for key, request in requests.items():
+        result = (resumed or {}).get(key) or {
+            "error": "Missing batch result"
+        }
+        results[key] = _track_deferred_result(
+            state,
+            node_name,
+            result,
+            json_mode=bool(request.get("json_mode")),
+            model_uuid=model_uuid,
+            tracking_tags=tracking_tags,
+        )
+    return results
+
+
+def unwrap_deferred_result(
+    result: Tuple[Any, Dict[str, Any]],
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Return a deferred result, raising for failed requests.
+
+    Keeps the node's realtime error handling unchanged: a failed batch
+    request surfaces as the same exception path as a failed provider call.
+    """
+    content, usage = result
+    if usage.get("error"):
+        raise RuntimeError(f"Batch request failed: {usage['error']}")
+    return content, usage
+
+
+def _track_deferred_result(
+    state: Dict[str, Any],
+    node_name: str,
+    result: Dict[str, Any],
+    *,
+    json_mode: bool,
+    model_uuid: Optional[str],
+    tracking_tags: Optional[Dict[str, Any]],
+) -> Tuple[Any, Dict[str, Any]]:
+    error = result.get("error")
+    usage = dict(result.get("usage") or {})
+    content = result.get("content")
+
+    if not error and json_mode and isinstance(content, str):
+        try:
+            content = parse_json_response(content)
+        except Exception as e:
+            logger.warning(
+                "Failed to parse batch JSON response in %s: %s. "
+                "Returning raw string.",
+                node_name,
+                e,
+            )
+
+    if settings.ENABLE_COST_TRACKING:
+        state.setdefault("llm_calls", []).append(
+            {
+                "node": node_name,
+                "model": usage.get("model")
+                or (str(model_uuid) if model_uuid else "unknown"),
+                "input_tokens": usage.get("prompt_tokens", 0),
+                "output_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0),
+                "cached_tokens": usage.get("cached_tokens", 0),
+                "reasoning_tokens": usage.get("reasoning_tokens", 0),
+                "success": not error,
+                "error": error,
+                "timestamp": timezone.now().isoformat(),
+                "execution_mode": "batch",
+                **(tracking_tags or {}),
+            }
+        )
+
+    if error:
+        return None, {"error": error}
+    return content, usage
+
+
+def collect_batch_interrupts(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Return the llm_batch interrupt payloads of a graph invocation result.
+    """
+    payloads = []
+    for item in (result or {}).get("__interrupt__") or ():
+        value = getattr(item, "value", None)
+        if (
+            isinstance(value, dict)
+            and value.get("kind") == LLM_BATCH_INTERRUPT_KIND
+        ):
+            payloads.append(value)
+    return payloads
@@ -0,0 +1,84 @@
+"""
+Streaming options for long-running LLM node calls.
+
+Nodes that generate long completions (llm_email, summary) can stream the
+response through LLMTracker.stream_and_track, reporting progress while
+tokens arrive and stopping at a max-output-token guard.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+# Denominator for progress ratios when no output guard is configured.
+DEFAULT_EXPECTED_OUTPUT_TOKENS = 2000
+
+
+@dataclass(frozen=True)
+class StreamingOptions:
+    """
+    Effective streaming settings for one node.
+    """
+
+    progress_interval_sec: float
+    max_output_tokens: Optional[int]
+
+    @property
+    def expected_output_tokens(self) -> int:
+        return self.max_output_tokens or DEFAULT_EXPECTED_OUTPUT_TOKENS
+
+    def tracker_kwargs(
+        self, on_progress: Callable[[int, float], None]
+    ) -> Dict[str, Any]:
+        """
+        Keyword arguments for LLMTracker.stream_and_track.
+        """
+        return {
+            "on_progress": on_progress,
+            "progress_interval_sec": self.progress_interval_sec,
+            "max_output_tokens": self.max_output_tokens,
+        }
+
+
+def resolve_llm_streaming(
+    state: Dict[str, Any], node_key: str
+) -> Optional[StreamingOptions]:
+    """
+    Return streaming options when ``node_key`` should stream, else None.
+
+    THREADLINE_LLM_STREAMING provides the defaults and
+    task_config["llm_streaming"] overrides individual keys.
+
+    Args:
+        state: EmailState dict
+        node_key: Node key in the streaming config (llm_email, summary)
+
+    Returns:
+        StreamingOptions or None
+    """
+    config = dict(getattr(settings, "THREADLINE_LLM_STREAMING", None) or {})
+    overrides = (state.get("task_config") or {}).get("llm_streaming")
+    if isinstance(overrides, dict):
+        config.update(overrides)
+
+    if not config.get("enabled"):
+        return None
+    if node_key not in (config.get("nodes") or ()):
+        return None
+
+    try:
+        max_output_tokens = int(
+            (config.get("max_output_tokens") or {}).get(node_key) or 0
+        )
+    except (TypeError, ValueError):
+        max_output_tokens = 0
+    try:
+        interval = float(config.get("progress_interval_sec") or 0)
+    except (TypeError, ValueError):
+        interval = 0.0
+
+    return StreamingOptions(
+        progress_interval_sec=max(interval, 0.0),
+        max_output_tokens=max_output_tokens if max_output_tokens > 0 else None,
+    )
@@ -16,6 +16,8 @@ from threadline.agents.email_state import (
     has_node_errors,
     get_node_errors_by_name,
 )
+from threadline.agents.llm_batch import is_graph_interrupt
+from threadline.agents.state_refs import checkpoint_state, resolve_state
 from threadline.utils.task_tracer import get_current_task_tracer
 
 logger = logging.getLogger(__name__)
@@ -73,6 +75,8 @@ class BaseLangGraphNode(ABC):
             EmailState: Updated email state
         """
         try:
+            # Slim checkpoints carry references to bulky inputs.
+            state = resolve_state(state)
             prefix = self._task_context_prefix()
             logger.info(f"{prefix}[{self.node_name}] Starting processing")
             self._record_task_step(
@@ -91,7 +95,7 @@ class BaseLangGraphNode(ABC):
                     level="WARNING",
                     state=state,
                 )
-                return state
+                return checkpoint_state(state)[0]
 
             state = self.before_processing(state)
 
@@ -99,15 +103,24 @@ class BaseLangGraphNode(ABC):
 
             state = self.after_processing(state)
 
-            logger.info(f"{prefix}[{self.node_name}] Processing completed")
+            state, checkpoint_bytes = checkpoint_state(state)
+            logger.info(
+                f"{prefix}[{self.node_name}] Processing completed "
+                f"(checkpoint_bytes={checkpoint_bytes})"
+            )
             self._record_task_step(
                 "NODE_COMPLETE",
                 f"{self.node_name} completed",
                 state=state,
+                checkpoint_bytes=checkpoint_bytes,
             )
             return state
 
         except Exception as e:
+            if is_graph_interrupt(e):
+                # Deferred LLM calls pause the graph; let LangGraph
+                # checkpoint the run instead of recording a node error.
+                raise
             prefix = self._task_context_prefix()
             logger.error(f"{prefix}[{self.node_name}] Error occurred: {e}")
             logger.exception(e)
@@ -118,7 +131,7 @@ class BaseLangGraphNode(ABC):
                 exception=str(e),
                 state=state,
             )
-            return self._handle_error(e, state)
+            return checkpoint_state(self._handle_error(e, state))[0]
 
     def _task_context_prefix(self) -> str:
         tracer = get_current_task_tracer()
@@ -270,3 +283,37 @@ class BaseLangGraphNode(ABC):
             tracer.append_task(action, message, payload)
         except Exception:
             logger.debug(f"[{self.node_name}] Failed to record progress step {action}")
+
+    def _stream_progress_callback(
+        self,
+        state: EmailState,
+        action: str,
+        message: str,
+        *,
+        ratio_start: float,
+        ratio_end: float,
+        expected_tokens: int,
+    ):
+        """
+        Build an LLMTracker stream progress callback for this node.
+
+        The stage ratio moves from ratio_start toward ratio_end as output
+        tokens approach expected_tokens; the tracker bounds how often the
+        callback (and therefore the progress write) runs.
+        """
+
+        def on_progress(output_tokens: int, elapsed_sec: float) -> None:
+            fraction = min(output_tokens / max(expected_tokens, 1), 1.0)
+            self._record_progress_step(
+                self.workflow_stage,
+                action,
+                message,
+                state=state,
+                ratio=round(
+                    ratio_start + (ratio_end - ratio_start) * fraction, 3
+                ),
+                output_tokens=output_tokens,
+                elapsed_sec=round(elapsed_sec, 2),
+            )
+
+        return on_progress
@@ -16,11 +16,10 @@ from pathlib import Path
 from core.tracking import LLMTracker
 from threadline.agents.email_state import EmailState, add_node_error
 from threadline.agents.nodes.base_node import BaseLangGraphNode
+from threadline.agents.prompt_context import build_budgeted_context
 
 logger = logging.getLogger(__name__)
 
-IMAGE_INPUT_CHAR_LIMIT = 8000
-
 
 class ImageIntentNode(BaseLangGraphNode):
     progress_stage = "images"
@@ -38,7 +37,9 @@ class ImageIntentNode(BaseLangGraphNode):
     def __init__(self):
         super().__init__("image_intent_node")
 
-    def _build_conversation_context(self, state: EmailState) -> str | None:
+    def _build_conversation_context(
+        self, state: EmailState, prompt: str = ""
+    ) -> str | None:
         subject = (state.get("subject") or "").strip()
         sender = (state.get("sender") or "").strip()
         recipients = (state.get("recipients") or "").strip()
@@ -60,7 +61,14 @@ class ImageIntentNode(BaseLangGraphNode):
         if received_at:
             sections.append(f"Received at: {received_at}")
         if conversation_body:
-            sections.append(f"Conversation body:\n{conversation_body}")
+            budgeted = build_budgeted_context(
+                state,
+                "image_intent",
+                conversation_body,
+                model_name=state.get("image_llm_model"),
+                reserved_text="\n\n".join(sections) + prompt,
+            )
+            sections.append(f"Conversation body:\n{budgeted.text}")
 
         if not sections:
             return None
@@ -85,13 +93,8 @@ class ImageIntentNode(BaseLangGraphNode):
         messages: list[dict] = [{"role": "system", "content": prompt}]
 
         user_blocks: list[dict] = []
-        context = self._build_conversation_context(state)
+        context = self._build_conversation_context(state, prompt)
         if context:
-            if len(context) > IMAGE_INPUT_CHAR_LIMIT:
-                context = (
-                    context[:IMAGE_INPUT_CHAR_LIMIT].rstrip()
-                    + "\n\n[Input truncated]"
-                )
             user_blocks.append(
                 {
                     "type": "text",
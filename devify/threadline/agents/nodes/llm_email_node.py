@@ -6,13 +6,25 @@ information. It operates purely on State without database access.
 """
 
 import logging
-import re
 import time
 from typing import Dict, Any
 
 from core.tracking import LLMTracker
 from threadline.agents.email_state import EmailState, add_node_error
+from threadline.agents.llm_batch import (
+    build_chat_request,
+    is_graph_interrupt,
+    is_llm_batch_enabled,
+    request_deferred_completions,
+    unwrap_deferred_result,
+)
+from threadline.agents.llm_streaming import resolve_llm_streaming
 from threadline.agents.nodes.base_node import BaseLangGraphNode
+from threadline.agents.prompt_context import (
+    build_budgeted_context,
+    estimate_tokens,
+    expand_image_placeholders,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +125,15 @@ class LLMEmailNode(BaseLangGraphNode):
             logger.error(error_message)
             return add_node_error(state, self.node_name, error_message)
 
+        budgeted = build_budgeted_context(
+            state,
+            "llm_email",
+            content_with_attachment_content,
+            model_name=state.get("text_llm_model"),
+            reserved_text=email_content_prompt,
+        )
+        content_with_attachment_content = budgeted.text
+
         started_at = None
         try:
             attachment_count = len(state.get("attachments", []) or [])
@@ -123,6 +144,7 @@ class LLMEmailNode(BaseLangGraphNode):
                 f"attachments={attachment_count} "
                 f"prompt_chars={prompt_size} "
                 f"content_chars={content_size} "
+                f"estimated_tokens={budgeted.estimated_tokens} "
                 f"text_llm_config_uuid={text_llm_config_uuid}"
             )
             self._record_progress_step(
@@ -132,6 +154,7 @@ class LLMEmailNode(BaseLangGraphNode):
                 state=state,
                 ratio=0.1,
                 attachment_count=attachment_count,
+                **budgeted.as_log_data(),
             )
 
             logger.debug(f"Before LLM call: {content_with_attachment_content}")
@@ -144,14 +167,68 @@ class LLMEmailNode(BaseLangGraphNode):
                 ratio=0.25,
                 attachment_count=attachment_count,
             )
-            llm_result, usage = LLMTracker.call_and_track(
-                prompt=email_content_prompt,
-                content=content_with_attachment_content,
-                json_mode=False,
-                state=state,
-                node_name=self.node_name,
-                model_uuid=text_llm_config_uuid,
-            )
+            tracking_tags = {
+                "estimated_input_tokens": estimate_tokens(
+                    email_content_prompt, state.get("text_llm_model")
+                )
+                + budgeted.estimated_tokens,
+            }
+            streaming = resolve_llm_streaming(state, "llm_email")
+            if is_llm_batch_enabled(state, "llm_email"):
+                # Interrupts the graph until the provider batch returns;
+                # on resume the result is returned here instead.
+                deferred = request_deferred_completions(
+                    state,
+                    self.node_name,
+                    {
+                        "content": {
+                            "body": build_chat_request(
+                                email_content_prompt,
+                                content_with_attachment_content,
+                                model=state.get("text_llm_model"),
+                            ),
+                            "json_mode": False,
+                        }
+                    },
+                    model_uuid=text_llm_config_uuid,
+                    tracking_tags=tracking_tags,
+                )
+                llm_result, usage = unwrap_deferred_result(
+                    deferred["content"]
+                )
+            elif streaming is not None:
+                llm_result, usage = LLMTracker.stream_and_track(
+                    prompt=email_content_prompt,
+                    content=content_with_attachment_content,
+                    json_mode=False,
+                    state=state,
+                    node_name=self.node_name,
+                    model_uuid=text_llm_config_uuid,
+                    tracking_tags=tracking_tags,
+                    model_name=state.get("text_llm_model"),
+                    **streaming.tracker_kwargs(
+                        self._stream_progress_callback(
+                            state,
+                            "LLM_CALL_PROGRESS",
+                            "Generating email content",
+                            ratio_start=0.25,
+                            ratio_end=0.95,
+                            expected_tokens=(
+                                streaming.expected_output_tokens
+                            ),
+                        )
+                    ),
+                )
+            else:
+                llm_result, usage = LLMTracker.call_and_track(
+                    prompt=email_content_prompt,
+                    content=content_with_attachment_content,
+                    json_mode=False,
+                    state=state,
+                    node_name=self.node_name,
+                    model_uuid=text_llm_config_uuid,
+                    tracking_tags=tracking_tags,
+                )
             elapsed = time.monotonic() - started_at
             logger.debug(f"After LLM call: {llm_result}")
             usage_model = (
@@ -177,6 +254,9 @@ class LLMEmailNode(BaseLangGraphNode):
                 elapsed_sec=round(elapsed, 2),
                 usage_model=usage_model,
                 total_tokens=total_tokens,
+                truncated=bool(
+                    isinstance(usage, dict) and usage.get("truncated")
+                ),
             )
             llm_content = llm_result.strip() if llm_result else ""
 
@@ -190,6 +270,8 @@ class LLMEmailNode(BaseLangGraphNode):
                 return {**state, "llm_content": ""}
 
         except Exception as e:
+            if is_graph_interrupt(e):
+                raise
             elapsed = None
             try:
                 elapsed = time.monotonic() - started_at
@@ -224,9 +306,6 @@ class LLMEmailNode(BaseLangGraphNode):
         """
         Replace [IMAGE: filename] placeholders with actual attachment content.
 
-        This method finds all image placeholders in the content and replaces
-        them with the corresponding LLM-processed attachment content.
-
         Args:
             content: Email content with image placeholders
             attachments: List of attachment states
@@ -234,78 +313,4 @@ class LLMEmailNode(BaseLangGraphNode):
         Returns:
             str: Content with image placeholders replaced by OCR content
         """
-        image_placeholder_pattern = r"\[IMAGE:\s*([^\]]+)\]"
-        placeholders = re.findall(image_placeholder_pattern, content)
-
-        if not placeholders:
-            logger.debug("No image placeholders found in email content")
-            return content
-
-        logger.info(
-            f"Found {len(placeholders)} image placeholders: {placeholders}"
-        )
-
-        attachment_content_map = {}
-        for att in attachments:
-            # Only process image attachments
-            if not att.get("is_image"):
-                continue
-
-            filename = att.get("filename")
-            logger.debug(f"Processing image attachment: {filename}")
-
-            # Get llm_content and check if it exists
-            llm_content_raw = att.get("llm_content")
-            if llm_content_raw:
-                llm_content = llm_content_raw.strip()
-            else:
-                logger.debug(f"No LLM content for {filename}, skipping")
-                continue
-
-            safe_filename = att.get("safe_filename") or filename
-            if safe_filename:
-                attachment_content_map[safe_filename] = llm_content
-                logger.debug(
-                    f"Mapped {safe_filename} to attachment content "
-                    f"({len(llm_content)} chars)"
-                )
-
-        logger.info(
-            "Created attachment content map with "
-            f"{len(attachment_content_map)} entries"
-        )
-
-        # Add attachment content as context without removing placeholders
-        # This allows LLM to understand image content while
-        # preserving placeholders for later processing
-        replaced_count = 0
-        for filename in placeholders:
-            filename_stripped = filename.strip()
-            if filename_stripped in attachment_content_map:
-                placeholder = f"[IMAGE: {filename}]"
-                attachment_content = attachment_content_map[filename_stripped]
-
-                # Add attachment content after the placeholder with clear
-                # delimiters. This keeps the placeholder for Jira processing.
-                content = content.replace(
-                    placeholder,
-                    f"{placeholder}\n"
-                    f"--- Attachment Content for {filename_stripped} ---\n"
-                    f"{attachment_content}\n"
-                    f"--- End of Attachment Content ---\n",
-                )
-                replaced_count += 1
-                logger.debug(
-                    f"Added attachment content for {filename_stripped}"
-                )
-            else:
-                logger.warning(
-                    f"No attachment content found for image placeholder: "
-                    f"{filename_stripped}"
-                )
-
-        logger.info(
-            f"Replaced {replaced_count}/{len(placeholders)} image placeholders"
-        )
-
-        return content
+        return expand_image_placeholders(content, attachments)
@@ -6,7 +6,7 @@ It operates purely on State without database access.
 """
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from dateutil import parser as date_parser
 from django.utils import timezone
@@ -14,10 +14,41 @@ from zoneinfo import ZoneInfo
 
 from core.tracking import LLMTracker
 from threadline.agents.email_state import EmailState, add_node_error
+from threadline.agents.llm_batch import (
+    build_chat_request,
+    is_graph_interrupt,
+    is_llm_batch_enabled,
+    request_deferred_completions,
+    unwrap_deferred_result,
+)
+from threadline.agents.llm_streaming import (
+    StreamingOptions,
+    resolve_llm_streaming,
+)
 from threadline.agents.nodes.base_node import BaseLangGraphNode
+from threadline.agents.prompt_context import (
+    build_attachment_digest,
+    build_budgeted_context,
+    estimate_tokens,
+    expand_image_placeholders,
+)
 
 logger = logging.getLogger(__name__)
 
+# Summary input modes, selected via task_config["summary_input_mode"]:
+# - llm_content: normalized llm_content only (default)
+# - compact: llm_content plus a short attachment digest
+# - raw: raw text with attachment content expanded inline, as sent to
+#   llm_email_node (baseline for A/B comparison)
+SUMMARY_INPUT_LLM_CONTENT = "llm_content"
+SUMMARY_INPUT_COMPACT = "compact"
+SUMMARY_INPUT_RAW = "raw"
+SUMMARY_INPUT_MODES = (
+    SUMMARY_INPUT_LLM_CONTENT,
+    SUMMARY_INPUT_COMPACT,
+    SUMMARY_INPUT_RAW,
+)
+
 
 class SummaryNode(BaseLangGraphNode):
     progress_stage = "summary"
@@ -189,10 +220,55 @@ class SummaryNode(BaseLangGraphNode):
 
         return processed_todos
 
+    def _summary_input_mode(self, state: EmailState) -> str:
+        """
+        Resolve the summary input mode from the workflow task_config.
+        """
+        mode = (state.get("task_config") or {}).get("summary_input_mode")
+        if mode in SUMMARY_INPUT_MODES:
+            return mode
+        if mode:
+            logger.warning(
+                f"Unknown summary_input_mode '{mode}', "
+                f"using '{SUMMARY_INPUT_LLM_CONTENT}'"
+            )
+        return SUMMARY_INPUT_LLM_CONTENT
+
+    def _build_summary_input(self, state: EmailState, mode: str) -> str:
+        """
+        Build the text content section for the selected input mode.
+
+        Args:
+            state: Current email state
+            mode: One of SUMMARY_INPUT_MODES
+
+        Returns:
+            str: Text content to summarize
+        """
+        llm_content = state.get("llm_content", "") or ""
+        attachments = state.get("attachments") or []
+
+        if mode == SUMMARY_INPUT_RAW:
+            text_content = state.get("text_content", "") or ""
+            if text_content.strip():
+                return expand_image_placeholders(text_content, attachments)
+            return llm_content
+
+        if mode == SUMMARY_INPUT_COMPACT:
+            digest = build_attachment_digest(attachments)
+            if digest:
+                return f"{llm_content}\n\nAttachments:\n{digest}"
+
+        return llm_content
+
     def _build_prompt_context(self, state: EmailState) -> str:
         """
         Build LLM prompt context with current time and timezone info.
 
+        The text content is fitted into the summary token budget; the
+        fixed header lines and the larger of the two summary prompts are
+        counted against it.
+
         Args:
             state: Current email state
 
@@ -200,7 +276,9 @@ class SummaryNode(BaseLangGraphNode):
             str: Formatted context string
         """
         subject = state.get("subject", "") or ""
-        llm_content = state.get("llm_content", "") or ""
+        summary_input = self._build_summary_input(
+            state, self._summary_input_mode(state)
+        )
         user_timezone = state.get("user_timezone") or "UTC"
 
         current_utc = timezone.now()
@@ -226,8 +304,23 @@ class SummaryNode(BaseLangGraphNode):
                 "content should be interpreted using the provided user "
                 "timezone unless explicitly stated otherwise."
             ),
-            f"Text Content: {llm_content}",
         ]
+        prompt_config = state.get("prompt_config") or {}
+        longest_prompt = max(
+            (
+                prompt_config.get("summary_prompt") or "",
+                prompt_config.get("summary_title_prompt") or "",
+            ),
+            key=len,
+        )
+        budgeted = build_budgeted_context(
+            state,
+            "summary",
+            summary_input,
+            model_name=state.get("text_llm_model"),
+            reserved_text="\n".join(context_parts) + longest_prompt,
+        )
+        context_parts.append(f"Text Content: {budgeted.text}")
 
         return "\n".join(context_parts) + "\n"
 
@@ -298,6 +391,77 @@ class SummaryNode(BaseLangGraphNode):
             else existing_summary_content or ""
         )
 
+    def _request_deferred_summary(
+        self,
+        state: EmailState,
+        *,
+        content: str,
+        summary_prompt: str,
+        summary_title_prompt: str,
+        need_title: bool,
+        need_summary: bool,
+        tracking_tags: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Defer the title and JSON summary calls to one provider batch.
+
+        Both calls go into a single interrupt so the workflow waits for
+        one batch round trip. Returns {} when the node runs realtime.
+        """
+        if not is_llm_batch_enabled(state, "summary"):
+            return {}
+
+        model = state.get("text_llm_model")
+        batch_requests = {}
+        if need_title:
+            batch_requests["title"] = {
+                "body": build_chat_request(
+                    summary_title_prompt, content, model=model
+                ),
+                "json_mode": False,
+            }
+        if need_summary:
+            batch_requests["summary"] = {
+                "body": build_chat_request(
+                    summary_prompt, content, model=model, json_mode=True
+                ),
+                "json_mode": True,
+            }
+        if not batch_requests:
+            return {}
+
+        return request_deferred_completions(
+            state,
+            self.node_name,
+            batch_requests,
+            model_uuid=state.get("text_llm_config_uuid"),
+            tracking_tags=tracking_tags,
+        )
+
+    def _call_llm(
+        self,
+        deferred_results: Dict[str, Any],
+        key: str,
+        streaming: Optional[StreamingOptions] = None,
+        on_progress: Optional[Callable[[int, float], None]] = None,
+        **kwargs: Any,
+    ):
+        """
+        Return the deferred result for ``key`` or call the LLM directly.
+
+        With streaming options the call streams and reports progress via
+        ``on_progress``; otherwise it blocks until the completion arrives.
+        """
+        if key in deferred_results:
+            return unwrap_deferred_result(deferred_results[key])
+        if streaming is not None and on_progress is not None:
+            return LLMTracker.stream_and_track(
+                model_name=kwargs["state"].get("text_llm_model"),
+                **streaming.tracker_kwargs(on_progress),
+                **kwargs,
+            )
+        return LLMTracker.call_and_track(**kwargs)
+
     def execute_processing(self, state: EmailState) -> EmailState:
         """
         Execute summary generation.
@@ -330,11 +494,19 @@ class SummaryNode(BaseLangGraphNode):
             logger.error(error_message)
             return add_node_error(state, self.node_name, error_message)
 
+        input_mode = self._summary_input_mode(state)
         content = self._build_prompt_context(state)
+        tracking_tags = {
+            "input_mode": input_mode,
+            "estimated_input_tokens": estimate_tokens(
+                content, state.get("text_llm_model")
+            ),
+        }
 
         logger.info(
-            "Using LLM-processed content and timezone context "
-            "for summary generation"
+            f"Using {input_mode} input and timezone context "
+            "for summary generation "
+            f"(estimated_tokens={tracking_tags['estimated_input_tokens']})"
         )
 
         summary_data = state.get("summary_data")
@@ -344,6 +516,18 @@ class SummaryNode(BaseLangGraphNode):
         text_llm_config_uuid = state.get("text_llm_config_uuid")
 
         try:
+            deferred_results = self._request_deferred_summary(
+                state,
+                content=content,
+                summary_prompt=summary_prompt,
+                summary_title_prompt=summary_title_prompt,
+                need_title=not summary_title or force,
+                need_summary=not summary_data or force,
+                tracking_tags=tracking_tags,
+            )
+            # Only the JSON call streams; titles are a few tokens.
+            streaming = resolve_llm_streaming(state, "summary")
+
             # Generate summary_title (still using Markdown mode)
             if not summary_title or force:
                 logger.info("Generating summary title")
@@ -354,13 +538,16 @@ class SummaryNode(BaseLangGraphNode):
                     state=state,
                     ratio=0.15,
                 )
-                summary_title_raw, usage = LLMTracker.call_and_track(
+                summary_title_raw, usage = self._call_llm(
+                    deferred_results,
+                    "title",
                     prompt=summary_title_prompt,
                     content=content,
                     json_mode=False,
                     state=state,
                     node_name=self.node_name,
                     model_uuid=text_llm_config_uuid,
+                    tracking_tags=tracking_tags,
                 )
                 if summary_title_raw:
                     summary_title = summary_title_raw.strip()
@@ -388,13 +575,29 @@ class SummaryNode(BaseLangGraphNode):
                 try:
                     # LLMTracker.call_and_track with json_mode=True
                     # automatically parses JSON and returns dict
-                    summary_json, usage = LLMTracker.call_and_track(
+                    summary_json, usage = self._call_llm(
+                        deferred_results,
+                        "summary",
+                        streaming=streaming,
+                        on_progress=self._stream_progress_callback(
+                            state,
+                            "SUMMARY_JSON_PROGRESS",
+                            "Generating structured email summary",
+                            ratio_start=0.45,
+                            ratio_end=0.85,
+                            expected_tokens=(
+                                streaming.expected_output_tokens
+                                if streaming
+                                else 0
+                            ),
+                        ),
                         prompt=summary_prompt,
                         content=content,
                         json_mode=True,
                         state=state,
                         node_name=self.node_name,
                         model_uuid=text_llm_config_uuid,
+                        tracking_tags=tracking_tags,
                     )
 
                     # Extract structured data
@@ -448,6 +651,7 @@ class SummaryNode(BaseLangGraphNode):
                         state=state,
                         node_name=self.node_name,
                         model_uuid=text_llm_config_uuid,
+                        tracking_tags=tracking_tags,
                     )
                     if summary_content_raw:
                         summary_content = summary_content_raw.strip()
@@ -495,6 +699,8 @@ class SummaryNode(BaseLangGraphNode):
             }
 
         except Exception as e:
+            if is_graph_interrupt(e):
+                raise
             logger.error(f"Summary generation failed: {e}", exc_info=True)
             self._record_progress_step(
                 self.workflow_stage,
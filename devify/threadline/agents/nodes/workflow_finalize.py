@@ -359,6 +359,10 @@ class WorkflowFinalizeNode(BaseLangGraphNode):
         """
         Sync email attachments from state.
 
+        Attachments are grouped by the set of fields they update and each
+        group is written with one bulk_update, so the number of queries
+        does not grow with the attachment count.
+
         Args:
             state: Current email state
         """
@@ -366,7 +370,7 @@ class WorkflowFinalizeNode(BaseLangGraphNode):
         if not attachments:
             return
 
-        att_sync_count = 0
+        groups: Dict[tuple, list] = {}
         att_sync_summary = []
 
         for att_data in attachments:
@@ -381,17 +385,22 @@ class WorkflowFinalizeNode(BaseLangGraphNode):
                 att_updates["llm_content"] = att_data.get("llm_content")
 
             if att_updates:
-                EmailAttachment.objects.filter(id=att_id).update(**att_updates)
-                att_sync_count += 1
-                field_names = list(att_updates.keys())
+                field_names = tuple(att_updates.keys())
+                groups.setdefault(field_names, []).append(
+                    EmailAttachment(id=int(att_id), **att_updates)
+                )
                 att_sync_summary.append(f"#{att_id}[{', '.join(field_names)}]")
                 logger.debug(
-                    f"Updated attachment {att_id} with fields: {field_names}"
+                    f"Updating attachment {att_id} with fields: "
+                    f"{list(field_names)}"
                 )
 
-        if att_sync_count > 0:
+        for field_names, objs in groups.items():
+            EmailAttachment.objects.bulk_update(objs, list(field_names))
+
+        if att_sync_summary:
             logger.info(
-                f"Synced {att_sync_count} attachment(s): "
+                f"Synced {len(att_sync_summary)} attachment(s): "
                 f"{', '.join(att_sync_summary)}"
             )
 
@@ -399,6 +408,10 @@ class WorkflowFinalizeNode(BaseLangGraphNode):
         """
         Create/update EmailTodo records from state.
 
+        Existing TODOs of the email are fetched once and matched by
+        content; new ones are written with bulk_create and changed ones
+        with bulk_update.
+
         Args:
             email: EmailMessage object
             state: Current email state
@@ -409,9 +422,16 @@ class WorkflowFinalizeNode(BaseLangGraphNode):
             logger.debug(f"No TODOs to sync for email {email.id}")
             return
 
+        existing_todos: Dict[str, EmailTodo] = {}
+        for todo in EmailTodo.objects.filter(email_message=email).order_by(
+            "id"
+        ):
+            existing_todos.setdefault(todo.content, todo)
+
+        todos_to_create: Dict[str, EmailTodo] = {}
+        todos_to_update: Dict[int, EmailTodo] = {}
+        updated_fields: set = set()
         todo_sync_count = 0
-        todo_update_count = 0
-        todo_create_count = 0
 
         for todo_data in todos:
             if not isinstance(todo_data, dict):
@@ -435,64 +455,66 @@ class WorkflowFinalizeNode(BaseLangGraphNode):
                         f"'{deadline_processed_str}': {e}"
                     )
 
-            # Use get_or_create to avoid duplicates
-            # Match by email_message and content
-            todo, created = EmailTodo.objects.get_or_create(
-                email_message=email,
-                content=content,
-                defaults={
-                    "user": email.user,
-                    "is_completed": False,
-                    "priority": todo_data.get("priority"),
-                    "owner": todo_data.get("owner"),
-                    "deadline": deadline,
-                    "location": todo_data.get("location"),
-                    "metadata": todo_data.get("metadata", {}),
-                },
-            )
+            # Match by email_message and content to avoid duplicates
+            todo = existing_todos.get(content) or todos_to_create.get(content)
+            if todo is None:
+                todos_to_create[content] = EmailTodo(
+                    email_message=email,
+                    content=content,
+                    user=email.user,
+                    is_completed=False,
+                    priority=todo_data.get("priority"),
+                    owner=todo_data.get("owner"),
+                    deadline=deadline,
+                    location=todo_data.get("location"),
+                    metadata=todo_data.get("metadata", {}),
+                )
+                todo_sync_count += 1
+                continue
 
-            if created:
-                todo_create_count += 1
+            # Update existing TODO with new metadata
+            update_fields = []
+            priority = todo_data.get("priority")
+            if priority and todo.priority != priority:
+                todo.priority = priority
+                update_fields.append("priority")
+            owner = todo_data.get("owner")
+            if owner and todo.owner != owner:
+                todo.owner = owner
+                update_fields.append("owner")
+            if deadline and todo.deadline != deadline:
+                todo.deadline = deadline
+                update_fields.append("deadline")
+            location = todo_data.get("location")
+            if location and todo.location != location:
+                todo.location = location
+                update_fields.append("location")
+            if todo_data.get("metadata"):
+                todo.metadata = todo_data.get("metadata", {})
+                update_fields.append("metadata")
+
+            if update_fields and todo.pk:
+                todos_to_update[todo.pk] = todo
+                updated_fields.update(update_fields)
                 logger.debug(
-                    f"Created TODO {todo.id} for email {email.id}: "
-                    f"'{content[:50]}...'"
+                    f"Updating TODO {todo.id} for email {email.id}: "
+                    f"fields={update_fields}"
                 )
-            else:
-                # Update existing TODO with new metadata
-                update_fields = []
-                priority = todo_data.get("priority")
-                if priority and todo.priority != priority:
-                    todo.priority = priority
-                    update_fields.append("priority")
-                owner = todo_data.get("owner")
-                if owner and todo.owner != owner:
-                    todo.owner = owner
-                    update_fields.append("owner")
-                if deadline and todo.deadline != deadline:
-                    todo.deadline = deadline
-                    update_fields.append("deadline")
-                location = todo_data.get("location")
-                if location and todo.location != location:
-                    todo.location = location
-                    update_fields.append("location")
-                if todo_data.get("metadata"):
-                    todo.metadata = todo_data.get("metadata", {})
-                    update_fields.append("metadata")
-
-                if update_fields:
-                    todo.save(update_fields=update_fields)
-                    todo_update_count += 1
-                    logger.debug(
-                        f"Updated TODO {todo.id} for email {email.id}: "
-                        f"fields={update_fields}"
-                    )
 
             todo_sync_count += 1
 
+        if todos_to_create:
+            EmailTodo.objects.bulk_create(todos_to_create.values())
+        if todos_to_update:
+            EmailTodo.objects.bulk_update(
+                todos_to_update.values(), sorted(updated_fields)
+            )
+
         if todo_sync_count > 0:
             logger.info(
                 f"Synced {todo_sync_count} TODO(s) for email {email.id}: "
-                f"{todo_create_count} created, {todo_update_count} updated"
+                f"{len(todos_to_create)} created, "
+                f"{len(todos_to_update)} updated"
             )
 
     def _create_issue_record(
@@ -10,6 +10,7 @@ import logging
 
 from django.conf import settings as django_settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
 
 from billing.services.subscription_service import SubscriptionService
 from threadline.agents.nodes.base_node import BaseLangGraphNode
@@ -20,16 +21,18 @@ from threadline.agents.progress import (
 )
 from threadline.models import EmailMessage, Issue, Settings, EmailTodo
 from threadline.state_machine import EmailStatus
+from threadline.services.runtime_context import get_user_runtime_context
 from threadline.services.workflow_config import (
     resolve_threadline_image_llm_config,
     resolve_threadline_llm_config,
+    resolve_threadline_task_config,
     resolve_threadline_text_llm_config,
 )
 from threadline.utils.issues.merge_policy import (
     get_issue_merge_policy,
     is_retry_trigger_source,
 )
-from threadline.utils.prompt_config_manager import PromptConfigManager
+from threadline.utils.prompt_config_manager import get_prompt_config_manager
 
 logger = logging.getLogger(__name__)
 
@@ -97,10 +100,27 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         if not email_id:
             raise ValueError("email_id is required in state")
 
+        latest_issues = Issue.objects.order_by("-created_at", "-id")
         try:
+            # One prefetch for everything the prepare stage reads from
+            # the email and its merge neighbours.
             self.email = (
-                EmailMessage.objects.select_related("user")
-                .prefetch_related("attachments")
+                EmailMessage.objects.select_related(
+                    "user", "user__profile", "merged_into"
+                )
+                .prefetch_related(
+                    "attachments",
+                    Prefetch(
+                        "todos",
+                        queryset=EmailTodo.objects.order_by("created_at"),
+                    ),
+                    Prefetch("issues", queryset=latest_issues),
+                    Prefetch("merged_into__issues", queryset=latest_issues),
+                    "merged_children",
+                    Prefetch(
+                        "merged_children__issues", queryset=latest_issues
+                    ),
+                )
                 .get(id=email_id)
             )
         except EmailMessage.DoesNotExist:
@@ -129,7 +149,7 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         retry_scene = state.get("retry_scene")
 
         try:
-            prompt_manager = PromptConfigManager()
+            prompt_manager = get_prompt_config_manager()
 
             if retry_language or retry_scene:
                 if retry_language and retry_scene:
@@ -286,21 +306,13 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         if strategy == "new":
             return None, None, None, None
 
-        existing_issue = (
-            Issue.objects.filter(email_message=self.email)
-            .order_by("-created_at", "-id")
-            .first()
-        )
+        existing_issue = self._latest_issue(self.email)
         if existing_issue is None and self.email.merged_into_id:
             # When the current email is a merged child, use the canonical
             # email's issue directly instead of carrying a merge context.
             canonical = self._resolve_canonical_email()
             if canonical and canonical.id != self.email.id:
-                existing_issue = (
-                    Issue.objects.filter(email_message=canonical)
-                    .order_by("-created_at", "-id")
-                    .first()
-                )
+                existing_issue = self._latest_issue(canonical)
 
         if not existing_issue:
             return None, None, None, None
@@ -342,6 +354,17 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             issue_result_data,
         )
 
+    @staticmethod
+    def _latest_issue(email: EmailMessage) -> Issue | None:
+        """
+        Return the newest issue of an email, using prefetched issues.
+        """
+        return max(
+            email.issues.all(),
+            key=lambda issue: (issue.created_at, issue.id),
+            default=None,
+        )
+
     def _load_related_issue_keys(self) -> list[str]:
         """
         Load issue keys that should be associated with the current email.
@@ -351,7 +374,7 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         def append_issue_key(email: EmailMessage | None) -> None:
             if not email:
                 return
-            issue = email.issues.order_by("-created_at", "-id").first()
+            issue = self._latest_issue(email)
             if issue and issue.external_id:
                 related_issue_keys.append(str(issue.external_id))
 
@@ -388,9 +411,9 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         Returns:
             list: List of TODO data dictionaries
         """
-        existing_todos = EmailTodo.objects.filter(
-            email_message=self.email
-        ).order_by("created_at")
+        existing_todos = sorted(
+            self.email.todos.all(), key=lambda todo: todo.created_at
+        )
 
         todos_data = []
         for todo in existing_todos:
@@ -446,8 +469,21 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             "llm_config_uuid": (
                 str(llm_config.uuid) if llm_config else None
             ),
+            "image_llm_model": self._llm_model_name(image_llm_config),
+            "text_llm_model": self._llm_model_name(text_llm_config),
+            "task_config": resolve_threadline_task_config(),
         }
 
+    @staticmethod
+    def _llm_model_name(llm_config) -> str | None:
+        """
+        Return the configured model name of an LLMConfig, if any.
+        """
+        if llm_config is None:
+            return None
+        model = (getattr(llm_config, "config", None) or {}).get("model")
+        return str(model) if model else None
+
     def _build_email_state(
         self,
         state: EmailState,
@@ -462,6 +498,7 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         related_issue_keys: list[str] | None,
         summary_data: dict | None,
         todos_data: list,
+        shared_context: dict | None = None,
     ) -> EmailState:
         """
         Build the final EmailState dictionary with all loaded data.
@@ -479,6 +516,7 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             related_issue_keys: Related issue keys for association
             summary_data: Summary data from EmailMessage
             todos_data: List of TODO data
+            shared_context: Preloaded per-user context from a batch run
 
         Returns:
             EmailState: Complete state dictionary
@@ -487,6 +525,23 @@ class WorkflowPrepareNode(BaseLangGraphNode):
         if self.email.merged_into_id:
             metadata = None
 
+        if shared_context:
+            runtime_bindings = {
+                key: shared_context.get(key)
+                for key in (
+                    "image_llm_config_uuid",
+                    "text_llm_config_uuid",
+                    "llm_config_uuid",
+                    "image_llm_model",
+                    "text_llm_model",
+                    "task_config",
+                )
+            }
+            user_timezone = shared_context.get("user_timezone") or "UTC"
+        else:
+            runtime_bindings = self._load_threadline_runtime_bindings()
+            user_timezone = self._get_user_timezone()
+
         return {
             **state,
             "id": str(self.email.id),
@@ -517,8 +572,10 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             "related_issue_keys": related_issue_keys or [],
             "prompt_config": prompt_config,
             "issue_config": issue_config,
-            **self._load_threadline_runtime_bindings(),
-            "user_timezone": self._get_user_timezone(),
+            **runtime_bindings,
+            "user_timezone": user_timezone,
+            # Consumed here; keep it out of checkpoints for later nodes.
+            "shared_context": None,
             "created_at": (
                 self.email.created_at.isoformat()
                 if self.email.created_at
@@ -572,6 +629,30 @@ class WorkflowPrepareNode(BaseLangGraphNode):
 
         return default_timezone
 
+    def load_shared_context(self, state: EmailState) -> dict:
+        """
+        Load the per-user context that does not depend on the email.
+
+        Batch runs load this once per user and pass it in via
+        ``state["shared_context"]`` so each email skips the lookups.
+        Requires ``self.email`` to be set (any email of the user).
+
+        Args:
+            state: Current email state (reads retry language/scene)
+
+        Returns:
+            dict: user_id, prompt_config, issue_config, max_attachments,
+                user_timezone and the Threadline runtime bindings
+        """
+        return {
+            "user_id": str(self.email.user_id),
+            "prompt_config": self._load_prompt_config(state),
+            "issue_config": self._load_issue_config(),
+            "max_attachments": self._get_max_attachments(),
+            "user_timezone": self._get_user_timezone(),
+            **self._load_threadline_runtime_bindings(),
+        }
+
     def execute_processing(self, state: EmailState) -> EmailState:
         """
         Execute the workflow preparation logic.
@@ -601,7 +682,26 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             ratio=0.2,
         )
 
-        prompt_config = self._load_prompt_config(state)
+        shared_context = state.get("shared_context")
+        if shared_context and str(shared_context.get("user_id")) != str(
+            self.email.user_id
+        ):
+            logger.warning(
+                f"[{self.node_name}] Ignoring shared context of user "
+                f"{shared_context.get('user_id')} for email {self.email.id}"
+            )
+            shared_context = None
+        if not shared_context:
+            shared_context = get_user_runtime_context(
+                self.email.user_id,
+                lambda: self.load_shared_context(state),
+                language=state.get("retry_language"),
+                scene=state.get("retry_scene"),
+            )
+        if shared_context:
+            prompt_config = shared_context.get("prompt_config")
+        else:
+            prompt_config = self._load_prompt_config(state)
         self._record_progress_step(
             self.workflow_stage,
             "PREPARE_PROMPT_CONFIG",
@@ -610,7 +710,10 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             ratio=0.45,
             prompt_config=bool(prompt_config),
         )
-        issue_config = self._load_issue_config()
+        if shared_context:
+            issue_config = shared_context.get("issue_config")
+        else:
+            issue_config = self._load_issue_config()
         self._record_progress_step(
             self.workflow_stage,
             "PREPARE_ISSUE_CONFIG",
@@ -619,7 +722,10 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             ratio=0.6,
             issue_config=bool(issue_config),
         )
-        max_attachments = self._get_max_attachments()
+        if shared_context:
+            max_attachments = shared_context.get("max_attachments")
+        else:
+            max_attachments = self._get_max_attachments()
         attachments_data = self._load_attachments_data()
         self._record_progress_step(
             self.workflow_stage,
@@ -660,6 +766,7 @@ class WorkflowPrepareNode(BaseLangGraphNode):
             related_issue_keys,
             summary_data,
             todos_data,
+            shared_context=shared_context,
         )
         updated_state["progress_plan"] = build_workflow_progress_plan(
             estimate_prepare_workflow_units(state=updated_state)
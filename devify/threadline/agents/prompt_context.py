@@ -0,0 +1,487 @@
+"""
+Token-budgeted prompt context building for workflow LLM nodes.
+
+Nodes used to pass the full email body to the provider and rely on a fixed
+character cap (image intent) or no cap at all (llm_email, summary). This
+module estimates tokens locally before the call and shrinks the context in
+order of least value: quoted reply chains first, then trailing signatures,
+and only then a hard cut at the budget.
+
+It also hosts the attachment content helpers shared by the text nodes:
+inline expansion of ``[IMAGE: ...]`` placeholders and the compact
+attachment digest used by the summary node.
+
+Budgets are resolved per node from ``task_config["token_budgets"]`` of the
+Threadline workflow config, falling back to
+``settings.THREADLINE_PROMPT_TOKEN_BUDGETS``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "[Input truncated]"
+
+# Approximate characters per token for Latin text, and tokens per CJK
+# character, by model family. Values are deliberately conservative so the
+# estimate errs on the side of over-counting.
+MODEL_FAMILY_TOKEN_RATIOS: Dict[str, Dict[str, float]] = {
+    "openai": {"chars_per_token": 4.0, "cjk_tokens_per_char": 1.0},
+    "anthropic": {"chars_per_token": 3.5, "cjk_tokens_per_char": 1.2},
+    "gemini": {"chars_per_token": 4.0, "cjk_tokens_per_char": 0.8},
+    "qwen": {"chars_per_token": 3.8, "cjk_tokens_per_char": 0.7},
+    "deepseek": {"chars_per_token": 3.8, "cjk_tokens_per_char": 0.7},
+    "default": {"chars_per_token": 3.5, "cjk_tokens_per_char": 1.0},
+}
+
+_MODEL_FAMILY_PREFIXES = (
+    ("gpt", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("o4", "openai"),
+    ("claude", "anthropic"),
+    ("gemini", "gemini"),
+    ("qwen", "qwen"),
+    ("deepseek", "deepseek"),
+)
+
+_CJK_PATTERN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+)
+
+# Header lines that introduce a quoted previous message.
+_REPLY_HEADER_PATTERNS = (
+    re.compile(r"^\s*On .{0,200}wrote:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Forwarded message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*在.{0,200}写道[:：]\s*$"),
+    re.compile(r"^\s*-{2,}\s*原始邮件\s*-{2,}\s*$"),
+)
+# "From:" only starts a quoted message in a header block (Outlook style):
+# after a separator line or followed by Sent/Date/To lines. Elsewhere it
+# is prose, e.g. "From: the finance team".
+_FROM_HEADER_PATTERN = re.compile(r"^\s*From:\s.+$", re.IGNORECASE)
+_HEADER_FIELD_PATTERN = re.compile(r"^\s*(Sent|Date|To):\s", re.IGNORECASE)
+_HEADER_SEPARATOR_PATTERN = re.compile(r"^\s*(-{2,}|_{5,})\s*$")
+
+_SIGNATURE_DELIMITERS = (
+    re.compile(r"^--\s*$"),
+    re.compile(r"^_{5,}\s*$"),
+    re.compile(r"^Sent from my .+$", re.IGNORECASE),
+)
+
+# Signatures are only stripped when they sit in the tail of the message.
+_SIGNATURE_MAX_LINES = 12
+
+ATTACHMENT_DIGEST_MAX_ITEMS = 10
+ATTACHMENT_DIGEST_ITEM_CHARS = 240
+
+
+@dataclass(frozen=True)
+class BudgetedContext:
+    """
+    Result of fitting prompt content into a token budget.
+    """
+
+    text: str
+    budget: int | None
+    original_tokens: int
+    estimated_tokens: int
+    steps: tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.steps)
+
+    def as_log_data(self) -> Dict[str, Any]:
+        return {
+            "token_budget": self.budget,
+            "original_tokens": self.original_tokens,
+            "estimated_tokens": self.estimated_tokens,
+            "trim_steps": list(self.steps),
+        }
+
+
+def resolve_model_family(model_name: str | None) -> str:
+    """
+    Map a model name (e.g. ``gpt-4o-mini``) to a token ratio family.
+    """
+    name = (model_name or "").strip().lower()
+    if "/" in name:
+        name = name.rsplit("/", 1)[-1]
+    for prefix, family in _MODEL_FAMILY_PREFIXES:
+        if name.startswith(prefix):
+            return family
+    return "default"
+
+
+def estimate_tokens(text: str | None, model_name: str | None = None) -> int:
+    """
+    Estimate the token count of text without calling the provider.
+
+    Args:
+        text: Text to estimate
+        model_name: Optional model name used to pick the family ratio
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    ratios = MODEL_FAMILY_TOKEN_RATIOS[resolve_model_family(model_name)]
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return int(
+        math.ceil(
+            cjk_count * ratios["cjk_tokens_per_char"]
+            + other_count / ratios["chars_per_token"]
+        )
+    )
+
+
+def _is_from_header(lines: list[str], index: int) -> bool:
+    """
+    Whether lines[index] is the "From:" line of a quoted message header.
+    """
+    if not _FROM_HEADER_PATTERN.match(lines[index]):
+        return False
+    previous = next(
+        (line for line in reversed(lines[:index]) if line.strip()), ""
+    )
+    if _HEADER_SEPARATOR_PATTERN.match(previous):
+        return True
+    following = lines[index + 1:index + 2]
+    return bool(following) and bool(_HEADER_FIELD_PATTERN.match(following[0]))
+
+
+def trim_quoted_replies(text: str) -> str:
+    """
+    Drop quoted reply chains (``>`` lines and everything after a reply
+    header such as ``On ... wrote:``).
+    """
+    if not text:
+        return text
+
+    kept: list[str] = []
+    dropped = False
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        if any(
+            pattern.match(line) for pattern in _REPLY_HEADER_PATTERNS
+        ) or _is_from_header(lines, index):
+            # A reply header as the very first line is the message itself
+            # (e.g. a forward with no comment); keep it.
+            if any(existing.strip() for existing in kept):
+                dropped = True
+                break
+        if line.lstrip().startswith(">"):
+            dropped = True
+            continue
+        kept.append(line)
+
+    if not dropped:
+        return text
+    return "\n".join(kept).rstrip()
+
+
+def strip_signature(text: str) -> str:
+    """
+    Remove a trailing signature block introduced by a standard delimiter.
+    """
+    if not text:
+        return text
+
+    lines = text.splitlines()
+    start = max(0, len(lines) - _SIGNATURE_MAX_LINES)
+    for index in range(len(lines) - 1, start - 1, -1):
+        if any(
+            pattern.match(lines[index]) for pattern in _SIGNATURE_DELIMITERS
+        ):
+            if index == 0:
+                return text
+            return "\n".join(lines[:index]).rstrip()
+    return text
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, model_name: str | None = None
+) -> str:
+    """
+    Hard-cut text so its estimate fits ``max_tokens``, with a marker.
+    """
+    if estimate_tokens(text, model_name) <= max_tokens:
+        return text
+
+    marker = f"\n\n{TRUNCATION_MARKER}"
+    available = max(0, max_tokens - estimate_tokens(marker, model_name))
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle], model_name) <= available:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + marker
+
+
+def fit_text_to_budget(
+    text: str | None,
+    budget: int | None,
+    model_name: str | None = None,
+    reserved_tokens: int = 0,
+) -> BudgetedContext:
+    """
+    Shrink text until it fits the token budget.
+
+    Trimming is applied in order of least value: quoted reply chains,
+    trailing signature, then a hard cut.
+
+    Args:
+        text: Body text to fit
+        budget: Total token budget for the prompt context, None to disable
+        model_name: Optional model name used for estimation
+        reserved_tokens: Tokens already used by fixed context around the body
+
+    Returns:
+        BudgetedContext: Fitted text and estimation details
+    """
+    text = text or ""
+    original_tokens = estimate_tokens(text, model_name)
+    if not budget or budget <= 0:
+        return BudgetedContext(
+            text=text,
+            budget=None,
+            original_tokens=original_tokens,
+            estimated_tokens=original_tokens,
+        )
+
+    available = max(0, budget - reserved_tokens)
+    steps: list[str] = []
+    current = text
+    current_tokens = original_tokens
+
+    for step, trimmer in (
+        ("quoted_replies", trim_quoted_replies),
+        ("signature", strip_signature),
+    ):
+        if current_tokens <= available:
+            break
+        trimmed = trimmer(current)
+        if trimmed != current:
+            current = trimmed
+            current_tokens = estimate_tokens(current, model_name)
+            steps.append(step)
+
+    if current_tokens > available:
+        current = truncate_to_tokens(current, available, model_name)
+        current_tokens = estimate_tokens(current, model_name)
+        steps.append("truncate")
+
+    return BudgetedContext(
+        text=current,
+        budget=budget,
+        original_tokens=original_tokens,
+        estimated_tokens=current_tokens,
+        steps=tuple(steps),
+    )
+
+
+def expand_image_placeholders(content: str, attachments: list) -> str:
+    """
+    Replace [IMAGE: filename] placeholders with actual attachment content.
+
+    Finds all image placeholders in the content and replaces
+    them with the corresponding LLM-processed attachment content.
+
+    Args:
+        content: Email content with image placeholders
+        attachments: List of attachment states
+
+    Returns:
+        str: Content with image placeholders replaced by OCR content
+    """
+    image_placeholder_pattern = r"\[IMAGE:\s*([^\]]+)\]"
+    placeholders = re.findall(image_placeholder_pattern, content)
+
+    if not placeholders:
+        logger.debug("No image placeholders found in email content")
+        return content
+
+    logger.info(
+        f"Found {len(placeholders)} image placeholders: {placeholders}"
+    )
+
+    attachment_content_map = {}
+    for att in attachments:
+        # Only process image attachments
+        if not att.get("is_image"):
+            continue
+
+        filename = att.get("filename")
+        logger.debug(f"Processing image attachment: {filename}")
+
+        # Get llm_content and check if it exists
+        llm_content_raw = att.get("llm_content")
+        if llm_content_raw:
+            llm_content = llm_content_raw.strip()
+        else:
+            logger.debug(f"No LLM content for {filename}, skipping")
+            continue
+
+        safe_filename = att.get("safe_filename") or filename
+        if safe_filename:
+            attachment_content_map[safe_filename] = llm_content
+            logger.debug(
+                f"Mapped {safe_filename} to attachment content "
+                f"({len(llm_content)} chars)"
+            )
+
+    logger.info(
+        "Created attachment content map with "
+        f"{len(attachment_content_map)} entries"
+    )
+
+    # Add attachment content as context without removing placeholders
+    # This allows LLM to understand image content while
+    # preserving placeholders for later processing
+    replaced_count = 0
+    for filename in placeholders:
+        filename_stripped = filename.strip()
+        if filename_stripped in attachment_content_map:
+            placeholder = f"[IMAGE: {filename}]"
+            attachment_content = attachment_content_map[filename_stripped]
+
+            # Add attachment content after the placeholder with clear
+            # delimiters. This keeps the placeholder for Jira processing.
+            content = content.replace(
+                placeholder,
+                f"{placeholder}\n"
+                f"--- Attachment Content for {filename_stripped} ---\n"
+                f"{attachment_content}\n"
+                f"--- End of Attachment Content ---\n",
+            )
+            replaced_count += 1
+            logger.debug(
+                f"Added attachment content for {filename_stripped}"
+            )
+        else:
+            logger.warning(
+                f"No attachment content found for image placeholder: "
+                f"{filename_stripped}"
+            )
+
+    logger.info(
+        f"Replaced {replaced_count}/{len(placeholders)} image placeholders"
+    )
+
+    return content
+
+
+def build_attachment_digest(
+    attachments: list | None,
+    max_items: int = ATTACHMENT_DIGEST_MAX_ITEMS,
+    max_chars: int = ATTACHMENT_DIGEST_ITEM_CHARS,
+) -> str:
+    """
+    Build a compact one-line-per-attachment digest for summary prompts.
+
+    Each line carries the filename and the first ``max_chars`` of the
+    attachment's LLM content; attachments skipped by plan limits or without
+    content are listed by name only.
+
+    Args:
+        attachments: Attachment states
+        max_items: Maximum number of attachments to list
+        max_chars: Maximum characters of content per attachment
+
+    Returns:
+        str: Digest text, or "" when there are no attachments
+    """
+    lines: list[str] = []
+    attachments = attachments or []
+    for att in attachments[:max_items]:
+        name = att.get("filename") or att.get("safe_filename") or "attachment"
+        content = " ".join((att.get("llm_content") or "").split())
+        if len(content) > max_chars:
+            content = content[:max_chars].rstrip() + "..."
+        lines.append(f"- {name}: {content}" if content else f"- {name}")
+    remaining = len(attachments) - len(lines)
+    if remaining > 0:
+        lines.append(f"- ... {remaining} more attachment(s)")
+    return "\n".join(lines)
+
+
+def resolve_token_budget(
+    node_key: str, task_config: Mapping[str, Any] | None = None
+) -> int | None:
+    """
+    Resolve the prompt token budget for a workflow node.
+
+    Args:
+        node_key: Budget key (``llm_email``, ``summary``, ``image_intent``)
+        task_config: Threadline workflow task_config carried in State
+
+    Returns:
+        int | None: Token budget, or None when budgeting is disabled
+    """
+    budgets = (task_config or {}).get("token_budgets")
+    value = None
+    if isinstance(budgets, Mapping):
+        value = budgets.get(node_key)
+    if value is None:
+        value = getattr(
+            settings, "THREADLINE_PROMPT_TOKEN_BUDGETS", {}
+        ).get(node_key)
+    try:
+        value = int(value) if value is not None else None
+    except (TypeError, ValueError):
+        logger.warning(
+            f"Ignoring invalid token budget for {node_key}: {value!r}"
+        )
+        return None
+    return value if value and value > 0 else None
+
+
+def build_budgeted_context(
+    state: Mapping[str, Any],
+    node_key: str,
+    body: str | None,
+    *,
+    model_name: str | None = None,
+    reserved_text: str = "",
+) -> BudgetedContext:
+    """
+    Fit a node's prompt body into its configured token budget.
+
+    Args:
+        state: Current email state (reads ``task_config``)
+        node_key: Budget key for the node
+        body: Variable part of the prompt context to trim
+        model_name: Optional model name used for estimation
+        reserved_text: Fixed prompt text counted against the budget
+
+    Returns:
+        BudgetedContext: Fitted body and estimation details
+    """
+    budget = resolve_token_budget(node_key, state.get("task_config"))
+    result = fit_text_to_budget(
+        body,
+        budget,
+        model_name=model_name,
+        reserved_tokens=estimate_tokens(reserved_text, model_name),
+    )
+    if result.trimmed:
+        logger.info(
+            f"Prompt context for {node_key} trimmed "
+            f"{result.original_tokens} -> {result.estimated_tokens} tokens "
+            f"(budget={budget}, steps={','.join(result.steps)})"
+        )
+    return result
@@ -0,0 +1,297 @@
+"""
+Slim checkpoint state for the email processing workflow.
+
+Every node returns the full EmailState and the checkpointer persists it
+after each node, so bulky inputs (email bodies, prompt/issue configs and
+attachment OCR/LLM text) used to be rewritten to Redis on every step. In
+slim mode BaseLangGraphNode replaces those values with content-hash
+references on the way out and resolves them again on the way in, from a
+per-run cache (process-local first, then the Django cache so a resumed
+run on another worker still finds them). Resolving a reference refreshes
+its TTL in the Django cache, so a run that keeps going does not lose it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+STATE_REF_KEY = "$state_ref"
+STATE_REF_CACHE_PREFIX = "threadline:state_ref"
+
+# Top-level EmailState fields that are large and read-only after
+# WorkflowPrepareNode loads them.
+SLIM_STATE_FIELDS = (
+    "html_content",
+    "text_content",
+    "prompt_config",
+    "issue_config",
+)
+SLIM_ATTACHMENT_FIELDS = (
+    "ocr_content",
+    "ocr_cleaned_content",
+    "llm_content",
+)
+# Email body fields that can be reloaded from the EmailMessage row when
+# a reference expired from every cache.
+EMAIL_RELOADABLE_FIELDS = ("html_content", "text_content")
+
+LOCAL_CACHE_SIZE = 512
+# Fraction of the TTL after which a process-local hit refreshes the
+# shared cache entry again.
+LOCAL_REFRESH_FRACTION = 0.25
+
+# Cache key -> (value, monotonic time the shared entry was last written
+# or touched). Shared by the worker threads of batch workflow runs.
+_local_refs: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+_local_refs_lock = threading.Lock()
+
+
+class StateRefError(RuntimeError):
+    """
+    Raised when a state reference cannot be resolved.
+    """
+
+
+def _checkpoint_config() -> Dict:
+    return dict(getattr(settings, "THREADLINE_CHECKPOINT", None) or {})
+
+
+def is_slim_state_enabled() -> bool:
+    """
+    Whether bulky workflow state is checkpointed by reference.
+    """
+    return bool(_checkpoint_config().get("slim_state"))
+
+
+def _config_int(key: str, default: int) -> int:
+    try:
+        return int(_checkpoint_config().get(key) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def _is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and STATE_REF_KEY in value
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+
+
+def _cache_key(run_key: str, digest: str) -> str:
+    return f"{STATE_REF_CACHE_PREFIX}:{run_key}:{digest}"
+
+
+def _remember(key: str, value: Any) -> None:
+    with _local_refs_lock:
+        _local_refs[key] = (value, time.monotonic())
+        _local_refs.move_to_end(key)
+        while len(_local_refs) > LOCAL_CACHE_SIZE:
+            _local_refs.popitem(last=False)
+
+
+def _local_get(key: str) -> Optional[Tuple[Any, float]]:
+    with _local_refs_lock:
+        entry = _local_refs.get(key)
+        if entry is not None:
+            _local_refs.move_to_end(key)
+        return entry
+
+
+def _ref_ttl() -> int:
+    return _config_int("state_ref_ttl_sec", 86400)
+
+
+def _touch(key: str) -> None:
+    try:
+        cache.touch(key, _ref_ttl())
+    except Exception as exc:
+        logger.warning(f"Failed to refresh state reference {key}: {exc}")
+
+
+def _make_ref(run_key: str, value: Any) -> Any:
+    """
+    Return a reference for value, or value itself when it stays inline.
+    """
+    if value is None or _is_ref(value):
+        return value
+    encoded = _encode(value)
+    if len(encoded) < _config_int("slim_min_bytes", 1024):
+        return value
+
+    digest = hashlib.sha256(encoded).hexdigest()[:32]
+    key = _cache_key(run_key, digest)
+    if _local_get(key) is not None:
+        # Already stored during this run; nothing to write.
+        return {STATE_REF_KEY: digest, "bytes": len(encoded)}
+
+    try:
+        cache.set(key, value, _ref_ttl())
+    except Exception as exc:
+        logger.warning(f"Failed to store state reference {key}: {exc}")
+        return value
+    _remember(key, value)
+    return {STATE_REF_KEY: digest, "bytes": len(encoded)}
+
+
+def _reload_email_field(run_key: str, field: str) -> Optional[str]:
+    if field not in EMAIL_RELOADABLE_FIELDS:
+        return None
+    # Deferred: avoid importing models at module load.
+    from threadline.models import EmailMessage
+
+    return (
+        EmailMessage.objects.filter(id=run_key)
+        .values_list(field, flat=True)
+        .first()
+    )
+
+
+def _resolve_ref(run_key: str, field: str, ref: Dict) -> Any:
+    key = _cache_key(run_key, ref[STATE_REF_KEY])
+    entry = _local_get(key)
+    if entry is not None:
+        value, refreshed_at = entry
+        if time.monotonic() - refreshed_at > (
+            _ref_ttl() * LOCAL_REFRESH_FRACTION
+        ):
+            _touch(key)
+            _remember(key, value)
+        return value
+
+    try:
+        value = cache.get(key)
+    except Exception as exc:
+        logger.warning(f"Failed to read state reference {key}: {exc}")
+        value = None
+    if value is not None:
+        _touch(key)
+    else:
+        value = _reload_email_field(run_key, field)
+    if value is None:
+        raise StateRefError(
+            f"State reference for '{field}' expired: {key}"
+        )
+    _remember(key, value)
+    return value
+
+
+def slim_state(state: Dict) -> Dict:
+    """
+    Return state with bulky values replaced by references.
+
+    Values below THREADLINE_CHECKPOINT["slim_min_bytes"] and values the
+    cache could not store stay inline.
+
+    Args:
+        state: Full workflow state returned by a node
+
+    Returns:
+        Dict: Shallow copy of state suitable for checkpointing
+    """
+    run_key = state.get("id")
+    if not run_key:
+        return state
+
+    slim = dict(state)
+    for field in SLIM_STATE_FIELDS:
+        if field in slim:
+            slim[field] = _make_ref(run_key, slim[field])
+
+    attachments = slim.get("attachments")
+    if attachments:
+        slim_attachments = []
+        for attachment in attachments:
+            attachment = dict(attachment)
+            for field in SLIM_ATTACHMENT_FIELDS:
+                if field in attachment:
+                    attachment[field] = _make_ref(run_key, attachment[field])
+            slim_attachments.append(attachment)
+        slim["attachments"] = slim_attachments
+    return slim
+
+
+def resolve_state(state: Dict) -> Dict:
+    """
+    Return state with all references replaced by their values.
+
+    State without references is returned unchanged.
+
+    Args:
+        state: Checkpointed workflow state
+
+    Returns:
+        Dict: Full workflow state
+
+    Raises:
+        StateRefError: A reference expired from every cache
+    """
+    run_key = state.get("id")
+    resolved = None
+
+    for field in SLIM_STATE_FIELDS:
+        value = state.get(field)
+        if _is_ref(value):
+            resolved = resolved if resolved is not None else dict(state)
+            resolved[field] = _resolve_ref(run_key, field, value)
+
+    attachments = state.get("attachments")
+    if attachments and any(
+        _is_ref(attachment.get(field))
+        for attachment in attachments
+        for field in SLIM_ATTACHMENT_FIELDS
+    ):
+        resolved = resolved if resolved is not None else dict(state)
+        resolved["attachments"] = [
+            {
+                key: (
+                    _resolve_ref(run_key, key, value)
+                    if _is_ref(value)
+                    else value
+                )
+                for key, value in attachment.items()
+            }
+            for attachment in attachments
+        ]
+
+    return resolved if resolved is not None else state
+
+
+def checkpoint_state(state: Dict) -> Tuple[Dict, Optional[int]]:
+    """
+    Prepare a node's returned state for checkpointing.
+
+    Args:
+        state: Full workflow state returned by a node
+
+    Returns:
+        Tuple[Dict, Optional[int]]: The state to return to LangGraph and
+            its approximate serialized size in bytes (None unless
+            THREADLINE_CHECKPOINT["measure_bytes"] is on)
+    """
+    if is_slim_state_enabled():
+        try:
+            state = slim_state(state)
+        except Exception as exc:
+            logger.warning(f"Failed to slim workflow state: {exc}")
+
+    if not _checkpoint_config().get("measure_bytes"):
+        return state, None
+    try:
+        size = len(_encode(state))
+    except Exception:
+        size = None
+    return state, size
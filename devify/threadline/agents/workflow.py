@@ -12,16 +12,33 @@ import traceback
 from typing import Dict, Any
 
 from threadline.models import EmailMessage, EmailStatus
-from threadline.agents.checkpoint_manager import create_checkpointer
+from threadline.agents.checkpoint_manager import (
+    CHECKPOINT_POLICY_MEMORY,
+    CHECKPOINT_POLICY_NONE,
+    CHECKPOINT_POLICY_REDIS,
+    CHECKPOINT_POLICY_REDIS_EXPENSIVE,
+    WORKFLOW_CHECKPOINT_NS,
+    create_checkpointer,
+    create_expensive_node_checkpointer,
+    create_thread_config,
+    get_checkpoint_manager,
+    get_expensive_nodes,
+    get_memory_checkpointer,
+    is_resume_enabled,
+    is_resume_trigger_source,
+    resolve_checkpoint_policy,
+)
 from threadline.agents.email_state import (
     EmailState,
     create_email_state,
     has_node_errors,
 )
+from threadline.agents.llm_batch import collect_batch_interrupts
 from threadline.agents.progress import (
     build_workflow_progress_plan,
     estimate_initial_workflow_units,
 )
+from threadline.agents.state_refs import StateRefError, resolve_state
 from threadline.utils.task_tracer import TaskTracer, use_task_tracer
 
 logger = logging.getLogger(__name__)
@@ -89,8 +106,155 @@ def should_handle_error(state: EmailState) -> str:
     return "workflow_finalize"
 
 
-@lru_cache(maxsize=1)
-def create_email_processing_graph():
+# Node a failed run resumes at -> node whose checkpoint is rewritten to
+# continue there. Mirrors the edges in create_email_processing_graph;
+# workflow_prepare and credits_check always re-run with the whole graph.
+_RESUME_PREDECESSORS = {
+    "image_intent": "credits_check",
+    "llm_email": "image_intent",
+    "summary": "llm_email",
+    "metadata": "summary",
+    "workflow_finalize": "metadata",
+}
+
+
+def _find_resume_snapshot(graph, thread_id: str):
+    """
+    Return the last error-free checkpoint of a failed run, if any.
+
+    The latest checkpoint of ``thread_id`` must belong to a run that
+    finished with node errors. History is walked newest first back to
+    the start of that run; the first checkpoint without errors that
+    waits on a resumable node (and has credits consumed) is returned.
+
+    Args:
+        graph: Compiled workflow graph with a durable checkpointer
+        thread_id: LangGraph thread id of the failed run
+
+    Returns:
+        StateSnapshot | None: Checkpoint to resume from
+    """
+    history = graph.get_state_history(
+        {"configurable": {"thread_id": thread_id}}
+    )
+    latest = next(history, None)
+    if (
+        latest is None
+        or latest.next
+        or not has_node_errors(latest.values)
+    ):
+        return None
+
+    for snapshot in history:
+        if (
+            snapshot.next
+            and snapshot.next[0] in _RESUME_PREDECESSORS
+            and snapshot.values.get("credits_consumed")
+            and not has_node_errors(snapshot.values)
+        ):
+            return snapshot
+        if (snapshot.metadata or {}).get("source") == "input":
+            break
+    return None
+
+
+def _resume_failed_run(
+    graph,
+    email: EmailMessage,
+    snapshot,
+    trigger_source: str | None,
+    tracer: TaskTracer,
+):
+    """
+    Continue a failed run from ``snapshot``.
+
+    Credits are checked again (the failed run may have been refunded),
+    the email is marked PROCESSING as WorkflowPrepareNode would, and the
+    checkpoint is forked so the graph continues at the node that failed.
+
+    Returns:
+        dict | None: Final graph state, or None when the run cannot be
+            resumed and must restart from the beginning
+    """
+    # Deferred: node classes pull litellm/agentcore.
+    from threadline.agents.nodes.credits_check_node import CreditsCheckNode
+
+    try:
+        state = resolve_state(snapshot.values)
+    except StateRefError as exc:
+        logger.info(f"Cannot resume email {email.id}: {exc}")
+        return None
+
+    state = {
+        **state,
+        "force": False,
+        "trigger_source": trigger_source,
+        "checkpoint_policy": CHECKPOINT_POLICY_REDIS,
+        "credits_consumed": None,
+        "credits_transaction_id": None,
+        "credits_refunded": None,
+    }
+    state = CreditsCheckNode()(state)
+    if has_node_errors(state):
+        # Let the full run record the credit failure.
+        return None
+
+    email.set_status(EmailStatus.PROCESSING.value)
+    resume_from = snapshot.next[0]
+    # Write every channel so the fork does not pick up values of the
+    # failed run's later checkpoints.
+    config = graph.update_state(
+        snapshot.config,
+        state,
+        as_node=_RESUME_PREDECESSORS[resume_from],
+    )
+    tracer.append_task(
+        "WORKFLOW_RESUME",
+        f"Resuming failed workflow at {resume_from}",
+        {
+            "email_id": str(email.id),
+            "resume_from": resume_from,
+            "checkpoint_id": snapshot.config["configurable"].get(
+                "checkpoint_id"
+            ),
+        },
+    )
+    return graph.invoke(None, config=config)
+
+
+def _release_run_checkpoints(graph, thread_id: str) -> None:
+    """
+    Let the graph's checkpointer drop what it held for a finished run.
+    """
+    release = getattr(graph.checkpointer, "release_thread", None)
+    if release is not None:
+        release(thread_id)
+
+
+def _create_policy_checkpointer(checkpoint_policy: str):
+    """
+    Return the checkpointer a graph compiled for the policy uses.
+    """
+    if checkpoint_policy == CHECKPOINT_POLICY_NONE:
+        return None
+    if checkpoint_policy == CHECKPOINT_POLICY_MEMORY:
+        return get_memory_checkpointer()
+
+    checkpointer = create_checkpointer()
+    if (
+        checkpoint_policy == CHECKPOINT_POLICY_REDIS_EXPENSIVE
+        and checkpointer is not None
+    ):
+        return create_expensive_node_checkpointer(
+            checkpointer, get_expensive_nodes()
+        )
+    return checkpointer
+
+
+@lru_cache(maxsize=4)
+def create_email_processing_graph(
+    checkpoint_policy: str = CHECKPOINT_POLICY_REDIS,
+):
     """
     Create and compile the email processing workflow graph.
 
@@ -105,6 +269,11 @@ def create_email_processing_graph():
     8. WorkflowFinalizeNode - Sync all results to database and publish
        downstream relay events on success
 
+    One compiled graph is cached per checkpoint policy.
+
+    Args:
+        checkpoint_policy: One of the checkpoint_manager policies
+
     Returns:
         Compiled LangGraph workflow
     """
@@ -168,12 +337,112 @@ def create_email_processing_graph():
     # WorkflowFinalize is the single exit point (always executes)
     workflow.add_edge("workflow_finalize", END)
 
-    graph = workflow.compile(checkpointer=create_checkpointer())
+    graph = workflow.compile(
+        checkpointer=_create_policy_checkpointer(checkpoint_policy)
+    )
 
     logger.info("Email processing workflow graph compiled successfully")
     return graph
 
 
+def _handle_workflow_result(
+    email: EmailMessage,
+    thread_id: str,
+    result: Dict[str, Any],
+    tracer: TaskTracer,
+    log_context: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Turn a graph invocation result into the workflow result dict.
+
+    A run interrupted by deferred LLM nodes stays checkpointed under
+    ``thread_id``; its batch requests are queued and the run reports
+    ``deferred`` instead of success or failure.
+    """
+    email_id = email.id
+    user_id = email.user_id
+
+    batch_interrupts = collect_batch_interrupts(result)
+    if batch_interrupts:
+        # Deferred: the batch service (and requests) is only needed when a
+        # node actually deferred its LLM calls.
+        from threadline.services.llm_batch import register_deferred_requests
+
+        batch_requests = register_deferred_requests(
+            email, thread_id, batch_interrupts
+        )
+        logger.info(
+            f"{tracer.context_summary(log_context)} "
+            f"deferred {len(batch_requests)} LLM request(s) to provider "
+            f"batch for email {email_id}, thread_id={thread_id}"
+        )
+        tracer.append_task(
+            "WORKFLOW_DEFERRED",
+            "Email processing workflow waiting for batch LLM results",
+            {
+                "email_id": str(email_id),
+                "thread_id": thread_id,
+                "nodes": sorted(
+                    {payload["node_name"] for payload in batch_interrupts}
+                ),
+                "request_count": len(batch_requests),
+            },
+        )
+        return {
+            "success": True,
+            "deferred": True,
+            "result": result,
+            "error": None,
+        }
+
+    success = not has_node_errors(result)
+
+    if success:
+        logger.info(
+            f"{tracer.context_summary(log_context)} "
+            f"completed successfully for email {email_id}, user {user_id}"
+        )
+    else:
+        node_errors = result.get("node_errors", {})
+        logger.error(
+            f"{tracer.context_summary(log_context)} "
+            f"completed with errors for email {email_id}, user {user_id}: "
+            f"{node_errors}"
+        )
+
+    if success:
+        tracer.append_task(
+            "WORKFLOW_COMPLETE",
+            "Email processing workflow completed successfully",
+            {
+                "email_id": str(email_id),
+                "success": success,
+                "node_errors": result.get("node_errors", {}),
+            },
+        )
+    else:
+        tracer.append_task(
+            "WORKFLOW_FAILED",
+            "Email processing workflow completed with errors",
+            {
+                "email_id": str(email_id),
+                "success": success,
+                "node_errors": result.get("node_errors", {}),
+            },
+        )
+
+    return {
+        "success": success,
+        "result": resolve_state(result),
+        "error": (
+            f'Email workflow failed with errors: '
+            f'{result.get("node_errors", {})}'
+            if not success
+            else None
+        ),
+    }
+
+
 def execute_email_processing_workflow(
     email: EmailMessage,
     force: bool = False,
@@ -181,6 +450,7 @@ def execute_email_processing_workflow(
     scene: str = None,
     trigger_source: str | None = None,
     tracer: TaskTracer | None = None,
+    shared_context: Dict[str, Any] | None = None,
 ) -> Dict[str, Any]:
     """
     Execute the email processing workflow for an email.
@@ -195,6 +465,8 @@ def execute_email_processing_workflow(
         force: Whether to force execution even if already completed
         language: Optional language override for this retry
         scene: Optional scene override for this retry
+        shared_context: Optional per-user context preloaded by a batch run
+            (see WorkflowPrepareNode.load_shared_context)
 
     Returns:
         Dict with success status and result/error
@@ -220,27 +492,36 @@ def execute_email_processing_workflow(
             initial_state["retry_language"] = language
         if scene:
             initial_state["retry_scene"] = scene
+        if shared_context:
+            initial_state["shared_context"] = shared_context
 
-        graph = create_email_processing_graph()
+        checkpoint_policy = resolve_checkpoint_policy(trigger_source)
+        initial_state["checkpoint_policy"] = checkpoint_policy
+        graph = create_email_processing_graph(checkpoint_policy)
 
         if force:
             from django.utils import timezone
 
             timestamp = int(timezone.now().timestamp())
             thread_id = f"email_workflow_{email_id}_force_{timestamp}"
+            if is_resume_enabled():
+                # A forced run supersedes whatever a failed run left to
+                # resume on the regular thread.
+                clear_email_workflow_checkpoint(email_id)
         else:
             thread_id = f"email_workflow_{email_id}"
 
         config = {
             "configurable": {
                 "thread_id": thread_id,
-                "checkpoint_ns": "email_processing",
+                "checkpoint_ns": WORKFLOW_CHECKPOINT_NS,
             }
         }
 
         logger.info(
             f"{tracer.context_summary({'email_id': email_id, 'user_id': user_id, 'force': force, 'language': language, 'scene': scene})} "
-            f"using thread_id={thread_id} (force={force})"
+            f"using thread_id={thread_id} (force={force}, "
+            f"checkpoint_policy={checkpoint_policy})"
         )
 
         tracer.append_task(
@@ -255,60 +536,160 @@ def execute_email_processing_workflow(
             },
         )
 
-        with use_task_tracer(tracer):
-            result = graph.invoke(initial_state, config=config)
-
-        success = not has_node_errors(result)
+        resume_snapshot = None
+        if (
+            not force
+            and not language
+            and not scene
+            and checkpoint_policy != CHECKPOINT_POLICY_NONE
+            and is_resume_trigger_source(trigger_source)
+        ):
+            # The failed run's checkpoints are in Redis whatever policy
+            # this run resolved to; a plain Redis graph also persists
+            # the forked checkpoint the resumed run starts from.
+            try:
+                resume_graph = create_email_processing_graph(
+                    CHECKPOINT_POLICY_REDIS
+                )
+                resume_snapshot = _find_resume_snapshot(
+                    resume_graph, thread_id
+                )
+            except Exception as exc:
+                logger.warning(
+                    f"Failed to look up resumable checkpoint for email "
+                    f"{email_id}: {exc}"
+                )
+
+        try:
+            with use_task_tracer(tracer):
+                result = None
+                if resume_snapshot is not None:
+                    result = _resume_failed_run(
+                        resume_graph,
+                        email,
+                        resume_snapshot,
+                        trigger_source,
+                        tracer,
+                    )
+                if result is None:
+                    result = graph.invoke(initial_state, config=config)
+        finally:
+            if checkpoint_policy == CHECKPOINT_POLICY_MEMORY:
+                # In-memory checkpoints never outlive the run.
+                get_memory_checkpointer().delete_thread(thread_id)
+            else:
+                _release_run_checkpoints(graph, thread_id)
+
+        return _handle_workflow_result(
+            email,
+            thread_id,
+            result,
+            tracer,
+            {
+                "email_id": email_id,
+                "user_id": user_id,
+                "force": force,
+                "language": language,
+                "scene": scene,
+            },
+        )
 
-        if success:
-            logger.info(
-                f"{tracer.context_summary({'email_id': email_id, 'user_id': user_id, 'force': force, 'language': language, 'scene': scene})} "
-                f"completed successfully for email {email_id}, user {user_id}"
-            )
-        else:
-            node_errors = result.get("node_errors", {})
-            logger.error(
-                f"{tracer.context_summary({'email_id': email_id, 'user_id': user_id, 'force': force, 'language': language, 'scene': scene})} "
-                f"completed with errors for email {email_id}, user {user_id}: "
-                f"{node_errors}"
-            )
+    except Exception as e:
+        error_traceback = traceback.format_exc()
+        logger.error(
+            f"Fatal workflow error for email {email_id}, user {user_id}: {e}"
+        )
+        logger.error(f"Full traceback:\n{error_traceback}")
 
-        if success:
-            tracer.append_task(
-                "WORKFLOW_COMPLETE",
-                "Email processing workflow completed successfully",
-                {
-                    "email_id": str(email_id),
-                    "success": success,
-                    "node_errors": result.get("node_errors", {}),
-                },
-            )
-        else:
+        error_msg = str(e)
+        if tracer is not None:
             tracer.append_task(
-                "WORKFLOW_FAILED",
-                "Email processing workflow completed with errors",
+                "WORKFLOW_ERROR",
+                f"Email processing workflow failed: {error_msg}",
                 {
                     "email_id": str(email_id),
-                    "success": success,
-                    "node_errors": result.get("node_errors", {}),
+                    "error": error_msg,
+                    "traceback": error_traceback,
                 },
             )
+        _update_email_status_on_fatal_error(email_id, error_msg)
 
-        return {
-            "success": success,
-            "result": result,
-            "error": (
-                f'Email workflow failed with errors: '
-                f'{result.get("node_errors", {})}'
-                if not success
-                else None
-            ),
+        return {"success": False, "result": None, "error": error_msg}
+
+
+def resume_email_processing_workflow(
+    email: EmailMessage,
+    thread_id: str,
+    resume: Dict[str, Any],
+    tracer: TaskTracer | None = None,
+) -> Dict[str, Any]:
+    """
+    Resume a checkpointed workflow with provider batch results.
+
+    The graph continues from the node that deferred its LLM calls; that
+    node runs again and receives ``resume`` in place of the interrupt. A
+    later deferred node interrupts the run again.
+
+    Args:
+        email: EmailMessage whose workflow is checkpointed
+        thread_id: LangGraph thread id of the interrupted run
+        resume: Batch results keyed by the node's request keys
+        tracer: Optional task tracer for this resume
+
+    Returns:
+        Dict with success status and result/error (``deferred`` when the
+        run is waiting on another batch)
+    """
+    # Deferred: langgraph is only needed once the graph runs.
+    from langgraph.types import Command
+
+    email_id = email.id
+    user_id = email.user_id
+    log_context = {
+        "email_id": email_id,
+        "user_id": user_id,
+        "thread_id": thread_id,
+    }
+
+    try:
+        tracer = tracer or TaskTracer("EMAIL_WORKFLOW")
+        graph = create_email_processing_graph()
+        config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": WORKFLOW_CHECKPOINT_NS,
+            }
         }
+        logger.info(
+            f"{tracer.context_summary(log_context)} "
+            f"resuming workflow for email {email_id} with "
+            f"{len(resume)} batch result(s)"
+        )
+        tracer.append_task(
+            "WORKFLOW_RESUME",
+            "Email processing workflow resumed with batch LLM results",
+            {
+                "email_id": str(email_id),
+                "thread_id": thread_id,
+                "request_keys": sorted(resume),
+            },
+        )
+
+        try:
+            with use_task_tracer(tracer):
+                result = graph.invoke(Command(resume=resume), config=config)
+        finally:
+            _release_run_checkpoints(graph, thread_id)
+
+        return _handle_workflow_result(
+            email, thread_id, result, tracer, log_context
+        )
 
     except Exception as e:
         error_traceback = traceback.format_exc()
         logger.error(
-            f"Fatal workflow error for email {email_id}, user {user_id}: {e}"
+            f"Fatal error resuming workflow for email {email_id}, "
+            f"user {user_id}: {e}"
         )
         logger.error(f"Full traceback:\n{error_traceback}")
 
@@ -316,9 +697,10 @@ def execute_email_processing_workflow(
         if tracer is not None:
             tracer.append_task(
                 "WORKFLOW_ERROR",
-                f"Email processing workflow failed: {error_msg}",
+                f"Email processing workflow resume failed: {error_msg}",
                 {
                     "email_id": str(email_id),
+                    "thread_id": thread_id,
                     "error": error_msg,
                     "traceback": error_traceback,
                 },
@@ -363,7 +745,9 @@ def clear_email_workflow_checkpoint(email_id: str) -> bool:
     """
     try:
         logger.info(f"Clearing email workflow checkpoint for: {email_id}")
-        return True
+        return get_checkpoint_manager().clear_checkpoint(
+            create_thread_config(f"email_workflow_{email_id}")
+        )
     except Exception as e:
         logger.error(
             f"Error clearing email workflow checkpoint: {email_id}, {e}"
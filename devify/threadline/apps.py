@@ -1,6 +1,7 @@
 import logging
 
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 logger = logging.getLogger(__name__)
 
@@ -19,5 +20,13 @@ class ThreadlineConfig(AppConfig):
         import threadline.tasks.email_merge  # noqa: F401
         import threadline.tasks.email_fetch  # noqa: F401
         import threadline.tasks.email_workflow  # noqa: F401
+        import threadline.tasks.llm_batch  # noqa: F401
         import threadline.tasks.notifications  # noqa: F401
         import threadline.tasks.scheduler  # noqa: F401
+        import threadline.signals  # noqa: F401
+
+        from threadline.services.search import install_search_index
+
+        # Databases built without migrations (tests) need the full-text
+        # index as well.
+        post_migrate.connect(install_search_index, sender=self)
@@ -22,7 +22,7 @@ from django.core.management.base import BaseCommand
 
 from threadline.models import Settings
 from threadline.utils.issues.issue_factory import normalize_issue_engine
-from threadline.utils.prompt_config_manager import PromptConfigManager
+from threadline.utils.prompt_config_manager import get_prompt_config_manager
 
 logger = logging.getLogger(__name__)
 
@@ -277,7 +277,7 @@ class Command(BaseCommand):
             dict: Prompt configuration or None on error
         """
         try:
-            config_manager = PromptConfigManager()
+            config_manager = get_prompt_config_manager()
             user_prompt_config = config_manager.generate_user_config(
                 language, scene
             )
@@ -29,6 +29,13 @@ Usage:
 
     # Enable debug logging
     python manage.py process_emails --user username --debug
+
+    # Reprocess several emails in one batch run (shared per-user context)
+    python manage.py process_emails --email-ids 12,13,14 --force
+
+    # Reprocess a backlog of failed emails with bounded concurrency
+    python manage.py process_emails --reprocess-status failed --limit 1000
+    python manage.py process_emails --reprocess-status failed --concurrency 8
 """
 
 import logging
@@ -87,6 +94,37 @@ class Command(BaseCommand):
                 "Specific email ID to reprocess (can be used independently)"
             ),
         )
+        parser.add_argument(
+            "--email-ids",
+            type=str,
+            help=(
+                "Comma-separated email IDs to reprocess in one batch run"
+            ),
+        )
+        parser.add_argument(
+            "--reprocess-status",
+            type=str,
+            choices=[choice.value for choice in EmailStatus],
+            help=(
+                "Reprocess emails in this status in one batch run "
+                "(optionally limited to --user)"
+            ),
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help=("Maximum number of emails for --reprocess-status"),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help=(
+                "Parallel workflow runs for batch reprocessing "
+                "(default: THREADLINE_BATCH_WORKFLOW_CONCURRENCY)"
+            ),
+        )
         parser.add_argument(
             "--force",
             action="store_true",
@@ -116,8 +154,10 @@ class Command(BaseCommand):
             logging.getLogger().setLevel(logging.DEBUG)
             logger.info("Debug logging enabled")
 
+        if options["email_ids"] or options["reprocess_status"]:
+            self.process_email_batch(options)
         # Check if specific email ID is provided
-        if options["email_id"]:
+        elif options["email_id"]:
             self.process_single_email_by_id(
                 options["email_id"], options["force"], options["verbose"]
             )
@@ -309,6 +349,78 @@ class Command(BaseCommand):
             )
             raise CommandError(f"Failed to process email ID={email_id}: {e}")
 
+    def process_email_batch(self, options):
+        """
+        Reprocess many emails through the batch workflow task.
+
+        Emails are selected by --email-ids or by --reprocess-status
+        (optionally filtered by --user and capped by --limit). The batch
+        runs in this process and reports aggregate throughput.
+
+        Args:
+            options: Parsed command line options
+        """
+        # Deferred: keep command import light for the other modes.
+        from threadline.tasks import process_email_workflow_batch
+
+        if options["email_ids"]:
+            try:
+                email_ids = [
+                    int(value)
+                    for value in options["email_ids"].split(",")
+                    if value.strip()
+                ]
+            except ValueError:
+                raise CommandError(
+                    "--email-ids must be a comma-separated list of integers"
+                )
+        else:
+            queryset = EmailMessage.objects.filter(
+                status=options["reprocess_status"]
+            )
+            if options["user"]:
+                queryset = queryset.filter(user__username=options["user"])
+            queryset = queryset.order_by("id").values_list("id", flat=True)
+            if options["limit"]:
+                queryset = queryset[: options["limit"]]
+            email_ids = list(queryset)
+
+        if not email_ids:
+            self.stdout.write(self.style.WARNING("No emails to reprocess"))
+            return
+
+        logger.info(f"Batch reprocessing {len(email_ids)} email(s)")
+        summary = process_email_workflow_batch.run(
+            [str(email_id) for email_id in email_ids],
+            force=options["force"],
+            trigger_source="command_batch",
+            max_concurrency=options["concurrency"],
+        )
+
+        if options["verbose"]:
+            for item in summary["results"]:
+                self.stdout.write(
+                    f"   Email ID={item['email_id']}: {item['status']}"
+                    + (f" ({item['error']})" if item.get("error") else "")
+                )
+
+        style = (
+            self.style.SUCCESS
+            if summary["failure_count"] == 0
+            else self.style.WARNING
+        )
+        self.stdout.write(
+            style(
+                f"Batch processed {summary['total']} email(s) in "
+                f"{summary['elapsed_sec']}s "
+                f"({summary['emails_per_sec']} emails/sec): "
+                f"{summary['success_count']} succeeded, "
+                f"{summary['failure_count']} failed, "
+                f"{summary['skipped_count']} skipped, "
+                f"{summary['not_found_count']} not found"
+            )
+        )
+
     def process_single_email(self, user, email_id, force=False, verbose=False):
         """
         Process a single email by ID for a specific user.
@@ -0,0 +1,229 @@
+"""
+Django management command for offline merge replay.
+
+This command replays a user's historical emails through the automatic merge
+engine in received order and compares the decisions with the recorded
+merge clusters. Nothing is written to the database, so it is safe to run
+against production snapshots when tuning the merge thresholds or measuring
+merge engine changes.
+
+Usage:
+    # Replay all emails of a user
+    python manage.py replay_merges --user alice
+
+    # Replay one month with a stricter similarity threshold
+    python manage.py replay_merges --user alice --since 2026-01-01 \
+        --until 2026-02-01 --ratio-threshold 70
+
+    # Print every decision and the disagreements, or a JSON report
+    python manage.py replay_merges --user alice --verbose
+    python manage.py replay_merges --user alice --json
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from threadline.services.merge_replay import MergeReplay
+
+logger = logging.getLogger(__name__)
+
+# Command option -> EmailMergeService attribute
+SETTING_OPTIONS = {
+    "ratio_threshold": "RAPIDFUZZ_RATIO_THRESHOLD",
+    "partial_ratio_threshold": "RAPIDFUZZ_PARTIAL_RATIO_THRESHOLD",
+    "min_text_similarity_length": "MIN_TEXT_SIMILARITY_LENGTH",
+    "min_containment_score": "MIN_CONTAINMENT_SCORE",
+    "content_window_days": "CONTENT_WINDOW_DAYS",
+    "thread_window_days": "THREAD_RELATION_WINDOW_DAYS",
+}
+
+
+def _parse_moment(value: str | None, option: str):
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid {option} value: {value}")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _format_ratio(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:.1%}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a user's emails through the merge engine without writing "
+        "and report decisions, accuracy and timings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=str,
+            required=True,
+            help="Username whose emails are replayed.",
+        )
+        parser.add_argument(
+            "--since",
+            type=str,
+            help="Replay emails received at or after this date/datetime.",
+        )
+        parser.add_argument(
+            "--until",
+            type=str,
+            help="Replay emails received before this date/datetime.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Replay at most this many emails.",
+        )
+        parser.add_argument(
+            "--ratio-threshold",
+            type=float,
+            help="Override RAPIDFUZZ_RATIO_THRESHOLD.",
+        )
+        parser.add_argument(
+            "--partial-ratio-threshold",
+            type=float,
+            help="Override RAPIDFUZZ_PARTIAL_RATIO_THRESHOLD.",
+        )
+        parser.add_argument(
+            "--min-text-similarity-length",
+            type=int,
+            help="Override MIN_TEXT_SIMILARITY_LENGTH.",
+        )
+        parser.add_argument(
+            "--min-containment-score",
+            type=float,
+            help="Override MIN_CONTAINMENT_SCORE.",
+        )
+        parser.add_argument(
+            "--content-window-days",
+            type=int,
+            help="Override CONTENT_WINDOW_DAYS.",
+        )
+        parser.add_argument(
+            "--thread-window-days",
+            type=int,
+            help="Override THREAD_RELATION_WINDOW_DAYS.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the report as JSON.",
+        )
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Print every decision and the disagreements.",
+        )
+
+    def handle(self, *args, **options):
+        username = options["user"]
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist as exc:
+            raise CommandError(f'User "{username}" does not exist.') from exc
+
+        overrides = {
+            setting: options[option]
+            for option, setting in SETTING_OPTIONS.items()
+            if options.get(option) is not None
+        }
+        replay = MergeReplay(
+            user.id,
+            since=_parse_moment(options.get("since"), "--since"),
+            until=_parse_moment(options.get("until"), "--until"),
+            limit=options.get("limit"),
+            overrides=overrides,
+        )
+        report = replay.run()
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps(
+                    {
+                        "user": username,
+                        "overrides": overrides,
+                        **report.as_dict(),
+                    },
+                    indent=2,
+                )
+            )
+            return
+
+        summary = report.as_dict()
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"Merge replay for {username}: {summary['emails']} email(s)"
+            )
+        )
+        if overrides:
+            self.stdout.write(f"Overrides: {overrides}")
+        if options["verbose"]:
+            for decision in report.decisions:
+                self.stdout.write(
+                    f"  {decision.email_id} | "
+                    f"{decision.reason or '-'} | "
+                    f"sources={decision.source_ids} | "
+                    f"{decision.seconds * 1000:.1f} ms | "
+                    f"{decision.subject or '(No Subject)'}"
+                )
+
+        self.stdout.write("")
+        self.stdout.write(f"Merged: {summary['merged']}")
+        for reason, count in sorted(summary["reasons"].items()):
+            self.stdout.write(f"  {reason}: {count}")
+        self.stdout.write(
+            f"Precision: {_format_ratio(summary['precision'])} "
+            f"({summary['correct_pairs']}/{summary['predicted_pairs']} pairs)"
+        )
+        self.stdout.write(
+            f"Recall: {_format_ratio(summary['recall'])} "
+            f"({summary['recovered_merges']}/{summary['expected_merges']} "
+            "emails)"
+        )
+
+        timings = summary["timings"]
+        if timings:
+            self.stdout.write(
+                f"Timings: mean {timings['mean_ms']:.1f} ms, "
+                f"p50 {timings['p50_ms']:.1f} ms, "
+                f"p95 {timings['p95_ms']:.1f} ms, "
+                f"max {timings['max_ms']:.1f} ms, "
+                f"{timings['queries']} queries, "
+                f"{timings['candidates']} candidates"
+            )
+
+        if options["verbose"]:
+            for title, decisions in (
+                ("False merges", report.false_merges()),
+                ("Missed merges", report.missed_merges()),
+            ):
+                self.stdout.write("")
+                self.stdout.write(f"{title}: {len(decisions)}")
+                for decision in decisions:
+                    self.stdout.write(
+                        f"  {decision.email_id} | "
+                        f"sources={decision.source_ids} | "
+                        f"{decision.subject or '(No Subject)'}"
+                    )
+
+        self.stdout.write(
+            self.style.WARNING("Replay only: no changes were written.")
+        )
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0037_emailmessage_merge_evidence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMBatchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_batch_id', models.CharField(help_text='Batch ID returned by the provider', max_length=255, unique=True, verbose_name='Provider Batch ID')),
+                ('llm_config_uuid', models.UUIDField(blank=True, help_text='agentcore-metering LLM config used for the batch', null=True, verbose_name='LLM Config UUID')),
+                ('input_file_id', models.CharField(blank=True, max_length=255, verbose_name='Input File ID')),
+                ('output_file_id', models.CharField(blank=True, max_length=255, verbose_name='Output File ID')),
+                ('error_file_id', models.CharField(blank=True, max_length=255, verbose_name='Error File ID')),
+                ('status', models.CharField(choices=[('submitted', 'Submitted'), ('completed', 'Completed'), ('failed', 'Failed')], default='submitted', max_length=20, verbose_name='Status')),
+                ('provider_status', models.CharField(blank=True, help_text='Last status reported by the provider', max_length=32, verbose_name='Provider Status')),
+                ('request_count', models.PositiveIntegerField(default=0, verbose_name='Request Count')),
+                ('error_message', models.TextField(blank=True, verbose_name='Error Message')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Completed At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'LLM Batch Job',
+                'verbose_name_plural': 'LLM Batch Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='threadline__status_93406a_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LLMBatchRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('custom_id', models.CharField(help_text='Request identifier echoed back in the batch output', max_length=128, unique=True, verbose_name='Custom ID')),
+                ('thread_id', models.CharField(help_text='LangGraph thread holding the workflow checkpoint', max_length=255, verbose_name='Thread ID')),
+                ('node_name', models.CharField(max_length=64, verbose_name='Node')),
+                ('request_key', models.CharField(help_text='Key of the call within the node (e.g. title)', max_length=64, verbose_name='Request Key')),
+                ('llm_config_uuid', models.UUIDField(blank=True, null=True, verbose_name='LLM Config UUID')),
+                ('request_body', models.JSONField(help_text='Chat completion body sent in the JSONL line', verbose_name='Request Body')),
+                ('json_mode', models.BooleanField(default=False, verbose_name='JSON Mode')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('submitted', 'Submitted'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('response', models.JSONField(blank=True, help_text='Response content and token usage', null=True, verbose_name='Response')),
+                ('error_message', models.TextField(blank=True, verbose_name='Error Message')),
+                ('resumed_at', models.DateTimeField(blank=True, help_text='When the workflow was resumed with this result', null=True, verbose_name='Resumed At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('batch_job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='threadline.llmbatchjob', verbose_name='Batch Job')),
+                ('email_message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='llm_batch_requests', to='threadline.emailmessage', verbose_name='Email Message')),
+            ],
+            options={
+                'verbose_name': 'LLM Batch Request',
+                'verbose_name_plural': 'LLM Batch Requests',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='threadline__status_d2308c_idx'), models.Index(fields=['thread_id', 'resumed_at'], name='threadline__thread__44df6d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 22:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0038_llm_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(help_text='agentcore TaskExecution task_id', max_length=255, verbose_name='Task ID')),
+                ('seq', models.PositiveIntegerField(help_text='Position of the step within the task', verbose_name='Sequence')),
+                ('action', models.CharField(max_length=100, verbose_name='Action')),
+                ('level', models.CharField(default='INFO', max_length=16, verbose_name='Level')),
+                ('ts', models.DateTimeField(verbose_name='Timestamp')),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Step message and data', verbose_name='Payload')),
+            ],
+            options={
+                'verbose_name': 'Task Step',
+                'verbose_name_plural': 'Task Steps',
+                'ordering': ['task_id', 'seq'],
+                'indexes': [models.Index(fields=['ts'], name='threadline__ts_af8e2b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('task_id', 'seq'), name='uniq_task_step_seq')],
+            },
+        ),
+    ]
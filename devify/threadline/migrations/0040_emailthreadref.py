@@ -0,0 +1,99 @@
+# Generated by Django 5.1.4 on 2026-10-18 23:32
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+THREAD_HEADER_PATTERN = re.compile(r"<([^>]+)>")
+BATCH_SIZE = 1000
+
+
+def _tokens(value):
+    if not value:
+        return []
+    return [
+        match.group(1).strip()
+        for match in THREAD_HEADER_PATTERN.finditer(value)
+    ]
+
+
+def populate_thread_refs(apps, schema_editor):
+    """
+    Index the thread headers of existing emails.
+    """
+    EmailMessage = apps.get_model("threadline", "EmailMessage")
+    EmailThreadRef = apps.get_model("threadline", "EmailThreadRef")
+
+    batch = []
+    queryset = EmailMessage.objects.only(
+        "id",
+        "user_id",
+        "message_id",
+        "raw_message_id",
+        "in_reply_to",
+        "references",
+    )
+    for email in queryset.iterator(chunk_size=BATCH_SIZE):
+        message_ids = set(_tokens(email.raw_message_id))
+        if not message_ids and email.raw_message_id:
+            message_ids.add(email.raw_message_id.strip())
+        if email.message_id:
+            message_ids.add(email.message_id)
+        references = email.references or []
+        if not isinstance(references, list):
+            references = [str(references)]
+        reference_ids = set(_tokens(email.in_reply_to))
+        for value in references:
+            reference_ids.update(_tokens(value))
+
+        for kind, tokens in (
+            ("message_id", message_ids),
+            ("reference", reference_ids),
+        ):
+            batch.extend(
+                EmailThreadRef(
+                    user_id=email.user_id,
+                    email_id=email.id,
+                    kind=kind,
+                    token=token[:255],
+                )
+                for token in {token[:255] for token in tokens if token}
+            )
+        if len(batch) >= BATCH_SIZE:
+            EmailThreadRef.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        EmailThreadRef.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0039_task_step'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailThreadRef',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(help_text='Message ID without angle brackets', max_length=255, verbose_name='Token')),
+                ('kind', models.CharField(choices=[('message_id', 'Message ID'), ('reference', 'Reference')], max_length=16, verbose_name='Kind')),
+                ('email', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='thread_refs', to='threadline.emailmessage', verbose_name='Email Message')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_thread_refs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Email Thread Reference',
+                'verbose_name_plural': 'Email Thread References',
+                'indexes': [models.Index(fields=['user', 'kind', 'token'], name='etr_user_kind_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('email', 'kind', 'token'), name='uniq_email_thread_ref')],
+            },
+        ),
+        migrations.RunPython(
+            code=populate_thread_refs,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.1.4 on 2026-10-18 23:40
+
+import hashlib
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of threadline.utils.merge_fingerprint at the time of this
+# migration, so later changes to the live code do not alter it.
+SUBJECT_PREFIX_PATTERN = re.compile(r"^\s*((re|fw|fwd)\s*:\s*)+", re.I)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+QUOTED_LINE_PATTERN = re.compile(r"(?m)^\s*>.*$")
+SEPARATOR_LINE_PATTERN = re.compile(r"(?m)^-----.*?-----$")
+SIMHASH_BITS = 64
+SIMHASH_SHINGLE_SIZE = 4
+BATCH_SIZE = 500
+
+
+def _normalize_subject(subject):
+    subject = SUBJECT_PREFIX_PATTERN.sub("", subject or "")
+    return WHITESPACE_PATTERN.sub(" ", subject.strip().lower())
+
+
+def _normalize_text(content):
+    content = QUOTED_LINE_PATTERN.sub("", content or "")
+    content = SEPARATOR_LINE_PATTERN.sub("", content)
+    content = WHITESPACE_PATTERN.sub(" ", content.replace("\r", "\n"))
+    return content.strip().lower()
+
+
+def _simhash(text):
+    if not text:
+        return None
+    size = min(SIMHASH_SHINGLE_SIZE, len(text))
+    shingles = Counter(
+        text[index : index + size] for index in range(len(text) - size + 1)
+    )
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in shingles.items():
+        digest = int.from_bytes(
+            hashlib.blake2b(
+                shingle.encode("utf-8"), digest_size=SIMHASH_BITS // 8
+            ).digest(),
+            "big",
+        )
+        for bit in range(SIMHASH_BITS):
+            if digest >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    if value >= 1 << (SIMHASH_BITS - 1):
+        value -= 1 << SIMHASH_BITS
+    return value
+
+
+def merge_fingerprint(subject, text_content):
+    subject = _normalize_subject(subject)
+    text = _normalize_text(text_content)
+    return {
+        "merge_subject_hash": (
+            hashlib.md5(subject.encode("utf-8")).hexdigest()
+            if subject
+            else ""
+        ),
+        "merge_text_length": len(text),
+        "merge_text_simhash": _simhash(text),
+    }
+
+
+def populate_merge_fingerprints(apps, schema_editor):
+    """
+    Backfill merge fingerprints for existing emails.
+    """
+    EmailMessage = apps.get_model("threadline", "EmailMessage")
+    fields = ["merge_subject_hash", "merge_text_length", "merge_text_simhash"]
+
+    batch = []
+    queryset = EmailMessage.objects.only("id", "subject", "text_content")
+    for email in queryset.iterator(chunk_size=BATCH_SIZE):
+        for field, value in merge_fingerprint(
+            email.subject, email.text_content
+        ).items():
+            setattr(email, field, value)
+        batch.append(email)
+        if len(batch) >= BATCH_SIZE:
+            EmailMessage.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        EmailMessage.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0040_emailthreadref'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailmessage',
+            name='merge_subject_hash',
+            field=models.CharField(blank=True, default='', help_text='MD5 of the normalized subject', max_length=32, verbose_name='Merge Subject Hash'),
+        ),
+        migrations.AddField(
+            model_name='emailmessage',
+            name='merge_text_length',
+            field=models.PositiveIntegerField(default=0, help_text='Length of the normalized text content', verbose_name='Merge Text Length'),
+        ),
+        migrations.AddField(
+            model_name='emailmessage',
+            name='merge_text_simhash',
+            field=models.BigIntegerField(blank=True, help_text='64-bit SimHash of the normalized text content', null=True, verbose_name='Merge Text SimHash'),
+        ),
+        migrations.RunPython(
+            code=populate_merge_fingerprints,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='emailmessage',
+            index=models.Index(fields=['user', 'merge_subject_hash'], name='em_user_subject_hash_idx'),
+        ),
+    ]
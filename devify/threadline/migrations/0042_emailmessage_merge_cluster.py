@@ -0,0 +1,67 @@
+# Generated by Django 5.1.4 on 2026-10-19 00:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def populate_merge_clusters(apps, schema_editor):
+    """
+    Backfill cluster_root_id/cluster_depth from the merged_into tree.
+    """
+    EmailMessage = apps.get_model("threadline", "EmailMessage")
+
+    parents = dict(
+        EmailMessage.objects.filter(merged_into__isnull=False).values_list(
+            "id", "merged_into_id"
+        )
+    )
+    batch = []
+    for email_id in parents:
+        root_id, depth, seen = email_id, 0, {email_id}
+        while root_id in parents and parents[root_id] not in seen:
+            root_id = parents[root_id]
+            seen.add(root_id)
+            depth += 1
+        if root_id == email_id:
+            continue
+        batch.append(
+            EmailMessage(id=email_id, cluster_root_id=root_id, cluster_depth=depth)
+        )
+        if len(batch) >= BATCH_SIZE:
+            EmailMessage.objects.bulk_update(
+                batch, ["cluster_root_id", "cluster_depth"]
+            )
+            batch = []
+    if batch:
+        EmailMessage.objects.bulk_update(batch, ["cluster_root_id", "cluster_depth"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0041_emailmessage_merge_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailmessage',
+            name='cluster_depth',
+            field=models.PositiveIntegerField(default=0, help_text='Distance from the merge cluster head', verbose_name='Cluster Depth'),
+        ),
+        migrations.AddField(
+            model_name='emailmessage',
+            name='cluster_root_id',
+            field=models.BigIntegerField(blank=True, help_text='Head of the merge cluster this record belongs to; empty for cluster heads', null=True, verbose_name='Cluster Root ID'),
+        ),
+        migrations.RunPython(
+            code=populate_merge_clusters,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='emailmessage',
+            index=models.Index(fields=['cluster_root_id'], name='em_cluster_root_idx'),
+        ),
+    ]
@@ -0,0 +1,156 @@
+# Generated by Django 5.1.4 on 2026-10-19 00:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of threadline.utils.search_index as of this migration, so
+# later changes to the live search code cannot change what it does.
+SEARCH_DOCUMENT_TABLE = "threadline_searchdocument"
+EMAIL_SEARCH_FIELDS = (
+    "subject",
+    "sender",
+    "recipients",
+    "summary_title",
+    "summary_content",
+    "llm_content",
+    "text_content",
+    "message_id",
+)
+ATTACHMENT_SEARCH_FIELDS = ("filename", "content_type")
+BATCH_SIZE = 500
+
+FTS_TABLE = f"{SEARCH_DOCUMENT_TABLE}_fts"
+INSTALL_SQL = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"document, content='{SEARCH_DOCUMENT_TABLE}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON "
+        f"{SEARCH_DOCUMENT_TABLE} BEGIN INSERT INTO {FTS_TABLE}"
+        "(rowid, document) VALUES (new.id, new.document); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON "
+        f"{SEARCH_DOCUMENT_TABLE} BEGIN INSERT INTO {FTS_TABLE}"
+        f"({FTS_TABLE}, rowid, document) "
+        "VALUES ('delete', old.id, old.document); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON "
+        f"{SEARCH_DOCUMENT_TABLE} BEGIN INSERT INTO {FTS_TABLE}"
+        f"({FTS_TABLE}, rowid, document) "
+        "VALUES ('delete', old.id, old.document); "
+        f"INSERT INTO {FTS_TABLE}(rowid, document) "
+        "VALUES (new.id, new.document); END",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ],
+    "mysql": [
+        f"ALTER TABLE {SEARCH_DOCUMENT_TABLE} "
+        f"ADD FULLTEXT INDEX {SEARCH_DOCUMENT_TABLE}_ft (document)",
+    ],
+    "postgresql": [
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_DOCUMENT_TABLE}_tsv "
+        f"ON {SEARCH_DOCUMENT_TABLE} USING GIN (to_tsvector('simple', "
+        "regexp_replace(document, '[@./:+-]', ' ', 'g')))",
+    ],
+}
+UNINSTALL_SQL = {
+    "sqlite": [
+        *(
+            f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"
+            for suffix in ("ai", "ad", "au")
+        ),
+        f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    ],
+    "mysql": [
+        f"ALTER TABLE {SEARCH_DOCUMENT_TABLE} "
+        f"DROP INDEX {SEARCH_DOCUMENT_TABLE}_ft",
+    ],
+    "postgresql": [f"DROP INDEX IF EXISTS {SEARCH_DOCUMENT_TABLE}_tsv"],
+}
+
+
+def _run_search_index_sql(schema_editor, statements):
+    config = getattr(settings, "THREADLINE_SEARCH", None) or {}
+    if config.get("backend", "auto") == "like":
+        return
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def install_search_index(apps, schema_editor):
+    _run_search_index_sql(schema_editor, INSTALL_SQL)
+
+
+def uninstall_search_index(apps, schema_editor):
+    _run_search_index_sql(schema_editor, UNINSTALL_SQL)
+
+
+def build_search_document(obj, fields):
+    return "\n".join(
+        str(value) for value in (getattr(obj, field, None) for field in fields)
+        if value
+    )
+
+
+def populate_search_documents(apps, schema_editor):
+    """
+    Backfill search documents for existing emails and attachments.
+    """
+    SearchDocument = apps.get_model("threadline", "SearchDocument")
+    sources = [
+        ("email", apps.get_model("threadline", "EmailMessage"),
+         EMAIL_SEARCH_FIELDS),
+        ("attachment", apps.get_model("threadline", "EmailAttachment"),
+         ATTACHMENT_SEARCH_FIELDS),
+    ]
+    for kind, model, fields in sources:
+        batch = []
+        queryset = model.objects.only("id", "user_id", *fields)
+        for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+            batch.append(
+                SearchDocument(
+                    kind=kind,
+                    object_id=obj.id,
+                    user_id=obj.user_id,
+                    document=build_search_document(obj, fields),
+                )
+            )
+            if len(batch) >= BATCH_SIZE:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0042_emailmessage_merge_cluster'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('email', 'Email'), ('attachment', 'Attachment')], max_length=16, verbose_name='Kind')),
+                ('object_id', models.BigIntegerField(help_text='ID of the indexed email or attachment', verbose_name='Object ID')),
+                ('document', models.TextField(blank=True, help_text='Searchable text, one source column per line', verbose_name='Document')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'indexes': [models.Index(fields=['user', 'kind'], name='sd_user_kind_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_document')],
+            },
+        ),
+        migrations.RunPython(
+            code=install_search_index,
+            reverse_code=uninstall_search_index,
+        ),
+        migrations.RunPython(
+            code=populate_search_documents,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-19 01:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0043_searchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailmessage',
+            index=models.Index(fields=['user', 'received_at', 'id'], name='em_user_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailtodo',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='todo_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0044_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmbatchrequest',
+            name='submit_attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Failed attempts to submit the request in a batch', verbose_name='Submit Attempts'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-19 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0045_llmbatchrequest_submit_attempts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailmessage',
+            name='merge_pending',
+            field=models.BooleanField(default=False, help_text='Saved with its attachments and waiting for a per-user merge batch to claim it', verbose_name='Merge Pending'),
+        ),
+        migrations.AddIndex(
+            model_name='emailmessage',
+            index=models.Index(fields=['user', 'merge_pending'], name='em_user_merge_pending_idx'),
+        ),
+    ]
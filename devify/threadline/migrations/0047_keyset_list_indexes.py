@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threadline', '0046_emailmessage_merge_pending'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailattachment',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='att_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailtask',
+            index=models.Index(fields=['created_at', 'id'], name='task_created_idx'),
+        ),
+    ]
@@ -14,11 +14,18 @@ from threadline.state_machine import (
     get_initial_email_status,
     can_transition_to,
     get_next_states,
+    get_previous_states,
     EMAIL_STATE_MACHINE,
 )
+from threadline.utils.merge_fingerprint import merge_fingerprint
+from threadline.utils.processing_progress import publish_processing_progress
 
 logger = logging.getLogger(__name__)
 
+# EmailMessage columns the merge fingerprint is computed from.
+MERGE_FINGERPRINT_INPUTS = ("subject", "text_content")
+
+
 class Settings(models.Model):
     """
     User settings using key-value design with JSON values
@@ -263,12 +270,27 @@ class EmailTask(models.Model):
             models.Index(fields=["task_type"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["status", "created_at"]),
+            # Keyset pagination of the task list; tasks have no owner.
+            models.Index(
+                fields=["created_at", "id"],
+                name="task_created_idx",
+            ),
         ]
 
     def __str__(self):
         return f"EmailTask({self.id}): {self.task_type}-{self.status}"
 
 
+def _invalid_transition_message(old_status: str, new_status: str) -> str:
+    valid_transitions = get_next_states(old_status, EMAIL_STATE_MACHINE)
+    transitions_str = ", ".join(valid_transitions)
+    return (
+        f"Invalid email status transition from "
+        f"{old_status} to {new_status}. "
+        f"Valid transitions: {transitions_str}"
+    )
+
+
 class EmailMessage(models.Model):
     """
     Email message details
@@ -385,6 +407,21 @@ class EmailMessage(models.Model):
         verbose_name=_("Last Merged At"),
         help_text=_("Timestamp of the latest merge into this record"),
     )
+    # Materialized merged_into tree, maintained by the merge services
+    cluster_root_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Cluster Root ID"),
+        help_text=_(
+            "Head of the merge cluster this record belongs to; "
+            "empty for cluster heads"
+        ),
+    )
+    cluster_depth = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Cluster Depth"),
+        help_text=_("Distance from the merge cluster head"),
+    )
     raw_message_id = models.CharField(
         max_length=255,
         blank=True,
@@ -407,6 +444,33 @@ class EmailMessage(models.Model):
         verbose_name=_("References"),
         help_text=_("Normalized References header tokens"),
     )
+    # Merge fingerprint, derived from subject/text_content on save
+    merge_subject_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        verbose_name=_("Merge Subject Hash"),
+        help_text=_("MD5 of the normalized subject"),
+    )
+    merge_text_length = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Merge Text Length"),
+        help_text=_("Length of the normalized text content"),
+    )
+    merge_text_simhash = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Merge Text SimHash"),
+        help_text=_("64-bit SimHash of the normalized text content"),
+    )
+    merge_pending = models.BooleanField(
+        default=False,
+        verbose_name=_("Merge Pending"),
+        help_text=_(
+            "Saved with its attachments and waiting for a per-user merge "
+            "batch to claim it"
+        ),
+    )
 
     # Processing status for each stage of the email workflow
     status = models.CharField(
@@ -442,6 +506,23 @@ class EmailMessage(models.Model):
             models.Index(fields=["user", "status"]),
             models.Index(fields=["user", "raw_message_id"]),
             models.Index(fields=["received_at"]),
+            models.Index(
+                fields=["user", "merge_subject_hash"],
+                name="em_user_subject_hash_idx",
+            ),
+            models.Index(
+                fields=["cluster_root_id"],
+                name="em_cluster_root_idx",
+            ),
+            models.Index(
+                fields=["user", "merge_pending"],
+                name="em_user_merge_pending_idx",
+            ),
+            # Keyset pagination of the threadline list.
+            models.Index(
+                fields=["user", "received_at", "id"],
+                name="em_user_received_idx",
+            ),
         ]
         unique_together = ["user", "message_id"]
 
@@ -455,28 +536,78 @@ class EmailMessage(models.Model):
         When transitioning to SUCCESS status, error_message is
         automatically cleared to ensure clean state.
 
+        The transition is validated and written in a single
+        compare-and-set UPDATE, see compare_and_set_status.
+
         Args:
             status: New status value
             error_message: Optional error message to save
+
+        Raises:
+            ValidationError: If the stored status does not allow the
+                transition
         """
         old_status = self.status
 
-        update_fields = ["status", "updated_at"]
-        self.status = status
-
+        fields = {}
         # Clear error_message when transitioning to SUCCESS
         if status == EmailStatus.SUCCESS.value:
-            self.error_message = ""
-            update_fields.append("error_message")
+            fields["error_message"] = ""
         elif error_message:
-            self.error_message = error_message
-            update_fields.append("error_message")
-
-        self.save(update_fields=update_fields)
+            fields["error_message"] = error_message
+
+        if not self.pk:
+            self.status = status
+            for field, value in fields.items():
+                setattr(self, field, value)
+            self.save()
+        elif not self.compare_and_set_status(status, **fields):
+            current = (
+                EmailMessage.objects.filter(pk=self.pk)
+                .values_list("status", flat=True)
+                .first()
+            )
+            if current is None:
+                raise EmailMessage.DoesNotExist(
+                    f"EmailMessage {self.pk} no longer exists"
+                )
+            raise ValidationError(_invalid_transition_message(current, status))
 
         if old_status != status and status == EmailStatus.FAILED.value:
             self._dispatch_failure_notification(old_status)
 
+    def compare_and_set_status(self, status: str, **fields) -> bool:
+        """
+        Atomically move the stored row to status if the transition is valid.
+
+        Issues one ``UPDATE ... WHERE status IN (valid predecessors)``
+        instead of loading the row first, so concurrent writers cannot
+        both pass validation. Re-setting the current status is allowed,
+        matching save().
+
+        Args:
+            status: New status value
+            **fields: Extra field values written in the same UPDATE
+
+        Returns:
+            bool: False when the stored status does not allow the
+                transition; the instance is left unchanged
+        """
+        allowed = get_previous_states(status, EMAIL_STATE_MACHINE)
+        allowed.append(status)
+        now = timezone.now()
+        updated = EmailMessage.objects.filter(
+            pk=self.pk, status__in=allowed
+        ).update(status=status, updated_at=now, **fields)
+        if not updated:
+            return False
+
+        self.status = status
+        self.updated_at = now
+        for field, value in fields.items():
+            setattr(self, field, value)
+        return True
+
     def _dispatch_failure_notification(self, old_status: str) -> None:
         try:
             from threadline.services.workflow_config import (
@@ -509,12 +640,19 @@ class EmailMessage(models.Model):
                 f"{self.id}: {exc}"
             )
 
-    def set_processing_progress(self, percent: int) -> None:
+    def set_processing_progress(
+        self, percent: int, *, final: bool = False
+    ) -> None:
         """
         Persist a user-facing processing progress snapshot.
 
         The UI only consumes a single percentage value, so we keep the
         metadata payload intentionally small and stable.
+
+        Args:
+            percent: Progress percentage
+            final: The workflow reached a terminal state; ends progress
+                streams subscribed to this email
         """
         try:
             normalized = int(percent)
@@ -534,56 +672,143 @@ class EmailMessage(models.Model):
 
         self.metadata = metadata
         self.save(update_fields=["metadata", "updated_at"])
+        # Keep the live value in step so a reset (e.g. a new run at 0)
+        # is not hidden behind a stale percent from the previous run.
+        publish_processing_progress(self.id, normalized, final=final)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._merge_inputs = instance._current_merge_inputs()
+        return instance
+
+    def _current_merge_inputs(self) -> tuple:
+        # Deferred fields are not in __dict__ and must not be loaded here.
+        return tuple(
+            self.__dict__.get(field, models.DEFERRED)
+            for field in MERGE_FINGERPRINT_INPUTS
+        )
 
     def save(self, *args, **kwargs):
         """
-        Override save to automatically validate status transitions
+        Override save to automatically validate status transitions and
+        keep the merge fingerprint in step with subject/text_content.
+
+        The fingerprint (a SimHash of the whole body) is only recomputed
+        when subject or text_content differ from the values loaded from
+        the database, so status and summary saves do not pay for it.
         """
         update_fields = kwargs.get("update_fields")
         update_fields_set = (
             set(update_fields) if update_fields is not None else None
         )
 
+        merge_inputs = self._current_merge_inputs()
+        refresh_fingerprint = merge_inputs != getattr(
+            self, "_merge_inputs", None
+        ) and (
+            update_fields_set is None
+            or update_fields_set & set(MERGE_FINGERPRINT_INPUTS)
+        )
+        if refresh_fingerprint:
+            fingerprint = merge_fingerprint(self.subject, self.text_content)
+            for field, value in fingerprint.items():
+                setattr(self, field, value)
+            if update_fields_set is not None:
+                update_fields_set.update(fingerprint)
+                kwargs["update_fields"] = list(update_fields_set)
+
         # Skip state machine validation if saving from Django Admin
         if hasattr(self, "_from_admin"):
             # Clear the flag and save without validation
             delattr(self, "_from_admin")
             super().save(*args, **kwargs)
+            if refresh_fingerprint:
+                self._merge_inputs = merge_inputs
             return
 
-        # Check if this is an update and status has changed
-        if self.pk:
-            try:
-                old_instance = EmailMessage.objects.get(pk=self.pk)
-                status_changed = old_instance.status != self.status
+        should_validate_status = (
+            update_fields_set is None or "status" in update_fields_set
+        )
 
-                should_validate_status = (
-                    update_fields_set is None or "status" in update_fields_set
+        # Only updates that write status need the stored value, and only
+        # that column is loaded for the check.
+        if self.pk and should_validate_status:
+            try:
+                old_status = (
+                    EmailMessage.objects.only("status").get(pk=self.pk).status
                 )
-
-                if (
-                    should_validate_status
-                    and status_changed
-                    and not can_transition_to(
-                        old_instance.status, self.status, EMAIL_STATE_MACHINE
-                    )
+                if old_status != self.status and not can_transition_to(
+                    old_status, self.status, EMAIL_STATE_MACHINE
                 ):
-                    # Get valid next states using the state machine
-                    valid_transitions = get_next_states(
-                        old_instance.status, EMAIL_STATE_MACHINE
-                    )
-                    transitions_str = ", ".join(valid_transitions)
-                    error_msg = (
-                        f"Invalid email status transition from "
-                        f"{old_instance.status} to {self.status}. "
-                        f"Valid transitions: {transitions_str}"
+                    raise ValidationError(
+                        _invalid_transition_message(old_status, self.status)
                     )
-                    raise ValidationError(error_msg)
             except EmailMessage.DoesNotExist:
                 # New object, no validation needed
                 pass
 
         super().save(*args, **kwargs)
+        if refresh_fingerprint:
+            self._merge_inputs = merge_inputs
+
+
+class EmailThreadRef(models.Model):
+    """
+    Normalized thread-header tokens of an email.
+
+    One row per Message-ID token (``message_id``) and per In-Reply-To /
+    References token (``reference``), written when the email is saved
+    (see threadline.signals). EmailMergeService resolves thread relations
+    with one indexed lookup on (user, kind, token) instead of scanning
+    every email in the relation window.
+    """
+
+    class Kind(models.TextChoices):
+        MESSAGE_ID = "message_id", _("Message ID")
+        REFERENCE = "reference", _("Reference")
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name=_("User"),
+        related_name="email_thread_refs",
+    )
+    email = models.ForeignKey(
+        EmailMessage,
+        on_delete=models.CASCADE,
+        verbose_name=_("Email Message"),
+        related_name="thread_refs",
+    )
+    token = models.CharField(
+        max_length=255,
+        verbose_name=_("Token"),
+        help_text=_("Message ID without angle brackets"),
+    )
+    kind = models.CharField(
+        max_length=16,
+        choices=Kind.choices,
+        verbose_name=_("Kind"),
+    )
+
+    class Meta:
+        verbose_name = _("Email Thread Reference")
+        verbose_name_plural = _("Email Thread References")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["email", "kind", "token"],
+                name="uniq_email_thread_ref",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "kind", "token"],
+                name="etr_user_kind_token_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"EmailThreadRef({self.email_id}, {self.kind}): {self.token}"
 
 
 class EmailAttachment(models.Model):
@@ -679,12 +904,73 @@ class EmailAttachment(models.Model):
             models.Index(fields=["user", "is_image"]),
             models.Index(fields=["user", "content_md5"]),
             models.Index(fields=["email_message"]),
+            # Keyset pagination of the attachment list.
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="att_user_created_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.filename} ({self.content_type})"
 
 
+class SearchDocument(models.Model):
+    """
+    Denormalized searchable text of an email or attachment.
+
+    One row per object, rewritten when the object is saved (see
+    threadline.signals). The database's full-text index on ``document``
+    (see threadline.utils.search_index) answers the threadline, admin and
+    attachment searches without scanning the large text columns.
+    """
+
+    class Kind(models.TextChoices):
+        EMAIL = "email", _("Email")
+        ATTACHMENT = "attachment", _("Attachment")
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name=_("User"),
+        related_name="search_documents",
+    )
+    kind = models.CharField(
+        max_length=16,
+        choices=Kind.choices,
+        verbose_name=_("Kind"),
+    )
+    object_id = models.BigIntegerField(
+        verbose_name=_("Object ID"),
+        help_text=_("ID of the indexed email or attachment"),
+    )
+    document = models.TextField(
+        blank=True,
+        verbose_name=_("Document"),
+        help_text=_("Searchable text, one source column per line"),
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Search Document")
+        verbose_name_plural = _("Search Documents")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"],
+                name="uniq_search_document",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "kind"],
+                name="sd_user_kind_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"SearchDocument({self.kind}, {self.object_id})"
+
+
 class Issue(models.Model):
     """
     Generic issue model for external system integration.
@@ -862,6 +1148,10 @@ class EmailTodo(models.Model):
             models.Index(fields=["email_message"]),
             models.Index(fields=["deadline"]),
             models.Index(fields=["priority"]),
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="todo_user_created_idx",
+            ),
         ]
 
     def __str__(self):
@@ -1062,3 +1352,231 @@ class EmailAlias(models.Model):
         if active_only:
             queryset = queryset.filter(is_active=True)
         return queryset.order_by("alias")
+
+
+class LLMBatchJob(models.Model):
+    """
+    Provider-side batch job (OpenAI-style /v1/batches).
+
+    One job groups the deferred LLM requests of many workflows that share
+    the same LLM config. The job is polled until the provider reports a
+    terminal status, then the results are fanned out to the requests.
+    """
+
+    class JobStatus(models.TextChoices):
+        SUBMITTED = "submitted", _("Submitted")
+        COMPLETED = "completed", _("Completed")
+        FAILED = "failed", _("Failed")
+
+    provider_batch_id = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("Provider Batch ID"),
+        help_text=_("Batch ID returned by the provider"),
+    )
+    llm_config_uuid = models.UUIDField(
+        null=True,
+        blank=True,
+        verbose_name=_("LLM Config UUID"),
+        help_text=_("agentcore-metering LLM config used for the batch"),
+    )
+    input_file_id = models.CharField(
+        max_length=255, blank=True, verbose_name=_("Input File ID")
+    )
+    output_file_id = models.CharField(
+        max_length=255, blank=True, verbose_name=_("Output File ID")
+    )
+    error_file_id = models.CharField(
+        max_length=255, blank=True, verbose_name=_("Error File ID")
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=JobStatus.choices,
+        default=JobStatus.SUBMITTED,
+        verbose_name=_("Status"),
+    )
+    provider_status = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name=_("Provider Status"),
+        help_text=_("Last status reported by the provider"),
+    )
+    request_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("Request Count")
+    )
+    error_message = models.TextField(
+        blank=True, verbose_name=_("Error Message")
+    )
+    completed_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Completed At")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Created At")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated At")
+    )
+
+    class Meta:
+        verbose_name = _("LLM Batch Job")
+        verbose_name_plural = _("LLM Batch Jobs")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"LLMBatchJob({self.provider_batch_id}): {self.status}"
+
+
+class LLMBatchRequest(models.Model):
+    """
+    One deferred LLM call of a checkpointed email workflow.
+
+    Created when a node interrupts the graph in deferred mode. The workflow
+    stays checkpointed under ``thread_id`` until every request of the
+    interrupt has a result, then it is resumed with the responses.
+    """
+
+    class RequestStatus(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SUBMITTED = "submitted", _("Submitted")
+        COMPLETED = "completed", _("Completed")
+        FAILED = "failed", _("Failed")
+
+    email_message = models.ForeignKey(
+        EmailMessage,
+        on_delete=models.CASCADE,
+        verbose_name=_("Email Message"),
+        related_name="llm_batch_requests",
+    )
+    batch_job = models.ForeignKey(
+        LLMBatchJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Batch Job"),
+        related_name="requests",
+    )
+    custom_id = models.CharField(
+        max_length=128,
+        unique=True,
+        verbose_name=_("Custom ID"),
+        help_text=_("Request identifier echoed back in the batch output"),
+    )
+    thread_id = models.CharField(
+        max_length=255,
+        verbose_name=_("Thread ID"),
+        help_text=_("LangGraph thread holding the workflow checkpoint"),
+    )
+    node_name = models.CharField(max_length=64, verbose_name=_("Node"))
+    request_key = models.CharField(
+        max_length=64,
+        verbose_name=_("Request Key"),
+        help_text=_("Key of the call within the node (e.g. title)"),
+    )
+    llm_config_uuid = models.UUIDField(
+        null=True, blank=True, verbose_name=_("LLM Config UUID")
+    )
+    request_body = models.JSONField(
+        verbose_name=_("Request Body"),
+        help_text=_("Chat completion body sent in the JSONL line"),
+    )
+    json_mode = models.BooleanField(
+        default=False, verbose_name=_("JSON Mode")
+    )
+    submit_attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_("Submit Attempts"),
+        help_text=_("Failed attempts to submit the request in a batch"),
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=RequestStatus.choices,
+        default=RequestStatus.PENDING,
+        verbose_name=_("Status"),
+    )
+    response = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name=_("Response"),
+        help_text=_("Response content and token usage"),
+    )
+    error_message = models.TextField(
+        blank=True, verbose_name=_("Error Message")
+    )
+    resumed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Resumed At"),
+        help_text=_("When the workflow was resumed with this result"),
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Created At")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated At")
+    )
+
+    class Meta:
+        verbose_name = _("LLM Batch Request")
+        verbose_name_plural = _("LLM Batch Requests")
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["thread_id", "resumed_at"]),
+        ]
+
+    def __str__(self):
+        return (
+            f"LLMBatchRequest({self.custom_id}): "
+            f"{self.node_name}-{self.status}"
+        )
+
+
+class TaskStep(models.Model):
+    """
+    Append-only step log of a traced task.
+
+    TaskTracer writes one row per appended step (in bulk_create batches)
+    when THREADLINE_TASK_TRACER["step_storage"] is "table", so the
+    agentcore TaskExecution metadata only keeps the latest progress
+    summary instead of an ever-growing steps list.
+    """
+
+    task_id = models.CharField(
+        max_length=255,
+        verbose_name=_("Task ID"),
+        help_text=_("agentcore TaskExecution task_id"),
+    )
+    seq = models.PositiveIntegerField(
+        verbose_name=_("Sequence"),
+        help_text=_("Position of the step within the task"),
+    )
+    action = models.CharField(max_length=100, verbose_name=_("Action"))
+    level = models.CharField(
+        max_length=16, default="INFO", verbose_name=_("Level")
+    )
+    ts = models.DateTimeField(verbose_name=_("Timestamp"))
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Payload"),
+        help_text=_("Step message and data"),
+    )
+
+    class Meta:
+        verbose_name = _("Task Step")
+        verbose_name_plural = _("Task Steps")
+        ordering = ["task_id", "seq"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task_id", "seq"], name="uniq_task_step_seq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["ts"]),
+        ]
+
+    def __str__(self):
+        return f"TaskStep({self.task_id}#{self.seq}): {self.action}"
@@ -18,6 +18,16 @@ def register_periodic_tasks():
         task="threadline.tasks.scheduler.schedule_reset_stuck_processing_emails",
         schedule=crontab(minute="*/10"),
     )
+    TASK_REGISTRY.add(
+        name="threadline-llm-batch-submit",
+        task="threadline.tasks.llm_batch.submit_llm_batch_requests",
+        schedule=crontab(minute="*/5"),
+    )
+    TASK_REGISTRY.add(
+        name="threadline-llm-batch-poll",
+        task="threadline.tasks.llm_batch.poll_llm_batch_jobs",
+        schedule=crontab(minute="*/5"),
+    )
     TASK_REGISTRY.add(
         name="threadline-haraka-cleanup",
         task="threadline.tasks.scheduler.schedule_haraka_cleanup",
@@ -28,6 +38,11 @@ def register_periodic_tasks():
         task="threadline.tasks.scheduler.schedule_email_task_cleanup",
         schedule=crontab(hour=3, minute=0),
     )
+    TASK_REGISTRY.add(
+        name="threadline-checkpoint-cleanup",
+        task="threadline.tasks.scheduler.schedule_checkpoint_cleanup",
+        schedule=crontab(minute=20),
+    )
     TASK_REGISTRY.add(
         name="threadline-share-link-cleanup",
         task="threadline.tasks.scheduler.schedule_share_link_cleanup",
@@ -46,6 +46,7 @@ from .email_message import (
 from .admin_conversations import (
     AdminConversationListSerializer,
     AdminConversationTaskListSerializer,
+    AdminTaskStepSerializer,
 )
 from .share_link import (
     ThreadlineShareLinkSerializer,
@@ -91,6 +92,7 @@ __all__ = [
     "EmailMessageListSerializer",
     "AdminConversationListSerializer",
     "AdminConversationTaskListSerializer",
+    "AdminTaskStepSerializer",
     "EmailMessageCreateSerializer",
     "EmailMessageUpdateSerializer",
     "EmailMessageMergeSerializer",
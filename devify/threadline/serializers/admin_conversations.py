@@ -4,7 +4,7 @@ from rest_framework import serializers
 
 from agentcore_task.adapters.django.models import TaskExecution
 
-from ..models import EmailMessage
+from ..models import EmailMessage, TaskStep
 from .base import UserSerializer
 
 
@@ -89,6 +89,7 @@ class AdminConversationTaskListSerializer(serializers.ModelSerializer):
     created_by_id = serializers.IntegerField(
         source="created_by.id", read_only=True
     )
+    step_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = TaskExecution
@@ -106,4 +107,31 @@ class AdminConversationTaskListSerializer(serializers.ModelSerializer):
             "duration",
             "is_completed",
             "is_running",
+            "step_count",
         ]
+
+
+class AdminTaskStepSerializer(serializers.ModelSerializer):
+    """
+    TaskStep row in the shape of a metadata step entry.
+
+    The payload is flattened next to the columns so the admin timeline can
+    render table-backed and legacy metadata steps the same way.
+    """
+
+    class Meta:
+        model = TaskStep
+        fields = ["seq", "action", "level", "ts", "payload"]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        payload = data.pop("payload") or {}
+        return {
+            **payload,
+            "seq": data["seq"],
+            "step": data["action"],
+            "action": data["action"],
+            "level": data["level"],
+            "timestamp": data["ts"],
+        }
@@ -7,10 +7,17 @@ Serializers for EmailMessage model CRUD operations.
 import re
 
 from django.contrib.auth.models import User
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
-from ..models import EmailMessage
+from ..models import EmailMessage, Issue
+from ..services.merge_cluster import walk_merge_cluster
+from ..state_machine import EmailStatus
+from ..utils.processing_progress import (
+    get_live_processing_progress,
+    overlay_processing_progress,
+)
 from .base import UserSerializer
 from .email_attachment import (
     EmailAttachmentMinimalSerializer,
@@ -22,6 +29,20 @@ from .share_link import ThreadlineShareLinkSerializer
 from relay.models import RelayDelivery, RelayEvent
 
 
+def _with_live_progress(instance, data):
+    """
+    Overlay the live progress side channel while an email is processing.
+    """
+    if instance.status != EmailStatus.PROCESSING.value:
+        return data
+    live = get_live_processing_progress(instance.id)
+    if live and "metadata" in data:
+        data["metadata"] = overlay_processing_progress(
+            data["metadata"], live
+        )
+    return data
+
+
 def _get_latest_share_link(instance):
     """
     Retrieve latest share link, prioritizing prefetched data.
@@ -150,7 +171,6 @@ def _collect_issue_cluster(instance):
     """
     Collect direct issues from the merged cluster for on-demand expansion.
     """
-    visited: set[int] = set()
     cluster: list[dict] = []
 
     def direct_issue(obj):
@@ -163,11 +183,10 @@ def _collect_issue_cluster(instance):
 
         return obj.issues.order_by("-created_at", "-id").first()
 
-    def walk(obj, depth=0):
-        if not obj or obj.id in visited:
-            return
-        visited.add(obj.id)
-
+    cluster_queryset = EmailMessage.objects.prefetch_related(
+        Prefetch("issues", queryset=Issue.objects.order_by("-created_at", "-id"))
+    )
+    for obj, depth in walk_merge_cluster(instance, cluster_queryset):
         issue = direct_issue(obj)
         if issue:
             cluster.append(
@@ -188,13 +207,6 @@ def _collect_issue_cluster(instance):
                 }
             )
 
-        if obj.merged_into_id and obj.merged_into:
-            walk(obj.merged_into, depth + 1)
-
-        for child in obj.merged_children.all():
-            walk(child, depth + 1)
-
-    walk(instance)
     return cluster
 
 
@@ -462,7 +474,9 @@ class EmailMessageSerializer(serializers.ModelSerializer):
         Returns:
             dict: Serialized data with replaced image placeholders
         """
-        data = super().to_representation(instance)
+        data = _with_live_progress(
+            instance, super().to_representation(instance)
+        )
 
         # Check if this is a list view by checking if parent serializer
         # has many=True
@@ -676,7 +690,9 @@ class EmailMessageListSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         """Limit summary_content length for list views"""
-        data = super().to_representation(instance)
+        data = _with_live_progress(
+            instance, super().to_representation(instance)
+        )
 
         # Limit summary_content for preview
         if data.get("summary_content"):
@@ -930,6 +946,14 @@ class EmailMessageBatchRetrySerializer(serializers.Serializer):
         max_length=64,
     )
     force = serializers.BooleanField(required=False, default=False)
+    batch = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text=(
+            "Run all messages in one batch workflow task, skipping the "
+            "merge step"
+        ),
+    )
 
     def validate_source_uuids(self, value):
         """
@@ -4,7 +4,11 @@ Service helpers for threadline runtime bindings and related admin logic.
 
 from .email_merge import EmailMergeService, MergeDecision
 from .manual_merge import ManualMergeService, ManualMergeResult
-from .merge_workflow import enqueue_merge_workflow, enqueue_merge_workflows
+from .merge_workflow import (
+    enqueue_merge_workflow,
+    enqueue_merge_workflows,
+    enqueue_workflow_batch,
+)
 
 __all__ = [
     "EmailMergeService",
@@ -13,4 +17,5 @@ __all__ = [
     "ManualMergeResult",
     "enqueue_merge_workflow",
     "enqueue_merge_workflows",
+    "enqueue_workflow_batch",
 ]
@@ -6,22 +6,186 @@ from __future__ import annotations
 
 import logging
 import re
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from datetime import timedelta
 from typing import Iterable, Optional
 
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils import timezone
-from rapidfuzz import fuzz
-
-from threadline.models import EmailMessage
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from threadline.models import EmailAttachment, EmailMessage, EmailThreadRef
+from threadline.services.merge_decision_cache import (
+    email_fingerprint,
+    get_cached_decision,
+    get_window_version,
+    is_decision_cache_enabled,
+    set_cached_decision,
+)
+from threadline.utils.merge_fingerprint import (
+    hamming_distance,
+    normalize_subject,
+    normalize_text,
+    simhash,
+    subject_hash,
+)
 
 logger = logging.getLogger(__name__)
 
 
 THREAD_HEADER_PATTERN = re.compile(r"<([^>]+)>")
-SUBJECT_PREFIX_PATTERN = re.compile(r"^\s*((re|fw|fwd)\s*:\s*)+", re.I)
-WHITESPACE_PATTERN = re.compile(r"\s+")
+THREAD_REF_TOKEN_LENGTH = EmailThreadRef._meta.get_field("token").max_length
+THREAD_REF_FIELDS = frozenset(
+    {"user", "message_id", "raw_message_id", "in_reply_to", "references"}
+)
+# Columns the matchers read from candidates; text_content is loaded in one
+# batch for the candidates that reach the content matchers, and the
+# html/summary/LLM columns are never loaded.
+CANDIDATE_FIELDS = (
+    "id",
+    "uuid",
+    "user_id",
+    "message_id",
+    "subject",
+    "received_at",
+    "status",
+    "merged_into_id",
+    "merge_reason",
+    "raw_message_id",
+    "in_reply_to",
+    "references",
+    "merge_subject_hash",
+    "merge_text_length",
+    "merge_text_simhash",
+)
+
+
+def extract_message_tokens(value: str) -> list[str]:
+    """
+    Extract RFC message IDs (without angle brackets) from a header value.
+    """
+    if not value:
+        return []
+    return [
+        match.group(1).strip()
+        for match in THREAD_HEADER_PATTERN.finditer(value)
+    ]
+
+
+def message_id_tokens(email: EmailMessage) -> set[str]:
+    """
+    Tokens other emails can use to reference this email.
+
+    The Message-ID header is stored as parsed (usually still wrapped in
+    angle brackets), while In-Reply-To/References tokens are extracted
+    without them, so both sides are normalized to the bare ID.
+    """
+    tokens = set(extract_message_tokens(email.raw_message_id))
+    if not tokens and email.raw_message_id:
+        tokens.add(email.raw_message_id.strip())
+    if email.message_id:
+        tokens.add(email.message_id)
+    return {token for token in tokens if token}
+
+
+def reference_tokens(email: EmailMessage) -> list[str]:
+    """
+    In-Reply-To and References tokens of an email, in header order.
+    """
+    tokens = extract_message_tokens(email.in_reply_to)
+    references = email.references
+    if references:
+        if not isinstance(references, list):
+            references = [str(references)]
+        for value in references:
+            tokens.extend(extract_message_tokens(value))
+    return tokens
+
+
+def sync_email_thread_refs(email: EmailMessage, created: bool = False) -> None:
+    """
+    Rewrite the EmailThreadRef rows of an email from its headers.
+
+    Args:
+        email: Saved EmailMessage
+        created: Skip the delete for rows that cannot have refs yet
+    """
+    if not created:
+        EmailThreadRef.objects.filter(email_id=email.pk).delete()
+
+    refs = {
+        (EmailThreadRef.Kind.MESSAGE_ID, token[:THREAD_REF_TOKEN_LENGTH])
+        for token in message_id_tokens(email)
+    }
+    refs.update(
+        (EmailThreadRef.Kind.REFERENCE, token[:THREAD_REF_TOKEN_LENGTH])
+        for token in reference_tokens(email)
+    )
+    EmailThreadRef.objects.bulk_create(
+        [
+            EmailThreadRef(
+                user_id=email.user_id, email_id=email.pk, kind=kind, token=token
+            )
+            for kind, token in refs
+        ]
+    )
+
+
+@dataclass
+class MergeStats:
+    """
+    Cost of one merge decision.
+
+    ``bytes_loaded`` counts the subject and text_content characters (UTF-8
+    encoded) of the candidates the decision materialized; ``cached`` is set
+    when the decision came from the decision cache.
+    """
+
+    queries: int = 0
+    bytes_loaded: int = 0
+    candidates: int = 0
+    cached: bool = False
+
+    @contextmanager
+    def track_queries(self):
+        def count(execute, sql, params, many, context):
+            self.queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            yield
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "bytes_loaded": self.bytes_loaded,
+            "candidates": self.candidates,
+            "cached": self.cached,
+        }
+
+
+@dataclass
+class MergeCandidateCache:
+    """
+    Candidate content shared by the decisions of one merge batch.
+
+    Only immutable content is cached (text_content and image MD5s by
+    email id); the merge columns are re-read for every decision because
+    reconciling one email re-points the cluster heads of the next.
+    """
+
+    texts: dict[int, str] = field(default_factory=dict)
+    image_md5s: dict[int, set] = field(default_factory=dict)
+
+    def remember(self, email: EmailMessage) -> None:
+        """
+        Seed the cache from a fully loaded record.
+        """
+        self.texts[email.pk] = email.text_content
 
 
 @dataclass(frozen=True)
@@ -30,6 +194,7 @@ class MergeDecision:
     reason: str = ""
     sources: tuple[EmailMessage, ...] = ()
     evidence: Optional[dict] = None
+    stats: Optional[dict] = None
 
     @property
     def should_merge(self) -> bool:
@@ -60,11 +225,146 @@ class EmailMergeService:
     # (image-heavy emails with a one-line note over-trigger the thresholds),
     # so require exact equality instead of trusting RapidFuzz.
     MIN_TEXT_SIMILARITY_LENGTH = 120
+    MIN_CONTAINMENT_LENGTH = 120
+    MIN_CONTAINMENT_SCORE = 0.38
+    # Memoize decisions when THREADLINE_EMAIL_MERGE["decision_cache"] is on.
+    USE_DECISION_CACHE = True
+
+    def __init__(
+        self, candidate_cache: Optional[MergeCandidateCache] = None
+    ):
+        """
+        Args:
+            candidate_cache: Share candidate text and image MD5s across
+                the decisions of a batch (see reconcile_user_merge_batch)
+        """
+        self.candidate_cache = candidate_cache or MergeCandidateCache()
 
     def decide(self, email: EmailMessage) -> MergeDecision:
         """
         Find a related target for the given email if mergeable.
+
+        The returned decision carries the MergeStats of the decision.
         """
+        stats = MergeStats()
+        with stats.track_queries():
+            memo = self._decision_memo(email)
+            decision = self._load_memoized_decision(email, memo)
+            if decision is not None:
+                stats.cached = True
+            else:
+                decision = self._decide(email, stats)
+                self._memoize_decision(email, memo, decision)
+        logger.info(
+            f"[EmailMerge] decide stats email_id={email.id}"
+            f" queries={stats.queries} bytes_loaded={stats.bytes_loaded}"
+            f" candidates={stats.candidates} cached={stats.cached}"
+        )
+        return replace(decision, stats=stats.as_dict())
+
+    def _decision_memo(
+        self, email: EmailMessage
+    ) -> Optional[tuple[int, str]]:
+        """
+        Version and fingerprint a decision for the email is cached under.
+
+        Returns None when memoization does not apply: disabled, or the
+        email already follows a relation (that path is cheap).
+        """
+        if not (self.USE_DECISION_CACHE and is_decision_cache_enabled()):
+            return None
+        if email.merged_into_id or not email.pk:
+            return None
+        version = get_window_version(email.user_id)
+        if version is None:
+            return None
+        return version, email_fingerprint(email, self._matcher_signature())
+
+    def _matcher_signature(self) -> tuple:
+        config = getattr(settings, "THREADLINE_EMAIL_MERGE", None) or {}
+        return (
+            self.CONTENT_WINDOW_DAYS,
+            self.THREAD_RELATION_WINDOW_DAYS,
+            self.RAPIDFUZZ_RATIO_THRESHOLD,
+            self.RAPIDFUZZ_PARTIAL_RATIO_THRESHOLD,
+            self.MIN_TEXT_EXTENSION,
+            self.MIN_TEXT_EXTENSION_RATIO,
+            self.MIN_TEXT_SIMILARITY_LENGTH,
+            self.MIN_CONTAINMENT_LENGTH,
+            self.MIN_CONTAINMENT_SCORE,
+            bool(config.get("simhash_prefilter")),
+            config.get("simhash_max_distance"),
+        )
+
+    def _load_memoized_decision(
+        self, email: EmailMessage, memo: Optional[tuple[int, str]]
+    ) -> Optional[MergeDecision]:
+        """
+        Rebuild a cached decision, reloading only its target and sources.
+        """
+        if memo is None:
+            return None
+        payload = get_cached_decision(email, *memo)
+        if payload is None:
+            return None
+        if payload["target_id"] is None:
+            return MergeDecision(target=None)
+
+        source_ids = payload["source_ids"]
+        records = EmailMessage.objects.filter(
+            pk__in=[payload["target_id"], *source_ids],
+            user_id=email.user_id,
+        ).only(*CANDIDATE_FIELDS)
+        records = {record.pk: record for record in records}
+        if payload["target_id"] not in records or any(
+            source_id not in records for source_id in source_ids
+        ):
+            return None
+        return MergeDecision(
+            target=records[payload["target_id"]],
+            reason=payload["reason"],
+            sources=tuple(records[source_id] for source_id in source_ids),
+            evidence=payload["evidence"],
+        )
+
+    def _memoize_decision(
+        self,
+        email: EmailMessage,
+        memo: Optional[tuple[int, str]],
+        decision: MergeDecision,
+    ) -> None:
+        if memo is None:
+            return
+        set_cached_decision(
+            email,
+            *memo,
+            {
+                "target_id": getattr(decision.target, "pk", None),
+                "reason": decision.reason,
+                "source_ids": [source.pk for source in decision.sources],
+                "evidence": decision.evidence,
+            },
+        )
+
+    def _memoize_decision_on_commit(
+        self, email: EmailMessage, decision: MergeDecision
+    ) -> None:
+        """
+        Re-key the decision once the reconcile transaction commits.
+
+        Writes of the transaction bump the window version on commit (see
+        schedule_window_version_bump); caching the decision again after
+        that keeps retries of this email on the cache. Bumps registered
+        later in the same transaction still run after it and invalidate
+        it.
+        """
+        transaction.on_commit(
+            lambda: self._memoize_decision(
+                email, self._decision_memo(email), decision
+            )
+        )
+
+    def _decide(self, email: EmailMessage, stats: MergeStats) -> MergeDecision:
         logger.info(
             f"[EmailMerge] decide start email_id={email.id} uuid={email.uuid}"
             f" subject={email.subject!r} received_at={email.received_at}"
@@ -83,7 +383,7 @@ class EmailMergeService:
 
         # Find older canonical candidates that appear to belong to the same
         # conversation cluster as the current email.
-        matched_sources = self._find_merge_sources(email)
+        matched_sources = self._find_merge_sources(email, stats)
         logger.info(
             f"[EmailMerge] decide matched_sources email_id={email.id}"
             f" matched_source_ids={[s.id for s in matched_sources]}"
@@ -157,6 +457,7 @@ class EmailMergeService:
 
             if not (decision.should_merge and decision.sources):
                 self._mark_canonical(email)
+                self._memoize_decision_on_commit(email, decision)
                 return email, decision
 
             merged_at = timezone.now()
@@ -197,6 +498,7 @@ class EmailMergeService:
                     locked_head, email, decision.reason, merged_at,
                     decision.evidence,
                 )
+            self._memoize_decision_on_commit(email, decision)
             return email, decision
 
     def resolve_canonical(self, email: EmailMessage) -> EmailMessage:
@@ -219,12 +521,14 @@ class EmailMergeService:
 
         return current
 
-    def _find_merge_sources(self, email: EmailMessage) -> list[EmailMessage]:
+    def _find_merge_sources(
+        self, email: EmailMessage, stats: Optional[MergeStats] = None
+    ) -> list[EmailMessage]:
         """
         Return all nearby messages that may be related to this email.
         """
         matched_sources: list[EmailMessage] = []
-        for candidate in self._candidate_queryset(email):
+        for candidate in self._load_candidates(email, stats or MergeStats()):
             # Candidate scanning stays conservative: we log every record in the
             # time window, but only merge when a matcher explicitly fires.
             logger.debug(
@@ -382,22 +686,11 @@ class EmailMergeService:
         ):
             return False
 
-        candidate_ids = []
-        if email.in_reply_to:
-            candidate_ids.extend(
-                self._extract_message_tokens(email.in_reply_to)
-            )
-        candidate_ids.extend(
-            self._extract_reference_tokens(email.references)
-        )
-
+        candidate_ids = reference_tokens(email)
         if not candidate_ids:
             return False
 
-        return bool(
-            candidate.raw_message_id in candidate_ids
-            or candidate.message_id in candidate_ids
-        )
+        return not message_id_tokens(candidate).isdisjoint(candidate_ids)
 
     def _matches_forward_chain(
         self, email: EmailMessage, candidate: EmailMessage
@@ -407,14 +700,14 @@ class EmailMergeService:
         ):
             return False
 
-        normalized_subject = self._normalize_subject(email.subject)
+        normalized_subject = self._email_subject(email)
         if not normalized_subject:
             return False
 
         if not self._subject_looks_forward(email.subject):
             return False
 
-        candidate_subject = self._normalize_subject(candidate.subject)
+        candidate_subject = self._email_subject(candidate)
         if candidate_subject != normalized_subject:
             return False
 
@@ -434,11 +727,11 @@ class EmailMergeService:
         ):
             return False
 
-        normalized_subject = self._normalize_subject(email.subject)
+        normalized_subject = self._email_subject(email)
         if not normalized_subject:
             return False
 
-        if self._normalize_subject(candidate.subject) != normalized_subject:
+        if self._email_subject(candidate) != normalized_subject:
             return False
 
         return self._text_bodies_match(
@@ -461,8 +754,8 @@ class EmailMergeService:
         unreliable, so require exact normalized-text equality below the length
         floor instead of a fuzzy score.
         """
-        current_text = self._normalize_text(email.text_content)
-        candidate_text = self._normalize_text(candidate.text_content)
+        current_text = self._email_text(email)
+        candidate_text = self._email_text(candidate)
         if not current_text or not candidate_text:
             return False
 
@@ -473,9 +766,12 @@ class EmailMergeService:
         ):
             return current_text == candidate_text
 
-        ratio, partial_ratio = self._text_similarity_scores(
-            candidate_text, current_text
-        )
+        if self._simhash_too_far(email, candidate):
+            return False
+
+        ratio, partial_ratio = self._batched_text_scores(
+            candidate, current_text
+        ) or self._text_similarity_scores(candidate_text, current_text)
         logger.debug(
             f"[EmailMerge] rapidfuzz similarity email_id={email.id}"
             f" candidate_id={candidate.id}"
@@ -483,6 +779,33 @@ class EmailMergeService:
         )
         return self._meets_text_similarity_threshold(ratio, partial_ratio)
 
+    def _simhash_too_far(
+        self, email: EmailMessage, candidate: EmailMessage
+    ) -> bool:
+        """
+        Opt-in SimHash prefilter in front of RapidFuzz.
+
+        See THREADLINE_EMAIL_MERGE["simhash_prefilter"]; records without a
+        stored signature are never skipped.
+        """
+        config = getattr(settings, "THREADLINE_EMAIL_MERGE", None) or {}
+        if not config.get("simhash_prefilter"):
+            return False
+
+        email_simhash = self._email_simhash(email)
+        candidate_simhash = candidate.merge_text_simhash
+        if email_simhash is None or candidate_simhash is None:
+            return False
+
+        distance = hamming_distance(email_simhash, candidate_simhash)
+        if distance <= int(config.get("simhash_max_distance", 24)):
+            return False
+        logger.debug(
+            f"[EmailMerge] simhash prefilter skip email_id={email.id}"
+            f" candidate_id={candidate.id} distance={distance}"
+        )
+        return True
+
     def _matches_containment(
         self, email: EmailMessage, candidate: EmailMessage
     ) -> bool:
@@ -491,23 +814,178 @@ class EmailMergeService:
         ):
             return False
 
-        current_text = self._normalize_text(email.text_content)
-        candidate_text = self._normalize_text(candidate.text_content)
+        current_text = self._email_text(email)
+        candidate_text = self._email_text(candidate)
         if not current_text or not candidate_text:
             return False
         return self._is_strong_containment(candidate_text, current_text)
 
+    def _load_candidates(
+        self, email: EmailMessage, stats: MergeStats
+    ) -> list[EmailMessage]:
+        """
+        Materialize the candidates with only the columns the matchers read.
+
+        text_content is fetched in one query for the candidates inside the
+        content window (thread relations do not need it), and the image
+        MD5s of all candidates are prefetched in one query; both skip the
+        records already in the candidate cache.
+        """
+        candidates = list(
+            self._candidate_queryset(email).only(*CANDIDATE_FIELDS)
+        )
+        stats.candidates = len(candidates)
+
+        texts = self.candidate_cache.texts
+        text_ids = [
+            candidate.pk
+            for candidate in candidates
+            if candidate.pk not in texts
+            and self._within_time_window(
+                email, candidate, self.CONTENT_WINDOW_DAYS
+            )
+        ]
+        loaded = dict(
+            EmailMessage.objects.filter(pk__in=text_ids).values_list(
+                "id", "text_content"
+            )
+            if text_ids
+            else ()
+        )
+        texts.update(loaded)
+        for candidate in candidates:
+            if candidate.pk in texts:
+                candidate.text_content = texts[candidate.pk]
+            stats.bytes_loaded += len(
+                (candidate.subject or "").encode("utf-8")
+            ) + len((loaded.get(candidate.pk) or "").encode("utf-8"))
+
+        self._prefetch_image_md5s(email, candidates)
+        self._prefetch_text_scores(email, candidates)
+        return candidates
+
+    def _prefetch_image_md5s(
+        self, email: EmailMessage, candidates: list[EmailMessage]
+    ) -> None:
+        """
+        Fill the _image_md5_set cache of all candidates with one query.
+
+        Skipped when the arriving email has no images, since
+        _has_disjoint_images never looks at the candidates then.
+        """
+        if not candidates or not self._image_md5_set(email):
+            return
+
+        md5s = self.candidate_cache.image_md5s
+        missing = [
+            candidate.pk for candidate in candidates if candidate.pk not in md5s
+        ]
+        if missing:
+            md5s.update((email_id, set()) for email_id in missing)
+            rows = (
+                EmailAttachment.objects.filter(
+                    email_message_id__in=missing, is_image=True
+                )
+                .exclude(content_md5="")
+                .values_list("email_message_id", "content_md5")
+            )
+            for email_id, content_md5 in rows:
+                md5s[email_id].add(content_md5)
+        for candidate in candidates:
+            candidate._merge_image_md5s = md5s[candidate.pk]
+
+    def _prefetch_text_scores(
+        self, email: EmailMessage, candidates: list[EmailMessage]
+    ) -> None:
+        """
+        Score every candidate that will reach RapidFuzz in one cdist call.
+
+        Mirrors the guards in front of _text_bodies_match (content window,
+        same normalized subject, images not disjoint, length floor, SimHash
+        prefilter) so only pairs that would be scored anyway are scored.
+        Scores below the thresholds come back as 0, which does not change
+        _meets_text_similarity_threshold; evidence still recomputes exact
+        scores for the primary source.
+        """
+        current_text = self._email_text(email)
+        subject = self._email_subject(email)
+        if not current_text or not subject:
+            return
+        skip_length_floor = self._subject_looks_forward(email.subject)
+
+        scored = []
+        for candidate in candidates:
+            if not self._within_time_window(
+                email, candidate, self.CONTENT_WINDOW_DAYS
+            ):
+                continue
+            candidate_text = self._email_text(candidate)
+            if not candidate_text or self._email_subject(candidate) != subject:
+                continue
+            if (
+                not skip_length_floor
+                and min(len(current_text), len(candidate_text))
+                < self.MIN_TEXT_SIMILARITY_LENGTH
+            ):
+                continue
+            if self._has_disjoint_images(
+                email, candidate
+            ) or self._simhash_too_far(email, candidate):
+                continue
+            scored.append(candidate)
+        if not scored:
+            return
+
+        # Same argument order as _text_similarity_scores (candidate first).
+        queries = [self._email_text(candidate) for candidate in scored]
+        config = getattr(settings, "THREADLINE_EMAIL_MERGE", None) or {}
+        workers = int(config.get("rapidfuzz_workers") or 1)
+        ratios = process.cdist(
+            queries,
+            [current_text],
+            scorer=fuzz.ratio,
+            score_cutoff=self.RAPIDFUZZ_RATIO_THRESHOLD,
+            dtype=np.float64,
+            workers=workers,
+        )
+        partial_ratios = process.cdist(
+            queries,
+            [current_text],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=self.RAPIDFUZZ_PARTIAL_RATIO_THRESHOLD,
+            dtype=np.float64,
+            workers=workers,
+        )
+        for index, candidate in enumerate(scored):
+            candidate._merge_text_scores = (
+                current_text,
+                float(ratios[index][0]),
+                float(partial_ratios[index][0]),
+            )
+
+    def _batched_text_scores(
+        self, candidate: EmailMessage, current_text: str
+    ) -> Optional[tuple[float, float]]:
+        cached = getattr(candidate, "_merge_text_scores", None)
+        if cached is None or cached[0] is not current_text:
+            return None
+        return cached[1], cached[2]
+
     def _image_md5_set(self, email: EmailMessage) -> set:
         """
         Content MD5s of this record's image attachments (empty if none).
 
         Queried lazily and cached on the model instance so the arriving email
-        is fetched at most once and each candidate at most once. Only reached
-        when the arriving email itself has images (see _has_disjoint_images),
-        so mailboxes without image attachments never hit this query.
+        is fetched at most once; candidates are prefilled in one batch by
+        _prefetch_image_md5s. Only reached when the arriving email itself has
+        images (see _has_disjoint_images), so mailboxes without image
+        attachments never hit this query.
         """
         cached = getattr(email, "_merge_image_md5s", None)
+        if cached is None:
+            cached = self.candidate_cache.image_md5s.get(email.pk)
         if cached is not None:
+            email._merge_image_md5s = cached
             return cached
         result = {
             att.content_md5
@@ -515,6 +993,7 @@ class EmailMergeService:
             if att.is_image and att.content_md5
         }
         email._merge_image_md5s = result
+        self.candidate_cache.image_md5s[email.pk] = result
         return result
 
     def _has_disjoint_images(
@@ -538,25 +1017,87 @@ class EmailMergeService:
     def _candidate_queryset(self, email: EmailMessage):
         """
         Base queryset for same-user relation candidates.
+
+        Thread relations may reach back THREAD_RELATION_WINDOW_DAYS, but
+        they are resolved through the EmailThreadRef index. Within
+        CONTENT_WINDOW_DAYS only records a content matcher could accept
+        are loaded, using the fingerprint persisted on save: the same
+        normalized subject (forward chain / text similarity) or a body
+        length that allows containment.
         """
         # Only search within the same user and a symmetric time window; this
         # keeps the relation pass fast and avoids cross-user contamination.
         window_start = email.received_at - timedelta(
-            days=self.THREAD_RELATION_WINDOW_DAYS
+            days=self.CONTENT_WINDOW_DAYS
         )
         window_end = email.received_at + timedelta(
-            days=self.THREAD_RELATION_WINDOW_DAYS
+            days=self.CONTENT_WINDOW_DAYS
         )
-        return (
-            EmailMessage.objects.filter(
-                user_id=email.user_id,
+        related = Q(pk__in=self._thread_relation_ids(email))
+        content_match = self._content_prefilter(email)
+        if content_match is not None:
+            related |= Q(
+                content_match,
                 received_at__gte=window_start,
                 received_at__lte=window_end,
             )
+        return (
+            EmailMessage.objects.filter(related, user_id=email.user_id)
             .exclude(pk=email.pk)
             .order_by("received_at", "id")
         )
 
+    def _content_prefilter(self, email: EmailMessage) -> Optional[Q]:
+        """
+        Fingerprint filter for candidates of the content matchers.
+
+        Returns None when the email has no text, so no content matcher
+        can fire.
+        """
+        text_length = len(self._email_text(email))
+        if not text_length:
+            return None
+
+        # Containment needs the candidate text inside the current text and
+        # at least MIN_CONTAINMENT_SCORE of its length.
+        condition = Q(
+            merge_text_length__gte=max(
+                self.MIN_CONTAINMENT_LENGTH,
+                int(text_length * self.MIN_CONTAINMENT_SCORE),
+            ),
+            merge_text_length__lte=text_length,
+        )
+        email_subject_hash = subject_hash(self._email_subject(email))
+        if email_subject_hash:
+            condition |= Q(
+                merge_subject_hash=email_subject_hash,
+                merge_text_length__gt=0,
+            )
+        return condition
+
+    def _thread_relation_ids(self, email: EmailMessage) -> list[int]:
+        """
+        IDs of same-user emails whose Message-ID the email references.
+        """
+        tokens = {
+            token[:THREAD_REF_TOKEN_LENGTH] for token in reference_tokens(email)
+        }
+        if not tokens:
+            return []
+        window = timedelta(days=self.THREAD_RELATION_WINDOW_DAYS)
+        return list(
+            EmailThreadRef.objects.filter(
+                user_id=email.user_id,
+                kind=EmailThreadRef.Kind.MESSAGE_ID,
+                token__in=tokens,
+                email__received_at__gte=email.received_at - window,
+                email__received_at__lte=email.received_at + window,
+            )
+            .exclude(email_id=email.pk)
+            .values_list("email_id", flat=True)
+            .distinct()
+        )
+
     def _pick_earliest_candidate(
         self, candidates: Iterable[EmailMessage]
     ) -> Optional[EmailMessage]:
@@ -576,7 +1117,7 @@ class EmailMergeService:
         """
         Pick a candidate that strongly matches the new text.
         """
-        current_text = self._normalize_text(email.text_content)
+        current_text = self._email_text(email)
         if not current_text:
             return None
 
@@ -586,7 +1127,7 @@ class EmailMergeService:
         best_partial_ratio = 0.0
 
         for candidate in candidates:
-            candidate_text = self._normalize_text(candidate.text_content)
+            candidate_text = self._email_text(candidate)
             if not candidate_text:
                 continue
 
@@ -668,10 +1209,13 @@ class EmailMergeService:
         if not self._is_continuation(candidate_text, current_text):
             return False
 
-        if len(candidate_text) < 120:
+        if len(candidate_text) < self.MIN_CONTAINMENT_LENGTH:
             return False
 
-        return self._containment_score(candidate_text, current_text) >= 0.38
+        return (
+            self._containment_score(candidate_text, current_text)
+            >= self.MIN_CONTAINMENT_SCORE
+        )
 
     def _containment_score(
         self, candidate_text: str, current_text: str
@@ -727,16 +1271,12 @@ class EmailMergeService:
             return evidence
 
         if self._matches_thread_relation(email, candidate):
-            tokens = []
-            if email.in_reply_to:
-                tokens.extend(self._extract_message_tokens(email.in_reply_to))
-            tokens.extend(self._extract_reference_tokens(email.references))
+            candidate_tokens = message_id_tokens(candidate)
             matched = next(
                 (
                     token
-                    for token in tokens
-                    if token
-                    in (candidate.raw_message_id, candidate.message_id)
+                    for token in reference_tokens(email)
+                    if token in candidate_tokens
                 ),
                 None,
             )
@@ -745,8 +1285,8 @@ class EmailMergeService:
             )
             return evidence
 
-        candidate_text = self._normalize_text(candidate.text_content)
-        email_text = self._normalize_text(email.text_content)
+        candidate_text = self._email_text(candidate)
+        email_text = self._email_text(email)
 
         if self._matches_forward_chain(email, candidate):
             ratio, partial_ratio = self._text_similarity_scores(
@@ -823,7 +1363,12 @@ class EmailMergeService:
     def _mark_canonical(self, email: EmailMessage) -> None:
         """
         Mark a record as canonical if it is not merged into another record.
+
+        Already canonical records are not saved, so reconciling them does
+        not bump the user's merge window version.
         """
+        if email.merged_into_id is None and not email.merge_reason:
+            return
         email.merged_into = None
         email.merge_reason = ""
         email.save(
@@ -860,48 +1405,54 @@ class EmailMergeService:
         return message_id.startswith("manual-merge-")
 
     def _normalize_subject(self, subject: str) -> str:
-        subject = subject or ""
-        subject = SUBJECT_PREFIX_PATTERN.sub("", subject)
-        subject = subject.strip().lower()
-        return WHITESPACE_PATTERN.sub(" ", subject)
+        return normalize_subject(subject)
 
     def _normalize_text(self, content: str) -> str:
-        content = content or ""
-        content = re.sub(r"(?m)^\s*>.*$", "", content)
-        content = re.sub(r"(?m)^-----.*?-----$", "", content)
-        content = content.replace("\r", "\n")
-        content = WHITESPACE_PATTERN.sub(" ", content)
-        return content.strip().lower()
+        return normalize_text(content)
 
-    def _subject_looks_forward(self, subject: str) -> bool:
+    def _email_subject(self, email: EmailMessage) -> str:
         """
-        Return True when the subject looks like a forwarded thread.
+        Normalized subject of a record, cached on the instance.
         """
-        subject = subject or ""
-        return bool(re.match(r"^\s*(fw|fwd)\s*:", subject, re.I))
+        return self._cached_normalized(
+            email, "subject", "_merge_subject", normalize_subject
+        )
 
-    def _extract_message_tokens(self, value: str) -> list[str]:
+    def _email_text(self, email: EmailMessage) -> str:
         """
-        Extract RFC message IDs from a header value.
+        Normalized text_content of a record, cached on the instance.
+
+        Every matcher compares the same two bodies, so normalize each
+        record once per decision instead of once per matcher call.
         """
-        if not value:
-            return []
-        return [
-            match.group(1).strip()
-            for match in THREAD_HEADER_PATTERN.finditer(value)
-        ]
+        return self._cached_normalized(
+            email, "text_content", "_merge_text", normalize_text
+        )
+
+    def _email_simhash(self, email: EmailMessage) -> Optional[int]:
+        text = self._email_text(email)
+        cached = getattr(email, "_merge_simhash", None)
+        if cached is not None and cached[0] is text:
+            return cached[1]
+        value = simhash(text)
+        email._merge_simhash = (text, value)
+        return value
+
+    def _cached_normalized(
+        self, email, field_name, cache_attr, normalize
+    ) -> str:
+        raw = getattr(email, field_name)
+        cached = getattr(email, cache_attr, None)
+        # Key the cache on the raw value so edits to the instance are seen.
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        normalized = normalize(raw)
+        setattr(email, cache_attr, (raw, normalized))
+        return normalized
 
-    def _extract_reference_tokens(self, references) -> list[str]:
+    def _subject_looks_forward(self, subject: str) -> bool:
         """
-        Normalize References header values.
+        Return True when the subject looks like a forwarded thread.
         """
-        if not references:
-            return []
-        if isinstance(references, list):
-            values = references
-        else:
-            values = [str(references)]
-        tokens: list[str] = []
-        for value in values:
-            tokens.extend(self._extract_message_tokens(value))
-        return tokens
+        subject = subject or ""
+        return bool(re.match(r"^\s*(fw|fwd)\s*:", subject, re.I))
@@ -0,0 +1,687 @@
+"""
+Provider batch jobs for deferred LLM workflow calls.
+
+Lifecycle of a deferred request:
+1. A node interrupts the workflow (threadline.agents.llm_batch) and the
+   runner stores one LLMBatchRequest per call (PENDING).
+2. ``submit_pending_requests`` groups pending requests per LLM config into
+   a JSONL file, uploads it and creates an OpenAI-style ``/v1/batches`` job
+   (SUBMITTED). Requests whose submission keeps failing are FAILED after
+   ``max_submit_attempts`` tries.
+3. ``poll_batch_jobs`` checks submitted jobs; once a job reaches a terminal
+   status its output/error files are downloaded and every request gets its
+   result (COMPLETED / FAILED).
+4. Threads whose requests all have results are returned so the caller can
+   resume the checkpointed workflow with ``build_resume_value``.
+
+While requests are open, ``refresh_waiting_checkpoints`` keeps the
+checkpoints of their threads from expiring in Redis.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid as uuid_lib
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from threadline.agents.llm_batch import resolve_llm_batch_config
+from threadline.models import EmailMessage, LLMBatchJob, LLMBatchRequest
+from threadline.services.workflow_config import (
+    _llm_config_model_class,
+    _safe_uuid_ref,
+    resolve_threadline_task_config,
+    resolve_threadline_text_llm_config,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_API_BASE = "https://api.openai.com/v1"
+BATCH_ENDPOINT = "/v1/chat/completions"
+# Provider statuses after which a batch will not change any more.
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+OPEN_REQUEST_STATUSES = (
+    LLMBatchRequest.RequestStatus.PENDING,
+    LLMBatchRequest.RequestStatus.SUBMITTED,
+)
+DEFAULT_MAX_SUBMIT_ATTEMPTS = 5
+DEFAULT_CHECKPOINT_REFRESH_SEC = 3600
+CHECKPOINT_REFRESH_CACHE_KEY = "threadline:llm_batch:checkpoint_refresh:{}"
+
+
+class LLMBatchClient:
+    """
+    Minimal client for the OpenAI-compatible Files and Batches API.
+    """
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: str = "",
+        *,
+        timeout: int = 60,
+    ):
+        self.api_base = api_base.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.api_key:
+            return {}
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        response = requests.request(
+            method,
+            f"{self.api_base}{path}",
+            headers=self._headers(),
+            timeout=self.timeout,
+            **kwargs,
+        )
+        response.raise_for_status()
+        return response
+
+    def upload_batch_file(self, lines: Iterable[Dict[str, Any]]) -> str:
+        """
+        Upload JSONL batch input and return the file id.
+        """
+        payload = "\n".join(
+            json.dumps(line, ensure_ascii=False) for line in lines
+        )
+        response = self._request(
+            "POST",
+            "/files",
+            data={"purpose": "batch"},
+            files={
+                "file": (
+                    "batch.jsonl",
+                    payload.encode("utf-8"),
+                    "application/jsonl",
+                )
+            },
+        )
+        return response.json()["id"]
+
+    def create_batch(
+        self,
+        input_file_id: str,
+        *,
+        completion_window: str = "24h",
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a batch job for an uploaded input file.
+        """
+        body = {
+            "input_file_id": input_file_id,
+            "endpoint": BATCH_ENDPOINT,
+            "completion_window": completion_window,
+        }
+        if metadata:
+            body["metadata"] = metadata
+        return self._request("POST", "/batches", json=body).json()
+
+    def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Return the provider's current view of a batch job.
+        """
+        return self._request("GET", f"/batches/{batch_id}").json()
+
+    def download_file(self, file_id: str) -> str:
+        """
+        Return the raw content of an output or error file.
+        """
+        return self._request("GET", f"/files/{file_id}/content").text
+
+
+def _batch_config() -> Dict[str, Any]:
+    return resolve_llm_batch_config(resolve_threadline_task_config())
+
+
+def _resolve_llm_config(llm_config_uuid: Optional[str]):
+    if llm_config_uuid:
+        try:
+            return _safe_uuid_ref(_llm_config_model_class(), llm_config_uuid)
+        except RuntimeError:
+            return None
+    return resolve_threadline_text_llm_config()
+
+
+def resolve_batch_client(
+    llm_config_uuid: Optional[str],
+) -> tuple[LLMBatchClient, Optional[str]]:
+    """
+    Build a batch client for an LLM config.
+
+    THREADLINE_LLM_BATCH["api_base"] takes precedence over the config's
+    api_base so a batch-capable gateway (or a local stub) can be used.
+
+    Args:
+        llm_config_uuid: agentcore-metering LLMConfig UUID (optional)
+
+    Returns:
+        tuple: (client, default model name from the config)
+    """
+    llm_config = _resolve_llm_config(llm_config_uuid)
+    config = (getattr(llm_config, "config", None) or {}) if llm_config else {}
+    batch_config = _batch_config()
+    api_base = (
+        batch_config.get("api_base")
+        or config.get("api_base")
+        or DEFAULT_BATCH_API_BASE
+    )
+    client = LLMBatchClient(api_base, config.get("api_key") or "")
+    return client, config.get("model")
+
+
+def register_deferred_requests(
+    email: EmailMessage,
+    thread_id: str,
+    payloads: List[Dict[str, Any]],
+) -> List[LLMBatchRequest]:
+    """
+    Store the requests of llm_batch interrupts as PENDING.
+
+    Args:
+        email: Email whose workflow was interrupted
+        thread_id: LangGraph thread id of the checkpointed run
+        payloads: Interrupt payloads from collect_batch_interrupts
+
+    Returns:
+        list: Created LLMBatchRequest rows
+    """
+    rows = []
+    for payload in payloads:
+        node_name = payload.get("node_name") or "unknown"
+        for key, request in (payload.get("requests") or {}).items():
+            rows.append(
+                LLMBatchRequest(
+                    email_message=email,
+                    custom_id=(
+                        f"email-{email.id}-{node_name}-{key}-"
+                        f"{uuid_lib.uuid4().hex[:12]}"
+                    ),
+                    thread_id=thread_id,
+                    node_name=node_name,
+                    request_key=key,
+                    llm_config_uuid=payload.get("llm_config_uuid"),
+                    request_body=request.get("body") or {},
+                    json_mode=bool(request.get("json_mode")),
+                )
+            )
+    return LLMBatchRequest.objects.bulk_create(rows)
+
+
+def submit_pending_requests(
+    *,
+    client_factory: Callable[
+        [Optional[str]], tuple[LLMBatchClient, Optional[str]]
+    ] = resolve_batch_client,
+) -> Dict[str, Any]:
+    """
+    Upload pending requests as provider batch jobs.
+
+    Requests are grouped per LLM config and split into jobs of at most
+    ``max_requests_per_job`` lines. A failed submission counts an attempt
+    on its requests; requests out of attempts are FAILED so their
+    workflow resumes with the error instead of waiting forever.
+
+    Returns:
+        dict: Submission summary (jobs, submitted_count, failed_count)
+    """
+    batch_config = _batch_config()
+    max_per_job = max(int(batch_config.get("max_requests_per_job") or 1), 1)
+    completion_window = batch_config.get("completion_window") or "24h"
+    max_attempts = max(
+        int(
+            batch_config.get("max_submit_attempts")
+            or DEFAULT_MAX_SUBMIT_ATTEMPTS
+        ),
+        1,
+    )
+
+    grouped = defaultdict(list)
+    pending = LLMBatchRequest.objects.filter(
+        status=LLMBatchRequest.RequestStatus.PENDING
+    ).order_by("created_at")
+    for request_row in pending:
+        grouped[request_row.llm_config_uuid].append(request_row)
+
+    jobs = []
+    submitted_count = 0
+    failed_count = 0
+    given_up_count = 0
+    for llm_config_uuid, rows in grouped.items():
+        try:
+            client, default_model = client_factory(
+                str(llm_config_uuid) if llm_config_uuid else None
+            )
+        except Exception as exc:
+            logger.error(
+                "Failed to build LLM batch client for config %s: %s",
+                llm_config_uuid,
+                exc,
+            )
+            failed_count += len(rows)
+            given_up_count += _record_submit_failure(rows, exc, max_attempts)
+            continue
+        for start in range(0, len(rows), max_per_job):
+            chunk = rows[start:start + max_per_job]
+            try:
+                job = _submit_job(
+                    client,
+                    chunk,
+                    llm_config_uuid=llm_config_uuid,
+                    default_model=default_model,
+                    completion_window=completion_window,
+                )
+            except Exception as exc:
+                logger.error(
+                    "Failed to submit LLM batch of %s requests: %s",
+                    len(chunk),
+                    exc,
+                )
+                failed_count += len(chunk)
+                given_up_count += _record_submit_failure(
+                    chunk, exc, max_attempts
+                )
+                continue
+            jobs.append(job.provider_batch_id)
+            submitted_count += len(chunk)
+
+    return {
+        "jobs": jobs,
+        "submitted_count": submitted_count,
+        "failed_count": failed_count,
+        "given_up_count": given_up_count,
+    }
+
+
+def _record_submit_failure(
+    rows: List[LLMBatchRequest],
+    error: Exception,
+    max_attempts: int,
+) -> int:
+    """
+    Count a failed submission and fail requests out of attempts.
+
+    Returns:
+        int: Number of requests marked FAILED
+    """
+    now = timezone.now()
+    ids = [row.id for row in rows]
+    LLMBatchRequest.objects.filter(id__in=ids).update(
+        submit_attempts=F("submit_attempts") + 1, updated_at=now
+    )
+    return LLMBatchRequest.objects.filter(
+        id__in=ids,
+        status=LLMBatchRequest.RequestStatus.PENDING,
+        submit_attempts__gte=max_attempts,
+    ).update(
+        status=LLMBatchRequest.RequestStatus.FAILED,
+        error_message=(
+            f"Batch submission failed after {max_attempts} attempts: "
+            f"{error}"
+        ),
+        updated_at=now,
+    )
+
+
+def _submit_job(
+    client: LLMBatchClient,
+    rows: List[LLMBatchRequest],
+    *,
+    llm_config_uuid,
+    default_model: Optional[str],
+    completion_window: str,
+) -> LLMBatchJob:
+    lines = []
+    for row in rows:
+        body = dict(row.request_body)
+        if default_model and not body.get("model"):
+            body["model"] = default_model
+        lines.append(
+            {
+                "custom_id": row.custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": body,
+            }
+        )
+
+    input_file_id = client.upload_batch_file(lines)
+    batch = client.create_batch(
+        input_file_id,
+        completion_window=completion_window,
+        metadata={"source": "threadline"},
+    )
+
+    with transaction.atomic():
+        job = LLMBatchJob.objects.create(
+            provider_batch_id=batch["id"],
+            llm_config_uuid=llm_config_uuid,
+            input_file_id=input_file_id,
+            provider_status=batch.get("status") or "",
+            request_count=len(rows),
+        )
+        LLMBatchRequest.objects.filter(
+            id__in=[row.id for row in rows]
+        ).update(
+            batch_job=job,
+            status=LLMBatchRequest.RequestStatus.SUBMITTED,
+            updated_at=timezone.now(),
+        )
+    logger.info(
+        f"Submitted LLM batch {job.provider_batch_id} "
+        f"with {len(rows)} requests"
+    )
+    return job
+
+
+def poll_batch_jobs(
+    *,
+    client_factory: Callable[
+        [Optional[str]], tuple[LLMBatchClient, Optional[str]]
+    ] = resolve_batch_client,
+) -> Dict[str, Any]:
+    """
+    Refresh submitted jobs and store results of finished ones.
+
+    Returns:
+        dict: Poll summary with ``ready_threads`` (thread ids whose
+            requests all have results and can be resumed)
+    """
+    finished_jobs = []
+    for job in LLMBatchJob.objects.filter(
+        status=LLMBatchJob.JobStatus.SUBMITTED
+    ):
+        client, _ = client_factory(
+            str(job.llm_config_uuid) if job.llm_config_uuid else None
+        )
+        try:
+            batch = client.retrieve_batch(job.provider_batch_id)
+        except Exception as exc:
+            logger.warning(
+                f"Failed to poll LLM batch {job.provider_batch_id}: {exc}"
+            )
+            continue
+
+        provider_status = batch.get("status") or ""
+        if provider_status not in TERMINAL_BATCH_STATUSES:
+            if provider_status != job.provider_status:
+                job.provider_status = provider_status
+                job.save(update_fields=["provider_status", "updated_at"])
+            continue
+
+        _store_job_results(client, job, batch)
+        finished_jobs.append(job.provider_batch_id)
+
+    return {
+        "finished_jobs": finished_jobs,
+        "ready_threads": list_ready_threads(),
+    }
+
+
+def _parse_jsonl(content: str) -> List[Dict[str, Any]]:
+    lines = []
+    for raw_line in (content or "").splitlines():
+        raw_line = raw_line.strip()
+        if not raw_line:
+            continue
+        try:
+            lines.append(json.loads(raw_line))
+        except ValueError:
+            logger.warning("Skipping malformed batch output line")
+    return lines
+
+
+def _result_from_line(line: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert one output/error line into {"content", "usage"} or {"error"}.
+    """
+    if line.get("error"):
+        error = line["error"]
+        message = error.get("message") if isinstance(error, dict) else error
+        return {"error": str(message)}
+
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    status_code = response.get("status_code")
+    if status_code and status_code >= 400:
+        error = body.get("error") or {}
+        return {
+            "error": (
+                error.get("message")
+                if isinstance(error, dict)
+                else str(error)
+            )
+            or f"HTTP {status_code}"
+        }
+
+    choices = body.get("choices") or []
+    if not choices:
+        return {"error": "Batch response has no choices"}
+    usage = body.get("usage") or {}
+    prompt_details = usage.get("prompt_tokens_details") or {}
+    completion_details = usage.get("completion_tokens_details") or {}
+    return {
+        "content": (choices[0].get("message") or {}).get("content"),
+        "usage": {
+            "model": body.get("model"),
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+            "cached_tokens": prompt_details.get("cached_tokens", 0),
+            "reasoning_tokens": completion_details.get(
+                "reasoning_tokens", 0
+            ),
+        },
+    }
+
+
+def _store_job_results(
+    client: LLMBatchClient,
+    job: LLMBatchJob,
+    batch: Dict[str, Any],
+) -> None:
+    results: Dict[str, Dict[str, Any]] = {}
+    for file_field in ("output_file_id", "error_file_id"):
+        file_id = batch.get(file_field)
+        if not file_id:
+            continue
+        setattr(job, file_field, file_id)
+        try:
+            content = client.download_file(file_id)
+        except Exception as exc:
+            logger.error(
+                f"Failed to download {file_field} for LLM batch "
+                f"{job.provider_batch_id}: {exc}"
+            )
+            continue
+        for line in _parse_jsonl(content):
+            custom_id = line.get("custom_id")
+            if custom_id:
+                results[custom_id] = _result_from_line(line)
+
+    provider_status = batch.get("status") or ""
+    missing_error = (
+        f"No result in batch {job.provider_batch_id} "
+        f"(status={provider_status})"
+    )
+    rows = list(job.requests.all())
+    now = timezone.now()
+    for row in rows:
+        result = results.get(row.custom_id) or {"error": missing_error}
+        row.response = result if not result.get("error") else None
+        row.error_message = result.get("error") or ""
+        row.status = (
+            LLMBatchRequest.RequestStatus.FAILED
+            if result.get("error")
+            else LLMBatchRequest.RequestStatus.COMPLETED
+        )
+        row.updated_at = now
+
+    with transaction.atomic():
+        LLMBatchRequest.objects.bulk_update(
+            rows, ["response", "error_message", "status", "updated_at"]
+        )
+        job.provider_status = provider_status
+        job.status = (
+            LLMBatchJob.JobStatus.COMPLETED
+            if provider_status == "completed"
+            else LLMBatchJob.JobStatus.FAILED
+        )
+        if job.status == LLMBatchJob.JobStatus.FAILED:
+            errors = (batch.get("errors") or {}).get("data") or []
+            job.error_message = "; ".join(
+                str(error.get("message")) for error in errors
+            ) or missing_error
+        job.completed_at = now
+        job.save()
+    logger.info(
+        f"LLM batch {job.provider_batch_id} finished "
+        f"(status={provider_status}, requests={len(rows)})"
+    )
+
+
+def list_ready_threads() -> List[str]:
+    """
+    Return thread ids whose unresumed requests all have results.
+    """
+    unresumed = LLMBatchRequest.objects.filter(resumed_at__isnull=True)
+    waiting = set(
+        unresumed.filter(status__in=OPEN_REQUEST_STATUSES).values_list(
+            "thread_id", flat=True
+        )
+    )
+    finished = set(
+        unresumed.exclude(status__in=OPEN_REQUEST_STATUSES).values_list(
+            "thread_id", flat=True
+        )
+    )
+    return sorted(finished - waiting)
+
+
+def build_resume_value(thread_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Collect the results of a thread's pending interrupt and mark them used.
+
+    Returns:
+        dict: {"email_id", "resume": {request_key: result}}, or None when
+            the thread is not ready (still waiting or already resumed)
+    """
+    with transaction.atomic():
+        rows = list(
+            LLMBatchRequest.objects.select_for_update().filter(
+                thread_id=thread_id, resumed_at__isnull=True
+            )
+        )
+        if not rows or any(
+            row.status in OPEN_REQUEST_STATUSES for row in rows
+        ):
+            return None
+
+        resume = {}
+        for row in rows:
+            if row.status == LLMBatchRequest.RequestStatus.COMPLETED:
+                resume[row.request_key] = row.response or {}
+            else:
+                resume[row.request_key] = {
+                    "error": row.error_message or "Batch request failed"
+                }
+        LLMBatchRequest.objects.filter(
+            id__in=[row.id for row in rows]
+        ).update(resumed_at=timezone.now())
+
+    return {"email_id": rows[0].email_message_id, "resume": resume}
+
+
+def refresh_waiting_checkpoints(checkpoint_manager=None) -> int:
+    """
+    Keep the checkpoints of threads waiting on batch results alive.
+
+    The Redis checkpointer expires a thread after its TTL (24h), which is
+    no longer than the provider completion window, so a slow batch could
+    otherwise land after its checkpoint is gone. Each waiting thread is
+    refreshed at most once per ``checkpoint_refresh_sec``.
+
+    Args:
+        checkpoint_manager: CheckpointManager (default: the global one)
+
+    Returns:
+        int: Number of threads whose checkpoint was refreshed
+    """
+    # Deferred: the checkpoint manager pulls langgraph-redis lazily.
+    from threadline.agents.checkpoint_manager import get_checkpoint_manager
+
+    interval = int(
+        _batch_config().get("checkpoint_refresh_sec")
+        or DEFAULT_CHECKPOINT_REFRESH_SEC
+    )
+    thread_ids = (
+        LLMBatchRequest.objects.filter(
+            resumed_at__isnull=True, status__in=OPEN_REQUEST_STATUSES
+        )
+        .values_list("thread_id", flat=True)
+        .distinct()
+    )
+    manager = checkpoint_manager or get_checkpoint_manager()
+    refreshed = 0
+    for thread_id in thread_ids:
+        key = CHECKPOINT_REFRESH_CACHE_KEY.format(thread_id)
+        if not cache.add(key, 1, timeout=interval):
+            continue
+        if manager.refresh_thread_ttl(thread_id):
+            refreshed += 1
+        else:
+            cache.delete(key)
+    return refreshed
+
+
+def cleanup_finished_batches(cutoff_date, batch_size: int = 1000) -> int:
+    """
+    Delete batch rows of workflows resumed before ``cutoff_date``.
+
+    Request bodies hold full email content, so they are not kept past
+    the task retention window. Jobs go once none of their requests is
+    left.
+
+    Args:
+        cutoff_date: Requests resumed before this are removed
+        batch_size: Rows deleted per statement
+
+    Returns:
+        int: Number of deleted requests
+    """
+    deleted_total = 0
+    while True:
+        batch_ids = list(
+            LLMBatchRequest.objects.filter(
+                resumed_at__lt=cutoff_date
+            ).values_list("id", flat=True)[:batch_size]
+        )
+        if not batch_ids:
+            break
+        deleted, _ = LLMBatchRequest.objects.filter(id__in=batch_ids).delete()
+        deleted_total += deleted
+
+    LLMBatchJob.objects.filter(
+        completed_at__lt=cutoff_date, requests__isnull=True
+    ).delete()
+    return deleted_total
+
+
+def waiting_email_ids():
+    """
+    Return a subquery of email ids whose workflow waits on batch results.
+    """
+    return LLMBatchRequest.objects.filter(
+        resumed_at__isnull=True
+    ).values("email_message_id")
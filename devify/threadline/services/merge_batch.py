@@ -0,0 +1,296 @@
+"""
+Per-user micro-batching of merge reconciliation.
+
+A mailing-list burst saves many related emails for one user within
+seconds. With one process_email_merge task per email, the tasks serialize
+on the row locks taken by EmailMergeService.reconcile and re-scan
+overlapping candidate windows. With THREADLINE_EMAIL_MERGE["micro_batch"]
+enabled, a saved email only schedules one process_user_merge_batch task
+per user and batch window. The batch reconciles the user's new FETCHED
+emails in received_at order in one transaction, sharing candidate text
+and image MD5s between the decisions.
+
+Batch scheduling lives in the Django cache: a pending flag per user (one
+scheduled batch per window) and a running flag (one batch per user at a
+time). If the cache is unavailable, callers fall back to per-email merge
+tasks. Which emails a batch reconciles is recorded on the rows instead:
+EmailMessage.merge_pending is set once an email and its attachments are
+saved, and a batch claims flagged rows in the transaction that reconciles
+them, so emails that commit late or out of id order are still picked up.
+If a batch task is lost, the stuck-email reset task hands its flagged
+emails to per-email merges (see claim_stale_merge_pending_emails).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from threadline.models import EmailMessage
+from threadline.services.email_merge import (
+    EmailMergeService,
+    MergeCandidateCache,
+)
+from threadline.state_machine import EmailStatus
+
+logger = logging.getLogger(__name__)
+
+MERGE_BATCH_CACHE_PREFIX = "threadline:merge_batch"
+
+
+def _merge_config() -> Dict[str, Any]:
+    return dict(getattr(settings, "THREADLINE_EMAIL_MERGE", None) or {})
+
+
+def is_merge_batch_enabled() -> bool:
+    """
+    Whether fetched emails are reconciled in per-user batches.
+    """
+    return bool(_merge_config().get("micro_batch"))
+
+
+def merge_batch_window_sec() -> int:
+    return max(0, int(_merge_config().get("batch_window_sec", 5)))
+
+
+def _batch_lock_timeout() -> int:
+    return merge_batch_window_sec() + settings.TASK_TIMEOUT_MINUTES * 60
+
+
+def _pending_key(user_id) -> str:
+    return f"{MERGE_BATCH_CACHE_PREFIX}:pending:{user_id}"
+
+
+def _running_key(user_id) -> str:
+    return f"{MERGE_BATCH_CACHE_PREFIX}:running:{user_id}"
+
+
+def queue_email_for_merge_batch(email: EmailMessage) -> bool:
+    """
+    Flag a saved email for its user's next merge batch.
+
+    Call once the email and its attachments are written, so a batch never
+    reconciles an email before its attachments exist.
+
+    Returns:
+        bool: False when the caller should queue a per-email merge instead
+    """
+    EmailMessage.objects.filter(pk=email.pk).update(merge_pending=True)
+    if schedule_user_merge_batch(email.user_id):
+        return True
+    # A batch that is already running may have claimed the email.
+    unclaimed = EmailMessage.objects.filter(
+        pk=email.pk, merge_pending=True
+    ).update(merge_pending=False)
+    return not unclaimed
+
+
+def schedule_user_merge_batch(user_id, countdown: int | None = None) -> bool:
+    """
+    Make sure a merge batch is scheduled for the user.
+
+    Only the first call within a window enqueues the task; later calls
+    are picked up by that batch.
+
+    Args:
+        user_id: Owner of the saved email
+        countdown: Delay in seconds; defaults to the batch window
+
+    Returns:
+        bool: False when the batch could not be scheduled and the caller
+            should queue a per-email merge instead
+    """
+    try:
+        scheduled = cache.add(_pending_key(user_id), 1, _batch_lock_timeout())
+    except Exception as exc:
+        logger.warning(f"[MergeBatch] Cache unavailable, not batching: {exc}")
+        return False
+    if not scheduled:
+        return True
+
+    # Deferred: the task module imports this module.
+    from threadline.tasks.email_merge import process_user_merge_batch
+
+    try:
+        process_user_merge_batch.apply_async(
+            args=[str(user_id)],
+            countdown=(
+                merge_batch_window_sec() if countdown is None else countdown
+            ),
+        )
+    except Exception as exc:
+        logger.error(
+            f"[MergeBatch] Failed to schedule batch for user {user_id}: {exc}"
+        )
+        cache.delete(_pending_key(user_id))
+        return False
+    return True
+
+
+def acquire_user_merge_batch(user_id) -> bool:
+    """
+    Claim the user's batch slot and consume the pending flag.
+
+    Returns:
+        bool: False when another batch of the user is still running
+    """
+    try:
+        if not cache.add(_running_key(user_id), 1, _batch_lock_timeout()):
+            return False
+        # Emails saved from now on schedule the next batch.
+        cache.delete(_pending_key(user_id))
+    except Exception as exc:
+        logger.warning(f"[MergeBatch] Cache unavailable, running anyway: {exc}")
+    return True
+
+
+def release_user_merge_batch(user_id) -> None:
+    try:
+        cache.delete(_running_key(user_id))
+    except Exception as exc:
+        logger.warning(f"[MergeBatch] Failed to release batch slot: {exc}")
+
+
+def reconcile_user_merge_batch(user_id) -> Dict[str, Any]:
+    """
+    Reconcile the user's FETCHED emails waiting for a merge batch.
+
+    Flagged emails are claimed with SELECT ... FOR UPDATE SKIP LOCKED and
+    unflagged in the same transaction that reconciles them, oldest first
+    (received_at, id), by one EmailMergeService with a shared candidate
+    cache. Emails with merged children are skipped like in
+    process_email_merge. If the transaction fails, the claim rolls back
+    with it; the emails are unflagged and returned as ``failed_ids`` so
+    the caller can retry them one by one.
+
+    Args:
+        user_id: Owner of the emails
+
+    Returns:
+        dict: email_ids (reconciled or skipped, in order), merged_count,
+            skipped_count, failed_ids and has_more
+    """
+    max_size = max(1, int(_merge_config().get("batch_max_size", 200)))
+    result = {
+        "email_ids": [],
+        "merged_count": 0,
+        "skipped_count": 0,
+        "failed_ids": [],
+        "has_more": False,
+    }
+    claimed_ids: list = []
+
+    try:
+        with transaction.atomic():
+            claimed_ids = list(
+                EmailMessage.objects.select_for_update(skip_locked=True)
+                .filter(
+                    user_id=user_id,
+                    merge_pending=True,
+                    status=EmailStatus.FETCHED.value,
+                )
+                .order_by("id")
+                .values_list("id", flat=True)[: max_size + 1]
+            )
+            result["has_more"] = len(claimed_ids) > max_size
+            claimed_ids = claimed_ids[:max_size]
+            if not claimed_ids:
+                return result
+            EmailMessage.objects.filter(pk__in=claimed_ids).update(
+                merge_pending=False
+            )
+
+            emails = list(
+                EmailMessage.objects.filter(pk__in=claimed_ids)
+                .annotate(
+                    has_merged_children=Exists(
+                        EmailMessage.objects.filter(
+                            merged_into_id=OuterRef("pk")
+                        )
+                    )
+                )
+                .order_by("received_at", "id")
+            )
+            candidate_cache = MergeCandidateCache()
+            for email in emails:
+                candidate_cache.remember(email)
+            service = EmailMergeService(candidate_cache=candidate_cache)
+
+            for email in emails:
+                if email.has_merged_children:
+                    result["skipped_count"] += 1
+                else:
+                    _, decision = service.reconcile(email)
+                    if decision.should_merge and decision.sources:
+                        result["merged_count"] += 1
+                result["email_ids"].append(email.id)
+    except Exception as exc:
+        if not claimed_ids:
+            raise
+        logger.error(
+            f"[MergeBatch] Batch reconcile failed for user {user_id}, "
+            f"falling back to per-email merge: {exc}"
+        )
+        # The caller hands these emails to per-email merge tasks.
+        EmailMessage.objects.filter(pk__in=claimed_ids).update(
+            merge_pending=False
+        )
+        result.update(
+            email_ids=[],
+            merged_count=0,
+            skipped_count=0,
+            failed_ids=list(claimed_ids),
+        )
+
+    logger.info(
+        f"[MergeBatch] user_id={user_id} reconciled="
+        f"{len(result['email_ids'])} merged={result['merged_count']}"
+        f" skipped={result['skipped_count']}"
+        f" failed={len(result['failed_ids'])}"
+        f" has_more={result['has_more']}"
+    )
+    return result
+
+
+def claim_stale_merge_pending_emails() -> List[int]:
+    """
+    Unflag emails whose merge batch never ran.
+
+    An email still flagged after the batch window plus the task timeout
+    lost its batch task (worker crash, dropped message). The flags are
+    cleared with the same SKIP LOCKED claim a batch uses, so a batch
+    that is running right now keeps its emails.
+
+    Returns:
+        list: ids of the claimed emails still in FETCHED state, for the
+            caller to queue per-email merges
+    """
+    cutoff = timezone.now() - timedelta(seconds=_batch_lock_timeout())
+    with transaction.atomic():
+        stale = list(
+            EmailMessage.objects.select_for_update(skip_locked=True)
+            .filter(merge_pending=True, updated_at__lt=cutoff)
+            .values_list("id", "status")
+        )
+        if not stale:
+            return []
+        EmailMessage.objects.filter(
+            pk__in=[email_id for email_id, _ in stale]
+        ).update(merge_pending=False)
+
+    logger.warning(
+        f"[MergeBatch] Cleared {len(stale)} merge_pending flags left by "
+        "lost batches"
+    )
+    return [
+        email_id
+        for email_id, status in stale
+        if status == EmailStatus.FETCHED.value
+    ]
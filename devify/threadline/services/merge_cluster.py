@@ -0,0 +1,192 @@
+"""
+Materialized merge clusters.
+
+EmailMessage.cluster_root_id and cluster_depth mirror the merged_into
+tree: a merged record stores the head of its cluster and its distance
+from it, while heads keep cluster_root_id NULL and depth 0. Readers load
+a whole cluster with one indexed query instead of walking merged_into and
+merged_children record by record.
+
+threadline.signals calls refresh_merge_clusters() whenever merged_into
+is saved, inside the transaction of the EmailMergeService or
+ManualMergeService merge, and when a record is deleted, since
+on_delete=SET_NULL detaches the children of a removed head.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.db.models import Q, QuerySet
+
+from threadline.models import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_UPDATE_BATCH_SIZE = 500
+
+
+def merge_cluster_root_id(email) -> int:
+    """
+    Id of the head of the cluster an email belongs to.
+    """
+    return getattr(email, "cluster_root_id", None) or email.id
+
+
+def merge_cluster_queryset(
+    email, queryset: Optional[QuerySet] = None
+) -> QuerySet:
+    """
+    All records of an email's merge cluster, including the email itself.
+    """
+    root_id = merge_cluster_root_id(email)
+    if queryset is None:
+        queryset = EmailMessage.objects.all()
+    return queryset.filter(Q(pk=root_id) | Q(cluster_root_id=root_id))
+
+
+def walk_merge_cluster(
+    email: EmailMessage, queryset: Optional[QuerySet] = None
+) -> list[tuple[EmailMessage, int]]:
+    """
+    Walk an email's merge cluster from a single query.
+
+    Records are returned in the order of a depth-first walk starting at
+    ``email``: its canonical chain first, then merged children. Depth is
+    the distance from ``email`` in that walk. merged_into is filled from
+    the loaded rows so callers can read it without extra queries.
+
+    Args:
+        email: Record to start from; returned as-is as the first node
+        queryset: Optional base queryset, e.g. with issue prefetches
+
+    Returns:
+        list: (record, depth) pairs
+    """
+    members = {email.id: email}
+    children: dict[int, list[EmailMessage]] = defaultdict(list)
+    for member in merge_cluster_queryset(email, queryset):
+        member = members.setdefault(member.id, member)
+        if member.merged_into_id:
+            children[member.merged_into_id].append(member)
+
+    merged_into_field = EmailMessage._meta.get_field("merged_into")
+    for member in members.values():
+        parent = members.get(member.merged_into_id)
+        if parent is not None:
+            merged_into_field.set_cached_value(member, parent)
+
+    visited: set[int] = set()
+    nodes: list[tuple[EmailMessage, int]] = []
+    stack = [(email, 0)]
+    while stack:
+        current, depth = stack.pop()
+        if current.id in visited:
+            continue
+        visited.add(current.id)
+        nodes.append((current, depth))
+
+        # Pushed in reverse so the parent chain is walked first, then the
+        # children in queryset order.
+        for child in reversed(children.get(current.id, [])):
+            stack.append((child, depth + 1))
+        parent = members.get(current.merged_into_id)
+        if parent is not None:
+            stack.append((parent, depth + 1))
+
+    return nodes
+
+
+def refresh_merge_clusters(
+    email_ids: Iterable[int] = (),
+    root_ids: Iterable[int] = (),
+) -> dict[int, tuple[Optional[int], int]]:
+    """
+    Recompute cluster_root_id and cluster_depth after merged_into changed.
+
+    Every cluster the given records belonged to (by their stored
+    cluster_root_id) is recomputed from merged_into. Records pointing
+    outside those clusters take the stored root and depth of their new
+    canonical record, so merging a cluster under another one does not
+    touch the target cluster.
+
+    Args:
+        email_ids: Records whose merged_into was changed
+        root_ids: Heads of clusters to recompute, e.g. a deleted head
+
+    Returns:
+        dict: New (cluster_root_id, cluster_depth) of the updated records
+    """
+    root_ids = set(root_ids)
+    email_ids = list(email_ids)
+    if email_ids:
+        for email_id, root_id in EmailMessage.objects.filter(
+            pk__in=email_ids
+        ).values_list("id", "cluster_root_id"):
+            root_ids.add(root_id or email_id)
+    if not root_ids:
+        return {}
+
+    rows = {
+        email_id: (merged_into_id, root_id, depth)
+        for email_id, merged_into_id, root_id, depth in EmailMessage.objects
+        .filter(Q(pk__in=root_ids) | Q(cluster_root_id__in=root_ids))
+        .values_list("id", "merged_into_id", "cluster_root_id", "cluster_depth")
+    }
+    outside_ids = {
+        merged_into_id
+        for merged_into_id, _, _ in rows.values()
+        if merged_into_id and merged_into_id not in rows
+    }
+    # Resolved (root, depth) per record; records outside the recomputed
+    # clusters are trusted as stored.
+    resolved: dict[int, tuple[int, int]] = {
+        email_id: (root_id or email_id, depth)
+        for email_id, root_id, depth in EmailMessage.objects.filter(
+            pk__in=outside_ids
+        ).values_list("id", "cluster_root_id", "cluster_depth")
+    }
+
+    for email_id in rows:
+        path: list[int] = []
+        current = email_id
+        while current not in resolved:
+            path.append(current)
+            merged_into_id = rows[current][0]
+            if merged_into_id in resolved or (
+                merged_into_id in rows and merged_into_id not in path
+            ):
+                current = merged_into_id
+                continue
+            if merged_into_id:
+                logger.warning(
+                    f"[MergeCluster] Treating email {current} as a cluster "
+                    f"head, merged_into {merged_into_id} is not reachable"
+                )
+            resolved[current] = (current, 0)
+            path.pop()
+        root_id, depth = resolved[current]
+        for node in reversed(path):
+            depth += 1
+            resolved[node] = (root_id, depth)
+
+    changed = {}
+    for email_id, (_, stored_root_id, stored_depth) in rows.items():
+        root_id, depth = resolved[email_id]
+        root_id = None if root_id == email_id else root_id
+        if (root_id, depth) != (stored_root_id, stored_depth):
+            changed[email_id] = (root_id, depth)
+    if changed:
+        EmailMessage.objects.bulk_update(
+            [
+                EmailMessage(
+                    id=email_id, cluster_root_id=root_id, cluster_depth=depth
+                )
+                for email_id, (root_id, depth) in changed.items()
+            ],
+            ["cluster_root_id", "cluster_depth"],
+            batch_size=CLUSTER_UPDATE_BATCH_SIZE,
+        )
+    return changed
@@ -0,0 +1,164 @@
+"""
+Memoized merge decisions.
+
+EmailMergeService.decide is a function of the email and the user's other
+emails. With THREADLINE_EMAIL_MERGE["decision_cache"] enabled, a decision
+is cached under the email's fingerprint (the merge fingerprint and thread
+headers persisted on save) and a per-user window version. threadline.signals
+bumps the version after every committed insert, merge or content change of
+the user's emails and attachments, so a cached decision is only reused
+while nothing a candidate scan could see has changed (merge retries, force
+reruns, batch retries).
+
+Only ids are cached; EmailMergeService reloads the target and sources.
+Cache errors are logged and treated as misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from threadline.models import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+MERGE_DECISION_CACHE_PREFIX = "threadline:merge_decision"
+# EmailMessage columns a candidate scan reads; saving any of them bumps
+# the owner's window version.
+DECISION_INPUT_FIELDS = frozenset(
+    {
+        "user",
+        "subject",
+        "text_content",
+        "received_at",
+        "merged_into",
+        "message_id",
+        "raw_message_id",
+        "in_reply_to",
+        "references",
+    }
+)
+# EmailAttachment columns the image matcher reads.
+DECISION_ATTACHMENT_FIELDS = frozenset(
+    {"email_message", "content_md5", "is_image"}
+)
+
+
+def _merge_config() -> Dict[str, Any]:
+    return dict(getattr(settings, "THREADLINE_EMAIL_MERGE", None) or {})
+
+
+def is_decision_cache_enabled() -> bool:
+    return bool(_merge_config().get("decision_cache"))
+
+
+def _version_key(user_id) -> str:
+    return f"{MERGE_DECISION_CACHE_PREFIX}:version:{user_id}"
+
+
+def get_window_version(user_id) -> Optional[int]:
+    """
+    Current merge window version of a user.
+
+    Returns:
+        int: The version, or None when the cache is unavailable
+    """
+    try:
+        version = cache.get(_version_key(user_id))
+        if version is None:
+            # Seeded from the clock rather than 0 so an evicted counter
+            # never matches versions of decisions cached before it.
+            cache.add(_version_key(user_id), time.time_ns(), None)
+            version = cache.get(_version_key(user_id))
+        return None if version is None else int(version)
+    except Exception as exc:
+        logger.warning(f"[MergeDecisionCache] Failed to read version: {exc}")
+        return None
+
+
+def bump_window_version(user_id) -> None:
+    """
+    Invalidate every memoized decision of a user.
+    """
+    if not is_decision_cache_enabled():
+        return
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # No version yet, so no decision was cached under it.
+        pass
+    except Exception as exc:
+        logger.warning(f"[MergeDecisionCache] Failed to bump version: {exc}")
+
+
+def schedule_window_version_bump(user_id) -> None:
+    """
+    Bump the user's window version once the saving transaction commits.
+
+    Bumping earlier would let a concurrent decide() cache a decision
+    computed from the pre-commit rows under the new version.
+    """
+    if not is_decision_cache_enabled():
+        return
+    transaction.on_commit(lambda: bump_window_version(user_id))
+
+
+def email_fingerprint(email: EmailMessage, signature: Any = None) -> str:
+    """
+    Hash of everything of the email itself a merge decision reads.
+
+    Args:
+        email: Email being decided
+        signature: Matcher configuration, so tuning changes miss
+    """
+    payload = [
+        email.merge_subject_hash,
+        email.merge_text_length,
+        email.merge_text_simhash,
+        email.raw_message_id,
+        email.in_reply_to,
+        email.references,
+        str(email.received_at),
+        signature,
+    ]
+    return hashlib.md5(
+        json.dumps(payload, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _decision_key(email: EmailMessage, version: int, fingerprint: str) -> str:
+    return (
+        f"{MERGE_DECISION_CACHE_PREFIX}:{email.user_id}:{email.pk}:"
+        f"{version}:{fingerprint}"
+    )
+
+
+def get_cached_decision(
+    email: EmailMessage, version: int, fingerprint: str
+) -> Optional[dict]:
+    try:
+        return cache.get(_decision_key(email, version, fingerprint))
+    except Exception as exc:
+        logger.warning(f"[MergeDecisionCache] Failed to read decision: {exc}")
+        return None
+
+
+def set_cached_decision(
+    email: EmailMessage, version: int, fingerprint: str, payload: dict
+) -> None:
+    try:
+        cache.set(
+            _decision_key(email, version, fingerprint),
+            payload,
+            int(_merge_config().get("decision_cache_ttl_sec", 3600)),
+        )
+    except Exception as exc:
+        logger.warning(f"[MergeDecisionCache] Failed to store decision: {exc}")
@@ -0,0 +1,294 @@
+"""
+Offline replay of the automatic merge decisions.
+
+MergeReplay feeds a user's historical emails through
+EmailMergeService.decide in received order, as if they arrived one by one,
+and compares the decisions with the merge clusters recorded in the
+database (automatic merges and manual merges alike). Nothing is written:
+merge columns of the replayed emails are only changed in memory and the
+replay runs in a rolled-back transaction.
+
+Used by the replay_merges management command to tune the matcher
+thresholds and to measure the cost of merge engine changes on database
+snapshots.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from threadline.models import EmailMessage
+from threadline.services.email_merge import (
+    EmailMergeService,
+    MergeCandidateCache,
+)
+
+logger = logging.getLogger(__name__)
+
+REPLAY_CHUNK_SIZE = 200
+MANUAL_MERGE_MESSAGE_PREFIX = "manual-merge-"
+
+
+class ReplayMergeService(EmailMergeService):
+    """
+    EmailMergeService that only sees the emails replayed so far.
+
+    Manual merge canonicals are synthetic records, not arrivals, so they
+    are never offered as candidates. Replayed decisions depend on the
+    replay order and overrides, so they are never memoized.
+    """
+
+    USE_DECISION_CACHE = False
+
+    def _candidate_queryset(self, email: EmailMessage):
+        return (
+            super()
+            ._candidate_queryset(email)
+            .filter(
+                Q(received_at__lt=email.received_at)
+                | Q(received_at=email.received_at, id__lt=email.id)
+            )
+            .exclude(message_id__startswith=MANUAL_MERGE_MESSAGE_PREFIX)
+        )
+
+
+@dataclass
+class ReplayDecision:
+    email_id: int
+    subject: str
+    reason: str
+    source_ids: list[int]
+    correct_source_ids: list[int]
+    expected: bool
+    seconds: float
+    stats: dict
+
+
+@dataclass
+class MergeReplayReport:
+    """
+    Outcome of a replay.
+
+    Pair counts compare each (email, matched source) pair with the
+    recorded clusters; ``expected_merges`` counts emails that have an
+    earlier replayed email in their recorded cluster.
+    """
+
+    decisions: list[ReplayDecision] = field(default_factory=list)
+    predicted_pairs: int = 0
+    correct_pairs: int = 0
+    expected_merges: int = 0
+    recovered_merges: int = 0
+    reasons: Counter = field(default_factory=Counter)
+
+    @property
+    def merged(self) -> int:
+        return sum(1 for decision in self.decisions if decision.source_ids)
+
+    @property
+    def precision(self) -> Optional[float]:
+        if not self.predicted_pairs:
+            return None
+        return self.correct_pairs / self.predicted_pairs
+
+    @property
+    def recall(self) -> Optional[float]:
+        if not self.expected_merges:
+            return None
+        return self.recovered_merges / self.expected_merges
+
+    def false_merges(self) -> list[ReplayDecision]:
+        return [
+            decision
+            for decision in self.decisions
+            if len(decision.correct_source_ids) < len(decision.source_ids)
+        ]
+
+    def missed_merges(self) -> list[ReplayDecision]:
+        return [
+            decision
+            for decision in self.decisions
+            if decision.expected and not decision.correct_source_ids
+        ]
+
+    def timings(self) -> dict:
+        """
+        Per-decision wall time in milliseconds.
+        """
+        samples = sorted(decision.seconds * 1000 for decision in self.decisions)
+        if not samples:
+            return {}
+
+        def percentile(value: float) -> float:
+            return samples[min(len(samples) - 1, int(len(samples) * value))]
+
+        return {
+            "count": len(samples),
+            "mean_ms": sum(samples) / len(samples),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": samples[-1],
+            "queries": sum(
+                decision.stats.get("queries", 0) for decision in self.decisions
+            ),
+            "candidates": sum(
+                decision.stats.get("candidates", 0)
+                for decision in self.decisions
+            ),
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "emails": len(self.decisions),
+            "merged": self.merged,
+            "reasons": dict(self.reasons),
+            "predicted_pairs": self.predicted_pairs,
+            "correct_pairs": self.correct_pairs,
+            "precision": self.precision,
+            "expected_merges": self.expected_merges,
+            "recovered_merges": self.recovered_merges,
+            "recall": self.recall,
+            "timings": self.timings(),
+        }
+
+
+class MergeReplay:
+    """
+    Replay a user's emails through the merge engine without writing.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        overrides: Optional[dict] = None,
+    ):
+        """
+        Args:
+            user_id: Owner of the replayed emails
+            since: Replay emails received at or after this time
+            until: Replay emails received before this time
+            limit: Replay at most this many emails
+            overrides: EmailMergeService class attributes to override,
+                e.g. {"RAPIDFUZZ_RATIO_THRESHOLD": 70.0}
+        """
+        self.user_id = user_id
+        self.since = since
+        self.until = until
+        self.limit = limit
+        self.overrides = overrides or {}
+
+    def _build_service(self) -> ReplayMergeService:
+        service = ReplayMergeService(candidate_cache=MergeCandidateCache())
+        for name, value in self.overrides.items():
+            if not hasattr(EmailMergeService, name):
+                raise ValueError(f"Unknown merge setting: {name}")
+            setattr(service, name, value)
+        return service
+
+    def _queryset(self):
+        queryset = EmailMessage.objects.filter(user_id=self.user_id).exclude(
+            message_id__startswith=MANUAL_MERGE_MESSAGE_PREFIX
+        )
+        if self.since:
+            queryset = queryset.filter(received_at__gte=self.since)
+        if self.until:
+            queryset = queryset.filter(received_at__lt=self.until)
+        queryset = queryset.order_by("received_at", "id")
+        if self.limit:
+            queryset = queryset[: self.limit]
+        return queryset
+
+    def run(self) -> MergeReplayReport:
+        """
+        Replay the selected emails in received order.
+
+        Returns:
+            MergeReplayReport: Decisions, accuracy and timings
+        """
+        with transaction.atomic():
+            try:
+                return self._run()
+            finally:
+                transaction.set_rollback(True)
+
+    def _run(self) -> MergeReplayReport:
+        service = self._build_service()
+        cache = service.candidate_cache
+        # Recorded cluster of every email of the user (see merge_cluster).
+        clusters = {
+            email_id: root_id or email_id
+            for email_id, root_id in EmailMessage.objects.filter(
+                user_id=self.user_id
+            ).values_list("id", "cluster_root_id")
+        }
+        replayed_clusters: set[int] = set()
+        # Candidate text only matters inside the content window, so the
+        # cache is trimmed as the replay moves forward.
+        cached = deque()
+        text_window = timedelta(days=service.CONTENT_WINDOW_DAYS)
+        report = MergeReplayReport()
+
+        for email in self._queryset().iterator(chunk_size=REPLAY_CHUNK_SIZE):
+            while cached and cached[0][0] < email.received_at - text_window:
+                _, email_id = cached.popleft()
+                cache.texts.pop(email_id, None)
+                cache.image_md5s.pop(email_id, None)
+
+            # Replay the email as a fresh arrival.
+            email.merged_into_id = None
+            email.merge_reason = ""
+
+            started = time.perf_counter()
+            decision = service.decide(email)
+            seconds = time.perf_counter() - started
+
+            cluster_id = clusters.get(email.id, email.id)
+            source_ids = [source.id for source in decision.sources]
+            correct_source_ids = [
+                source_id
+                for source_id in source_ids
+                if clusters.get(source_id, source_id) == cluster_id
+            ]
+            expected = cluster_id in replayed_clusters
+            replayed_clusters.add(cluster_id)
+
+            report.decisions.append(
+                ReplayDecision(
+                    email_id=email.id,
+                    subject=email.subject or "",
+                    reason=decision.reason,
+                    source_ids=source_ids,
+                    correct_source_ids=correct_source_ids,
+                    expected=expected,
+                    seconds=seconds,
+                    stats=decision.stats or {},
+                )
+            )
+            if source_ids:
+                report.reasons[decision.reason] += 1
+            report.predicted_pairs += len(source_ids)
+            report.correct_pairs += len(correct_source_ids)
+            if expected:
+                report.expected_merges += 1
+                if correct_source_ids:
+                    report.recovered_merges += 1
+
+            cache.remember(email)
+            cached.append((email.received_at, email.id))
+
+        logger.info(
+            f"[MergeReplay] user_id={self.user_id} {report.as_dict()}"
+        )
+        return report
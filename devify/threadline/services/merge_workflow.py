@@ -1,5 +1,5 @@
 """
-Helpers for triggering the email merge workflow.
+Helpers for triggering the email merge workflow and batch reprocessing.
 """
 
 from __future__ import annotations
@@ -110,3 +110,90 @@ def enqueue_merge_workflows(
             )
 
     return results
+
+
+def enqueue_workflow_batch(
+    messages: list[EmailMessage],
+    *,
+    force: bool = False,
+    language: str | None = None,
+    scene: str | None = None,
+    trigger_source: str = "unknown",
+) -> list[dict]:
+    """
+    Enqueue one batch workflow task for messages that were already merged.
+
+    Unlike enqueue_merge_workflows this skips the merge reconcile step and
+    runs the processing graph directly, sharing per-user context across the
+    batch. Per-item results mirror enqueue_merge_workflows.
+    """
+    from threadline.tasks.email_workflow import process_email_workflow_batch
+
+    queued: list[EmailMessage] = []
+    results: list[dict] = []
+    for message in messages:
+        try:
+            if message.status != EmailStatus.PROCESSING.value:
+                message.set_status(EmailStatus.PROCESSING.value)
+            message.set_processing_progress(0)
+            queued.append(message)
+        except Exception as exc:
+            results.append(
+                {
+                    "requested_email_id": str(message.id),
+                    "requested_uuid": str(message.uuid),
+                    "email_id": str(message.id),
+                    "uuid": str(message.uuid),
+                    "status": "failed",
+                    "error": str(exc),
+                }
+            )
+
+    if not queued:
+        return results
+
+    try:
+        process_email_workflow_batch.delay(
+            [str(message.id) for message in queued],
+            force=force,
+            language=language,
+            scene=scene,
+            trigger_source=trigger_source,
+        )
+        status, error = "success", None
+    except Exception as exc:
+        logger.error(
+            "Failed to trigger batch workflow for %s email(s) "
+            "trigger_source=%s: %s",
+            len(queued),
+            trigger_source,
+            exc,
+        )
+        status, error = "failed", str(exc)
+        for message in queued:
+            try:
+                message.set_status(
+                    EmailStatus.FAILED.value,
+                    error_message=error,
+                )
+            except Exception as status_error:
+                logger.error(
+                    "Failed to mark email %s as FAILED after dispatch "
+                    "error: %s",
+                    message.uuid,
+                    status_error,
+                )
+
+    for message in queued:
+        item = {
+            "requested_email_id": str(message.id),
+            "requested_uuid": str(message.uuid),
+            "email_id": str(message.id),
+            "uuid": str(message.uuid),
+            "status": status,
+        }
+        if error:
+            item["error"] = error
+        results.append(item)
+
+    return results
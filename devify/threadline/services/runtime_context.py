@@ -0,0 +1,181 @@
+"""
+Per-user runtime context cache for the Threadline workflow.
+
+WorkflowPrepareNode needs the same per-user context on every run: prompt
+and issue config, subscription attachment limit, timezone and the admin
+runtime bindings. The context is cached in the Django cache under a key
+that carries a per-user and a global version; signals bump the versions
+when Settings, Profile, Subscription, Plan, ThreadlineWorkflowConfig or
+LLMConfig rows change, so stale entries are never read again and expire
+by TTL. The key also carries the PromptConfigManager version, so edited
+prompt YAML files are picked up without waiting for the TTL.
+
+After a cache error the cache is bypassed for CACHE_RETRY_SEC so an
+unreachable cache does not slow down every run and every settings save;
+contexts cached before the outage are bounded by their TTL.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_CONTEXT_CACHE_PREFIX = "threadline:runtime_context"
+GLOBAL_VERSION_KEY = f"{RUNTIME_CONTEXT_CACHE_PREFIX}:version:global"
+
+CACHE_RETRY_SEC = 60
+_cache_retry_at = 0.0
+
+
+def _runtime_context_config() -> Dict[str, Any]:
+    return dict(getattr(settings, "THREADLINE_RUNTIME_CONTEXT", None) or {})
+
+
+def is_runtime_context_cache_enabled() -> bool:
+    """
+    Whether per-user runtime contexts are cached.
+    """
+    return bool(_runtime_context_config().get("enabled"))
+
+
+def _cache_available() -> bool:
+    return (
+        is_runtime_context_cache_enabled()
+        and time.monotonic() >= _cache_retry_at
+    )
+
+
+def _cache_failed(exc: Exception) -> None:
+    global _cache_retry_at
+    logger.warning(f"Runtime context cache unavailable: {exc}")
+    _cache_retry_at = time.monotonic() + CACHE_RETRY_SEC
+
+
+def _user_version_key(user_id) -> str:
+    return f"{RUNTIME_CONTEXT_CACHE_PREFIX}:version:user:{user_id}"
+
+
+def _new_version() -> str:
+    # Random tokens (not counters) so an evicted version key never
+    # falls back to a value an old context was cached under.
+    return uuid.uuid4().hex[:12]
+
+
+def _get_versions(user_id) -> tuple[str, str]:
+    user_key = _user_version_key(user_id)
+    found = cache.get_many([user_key, GLOBAL_VERSION_KEY])
+    user_version = found.get(user_key) or cache.get_or_set(
+        user_key, _new_version(), None
+    )
+    global_version = found.get(GLOBAL_VERSION_KEY) or cache.get_or_set(
+        GLOBAL_VERSION_KEY, _new_version(), None
+    )
+    return user_version, global_version
+
+
+def _prompt_version() -> str:
+    # Deferred: the manager loads the prompt YAML files on first use.
+    from threadline.utils.prompt_config_manager import (
+        get_prompt_config_manager,
+    )
+
+    try:
+        return get_prompt_config_manager().version
+    except Exception:
+        # The loader reports the missing prompt config; its context is
+        # not cached.
+        return "-"
+
+
+def _context_key(
+    user_id,
+    user_version: str,
+    global_version: str,
+    language: Optional[str],
+    scene: Optional[str],
+) -> str:
+    return (
+        f"{RUNTIME_CONTEXT_CACHE_PREFIX}:{user_id}:{user_version}:"
+        f"{global_version}:{_prompt_version()}:"
+        f"{language or '-'}:{scene or '-'}"
+    )
+
+
+def get_user_runtime_context(
+    user_id,
+    loader: Callable[[], Dict[str, Any]],
+    language: Optional[str] = None,
+    scene: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached runtime context of a user, loading it on a miss.
+
+    Contexts whose prompt_config failed to load are returned but not
+    cached. Cache errors fall back to ``loader``.
+
+    Args:
+        user_id: Owner of the email being processed
+        loader: Builds the context (WorkflowPrepareNode.load_shared_context)
+        language: Retry language override, part of the cache key
+        scene: Retry scene override, part of the cache key
+
+    Returns:
+        dict | None: The context, or None when caching is disabled
+    """
+    if not is_runtime_context_cache_enabled():
+        return None
+    if not _cache_available():
+        return loader()
+
+    try:
+        key = _context_key(user_id, *_get_versions(user_id), language, scene)
+        context = cache.get(key)
+    except Exception as exc:
+        _cache_failed(exc)
+        return loader()
+
+    if context is not None:
+        logger.debug(f"Using cached runtime context for user {user_id}")
+        return context
+
+    context = loader()
+    if context.get("prompt_config") is None:
+        return context
+    try:
+        cache.set(
+            key, context, int(_runtime_context_config().get("ttl_sec", 300))
+        )
+    except Exception as exc:
+        _cache_failed(exc)
+    return context
+
+
+def invalidate_user_runtime_context(user_id) -> None:
+    """
+    Drop the cached runtime contexts of one user.
+    """
+    if not _cache_available():
+        return
+    try:
+        cache.set(_user_version_key(user_id), _new_version(), None)
+    except Exception as exc:
+        _cache_failed(exc)
+
+
+def invalidate_all_runtime_contexts() -> None:
+    """
+    Drop the cached runtime contexts of every user.
+    """
+    if not _cache_available():
+        return
+    try:
+        cache.set(GLOBAL_VERSION_KEY, _new_version(), None)
+    except Exception as exc:
+        _cache_failed(exc)
@@ -0,0 +1,181 @@
+"""
+Full-text search over emails and attachments.
+
+SearchDocument holds the searchable columns of each email and attachment
+as one text document. threadline.signals writes the document of a new
+object with the insert, rewrites it after a transaction that updated a
+searchable column commits (so content updates do not pay for the index)
+and removes it with the object. The
+database's full-text index on it (see threadline.utils.search_index) turns
+a keyword search into an index lookup whose cost follows the number of
+matches rather than the size of the mailbox.
+
+Every keyword must match (AND), and a keyword matches when any searchable
+column contains it as a word prefix; keywords the index cannot fully answer
+are also matched as substrings of the document.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+from threadline.models import EmailAttachment, EmailMessage, SearchDocument
+from threadline.utils.search_index import (
+    ATTACHMENT_SEARCH_FIELDS,
+    EMAIL_SEARCH_FIELDS,
+    build_search_document,
+    get_search_backend,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DOCUMENT_KINDS = {
+    EmailMessage: SearchDocument.Kind.EMAIL,
+    EmailAttachment: SearchDocument.Kind.ATTACHMENT,
+}
+# Columns whose changes rewrite the search document, per model.
+SEARCH_INPUT_FIELDS = {
+    EmailMessage: frozenset(EMAIL_SEARCH_FIELDS) | {"user"},
+    EmailAttachment: frozenset(ATTACHMENT_SEARCH_FIELDS) | {"user"},
+}
+_SEARCH_FIELDS = {
+    EmailMessage: EMAIL_SEARCH_FIELDS,
+    EmailAttachment: ATTACHMENT_SEARCH_FIELDS,
+}
+
+
+def create_search_document(obj) -> None:
+    """
+    Write the search document of a newly inserted email or attachment.
+    """
+    model = type(obj)
+    SearchDocument.objects.create(
+        kind=SEARCH_DOCUMENT_KINDS[model],
+        object_id=obj.pk,
+        user_id=obj.user_id,
+        document=build_search_document(obj, _SEARCH_FIELDS[model]),
+    )
+
+
+def sync_search_document(model, pk) -> None:
+    """
+    Rewrite the search document of an email or attachment from the database.
+    """
+    kind = SEARCH_DOCUMENT_KINDS[model]
+    fields = _SEARCH_FIELDS[model]
+    obj = model.objects.filter(pk=pk).only("id", "user_id", *fields).first()
+    documents = SearchDocument.objects.filter(kind=kind, object_id=pk)
+    if obj is None:
+        documents.delete()
+        return
+
+    values = {
+        "user_id": obj.user_id,
+        "document": build_search_document(obj, fields),
+    }
+    if documents.update(**values):
+        return
+    try:
+        with transaction.atomic():
+            SearchDocument.objects.create(kind=kind, object_id=pk, **values)
+    except IntegrityError:
+        # Created by a concurrent commit of the same object.
+        documents.update(**values)
+
+
+def schedule_search_document_sync(obj) -> None:
+    """
+    Rewrite the search document once the saving transaction commits.
+    """
+    model, pk = type(obj), obj.pk
+    transaction.on_commit(lambda: sync_search_document(model, pk))
+
+
+def delete_search_document(obj) -> None:
+    """
+    Remove the search document of a deleted email or attachment.
+    """
+    SearchDocument.objects.filter(
+        kind=SEARCH_DOCUMENT_KINDS[type(obj)], object_id=obj.pk
+    ).delete()
+
+
+def search_documents(
+    kind: str, keywords: Iterable[str], user_id: Optional[int] = None
+) -> QuerySet:
+    """
+    Search documents of one kind matching every keyword.
+
+    Args:
+        kind: SearchDocument.Kind value
+        keywords: Keywords that must all match
+        user_id: Only search this user's documents
+    """
+    backend = get_search_backend()
+    queryset = SearchDocument.objects.filter(kind=kind)
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+
+    tokens: list[str] = []
+    for keyword in keywords:
+        keyword_tokens = backend.keyword_tokens(keyword)
+        if keyword_tokens is None:
+            queryset = queryset.filter(document__icontains=keyword)
+            continue
+        tokens.extend(keyword_tokens)
+        if keyword_tokens != [keyword.lower()]:
+            # Tokens narrow the candidates through the index; the
+            # substring check keeps "alice@example.com" from matching
+            # "alice" and "example.com" in different columns and covers
+            # the tokens the index dropped.
+            queryset = queryset.filter(document__icontains=keyword)
+
+    if tokens:
+        sql, params = backend.match_sql(tokens)
+        queryset = queryset.filter(id__in=RawSQL(sql, params))
+    return queryset
+
+
+def filter_by_search(
+    queryset: QuerySet,
+    keywords: Iterable[str],
+    user_id: Optional[int] = None,
+) -> QuerySet:
+    """
+    Restrict an EmailMessage or EmailAttachment queryset to search matches.
+
+    Args:
+        queryset: Queryset to filter
+        keywords: Keywords that must all match; no filtering when empty
+        user_id: Owner of the objects, to search only their documents
+    """
+    keywords = [keyword for keyword in keywords if keyword]
+    if not keywords:
+        return queryset
+    kind = SEARCH_DOCUMENT_KINDS[queryset.model]
+    matches = search_documents(kind, keywords, user_id=user_id)
+    return queryset.filter(pk__in=matches.values("object_id"))
+
+
+def install_search_index(using: str = "default", **kwargs) -> None:
+    """
+    Create the full-text index of the configured backend.
+
+    Connected to post_migrate so databases built without migrations
+    (tests, run_syncdb) get the index too; installing is idempotent.
+    """
+    connection = connections[using]
+    backend = get_search_backend(connection)
+    if not backend.uses_index:
+        return
+    if SearchDocument._meta.db_table not in (
+        connection.introspection.table_names()
+    ):
+        return
+    backend.install(connection)
+    logger.debug(f"Installed {backend.name} search index on {using}")
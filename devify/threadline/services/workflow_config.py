@@ -146,6 +146,18 @@ def resolve_threadline_llm_config():
         return None
 
 
+def resolve_threadline_task_config() -> Dict[str, Any]:
+    """
+    Resolve the Threadline task_config (token budgets, node switches).
+    """
+    try:
+        config = get_threadline_workflow_config()
+    except RuntimeError as exc:
+        logger.debug("Threadline workflow config not available: %s", exc)
+        return {}
+    return dict(config.task_config or {})
+
+
 def resolve_threadline_notification_channel():
     """
     Resolve the configured NotificationChannel, if any.
@@ -0,0 +1,167 @@
+"""
+Django signals for the Threadline app.
+
+Keeps the per-user runtime context cache (see
+threadline.services.runtime_context) in sync with the rows it is built
+from, the EmailThreadRef index in sync with the email headers, the
+materialized merge clusters in sync with merged_into, the search
+documents in sync with the searchable columns, and invalidates memoized
+merge decisions when a user's emails change.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Profile
+from agentcore_metering.adapters.django.models import LLMConfig
+from billing.models import Plan, Subscription
+from threadline.models import (
+    EmailAttachment,
+    EmailMessage,
+    Settings,
+    ThreadlineWorkflowConfig,
+)
+from threadline.services.email_merge import (
+    THREAD_REF_FIELDS,
+    sync_email_thread_refs,
+)
+from threadline.services.merge_cluster import (
+    merge_cluster_root_id,
+    refresh_merge_clusters,
+)
+from threadline.services.merge_decision_cache import (
+    DECISION_ATTACHMENT_FIELDS,
+    DECISION_INPUT_FIELDS,
+    schedule_window_version_bump,
+)
+from threadline.services.runtime_context import (
+    invalidate_all_runtime_contexts,
+    invalidate_user_runtime_context,
+)
+from threadline.services.search import (
+    SEARCH_INPUT_FIELDS,
+    create_search_document,
+    delete_search_document,
+    schedule_search_document_sync,
+)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Settings)
+@receiver(post_delete, sender=Settings)
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_user_context(sender, instance, **kwargs):
+    """
+    Invalidate the runtime context of the user a row belongs to.
+    """
+    user_id = instance.pk if sender is User else instance.user_id
+    invalidate_user_runtime_context(user_id)
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_save, sender=ThreadlineWorkflowConfig)
+@receiver(post_delete, sender=ThreadlineWorkflowConfig)
+@receiver(post_save, sender=LLMConfig)
+@receiver(post_delete, sender=LLMConfig)
+def invalidate_global_context(sender, instance, **kwargs):
+    """
+    Invalidate every runtime context after a shared row changed.
+    """
+    invalidate_all_runtime_contexts()
+
+
+@receiver(post_save, sender=EmailMessage)
+def sync_thread_refs(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Re-index the thread headers of an email when they may have changed.
+    """
+    if update_fields is not None and THREAD_REF_FIELDS.isdisjoint(
+        update_fields
+    ):
+        return
+    sync_email_thread_refs(instance, created=created)
+
+
+@receiver(post_save, sender=EmailMessage)
+def sync_merge_cluster(sender, instance, update_fields=None, **kwargs):
+    """
+    Re-materialize the merge cluster after merged_into may have changed.
+
+    Plain cluster heads (no merged_into, no stored cluster) are skipped, so
+    ordinary saves cost no extra queries.
+    """
+    if update_fields is not None and "merged_into" not in update_fields:
+        return
+    if instance.merged_into_id is None and instance.cluster_root_id is None:
+        return
+    changed = refresh_merge_clusters(email_ids=[instance.id])
+    if instance.id in changed:
+        instance.cluster_root_id, instance.cluster_depth = changed[instance.id]
+
+
+@receiver(post_delete, sender=EmailMessage)
+def refresh_merge_cluster(sender, instance, **kwargs):
+    """
+    Re-root the merge cluster of a deleted email.
+
+    Deleting a canonical record sets merged_into of its children to NULL,
+    which splits the materialized cluster.
+    """
+    refresh_merge_clusters(root_ids=[merge_cluster_root_id(instance)])
+
+
+@receiver(post_save, sender=EmailMessage)
+@receiver(post_save, sender=EmailAttachment)
+def invalidate_merge_decisions(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """
+    Bump the user's merge window version when merge inputs change.
+
+    The bump waits for the commit (see schedule_window_version_bump).
+    """
+    input_fields = (
+        DECISION_INPUT_FIELDS
+        if sender is EmailMessage
+        else DECISION_ATTACHMENT_FIELDS
+    )
+    if (
+        not created
+        and update_fields is not None
+        and input_fields.isdisjoint(update_fields)
+    ):
+        return
+    schedule_window_version_bump(instance.user_id)
+
+
+@receiver(post_delete, sender=EmailMessage)
+@receiver(post_delete, sender=EmailAttachment)
+def invalidate_merge_decisions_on_delete(sender, instance, **kwargs):
+    schedule_window_version_bump(instance.user_id)
+
+
+@receiver(post_save, sender=EmailMessage)
+@receiver(post_save, sender=EmailAttachment)
+def sync_search_documents(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """
+    Index new rows right away and updated ones once the save commits.
+    """
+    if created:
+        create_search_document(instance)
+        return
+    if update_fields is not None and SEARCH_INPUT_FIELDS[sender].isdisjoint(
+        update_fields
+    ):
+        return
+    schedule_search_document_sync(instance)
+
+
+@receiver(post_delete, sender=EmailMessage)
+@receiver(post_delete, sender=EmailAttachment)
+def delete_search_documents(sender, instance, **kwargs):
+    delete_search_document(instance)
@@ -139,6 +139,26 @@ def get_next_states(current_status: str, state_machine: Dict) -> List[str]:
     return [state.value for state in state_machine[current_enum]["next"]]
 
 
+def get_previous_states(
+    target_status: str, state_machine: Dict
+) -> List[str]:
+    """
+    Get all states that may transition to the target status.
+
+    Args:
+        target_status: Target status string
+        state_machine: State machine dictionary
+
+    Returns:
+        List[str]: List of status values allowed before the target
+    """
+    return [
+        status.value
+        for status, config in state_machine.items()
+        if any(state.value == target_status for state in config["next"])
+    ]
+
+
 def get_status_description(status: str, state_machine: Dict) -> str:
     """
     Get description for status.
@@ -12,8 +12,13 @@ from importlib import import_module
 
 __all__ = [
     "process_email_workflow",
+    "process_email_workflow_batch",
     "retry_failed_email_workflow",
+    "resume_email_workflow",
+    "submit_llm_batch_requests",
+    "poll_llm_batch_jobs",
     "process_email_merge",
+    "process_user_merge_batch",
     "schedule_email_fetch",
     "scan_user_emails",
     "send_threadline_failure_notification",
@@ -25,14 +30,34 @@ _EXPORTS = {
         "threadline.tasks.email_workflow",
         "process_email_workflow",
     ),
+    "process_email_workflow_batch": (
+        "threadline.tasks.email_workflow",
+        "process_email_workflow_batch",
+    ),
     "retry_failed_email_workflow": (
         "threadline.tasks.email_workflow",
         "retry_failed_email_workflow",
     ),
+    "resume_email_workflow": (
+        "threadline.tasks.email_workflow",
+        "resume_email_workflow",
+    ),
+    "submit_llm_batch_requests": (
+        "threadline.tasks.llm_batch",
+        "submit_llm_batch_requests",
+    ),
+    "poll_llm_batch_jobs": (
+        "threadline.tasks.llm_batch",
+        "poll_llm_batch_jobs",
+    ),
     "process_email_merge": (
         "threadline.tasks.email_merge",
         "process_email_merge",
     ),
+    "process_user_merge_batch": (
+        "threadline.tasks.email_merge",
+        "process_user_merge_batch",
+    ),
     "schedule_email_fetch": (
         "threadline.tasks.scheduler",
         "schedule_email_fetch",
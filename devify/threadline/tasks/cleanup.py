@@ -1,8 +1,8 @@
 """
 Email File Cleanup Tasks
 
-Provides cleanup functionality for Haraka email files and EmailTask
-records.
+Provides cleanup functionality for Haraka email files, EmailTask
+records, share links and workflow checkpoints.
 
 This module implements automated cleanup of email files from various
 directories and EmailTask database records to prevent disk space issues
@@ -13,13 +13,21 @@ File: devify/threadline/tasks/cleanup.py
 
 import logging
 import os
+import re
 from datetime import timedelta
 from typing import Dict
 
 from django.conf import settings
 from django.utils import timezone
 
-from threadline.models import EmailTask, ThreadlineShareLink
+from threadline.models import (
+    EmailMessage,
+    EmailTask,
+    TaskStep,
+    ThreadlineShareLink,
+)
+from threadline.services.llm_batch import cleanup_finished_batches
+from threadline.state_machine import EmailStatus
 from threadline.utils.task_tracer import TaskTracer, get_current_task_tracer
 
 logger = logging.getLogger(__name__)
@@ -435,12 +443,18 @@ class EmailTaskCleanupManager:
 
     def cleanup_email_tasks(self) -> Dict:
         """
-        Clean up old EmailTask records.
+        Clean up old EmailTask records, TaskStep rows and the batch rows
+        of resumed deferred LLM calls.
 
         Returns:
             Dict containing cleanup statistics
         """
-        stats = {"tasks_cleaned": 0, "errors": 0}
+        stats = {
+            "tasks_cleaned": 0,
+            "steps_cleaned": 0,
+            "batch_requests_cleaned": 0,
+            "errors": 0,
+        }
 
         # Create task record
         self.tracer.create_task(
@@ -504,10 +518,17 @@ class EmailTaskCleanupManager:
                     f"{context} Cleaned up {deleted_count} EmailTask records"
                 )
 
+            stats["steps_cleaned"] = self._cleanup_task_steps(cutoff_date)
+            stats["batch_requests_cleaned"] = cleanup_finished_batches(
+                cutoff_date
+            )
+
             # Complete task record
             details = {
                 "cleanup_type": "TASK_CLEANUP",
                 "tasks_cleaned": stats["tasks_cleaned"],
+                "steps_cleaned": stats["steps_cleaned"],
+                "batch_requests_cleaned": stats["batch_requests_cleaned"],
                 "errors": stats["errors"],
                 "completed_at": timezone.now().isoformat(),
             }
@@ -536,6 +557,35 @@ class EmailTaskCleanupManager:
             self.tracer.fail_task(details, str(e))
             return stats
 
+    def _cleanup_task_steps(self, cutoff_date, batch_size: int = 5000) -> int:
+        """
+        Delete TaskStep rows older than the task retention window.
+
+        Args:
+            cutoff_date: Steps recorded before this are removed
+            batch_size: Rows deleted per statement
+
+        Returns:
+            int: Number of deleted steps
+        """
+        deleted_total = 0
+        while True:
+            batch_ids = list(
+                TaskStep.objects.filter(ts__lt=cutoff_date).values_list(
+                    "id", flat=True
+                )[:batch_size]
+            )
+            if not batch_ids:
+                break
+            deleted, _ = TaskStep.objects.filter(id__in=batch_ids).delete()
+            deleted_total += deleted
+        if deleted_total:
+            logger.info(
+                f"{self.tracer.context_summary()} Cleaned up "
+                f"{deleted_total} TaskStep records"
+            )
+        return deleted_total
+
 
 class ShareLinkCleanupManager:
     """
@@ -665,3 +715,108 @@ class ShareLinkCleanupManager:
             self.tracer.fail_task(task_details, str(exc))
             logger.error(f"{context} Share link cleanup failed: {exc}")
             return stats
+
+
+class CheckpointCleanupManager:
+    """
+    Cleanup manager for LangGraph workflow checkpoints.
+
+    Forced runs use a fresh thread_id per run, so their checkpoints were
+    only dropped by the Redis TTL. This purges the threads of workflows
+    whose email completed successfully (or no longer exists); failed and
+    in-flight runs keep their checkpoints so they can be resumed.
+    """
+
+    THREAD_ID_PATTERN = re.compile(r"^email_workflow_(\d+)(?:_force_\d+)?$")
+
+    def __init__(self, checkpoint_manager=None):
+        """Initialize checkpoint cleanup configuration."""
+        config = getattr(settings, "THREADLINE_CHECKPOINT", {}) or {}
+        self.scan_page_size = config.get("cleanup_scan_page_size", 1000)
+        self.checkpoint_manager = checkpoint_manager
+        self.tracer = get_current_task_tracer() or TaskTracer(
+            "CHECKPOINT_CLEANUP"
+        )
+
+    def _completed_thread_ids(self, thread_ids) -> list:
+        email_ids = {}
+        for thread_id in thread_ids:
+            match = self.THREAD_ID_PATTERN.match(thread_id)
+            if match:
+                email_ids[thread_id] = int(match.group(1))
+
+        statuses = dict(
+            EmailMessage.objects.filter(
+                id__in=set(email_ids.values())
+            ).values_list("id", "status")
+        )
+        return [
+            thread_id
+            for thread_id, email_id in email_ids.items()
+            if statuses.get(email_id, EmailStatus.SUCCESS.value)
+            == EmailStatus.SUCCESS.value
+        ]
+
+    def cleanup_completed_checkpoints(self) -> Dict:
+        """
+        Clear checkpoints of completed email workflows.
+
+        Returns:
+            Dict containing cleanup statistics
+        """
+        # Deferred: the checkpoint manager pulls langgraph-redis lazily.
+        from threadline.agents.checkpoint_manager import (
+            create_thread_config,
+            get_checkpoint_manager,
+        )
+
+        stats = {"threads_scanned": 0, "threads_cleared": 0, "errors": 0}
+        manager = self.checkpoint_manager or get_checkpoint_manager()
+        task_details = {
+            "cleanup_type": "CHECKPOINT_CLEANUP",
+            "scan_page_size": self.scan_page_size,
+        }
+        self.tracer.create_task(task_details.copy())
+        context = self.tracer.context_summary(
+            {"cleanup_type": "CHECKPOINT_CLEANUP"}
+        )
+
+        try:
+            thread_ids = manager.list_thread_ids(
+                page_size=self.scan_page_size
+            )
+            stats["threads_scanned"] = len(thread_ids)
+
+            for thread_id in self._completed_thread_ids(thread_ids):
+                if manager.clear_checkpoint(create_thread_config(thread_id)):
+                    stats["threads_cleared"] += 1
+                else:
+                    stats["errors"] += 1
+
+            task_details.update(
+                {**stats, "completed_at": timezone.now().isoformat()}
+            )
+            self.tracer.append_task(
+                "CLEANUP_COMPLETE",
+                "Checkpoint cleanup finished",
+                task_details.copy(),
+            )
+            self.tracer.complete_task(task_details)
+            logger.info(
+                f"{context} Checkpoint cleanup completed. Cleared "
+                f"{stats['threads_cleared']} of "
+                f"{stats['threads_scanned']} threads."
+            )
+            return stats
+
+        except Exception as exc:
+            stats["errors"] += 1
+            task_details.update({**stats, "error": str(exc)})
+            self.tracer.append_task(
+                "CLEANUP_ERROR",
+                f"Checkpoint cleanup failed: {exc}",
+                task_details.copy(),
+            )
+            self.tracer.fail_task(task_details, str(exc))
+            logger.error(f"{context} Checkpoint cleanup failed: {exc}")
+            return stats
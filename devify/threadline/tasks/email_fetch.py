@@ -22,6 +22,10 @@ from threadline.utils.email import (
     EmailSaveService,
 )
 from threadline.utils.task_tracer import TaskTracer
+from threadline.services.merge_batch import (
+    is_merge_batch_enabled,
+    queue_email_for_merge_batch,
+)
 from threadline.tasks.email_merge import process_email_merge
 
 logger = logging.getLogger(__name__)
@@ -37,6 +41,9 @@ def _queue_merge_for_saved_email(email_msg: EmailMessage) -> None:
         )
         return
 
+    if is_merge_batch_enabled() and queue_email_for_merge_batch(email_msg):
+        return
+
     process_email_merge.delay(str(email_msg.id))
 
 
@@ -16,6 +16,13 @@ from django.conf import settings
 from agentcore_task.adapters.django import prevent_duplicate_task
 from threadline.models import EmailMessage
 from threadline.services.email_merge import EmailMergeService
+from threadline.services.merge_batch import (
+    acquire_user_merge_batch,
+    merge_batch_window_sec,
+    reconcile_user_merge_batch,
+    release_user_merge_batch,
+    schedule_user_merge_batch,
+)
 from threadline.tasks.email_workflow import process_email_workflow
 from threadline.utils.task_tracer import TaskTracer
 from threadline.state_machine import (
@@ -217,3 +224,76 @@ def process_email_merge(
                 str(exc),
             )
         raise
+
+
+@shared_task
+def process_user_merge_batch(user_id: str) -> dict:
+    """
+    Reconcile a user's newly fetched emails as one batch and enqueue their
+    workflows.
+
+    Scheduled by schedule_user_merge_batch() when
+    THREADLINE_EMAIL_MERGE["micro_batch"] is enabled. Emails the batch
+    could not reconcile fall back to process_email_merge.
+    """
+    if not acquire_user_merge_batch(user_id):
+        logger.info(
+            f"[Merge] Batch for user {user_id} still running, rescheduling"
+        )
+        process_user_merge_batch.apply_async(
+            args=[str(user_id)], countdown=merge_batch_window_sec()
+        )
+        return {"user_id": str(user_id), "status": "rescheduled"}
+
+    tracer = TaskTracer("EMAIL_MERGE")
+    task_id = getattr(process_user_merge_batch.request, "id", "") or ""
+    tracer.set_task_id(task_id)
+    tracer.create_task({"user_id": str(user_id), "status": "starting"})
+
+    try:
+        result = reconcile_user_merge_batch(user_id)
+        batch_result = {
+            "user_id": str(user_id),
+            "email_count": len(result["email_ids"]),
+            "merged_count": result["merged_count"],
+            "skipped_count": result["skipped_count"],
+            "failed_count": len(result["failed_ids"]),
+            "has_more": result["has_more"],
+        }
+        tracer.append_task(
+            "MERGE_RECONCILE",
+            "Merge batch reconciliation completed",
+            batch_result,
+        )
+
+        for email_id in result["email_ids"]:
+            try:
+                process_email_workflow.delay(
+                    str(email_id), trigger_source="merge_batch"
+                )
+            except Exception as exc:
+                logger.error(
+                    f"[Merge] Failed to enqueue workflow for email "
+                    f"{email_id}: {exc}"
+                )
+                _mark_email_failed(
+                    EmailMessage.objects.filter(id=email_id).first(), str(exc)
+                )
+
+        for email_id in result["failed_ids"]:
+            process_email_merge.delay(
+                str(email_id), trigger_source="merge_batch_fallback"
+            )
+
+        if result["has_more"]:
+            schedule_user_merge_batch(user_id, countdown=0)
+
+        tracer.complete_task({**batch_result, "status": "completed"})
+        return batch_result
+
+    except Exception as exc:
+        logger.error(f"[Merge] Batch failed for user {user_id}: {exc}")
+        tracer.fail_task({"user_id": str(user_id), "status": "failed"}, str(exc))
+        raise
+    finally:
+        release_user_merge_batch(user_id)
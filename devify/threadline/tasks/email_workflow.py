@@ -15,18 +15,182 @@ File: devify/threadline/tasks/email_workflow.py
 """
 
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 from celery import shared_task
 from django.conf import settings
+from django.db import connection
 
-from agentcore_task.adapters.django import prevent_duplicate_task
+from agentcore_task.adapters.django import (
+    acquire_task_lock,
+    prevent_duplicate_task,
+    release_task_lock,
+)
 from threadline.models import EmailMessage
-from threadline.agents.workflow import execute_email_processing_workflow
+from threadline.agents.workflow import (
+    execute_email_processing_workflow,
+    resume_email_processing_workflow,
+)
 from threadline.utils.task_tracer import TaskTracer
 
 logger = logging.getLogger(__name__)
 
 
+def _finish_traced_workflow(
+    tracer: TaskTracer,
+    email: EmailMessage,
+    result: dict,
+    task_details: dict,
+    elapsed: float,
+) -> None:
+    """
+    Close the EMAIL_WORKFLOW task record of a workflow run.
+
+    A run waiting on provider batch results is completed with status
+    ``deferred``; the resume gets its own task record.
+    """
+    email_id = str(email.id)
+    if result.get("deferred"):
+        logger.info(
+            f"[Workflow] Deferred email {email_id} to provider batch, "
+            f"elapsed_sec={elapsed:.2f}"
+        )
+        tracer.complete_task(
+            {
+                **task_details,
+                "status": "deferred",
+                "workflow_success": None,
+            }
+        )
+    elif result["success"]:
+        success_context = tracer.context_summary(
+            {
+                "email_id": email_id,
+                "user_id": str(email.user_id),
+            }
+        )
+        logger.info(
+            f"{success_context} [Workflow] Completed successfully for "
+            f"email {email_id}, user {email.user_id}, "
+            f"elapsed_sec={elapsed:.2f}"
+        )
+        tracer.complete_task(
+            {
+                **task_details,
+                "status": "completed",
+                "workflow_success": True,
+            }
+        )
+    else:
+        error_context = tracer.context_summary(
+            {
+                "email_id": email_id,
+                "user_id": str(email.user_id),
+            }
+        )
+        logger.error(
+            f"{error_context} [Workflow] Failed for email {email_id}, "
+            f"user {email.user_id}, elapsed_sec={elapsed:.2f}: "
+            f"{result.get('error')}"
+        )
+        tracer.fail_task(
+            {
+                **task_details,
+                "status": "failed",
+                "workflow_success": False,
+                "workflow_error": result.get("error"),
+            },
+            result.get("error") or "Workflow failed",
+        )
+
+
+def run_traced_email_workflow(
+    email: EmailMessage,
+    *,
+    force: bool = False,
+    language: str | None = None,
+    scene: str | None = None,
+    trigger_source: str | None = None,
+    task_id: str = "",
+    shared_context: dict | None = None,
+) -> dict:
+    """
+    Run the workflow for one email under its own EMAIL_WORKFLOW task record.
+
+    Shared by the single-email task and the batch task so both produce the
+    same task history.
+
+    Args:
+        email: EmailMessage to process (user preloaded)
+        force: Whether to force reprocessing
+        language: Optional language override
+        scene: Optional scene override
+        trigger_source: Source that triggered the run
+        task_id: Celery task id recorded on the task execution
+        shared_context: Optional per-user context preloaded by a batch run
+
+    Returns:
+        dict: Result of execute_email_processing_workflow
+    """
+    started_at = time.monotonic()
+    email_id = str(email.id)
+
+    tracer = TaskTracer("EMAIL_WORKFLOW")
+    tracer.set_task_id(task_id)
+    workflow_context = tracer.context_summary(
+        {
+            "email_id": str(email_id),
+            "user_id": str(email.user_id),
+            "force": force,
+            "language": language,
+            "scene": scene,
+            "trigger_source": trigger_source,
+        }
+    )
+    logger.info(
+        f"{workflow_context} [Workflow] Starting for email {email_id}, "
+        f"user {email.user_id}, status: {email.status}, force: {force}, "
+        f"language: {language}, scene: {scene}"
+    )
+
+    tracer.create_task(
+        {
+            "email_id": str(email_id),
+            "force": force,
+            "language": language,
+            "scene": scene,
+            "trigger_source": trigger_source,
+            "status": "starting",
+        }
+    )
+
+    result = execute_email_processing_workflow(
+        email=email,
+        force=force,
+        language=language,
+        scene=scene,
+        trigger_source=trigger_source,
+        tracer=tracer,
+        shared_context=shared_context,
+    )
+    _finish_traced_workflow(
+        tracer,
+        email,
+        result,
+        {
+            "email_id": str(email_id),
+            "force": force,
+            "language": language,
+            "scene": scene,
+            "trigger_source": trigger_source,
+        },
+        time.monotonic() - started_at,
+    )
+    return result
+
+
 @shared_task
 @prevent_duplicate_task(
     "process_email_workflow",
@@ -83,100 +247,18 @@ def process_email_workflow(
         Exception: For workflow execution errors
     """
     try:
-        started_at = time.monotonic()
         email = EmailMessage.objects.select_related("user", "merged_into").get(
             id=email_id
         )
-
-        tracer = TaskTracer("EMAIL_WORKFLOW")
         task_id = getattr(process_email_workflow.request, "id", "") or ""
-        tracer.set_task_id(task_id)
-        workflow_context = tracer.context_summary(
-            {
-                "email_id": str(email_id),
-                "user_id": str(email.user_id),
-                "force": force,
-                "language": language,
-                "scene": scene,
-                "trigger_source": trigger_source,
-            }
-        )
-        logger.info(
-            f"{workflow_context} [Workflow] Starting for email {email_id}, "
-            f"user {email.user_id}, status: {email.status}, force: {force}, "
-            f"language: {language}, scene: {scene}"
-        )
-
-        tracer.create_task(
-            {
-                "email_id": str(email_id),
-                "force": force,
-                "language": language,
-                "scene": scene,
-                "trigger_source": trigger_source,
-                "status": "starting",
-            }
-        )
-
-        result = execute_email_processing_workflow(
-            email=email,
+        run_traced_email_workflow(
+            email,
             force=force,
             language=language,
             scene=scene,
             trigger_source=trigger_source,
-            tracer=tracer,
+            task_id=task_id,
         )
-        elapsed = time.monotonic() - started_at
-
-        if result["success"]:
-            success_context = tracer.context_summary(
-                {
-                    "email_id": str(email_id),
-                    "user_id": str(email.user_id),
-                }
-            )
-            logger.info(
-                f"{success_context} [Workflow] Completed successfully for "
-                f"email {email_id}, user {email.user_id}, "
-                f"elapsed_sec={elapsed:.2f}"
-            )
-            tracer.complete_task(
-                {
-                    "email_id": str(email_id),
-                    "force": force,
-                    "language": language,
-                    "scene": scene,
-                    "trigger_source": trigger_source,
-                    "status": "completed",
-                    "workflow_success": True,
-                }
-            )
-        else:
-            error_context = tracer.context_summary(
-                {
-                    "email_id": str(email_id),
-                    "user_id": str(email.user_id),
-                }
-            )
-            logger.error(
-                f"{error_context} [Workflow] Failed for email {email_id}, "
-                f"user {email.user_id}, elapsed_sec={elapsed:.2f}: "
-                f"{result.get('error')}"
-            )
-            tracer.fail_task(
-                {
-                    "email_id": str(email_id),
-                    "force": force,
-                    "language": language,
-                    "scene": scene,
-                    "trigger_source": trigger_source,
-                    "status": "failed",
-                    "workflow_success": False,
-                    "workflow_error": result.get("error"),
-                },
-                result.get("error") or "Workflow failed",
-            )
-
         return email_id
 
     except EmailMessage.DoesNotExist:
@@ -194,8 +276,9 @@ def retry_failed_email_workflow(email_id: str) -> str:
     """
     Retry a failed email workflow.
 
-    This is a convenience task that calls the workflow with force=True
-    to retry processing from the beginning.
+    The run resumes from the failed run's last error-free checkpoint
+    when one is available (see THREADLINE_CHECKPOINT["resume_failed"])
+    and restarts from the beginning otherwise.
 
     Args:
         email_id (str): ID of the email to retry
@@ -206,7 +289,287 @@ def retry_failed_email_workflow(email_id: str) -> str:
     logger.info(f"[Workflow] Retrying failed workflow for email {email_id}")
     process_email_workflow.delay(
         email_id,
-        force=True,
+        force=False,
         trigger_source="retry_task",
     )
     return email_id
+
+
+@shared_task
+@prevent_duplicate_task(
+    "process_email_workflow",
+    lock_param="email_id",
+    timeout=settings.TASK_TIMEOUT_MINUTES * 60,
+)
+def resume_email_workflow(email_id: str, thread_id: str) -> str:
+    """
+    Resume a workflow checkpointed while waiting on provider batch results.
+
+    Shares the per-email lock with process_email_workflow. When the lock is
+    busy the task is skipped and the next batch poll enqueues it again,
+    because the results are only marked as used once the resume starts.
+
+    Args:
+        email_id (str): ID of the email whose workflow is checkpointed
+        thread_id (str): LangGraph thread id of the interrupted run
+
+    Returns:
+        str: The email_id
+    """
+    # Deferred: the batch service pulls requests and is only needed here.
+    from threadline.services.llm_batch import build_resume_value
+
+    email = EmailMessage.objects.select_related("user").get(id=email_id)
+    resume_value = build_resume_value(thread_id)
+    if resume_value is None:
+        logger.info(
+            f"[Workflow] Nothing to resume for email {email_id}, "
+            f"thread_id={thread_id}"
+        )
+        return email_id
+
+    started_at = time.monotonic()
+    task_details = {
+        "email_id": str(email_id),
+        "thread_id": thread_id,
+        "trigger_source": "llm_batch_resume",
+    }
+    tracer = TaskTracer("EMAIL_WORKFLOW")
+    tracer.set_task_id(
+        getattr(resume_email_workflow.request, "id", "") or ""
+    )
+    tracer.create_task({**task_details, "status": "starting"})
+    result = resume_email_processing_workflow(
+        email,
+        thread_id,
+        resume_value["resume"],
+        tracer=tracer,
+    )
+    _finish_traced_workflow(
+        tracer,
+        email,
+        result,
+        task_details,
+        time.monotonic() - started_at,
+    )
+    return email_id
+
+
+def _load_shared_contexts(
+    emails: list[EmailMessage],
+    language: str | None,
+    scene: str | None,
+) -> dict[int, dict]:
+    """
+    Load the per-user workflow context once for every user in the batch.
+    """
+    # Deferred: avoid importing graph nodes at task module import time.
+    from threadline.agents.nodes.workflow_prepare import WorkflowPrepareNode
+
+    contexts: dict[int, dict] = {}
+    for email in emails:
+        if email.user_id in contexts:
+            continue
+        node = WorkflowPrepareNode()
+        node.email = email
+        try:
+            contexts[email.user_id] = node.load_shared_context(
+                {"retry_language": language, "retry_scene": scene}
+            )
+        except Exception as exc:
+            logger.warning(
+                f"[WorkflowBatch] Failed to preload context for user "
+                f"{email.user_id}, falling back to per-email loading: {exc}"
+            )
+    return contexts
+
+
+def _run_batch_item(
+    email: EmailMessage,
+    *,
+    force: bool,
+    language: str | None,
+    scene: str | None,
+    trigger_source: str | None,
+    task_id: str,
+    shared_context: dict | None,
+) -> dict:
+    """
+    Run one batch item under the same per-email lock as the single task.
+    """
+    lock_name = f"process_email_workflow_{email.id}"
+    if not acquire_task_lock(
+        lock_name, timeout=settings.TASK_TIMEOUT_MINUTES * 60
+    ):
+        return {"email_id": str(email.id), "status": "skipped"}
+
+    item_started_at = time.monotonic()
+    try:
+        result = run_traced_email_workflow(
+            email,
+            force=force,
+            language=language,
+            scene=scene,
+            trigger_source=trigger_source,
+            task_id=task_id,
+            shared_context=shared_context,
+        )
+        if result.get("deferred"):
+            status = "deferred"
+        else:
+            status = "success" if result.get("success") else "failed"
+        return {
+            "email_id": str(email.id),
+            "status": status,
+            "error": result.get("error"),
+            "elapsed_sec": round(time.monotonic() - item_started_at, 2),
+        }
+    except Exception as exc:
+        logger.error(
+            f"[WorkflowBatch] Email {email.id} failed unexpectedly: {exc}"
+        )
+        return {
+            "email_id": str(email.id),
+            "status": "failed",
+            "error": str(exc),
+            "elapsed_sec": round(time.monotonic() - item_started_at, 2),
+        }
+    finally:
+        release_task_lock(lock_name)
+        if threading.current_thread() is not threading.main_thread():
+            # Worker threads own their DB connection; do not leak it.
+            connection.close()
+
+
+@shared_task
+def process_email_workflow_batch(
+    email_ids: list[str],
+    force: bool = False,
+    language: str = None,
+    scene: str = None,
+    trigger_source: str | None = None,
+    max_concurrency: int | None = None,
+) -> dict:
+    """
+    Execute the email workflow for many emails in a single task.
+
+    Intended for backlog reprocessing (e.g. after a prompt change). Per-user
+    context (prompt config, runtime bindings, plan limits, timezone) is
+    loaded once and shared across that user's emails, and the graph runs
+    for each email with bounded concurrency. Each email still gets its own
+    EMAIL_WORKFLOW task record and honours the per-email workflow lock;
+    emails already locked by another run are skipped.
+
+    Args:
+        email_ids (list[str]): IDs of the emails to process
+        force (bool): Whether to force reprocessing
+        language (str, optional): Language override for all emails
+        scene (str, optional): Scene override for all emails
+        trigger_source (str, optional): Source that triggered the batch
+        max_concurrency (int, optional): Parallel workflow runs, defaults
+            to settings.THREADLINE_BATCH_WORKFLOW_CONCURRENCY
+
+    Returns:
+        dict: Aggregate counts, elapsed time, throughput and per-email
+            results
+    """
+    started_at = time.monotonic()
+    unique_ids = list(dict.fromkeys(str(email_id) for email_id in email_ids))
+    emails_by_id = {
+        str(email.id): email
+        for email in EmailMessage.objects.select_related(
+            "user", "merged_into"
+        ).filter(id__in=unique_ids)
+    }
+    emails = [
+        emails_by_id[email_id]
+        for email_id in unique_ids
+        if email_id in emails_by_id
+    ]
+    missing_ids = [
+        email_id for email_id in unique_ids if email_id not in emails_by_id
+    ]
+    if missing_ids:
+        logger.warning(
+            f"[WorkflowBatch] {len(missing_ids)} email(s) not found: "
+            f"{missing_ids[:20]}"
+        )
+
+    concurrency = max(
+        1,
+        int(
+            max_concurrency
+            or getattr(settings, "THREADLINE_BATCH_WORKFLOW_CONCURRENCY", 1)
+        ),
+    )
+    task_id = getattr(process_email_workflow_batch.request, "id", "") or ""
+    contexts = _load_shared_contexts(emails, language, scene)
+    logger.info(
+        f"[WorkflowBatch] Starting batch of {len(emails)} email(s) for "
+        f"{len(contexts)} user(s), concurrency={concurrency}, "
+        f"force={force}, trigger_source={trigger_source}"
+    )
+
+    def run_item(email: EmailMessage) -> dict:
+        return _run_batch_item(
+            email,
+            force=force,
+            language=language,
+            scene=scene,
+            trigger_source=trigger_source,
+            task_id=task_id,
+            shared_context=contexts.get(email.user_id),
+        )
+
+    if concurrency == 1 or len(emails) <= 1:
+        results = [run_item(email) for email in emails]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix="email-workflow-batch",
+        ) as executor:
+            results = list(executor.map(run_item, emails))
+
+    results.extend(
+        {"email_id": email_id, "status": "not_found"}
+        for email_id in missing_ids
+    )
+    elapsed = time.monotonic() - started_at
+    processed_count = sum(
+        1
+        for item in results
+        if item["status"] in ("success", "failed", "deferred")
+    )
+    summary = {
+        "total": len(unique_ids),
+        "success_count": sum(
+            1 for item in results if item["status"] == "success"
+        ),
+        "failure_count": sum(
+            1 for item in results if item["status"] == "failed"
+        ),
+        "skipped_count": sum(
+            1 for item in results if item["status"] == "skipped"
+        ),
+        "deferred_count": sum(
+            1 for item in results if item["status"] == "deferred"
+        ),
+        "not_found_count": len(missing_ids),
+        "concurrency": concurrency,
+        "elapsed_sec": round(elapsed, 2),
+        "emails_per_sec": (
+            round(processed_count / elapsed, 3) if elapsed > 0 else None
+        ),
+        "results": results,
+    }
+    logger.info(
+        f"[WorkflowBatch] Completed {processed_count}/{len(unique_ids)} "
+        f"email(s) in {elapsed:.2f}s "
+        f"({summary['emails_per_sec']} emails/sec): "
+        f"success={summary['success_count']}, "
+        f"failed={summary['failure_count']}, "
+        f"skipped={summary['skipped_count']}, "
+        f"deferred={summary['deferred_count']}, "
+        f"not_found={summary['not_found_count']}"
+    )
+    return summary
@@ -0,0 +1,89 @@
+"""
+Provider batch tasks for deferred LLM workflow calls.
+
+Workflows started by a deferred trigger source checkpoint at their LLM
+nodes and queue the calls as LLMBatchRequest rows. These periodic tasks
+upload the queued calls as provider batch jobs, poll the jobs and resume
+the checkpointed workflows once their results are available.
+"""
+
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from agentcore_task.adapters.django import prevent_duplicate_task
+from threadline.models import LLMBatchRequest
+from threadline.services.llm_batch import (
+    poll_batch_jobs,
+    refresh_waiting_checkpoints,
+    submit_pending_requests,
+)
+from threadline.tasks.email_workflow import resume_email_workflow
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+@prevent_duplicate_task(
+    "llm_batch_submit", timeout=settings.TASK_TIMEOUT_MINUTES * 60
+)
+def submit_llm_batch_requests() -> dict:
+    """
+    Upload pending deferred LLM requests as provider batch jobs.
+    """
+    summary = submit_pending_requests()
+    if summary["jobs"] or summary["failed_count"]:
+        logger.info(
+            f"[LLMBatch] Submitted {summary['submitted_count']} request(s) "
+            f"in {len(summary['jobs'])} job(s), "
+            f"failed={summary['failed_count']}, "
+            f"given_up={summary['given_up_count']}"
+        )
+    return summary
+
+
+@shared_task
+@prevent_duplicate_task(
+    "llm_batch_poll", timeout=settings.TASK_TIMEOUT_MINUTES * 60
+)
+def poll_llm_batch_jobs() -> dict:
+    """
+    Poll submitted batch jobs and resume workflows whose results landed.
+
+    Threads still waiting get their checkpoint TTL refreshed.
+    """
+    summary = poll_batch_jobs()
+    resumed = enqueue_ready_workflow_resumes(summary["ready_threads"])
+    refreshed = refresh_waiting_checkpoints()
+    if summary["finished_jobs"] or resumed:
+        logger.info(
+            f"[LLMBatch] Finished {len(summary['finished_jobs'])} job(s), "
+            f"resuming {resumed} workflow(s)"
+        )
+    return {
+        **summary,
+        "resumed_count": resumed,
+        "checkpoints_refreshed": refreshed,
+    }
+
+
+def enqueue_ready_workflow_resumes(thread_ids: list[str]) -> int:
+    """
+    Enqueue one resume_email_workflow per ready thread.
+
+    Args:
+        thread_ids: Thread ids whose batch results are all available
+
+    Returns:
+        int: Number of resumes enqueued
+    """
+    email_ids = dict(
+        LLMBatchRequest.objects.filter(
+            thread_id__in=thread_ids, resumed_at__isnull=True
+        ).values_list("thread_id", "email_message_id")
+    )
+    for thread_id in thread_ids:
+        if thread_id in email_ids:
+            resume_email_workflow.delay(str(email_ids[thread_id]), thread_id)
+    return len(email_ids)
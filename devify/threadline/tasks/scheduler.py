@@ -7,12 +7,16 @@ from django.utils import timezone
 
 from agentcore_task.adapters.django import prevent_duplicate_task
 from threadline.models import EmailMessage, EmailTask
+from threadline.services.llm_batch import waiting_email_ids
+from threadline.services.merge_batch import claim_stale_merge_pending_emails
 from threadline.tasks.cleanup import (
+    CheckpointCleanupManager,
     EmailCleanupManager,
     EmailTaskCleanupManager,
     ShareLinkCleanupManager,
 )
 from threadline.tasks.email_fetch import imap_email_fetch, haraka_email_fetch
+from threadline.tasks.email_merge import process_email_merge
 from threadline.tasks.email_workflow import process_email_workflow
 from threadline.state_machine import EmailStatus
 from threadline.utils.task_cleanup import cleanup_stale_tasks
@@ -192,6 +196,9 @@ def schedule_share_link_cleanup():
 def schedule_reset_stuck_processing_emails(timeout_minutes=30):
     """
     Reset emails stuck in FETCHED or PROCESSING state.
+
+    Emails left flagged merge_pending by a lost merge batch are queued
+    for a per-email merge first.
     """
     tracer = TaskTracer(
         "STUCK_EMAIL_RESET",
@@ -208,6 +215,12 @@ def schedule_reset_stuck_processing_emails(timeout_minutes=30):
                 "started": timezone.now().isoformat(),
             }
         )
+        merge_requeued_ids = claim_stale_merge_pending_emails()
+        for email_id in merge_requeued_ids:
+            process_email_merge.delay(
+                str(email_id), trigger_source="merge_batch_sweep"
+            )
+
         now = timezone.now()
         stuck_emails = EmailMessage.objects.filter(
             status__in=(
@@ -215,7 +228,11 @@ def schedule_reset_stuck_processing_emails(timeout_minutes=30):
                 EmailStatus.PROCESSING.value,
             ),
             updated_at__lt=now - timedelta(minutes=timeout_minutes),
-        )
+        ).exclude(
+            # Checkpointed workflows waiting on provider batch results
+            # legitimately stay PROCESSING for hours.
+            id__in=waiting_email_ids()
+        ).exclude(id__in=merge_requeued_ids)
 
         fetched_retry_count = 0
         fetched_failed_count = 0
@@ -252,12 +269,14 @@ def schedule_reset_stuck_processing_emails(timeout_minutes=30):
                 processing_failed_count += 1
 
         total_handled = (
-            fetched_retry_count
+            len(merge_requeued_ids)
+            + fetched_retry_count
             + fetched_failed_count
             + processing_failed_count
         )
         tracer.complete_task(
             {
+                "merge_requeued_count": len(merge_requeued_ids),
                 "fetched_retry_count": fetched_retry_count,
                 "fetched_failed_count": fetched_failed_count,
                 "processing_failed_count": processing_failed_count,
@@ -266,6 +285,7 @@ def schedule_reset_stuck_processing_emails(timeout_minutes=30):
             }
         )
         return {
+            "merge_requeued_count": len(merge_requeued_ids),
             "fetched_retry_count": fetched_retry_count,
             "fetched_failed_count": fetched_failed_count,
             "processing_failed_count": processing_failed_count,
@@ -320,3 +340,35 @@ def schedule_email_task_cleanup():
             f"EmailTask cleanup failed: {exc}"
         )
         raise
+
+
+@shared_task
+@prevent_duplicate_task(
+    "checkpoint_cleanup", timeout=settings.TASK_TIMEOUT_MINUTES * 60
+)
+def schedule_checkpoint_cleanup():
+    """
+    Purge LangGraph checkpoints of completed email workflows.
+    """
+    tracer = TaskTracer(
+        "CHECKPOINT_CLEANUP",
+        module="threadline",
+    )
+    try:
+        with use_task_tracer(tracer):
+            logger.info(
+                f"{tracer.context_summary()} "
+                "Starting checkpoint cleanup scheduler"
+            )
+            result = CheckpointCleanupManager().cleanup_completed_checkpoints()
+        logger.info(
+            f"{tracer.context_summary()} "
+            f"Checkpoint cleanup completed: {result}"
+        )
+        return result
+    except Exception as exc:
+        logger.error(
+            f"{tracer.context_summary()} "
+            f"Checkpoint cleanup failed: {exc}"
+        )
+        raise
@@ -0,0 +1,235 @@
+"""
+Local stub of the OpenAI-style Files and Batches API.
+
+Runs an HTTP server on 127.0.0.1 that accepts JSONL uploads, creates
+batches and completes them after a configurable number of polls, so the
+deferred LLM workflow can be exercised end to end without a provider.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict
+
+
+def default_responder(body: Dict[str, Any]) -> str:
+    """
+    Echo a deterministic answer; JSON bodies get a minimal JSON object.
+    """
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps(
+            {"details": "Batch details", "key_process": [], "todos": []}
+        )
+    return "Batch answer"
+
+
+class LLMBatchStubServer:
+    """
+    In-process batch API stub.
+
+    Args:
+        responder: Builds the completion content from a request body;
+            raising makes the request land in the error file
+        complete_after_polls: Number of retrieve calls before a batch
+            reports ``completed``
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[Dict[str, Any]], str] = default_responder,
+        *,
+        complete_after_polls: int = 1,
+    ):
+        self.responder = responder
+        self.complete_after_polls = complete_after_polls
+        self.files: Dict[str, str] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._polls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self._build_handler()
+        )
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    @property
+    def api_base(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "LLMBatchStubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_id(self, prefix: str, store: Dict[str, Any]) -> str:
+        return f"{prefix}-{len(store) + 1}"
+
+    def _store_file(self, content: str) -> str:
+        with self._lock:
+            file_id = self._next_id("file", self.files)
+            self.files[file_id] = content
+        return file_id
+
+    def _create_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            batch_id = self._next_id("batch", self.batches)
+            batch = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": body.get("endpoint"),
+                "input_file_id": body.get("input_file_id"),
+                "completion_window": body.get("completion_window"),
+                "status": "validating",
+                "output_file_id": None,
+                "error_file_id": None,
+                "metadata": body.get("metadata"),
+            }
+            self.batches[batch_id] = batch
+            self._polls[batch_id] = 0
+        return batch
+
+    def _retrieve_batch(self, batch_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            self._polls[batch_id] += 1
+            if batch["status"] != "completed":
+                if self._polls[batch_id] >= self.complete_after_polls:
+                    self._complete(batch)
+                else:
+                    batch["status"] = "in_progress"
+            return dict(batch)
+
+    def _complete(self, batch: Dict[str, Any]) -> None:
+        outputs, errors = [], []
+        for raw_line in self.files[batch["input_file_id"]].splitlines():
+            line = json.loads(raw_line)
+            body = line["body"]
+            try:
+                content = self.responder(body)
+            except Exception as exc:
+                errors.append(
+                    {
+                        "id": f"err-{line['custom_id']}",
+                        "custom_id": line["custom_id"],
+                        "response": None,
+                        "error": {"code": "stub_error", "message": str(exc)},
+                    }
+                )
+                continue
+            outputs.append(
+                {
+                    "id": f"resp-{line['custom_id']}",
+                    "custom_id": line["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "model": body.get("model") or "stub-model",
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "message": {
+                                        "role": "assistant",
+                                        "content": content,
+                                    },
+                                }
+                            ],
+                            "usage": {
+                                "prompt_tokens": 10,
+                                "completion_tokens": 5,
+                                "total_tokens": 15,
+                            },
+                        },
+                    },
+                    "error": None,
+                }
+            )
+        for field, lines in (
+            ("output_file_id", outputs),
+            ("error_file_id", errors),
+        ):
+            if lines:
+                file_id = self._next_id("file", self.files)
+                self.files[file_id] = "\n".join(
+                    json.dumps(line) for line in lines
+                )
+                batch[field] = file_id
+        batch["status"] = "completed"
+
+    def _build_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Any, raw: bool = False):
+                body = payload if raw else json.dumps(payload)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header(
+                    "Content-Type",
+                    "application/jsonl" if raw else "application/json",
+                )
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length)
+
+            def do_POST(self):
+                if self.path == "/v1/files":
+                    message = BytesParser(policy=default_policy).parsebytes(
+                        b"Content-Type: "
+                        + self.headers["Content-Type"].encode()
+                        + b"\r\n\r\n"
+                        + self._read_body()
+                    )
+                    for part in message.iter_parts():
+                        if part.get_param(
+                            "name", header="content-disposition"
+                        ) == "file":
+                            content = part.get_payload(decode=True)
+                            file_id = stub._store_file(content.decode())
+                            return self._send(
+                                200,
+                                {
+                                    "id": file_id,
+                                    "object": "file",
+                                    "purpose": "batch",
+                                },
+                            )
+                    return self._send(400, {"error": "file is required"})
+                if self.path == "/v1/batches":
+                    body = json.loads(self._read_body() or b"{}")
+                    return self._send(200, stub._create_batch(body))
+                return self._send(404, {"error": "not found"})
+
+            def do_GET(self):
+                match = re.fullmatch(r"/v1/batches/([\w-]+)", self.path)
+                if match:
+                    batch = stub._retrieve_batch(match.group(1))
+                    if batch is None:
+                        return self._send(404, {"error": "not found"})
+                    return self._send(200, batch)
+                match = re.fullmatch(r"/v1/files/([\w-]+)/content", self.path)
+                if match and match.group(1) in stub.files:
+                    return self._send(
+                        200, stub.files[match.group(1)], raw=True
+                    )
+                return self._send(404, {"error": "not found"})
+
+        return Handler
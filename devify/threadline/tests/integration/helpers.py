@@ -98,6 +98,7 @@ def _build_fake_llm_responses():
         state=None,
         node_name="unknown",
         model_uuid=None,
+        tracking_tags=None,
     ):
         if node_name == "llm_email_node":
             response = "Processed email body for workflow"
@@ -125,6 +126,7 @@ def _build_fake_llm_responses():
         state=None,
         node_name="unknown",
         model_uuid=None,
+        tracking_tags=None,
     ):
         return fake_call_and_track(
             prompt="",
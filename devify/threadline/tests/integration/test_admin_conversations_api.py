@@ -6,8 +6,10 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from rest_framework.test import APIClient
 
+from agentcore_task.adapters.django.models import TaskExecution
 from agentcore_task.adapters.django.services import register_task_execution
 from threadline.models import EmailMessage
+from threadline.utils.task_tracer import TaskTracer
 
 
 @pytest.fixture
@@ -128,3 +130,67 @@ class TestAdminConversationAPI:
         body = response.json()["data"]
         assert body["id"] == task.id
         assert body["task_id"] == task.task_id
+
+    def test_tasks_list_and_detail_page_table_steps(
+        self, staff_client, conversation
+    ):
+        tracer = TaskTracer("EMAIL_WORKFLOW", step_storage="table")
+        tracer.create_task({"email_id": str(conversation.id)})
+        for index in range(5):
+            tracer.append_task(
+                f"STEP_{index}",
+                f"Step {index}",
+                {"email_id": str(conversation.id)},
+            )
+        task = TaskExecution.objects.get(task_id=tracer.task_id)
+        base_url = (
+            f"/api/v1/admin/threadline/conversations/{conversation.uuid}/tasks/"
+        )
+
+        list_response = staff_client.get(base_url)
+        row = next(
+            item
+            for item in list_response.json()["data"]["list"]
+            if item["task_id"] == task.task_id
+        )
+        assert row["step_count"] == 5
+
+        response = staff_client.get(
+            f"{base_url}{task.id}/",
+            {"steps_page": 2, "steps_page_size": 2},
+        )
+
+        assert response.status_code == 200
+        steps = response.json()["data"]["steps"]
+        assert steps["pagination"]["total"] == 5
+        assert [step["seq"] for step in steps["list"]] == [3, 4]
+        assert steps["list"][0]["action"] == "STEP_2"
+        assert steps["list"][0]["raw_message"] == "Step 2"
+        assert steps["pagination"]["next"] is not None
+
+    def test_tasks_detail_pages_legacy_metadata_steps(
+        self, staff_client, conversation
+    ):
+        task = register_task_execution(
+            task_id="task-for-email-003",
+            task_name="threadline.workflow.legacy",
+            module="threadline",
+            created_by=conversation.user,
+            metadata={
+                "context": {"email_id": str(conversation.id)},
+                "steps": [{"action": f"STEP_{i}"} for i in range(3)],
+            },
+        )
+
+        response = staff_client.get(
+            f"/api/v1/admin/threadline/conversations/{conversation.uuid}"
+            f"/tasks/{task.id}/",
+            {"steps_page_size": 2},
+        )
+
+        steps = response.json()["data"]["steps"]
+        assert steps["pagination"]["total"] == 3
+        assert [step["action"] for step in steps["list"]] == [
+            "STEP_0",
+            "STEP_1",
+        ]
@@ -13,6 +13,7 @@ from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core.paginations import KeysetPagination
 from threadline.models import EmailTodo, EmailMessage
 from ..fixtures.factories import (
     EmailTodoFactory,
@@ -269,6 +270,71 @@ class TestEmailTodoAPI:
         assert response.data["data"]["pagination"]["page"] == 1
         assert response.data["data"]["pagination"]["pageSize"] == 10
 
+    def test_list_todos_cursor_pagination(
+        self, authenticated_api_client, test_user, monkeypatch
+    ):
+        """
+        Test keyset pagination with a capped total
+        """
+        EmailTodo.objects.all().delete()
+        todos = EmailTodoFactory.create_batch(15, user=test_user)
+        monkeypatch.setattr(KeysetPagination, "total_cap", 12)
+
+        url = reverse("todos-list")
+        first = authenticated_api_client.get(
+            url, {"cursor": "", "page_size": 10, "total": "capped"}
+        )
+
+        assert first.status_code == status.HTTP_200_OK
+        pagination = first.data["data"]["pagination"]
+        assert pagination["total"] == 12
+        assert pagination["totalCapped"] is True
+        assert pagination["hasNext"] is True
+        assert "cursor=" in pagination["next"]
+
+        second = authenticated_api_client.get(
+            url, {"cursor": pagination["cursor"], "page_size": 10}
+        )
+
+        assert second.status_code == status.HTTP_200_OK
+        pagination = second.data["data"]["pagination"]
+        assert pagination["total"] is None
+        assert pagination["hasNext"] is False
+        assert pagination["next"] is None
+        ids = [
+            item["id"]
+            for response in (first, second)
+            for item in response.data["data"]["list"]
+        ]
+        assert sorted(ids) == sorted(todo.id for todo in todos)
+        assert len(ids) == 15
+
+    def test_list_todos_invalid_cursor(
+        self, authenticated_api_client, test_user
+    ):
+        """
+        Test that a malformed cursor is rejected
+        """
+        url = reverse("todos-list")
+        response = authenticated_api_client.get(url, {"cursor": "bogus"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["code"] == 400
+
+    def test_list_todos_cursor_rejects_unsupported_ordering(
+        self, authenticated_api_client, test_user
+    ):
+        """
+        Test that cursor mode rejects orderings it cannot page on
+        """
+        url = reverse("todos-list")
+        response = authenticated_api_client.get(
+            url, {"cursor": "", "ordering": "priority"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["code"] == 400
+
     def test_create_todo_unauthenticated(self, api_client):
         """
         Test that unauthenticated users cannot create TODOs
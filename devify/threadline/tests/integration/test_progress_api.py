@@ -0,0 +1,212 @@
+"""
+Tests for the threadline processing progress endpoint.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from threadline.models import EmailMessage
+from threadline.utils.processing_progress import (
+    progress_channel,
+    publish_processing_progress,
+)
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "progress-api-tests",
+    }
+}
+
+
+class FakePubSub:
+    """Replays queued pub/sub messages, then reports an idle channel."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.subscribed = []
+        self.closed = False
+
+    def subscribe(self, channel):
+        self.subscribed.append(channel)
+
+    def get_message(self, timeout=None):
+        if self.messages:
+            return {"type": "message", "data": self.messages.pop(0)}
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, messages=()):
+        self.pubsub_instance = FakePubSub(messages)
+        self.published = []
+
+    def publish(self, channel, data):
+        self.published.append((channel, json.loads(data)))
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.pubsub_instance
+
+
+def _frames(response):
+    body = b"".join(response.streaming_content).decode()
+    return [frame for frame in body.split("\n\n") if frame]
+
+
+def _event(frame):
+    lines = dict(line.split(": ", 1) for line in frame.splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestProcessingProgressAPI:
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        settings.CACHES = LOCMEM_CACHES
+        cache.clear()
+
+    @pytest.fixture
+    def processing_email(self, test_email_message):
+        EmailMessage.objects.filter(id=test_email_message.id).update(
+            status="processing"
+        )
+        test_email_message.refresh_from_db()
+        return test_email_message
+
+    def test_poll_returns_live_progress_while_processing(
+        self, authenticated_api_client, processing_email
+    ):
+        with patch(
+            "threadline.utils.processing_progress._get_redis_client",
+            return_value=None,
+        ):
+            publish_processing_progress(processing_email.id, 45)
+
+        response = authenticated_api_client.get(
+            reverse("threadlines-progress", args=[processing_email.uuid])
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.data["data"]
+        assert data["status"] == "processing"
+        assert data["percent"] == 45
+        assert data["final"] is False
+
+    def test_poll_uses_persisted_snapshot_after_finish(
+        self, authenticated_api_client, test_email_message
+    ):
+        EmailMessage.objects.filter(id=test_email_message.id).update(
+            status="success",
+            metadata={"processing_progress": {"percent": 100}},
+        )
+
+        response = authenticated_api_client.get(
+            reverse("threadlines-progress", args=[test_email_message.uuid])
+        )
+
+        data = response.data["data"]
+        assert data["percent"] == 100
+        assert data["final"] is True
+
+    def test_queued_email_stream_waits_for_processing(
+        self, authenticated_api_client, test_email_message
+    ):
+        EmailMessage.objects.filter(id=test_email_message.id).update(
+            status="fetched"
+        )
+        redis_client = FakeRedis(
+            [
+                json.dumps({"percent": 10, "final": False}),
+                json.dumps({"percent": 100, "final": True}),
+            ]
+        )
+        with patch(
+            "threadline.utils.processing_progress._get_redis_client",
+            return_value=redis_client,
+        ):
+            response = authenticated_api_client.get(
+                reverse(
+                    "threadlines-progress", args=[test_email_message.uuid]
+                ),
+                {"stream": "1"},
+            )
+            frames = _frames(response)
+
+        events = [_event(frame) for frame in frames]
+        assert events[0][1]["status"] == "fetched"
+        assert events[0][1]["final"] is False
+        assert [data.get("percent") for _, data in events[1:]] == [10, 100]
+
+    def test_progress_of_other_users_email_is_not_found(
+        self, authenticated_api_client_2, processing_email
+    ):
+        response = authenticated_api_client_2.get(
+            reverse("threadlines-progress", args=[processing_email.uuid])
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stream_emits_published_progress_until_final(
+        self, authenticated_api_client, processing_email
+    ):
+        redis_client = FakeRedis(
+            [
+                json.dumps({"percent": 60, "final": False}),
+                json.dumps({"percent": 100, "final": True}),
+            ]
+        )
+        with patch(
+            "threadline.utils.processing_progress._get_redis_client",
+            return_value=redis_client,
+        ):
+            response = authenticated_api_client.get(
+                reverse(
+                    "threadlines-progress", args=[processing_email.uuid]
+                ),
+                HTTP_ACCEPT="text/event-stream",
+            )
+            frames = _frames(response)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/event-stream")
+        assert response["Cache-Control"] == "no-cache"
+        events = [_event(frame) for frame in frames]
+        assert [data.get("percent") for _, data in events] == [
+            None,
+            60,
+            100,
+        ]
+        assert events[-1][1]["final"] is True
+        pubsub = redis_client.pubsub_instance
+        assert pubsub.subscribed == [progress_channel(processing_email.id)]
+        assert pubsub.closed
+
+    def test_stream_times_out_without_updates(
+        self, authenticated_api_client, processing_email, settings
+    ):
+        settings.THREADLINE_TASK_TRACER = {
+            "progress_stream_timeout_sec": 0.01
+        }
+        with patch(
+            "threadline.utils.processing_progress._get_redis_client",
+            return_value=FakeRedis(),
+        ):
+            response = authenticated_api_client.get(
+                reverse(
+                    "threadlines-progress", args=[processing_email.uuid]
+                ),
+                {"stream": "1"},
+            )
+            frames = _frames(response)
+
+        assert _event(frames[0])[0] == "progress"
+        assert _event(frames[-1])[0] == "timeout"
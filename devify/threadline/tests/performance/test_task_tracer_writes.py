@@ -0,0 +1,127 @@
+"""
+DB write benchmark for TaskTracer step recording.
+
+Simulates the step volume of one email workflow run and counts the
+INSERT/UPDATE statements issued by the unbuffered and buffered tracers.
+"""
+
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from threadline.models import EmailMessage
+from threadline.utils.processing_progress import get_live_processing_progress
+from threadline.utils.task_tracer import TaskTracer
+
+WORKFLOW_STEPS = 40
+PROGRESS_PLAN = {"workflow": {"start": 0, "span": 100}}
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "task-tracer-benchmark",
+    }
+}
+
+
+def _run_workflow(tracer, email_id):
+    tracer.create_task(
+        {"email_id": email_id, "status": "starting", "progress_percent": 0}
+    )
+    for index in range(WORKFLOW_STEPS):
+        tracer.append_task(
+            f"STEP_{index}",
+            "Processing",
+            {
+                "email_id": email_id,
+                "progress_plan": PROGRESS_PLAN,
+                "progress_stage": "workflow",
+                "progress_ratio": (index + 1) / WORKFLOW_STEPS,
+            },
+        )
+    tracer.complete_task({"email_id": email_id})
+
+
+def _count_writes(tracer, email_id):
+    with CaptureQueriesContext(connection) as queries:
+        _run_workflow(tracer, email_id)
+    return sum(
+        1
+        for query in queries.captured_queries
+        if query["sql"].lstrip().upper().startswith(("INSERT", "UPDATE"))
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.performance
+class TestTaskTracerWrites:
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        settings.CACHES = LOCMEM_CACHES
+
+    @pytest.fixture
+    def email(self):
+        user = User.objects.create_user(
+            username=f"tracer-{uuid4().hex[:8]}", password="password123"
+        )
+        return EmailMessage.objects.create(
+            user=user,
+            message_id=f"<{uuid4().hex}@example.com>",
+            subject="Tracer benchmark",
+            sender="sender@example.com",
+            recipients="recipient@example.com",
+            received_at=timezone.now(),
+            status="processing",
+        )
+
+    def test_buffered_tracer_reduces_writes_per_workflow(self, email):
+        unbuffered = _count_writes(
+            TaskTracer("EMAIL_WORKFLOW", buffered=False), email.id
+        )
+        buffered = _count_writes(
+            TaskTracer(
+                "EMAIL_WORKFLOW",
+                buffered=True,
+                flush_interval_sec=3600,
+                flush_max_steps=20,
+            ),
+            email.id,
+        )
+
+        print(
+            f"\nTaskTracer DB writes for {WORKFLOW_STEPS} steps: "
+            f"unbuffered={unbuffered} buffered={buffered}"
+        )
+        assert buffered * 5 <= unbuffered
+
+    def test_buffered_progress_is_live_and_persisted_at_finish(self, email):
+        tracer = TaskTracer(
+            "EMAIL_WORKFLOW",
+            buffered=True,
+            flush_interval_sec=3600,
+            flush_max_steps=100,
+        )
+        tracer.create_task({"email_id": email.id, "status": "starting"})
+        tracer.append_task(
+            "HALFWAY",
+            "Processing",
+            {
+                "email_id": email.id,
+                "progress_plan": PROGRESS_PLAN,
+                "progress_stage": "workflow",
+                "progress_ratio": 0.5,
+            },
+        )
+
+        email.refresh_from_db()
+        persisted = (email.metadata or {}).get("processing_progress") or {}
+        assert persisted.get("percent", 0) < 60
+        assert get_live_processing_progress(email.id)["percent"] == 60
+
+        tracer.complete_task({"email_id": email.id})
+
+        email.refresh_from_db()
+        assert email.metadata["processing_progress"]["percent"] == 100
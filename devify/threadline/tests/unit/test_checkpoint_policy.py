@@ -0,0 +1,207 @@
+"""Unit tests for workflow checkpoint policies and checkpoint cleanup."""
+
+from typing import TypedDict
+from unittest.mock import MagicMock
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from threadline.agents.checkpoint_manager import (
+    CHECKPOINT_POLICY_MEMORY,
+    CHECKPOINT_POLICY_NONE,
+    CHECKPOINT_POLICY_REDIS,
+    CheckpointManager,
+    create_expensive_node_checkpointer,
+    resolve_checkpoint_policy,
+)
+from threadline.tasks.cleanup import CheckpointCleanupManager
+
+
+class CounterState(TypedDict):
+    steps: list
+
+
+def _build_graph(checkpointer, fail_at=None):
+    def make_node(name):
+        def node(state):
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return {"steps": state["steps"] + [name]}
+
+        return node
+
+    builder = StateGraph(CounterState)
+    names = ["prepare", "image_intent", "metadata", "finalize"]
+    for name in names:
+        builder.add_node(name, make_node(name))
+    builder.add_edge(START, names[0])
+    for current, following in zip(names, names[1:]):
+        builder.add_edge(current, following)
+    builder.add_edge(names[-1], END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class TestResolveCheckpointPolicy:
+    def test_trigger_override_beats_default(self, settings):
+        settings.THREADLINE_LLM_BATCH = {"enabled": False}
+        settings.THREADLINE_CHECKPOINT = {
+            "policy": CHECKPOINT_POLICY_NONE,
+            "policy_by_trigger": {"api_retry": CHECKPOINT_POLICY_MEMORY},
+        }
+
+        assert resolve_checkpoint_policy("api_retry") == "memory"
+        assert resolve_checkpoint_policy("email_fetch") == "none"
+
+    def test_unknown_policy_falls_back_to_redis(self, settings):
+        settings.THREADLINE_CHECKPOINT = {"policy": "disk"}
+
+        assert resolve_checkpoint_policy(None) == CHECKPOINT_POLICY_REDIS
+
+    def test_batch_trigger_forces_durable_policy(self, settings):
+        settings.THREADLINE_CHECKPOINT = {"policy": CHECKPOINT_POLICY_MEMORY}
+        settings.THREADLINE_LLM_BATCH = {
+            "enabled": True,
+            "trigger_sources": ["command_batch"],
+        }
+
+        assert resolve_checkpoint_policy("command_batch") == "redis"
+        assert resolve_checkpoint_policy("api_retry") == "memory"
+
+
+class TestExpensiveNodeCheckpointer:
+    def test_persists_only_after_expensive_nodes(self):
+        full_saver = InMemorySaver()
+        _build_graph(full_saver).invoke({"steps": []}, _config("full"))
+
+        inner = InMemorySaver()
+        saver = create_expensive_node_checkpointer(inner, ["image_intent"])
+        result = _build_graph(saver).invoke({"steps": []}, _config("slim"))
+
+        assert result["steps"] == [
+            "prepare",
+            "image_intent",
+            "metadata",
+            "finalize",
+        ]
+        persisted = list(inner.list(_config("slim")))
+        assert len(persisted) == 1
+        assert len(persisted) < len(list(full_saver.list(_config("full"))))
+        values = persisted[0].checkpoint["channel_values"]
+        assert values["steps"] == ["prepare", "image_intent"]
+
+    def test_release_drops_the_final_held_checkpoint(self):
+        inner = InMemorySaver()
+        saver = create_expensive_node_checkpointer(inner, ["image_intent"])
+        graph = _build_graph(saver)
+        graph.invoke({"steps": []}, _config("done"))
+        graph.invoke({"steps": []}, _config("other"))
+
+        assert saver._threads[("done", "")]["pending"] is not None
+
+        saver.release_thread("done")
+
+        assert ("done", "") not in saver._threads
+        assert ("other", "") in saver._threads
+        assert len(list(inner.list(_config("done")))) == 1
+
+    def test_error_flushes_skipped_checkpoint(self):
+        inner = InMemorySaver()
+        saver = create_expensive_node_checkpointer(inner, ["image_intent"])
+
+        with pytest.raises(RuntimeError):
+            _build_graph(saver, fail_at="finalize").invoke(
+                {"steps": []}, _config("failed")
+            )
+
+        latest = inner.get_tuple(_config("failed"))
+        assert latest.checkpoint["channel_values"]["steps"] == [
+            "prepare",
+            "image_intent",
+            "metadata",
+        ]
+        assert any(write[1] == "__error__" for write in latest.pending_writes)
+
+    def test_error_write_before_its_checkpoint_is_kept(self):
+        inner = InMemorySaver()
+        saver = create_expensive_node_checkpointer(inner, ["image_intent"])
+        config = {"configurable": {"thread_id": "early", "checkpoint_ns": ""}}
+        first, second = empty_checkpoint(), empty_checkpoint()
+        saver.put(config, first, {}, {})
+
+        # LangGraph's background executor delivered the error write of
+        # the second checkpoint before the checkpoint itself.
+        write_config = {
+            "configurable": {
+                **config["configurable"],
+                "checkpoint_id": second["id"],
+            }
+        }
+        saver.put_writes(write_config, [("__error__", "boom")], "task-1")
+        assert inner.get_tuple(config) is None
+
+        saver.put(config, second, {}, {})
+
+        latest = inner.get_tuple(config)
+        assert latest.checkpoint["id"] == second["id"]
+        assert [write[1] for write in latest.pending_writes] == ["__error__"]
+
+
+@pytest.mark.django_db
+class TestCheckpointCleanupManager:
+    def test_clears_completed_and_orphaned_threads_only(
+        self, test_email_message
+    ):
+        from threadline.models import EmailMessage
+
+        failed = EmailMessage.objects.get(id=test_email_message.id)
+        EmailMessage.objects.filter(id=failed.id).update(status="failed")
+        manager = MagicMock()
+        manager.list_thread_ids.return_value = [
+            f"email_workflow_{failed.id}",
+            "email_workflow_999999_force_1700000000",
+            "unrelated_thread",
+        ]
+        manager.clear_checkpoint.return_value = True
+
+        stats = CheckpointCleanupManager(
+            checkpoint_manager=manager
+        ).cleanup_completed_checkpoints()
+
+        assert stats == {
+            "threads_scanned": 3,
+            "threads_cleared": 1,
+            "errors": 0,
+        }
+        cleared = manager.clear_checkpoint.call_args.args[0]
+        assert cleared["configurable"]["thread_id"] == (
+            "email_workflow_999999_force_1700000000"
+        )
+
+
+class TestListThreadIds:
+    def test_scans_every_checkpoint_key_of_the_namespace(self):
+        class FakeRedis:
+            def scan_iter(self, match, count):
+                self.args = (match, count)
+                return iter(
+                    [
+                        b"checkpoint:email_workflow_1:__empty__:1f0a",
+                        b"checkpoint:email_workflow_1:__empty__:1f0b",
+                        b"checkpoint:email_workflow_2_force_17:__empty__:1f0c",
+                    ]
+                )
+
+        manager = CheckpointManager(redis_url="redis://localhost:6379/0")
+        manager._maintenance_redis = redis = FakeRedis()
+
+        assert manager.list_thread_ids(page_size=50) == [
+            "email_workflow_1",
+            "email_workflow_2_force_17",
+        ]
+        assert redis.args == ("checkpoint:*:__empty__:*", 50)
@@ -15,7 +15,7 @@ import pytest
 from django.test import TestCase, override_settings
 from django.utils import timezone
 
-from threadline.models import EmailTask
+from threadline.models import EmailTask, TaskStep
 from threadline.tasks.cleanup import (
     EmailCleanupManager,
     EmailTaskCleanupManager,
@@ -317,6 +317,31 @@ class EmailTaskCleanupManagerTest(TestCase):
         self.assertEqual(result["tasks_cleaned"], 10)
         self.assertEqual(EmailTask.objects.count(), 0)
 
+    @patch("threadline.tasks.cleanup.settings")
+    def test_cleanup_email_tasks_removes_old_task_steps(self, mock_settings):
+        """Test TaskStep rows past retention are deleted with the tasks"""
+        mock_settings.EMAIL_CLEANUP_CONFIG = {"email_task_retention_days": 3}
+
+        TaskStep.objects.create(
+            task_id="old-task",
+            seq=1,
+            action="STEP",
+            ts=timezone.now() - timedelta(days=5),
+        )
+        TaskStep.objects.create(
+            task_id="recent-task", seq=1, action="STEP", ts=timezone.now()
+        )
+
+        with patch("threadline.tasks.cleanup.TaskTracer"):
+            manager = EmailTaskCleanupManager()
+            result = manager.cleanup_email_tasks()
+
+        self.assertEqual(result["steps_cleaned"], 1)
+        self.assertEqual(
+            list(TaskStep.objects.values_list("task_id", flat=True)),
+            ["recent-task"],
+        )
+
     @patch("threadline.tasks.cleanup.settings")
     @patch("threadline.tasks.cleanup.TaskTracer")
     @patch("threadline.tasks.cleanup.logger")
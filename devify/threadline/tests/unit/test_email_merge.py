@@ -4,14 +4,21 @@ Tests for conservative email merge behavior.
 
 from uuid import uuid4
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.contrib.auth.models import User
+from rapidfuzz import process
 from datetime import timedelta
 from unittest.mock import patch
 
-from threadline.models import EmailAttachment, EmailMessage
+from threadline.models import EmailAttachment, EmailMessage, EmailThreadRef
 from threadline.services.email_merge import EmailMergeService
+from threadline.utils.merge_fingerprint import (
+    merge_fingerprint,
+    subject_hash,
+)
 
 
 class TestEmailMergeService(TestCase):
@@ -610,3 +617,211 @@ class TestEmailMergeService(TestCase):
             decision.reason
             == EmailMessage.MergeReason.THREAD_RELATION.value
         )
+
+    def test_thread_refs_are_indexed_on_save(self):
+        email = self._create_email(
+            message_id="internal-1",
+            raw_message_id="<root@example.com>",
+            in_reply_to="<parent@example.com>",
+            references=["<grand@example.com> <parent@example.com>"],
+        )
+
+        refs = set(email.thread_refs.values_list("kind", "token"))
+
+        assert refs == {
+            (EmailThreadRef.Kind.MESSAGE_ID, "internal-1"),
+            (EmailThreadRef.Kind.MESSAGE_ID, "root@example.com"),
+            (EmailThreadRef.Kind.REFERENCE, "parent@example.com"),
+            (EmailThreadRef.Kind.REFERENCE, "grand@example.com"),
+        }
+
+        email.in_reply_to = ""
+        email.references = []
+        email.save(update_fields=["in_reply_to", "references"])
+
+        assert not email.thread_refs.filter(
+            kind=EmailThreadRef.Kind.REFERENCE
+        ).exists()
+
+    def test_thread_relation_reaches_past_content_window_via_index(self):
+        parent = self._create_email(
+            subject="Quarterly plan",
+            text_content="Original plan",
+            raw_message_id="<plan@example.com>",
+            received_at=timezone.now() - timedelta(days=20),
+        )
+        self._create_email(
+            subject="Unrelated",
+            text_content="Other",
+            received_at=timezone.now() - timedelta(days=10),
+        )
+        source = self._create_email(
+            subject="Re: Quarterly plan",
+            text_content="Reply",
+            in_reply_to="<plan@example.com>",
+            received_at=timezone.now(),
+        )
+
+        candidates = list(self.service._candidate_queryset(source))
+        decision = self.service.decide(source)
+
+        assert candidates == [parent]
+        assert decision.target == parent
+        assert decision.evidence["matched_message_id"] == "plan@example.com"
+
+    def test_merge_fingerprint_is_refreshed_on_save(self):
+        email = self._create_email(subject="Re: Weekly Sync", text_content="")
+
+        assert email.merge_subject_hash == subject_hash("weekly sync")
+        assert email.merge_text_length == 0
+        assert email.merge_text_simhash is None
+
+        email.text_content = "  Agenda\n> quoted\nNotes  "
+        email.save(update_fields=["text_content"])
+        email.refresh_from_db()
+
+        assert email.merge_text_length == len("agenda notes")
+        assert email.merge_text_simhash is not None
+
+    def test_merge_fingerprint_is_skipped_for_unchanged_content(self):
+        email = self._create_email(text_content=self.LONG_TEXT)
+        email = EmailMessage.objects.get(pk=email.pk)
+
+        with patch(
+            "threadline.models.merge_fingerprint", wraps=merge_fingerprint
+        ) as fingerprint:
+            email.summary_title = "Runbook review"
+            email.save()
+            email.save(update_fields=["text_content"])
+            EmailMessage.objects.only("id", "status").get(pk=email.pk).save()
+            assert fingerprint.call_count == 0
+
+            email.text_content = f"{self.LONG_TEXT} Updated."
+            email.save()
+            email.save()
+            assert fingerprint.call_count == 1
+
+    def test_candidate_queryset_prefilters_by_fingerprint(self):
+        now = timezone.now()
+        same_subject = self._create_email(
+            subject="Release notes",
+            text_content="Draft",
+            received_at=now - timedelta(hours=2),
+        )
+        contained = self._create_email(
+            subject="Something else",
+            text_content=self.LONG_TEXT,
+            received_at=now - timedelta(hours=1),
+        )
+        self._create_email(
+            subject="Lunch",
+            text_content="Pizza?",
+            received_at=now - timedelta(minutes=30),
+        )
+        source = self._create_email(
+            subject="Fwd: Release notes",
+            text_content=f"{self.LONG_TEXT} Adding the final sign-off.",
+            received_at=now,
+        )
+
+        candidates = list(self.service._candidate_queryset(source))
+
+        assert candidates == [same_subject, contained]
+
+    def test_simhash_prefilter_skips_rapidfuzz_when_enabled(self):
+        parent = self._create_email(
+            subject="Incident review",
+            text_content=self.LONG_TEXT,
+            received_at=timezone.now() - timedelta(minutes=5),
+        )
+        source = self._create_email(
+            subject="Re: Incident review",
+            text_content=(
+                "Catering for the offsite is confirmed: sandwiches, fruit "
+                "and coffee arrive at nine, lunch is served on the terrace "
+                "and the bus leaves at five."
+            ),
+            received_at=timezone.now(),
+        )
+
+        with patch.object(
+            self.service,
+            "_text_similarity_scores",
+            wraps=self.service._text_similarity_scores,
+        ) as scores:
+            self.service._matches_text_similarity(source, parent)
+            assert scores.call_count == 1
+
+            with self.settings(
+                THREADLINE_EMAIL_MERGE={
+                    "simhash_prefilter": True,
+                    "simhash_max_distance": 3,
+                }
+            ):
+                assert not self.service._matches_text_similarity(
+                    source, parent
+                )
+            assert scores.call_count == 1
+
+    def test_decide_batches_candidate_loading(self):
+        now = timezone.now()
+        for index in range(4):
+            candidate = self._create_email(
+                subject="Daily chart",
+                text_content=f"{self.LONG_TEXT} Chart {index}.",
+                received_at=now - timedelta(hours=index + 1),
+            )
+            self._attach_image(candidate, f"{index}" * 32)
+        source = self._create_email(
+            subject="Daily chart",
+            text_content=f"{self.LONG_TEXT} Chart 9.",
+            received_at=now,
+        )
+        self._attach_image(source, "9" * 32)
+        source = EmailMessage.objects.get(pk=source.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            decision = self.service.decide(source)
+
+        assert decision.should_merge is False
+        assert decision.stats["candidates"] == 4
+        assert decision.stats["bytes_loaded"] > 4 * len(self.LONG_TEXT)
+        # candidates, their text, the email's images, the candidates' images
+        assert decision.stats["queries"] == len(queries) == 4
+
+    def test_text_similarity_scores_candidates_in_one_batch(self):
+        now = timezone.now()
+        for index in range(3):
+            self._create_email(
+                subject="Release checklist",
+                text_content=f"{self.LONG_TEXT} Revision {index}.",
+                received_at=now - timedelta(hours=index + 1),
+            )
+        source = self._create_email(
+            subject="Re: Release checklist",
+            text_content=f"{self.LONG_TEXT} Revision 3.",
+            received_at=now,
+        )
+
+        with patch.object(
+            self.service,
+            "_text_similarity_scores",
+            wraps=self.service._text_similarity_scores,
+        ) as pair_scores, patch(
+            "threadline.services.email_merge.process.cdist",
+            wraps=process.cdist,
+        ) as cdist:
+            decision = self.service.decide(source)
+
+        assert len(decision.sources) == 3
+        assert (
+            decision.reason
+            == EmailMessage.MergeReason.TEXT_SIMILARITY.value
+        )
+        assert cdist.call_count == 2
+        assert len(cdist.call_args.args[0]) == 3
+        # One thread per scoring call; the workers own the other cores.
+        assert cdist.call_args.kwargs["workers"] == 1
+        # Only the evidence of the primary source is scored pairwise.
+        assert pair_scores.call_count == 1
+        assert decision.evidence["ratio"] > 90
@@ -0,0 +1,109 @@
+"""
+Tests for EmailMessage status transition writes.
+
+Covers the column-only transition lookup in save() and the single-UPDATE
+compare-and-set used by set_status().
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from threadline.models import EmailMessage
+from threadline.state_machine import EmailStatus
+
+User = get_user_model()
+
+
+class EmailStatusTransitionTest(TestCase):
+    """
+    Test the query cost and atomicity of status transitions.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='transition-user',
+            email='transition@example.com',
+            password='testpass123'
+        )
+        self.email = EmailMessage.objects.create(
+            user=self.user,
+            message_id='transition-message-id',
+            subject='Transition',
+            sender='sender@example.com',
+            recipients='recipient@example.com',
+            received_at='2024-01-01T00:00:00Z',
+            html_content='<p>' + 'x' * 1000 + '</p>',
+            status=EmailStatus.FETCHED.value,
+        )
+
+    def test_save_without_status_skips_transition_lookup(self):
+        self.email.summary_title = 'Updated'
+
+        with CaptureQueriesContext(connection) as queries:
+            self.email.save(update_fields=['summary_title', 'updated_at'])
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertTrue(
+            queries.captured_queries[0]['sql'].startswith('UPDATE')
+        )
+
+    def test_save_with_status_loads_only_status_column(self):
+        self.email.status = EmailStatus.PROCESSING.value
+
+        with CaptureQueriesContext(connection) as queries:
+            self.email.save(update_fields=['status', 'updated_at'])
+
+        lookup = queries.captured_queries[0]['sql']
+        self.assertTrue(lookup.startswith('SELECT'))
+        self.assertNotIn('html_content', lookup)
+        self.assertNotIn('metadata', lookup)
+
+    def test_save_rejects_invalid_transition(self):
+        self.email.status = EmailStatus.SUCCESS.value
+
+        with self.assertRaises(ValidationError):
+            self.email.save(update_fields=['status'])
+
+    def test_set_status_is_a_single_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.email.set_status(EmailStatus.PROCESSING.value)
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, EmailStatus.PROCESSING.value)
+
+    def test_set_status_compares_against_stored_status(self):
+        # Another worker already finished the email.
+        EmailMessage.objects.filter(pk=self.email.pk).update(
+            status=EmailStatus.PROCESSING.value
+        )
+        EmailMessage.objects.filter(pk=self.email.pk).update(
+            status=EmailStatus.SUCCESS.value
+        )
+
+        with self.assertRaises(ValidationError):
+            self.email.set_status(EmailStatus.FAILED.value, 'late failure')
+
+        self.assertEqual(self.email.status, EmailStatus.FETCHED.value)
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, EmailStatus.SUCCESS.value)
+        self.assertEqual(self.email.error_message, '')
+
+    def test_compare_and_set_status_writes_extra_fields(self):
+        self.email.set_status(EmailStatus.PROCESSING.value)
+
+        self.assertTrue(
+            self.email.compare_and_set_status(
+                EmailStatus.FAILED.value, error_message='boom'
+            )
+        )
+        self.assertFalse(
+            self.email.compare_and_set_status(EmailStatus.SUCCESS.value)
+        )
+
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, EmailStatus.FAILED.value)
+        self.assertEqual(self.email.error_message, 'boom')
@@ -0,0 +1,153 @@
+"""
+Unit tests for the batch email workflow task.
+"""
+
+from uuid import uuid4
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from threadline.models import EmailMessage
+from threadline.services.merge_workflow import enqueue_workflow_batch
+from threadline.state_machine import EmailStatus
+from threadline.tasks.email_workflow import process_email_workflow_batch
+
+
+class EmailWorkflowBatchTaskTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="batch-test-user",
+            email="batch-test@example.com",
+            password="password123",
+        )
+        self.other_user = User.objects.create_user(
+            username="batch-test-user-2",
+            email="batch-test-2@example.com",
+            password="password123",
+        )
+
+    def _create_email(self, user=None, **kwargs) -> EmailMessage:
+        defaults = {
+            "user": user or self.user,
+            "message_id": f"<{uuid4().hex}@example.com>",
+            "subject": "Batch test",
+            "sender": "sender@example.com",
+            "recipients": "recipient@example.com",
+            "received_at": timezone.now(),
+            "text_content": "Hello world",
+            "status": EmailStatus.FAILED.value,
+        }
+        defaults.update(kwargs)
+        return EmailMessage.objects.create(**defaults)
+
+    @patch("threadline.tasks.email_workflow.release_task_lock")
+    @patch(
+        "threadline.tasks.email_workflow.acquire_task_lock",
+        return_value=True,
+    )
+    @patch("threadline.tasks.email_workflow.run_traced_email_workflow")
+    @patch(
+        "threadline.agents.nodes.workflow_prepare.WorkflowPrepareNode."
+        "load_shared_context"
+    )
+    def test_batch_loads_shared_context_once_per_user(
+        self,
+        mock_load_context,
+        mock_run,
+        _mock_acquire,
+        mock_release,
+    ):
+        first = self._create_email()
+        second = self._create_email()
+        third = self._create_email(user=self.other_user)
+        mock_load_context.side_effect = lambda state: {
+            "prompt_config": {"scene": "chat"},
+        }
+        mock_run.side_effect = [
+            {"success": True, "error": None},
+            {"success": False, "error": "boom"},
+            {"success": True, "error": None},
+        ]
+
+        summary = process_email_workflow_batch.run(
+            [str(first.id), str(second.id), str(third.id), "999999"],
+            force=True,
+            trigger_source="test_batch",
+            max_concurrency=1,
+        )
+
+        assert mock_load_context.call_count == 2
+        assert mock_run.call_count == 3
+        assert all(
+            call.kwargs["shared_context"] == {"prompt_config": {"scene": "chat"}}
+            for call in mock_run.call_args_list
+        )
+        assert mock_release.call_count == 3
+        assert summary["total"] == 4
+        assert summary["success_count"] == 2
+        assert summary["failure_count"] == 1
+        assert summary["not_found_count"] == 1
+        assert summary["emails_per_sec"] is not None
+        assert [item["status"] for item in summary["results"]] == [
+            "success",
+            "failed",
+            "success",
+            "not_found",
+        ]
+
+    @patch("threadline.tasks.email_workflow.release_task_lock")
+    @patch(
+        "threadline.tasks.email_workflow.acquire_task_lock",
+        return_value=False,
+    )
+    @patch("threadline.tasks.email_workflow.run_traced_email_workflow")
+    @patch(
+        "threadline.agents.nodes.workflow_prepare.WorkflowPrepareNode."
+        "load_shared_context",
+        return_value={},
+    )
+    def test_batch_skips_emails_locked_by_another_run(
+        self,
+        _mock_load_context,
+        mock_run,
+        _mock_acquire,
+        mock_release,
+    ):
+        email = self._create_email()
+
+        summary = process_email_workflow_batch.run(
+            [str(email.id)], max_concurrency=1
+        )
+
+        mock_run.assert_not_called()
+        mock_release.assert_not_called()
+        assert summary["skipped_count"] == 1
+
+    @patch(
+        "threadline.tasks.email_workflow.process_email_workflow_batch.delay"
+    )
+    def test_enqueue_workflow_batch_marks_processing_and_queues_once(
+        self,
+        mock_delay,
+    ):
+        first = self._create_email()
+        second = self._create_email()
+
+        results = enqueue_workflow_batch(
+            [first, second],
+            force=True,
+            trigger_source="api_batch_retry",
+        )
+
+        first.refresh_from_db()
+        assert first.status == EmailStatus.PROCESSING.value
+        assert [item["status"] for item in results] == ["success", "success"]
+        mock_delay.assert_called_once_with(
+            [str(first.id), str(second.id)],
+            force=True,
+            language=None,
+            scene=None,
+            trigger_source="api_batch_retry",
+        )
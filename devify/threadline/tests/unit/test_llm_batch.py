@@ -0,0 +1,342 @@
+"""Unit tests for deferred provider batch execution of LLM nodes."""
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+
+from threadline.agents.email_state import EmailState
+from threadline.agents.llm_batch import (
+    collect_batch_interrupts,
+    is_llm_batch_enabled,
+)
+from threadline.agents.nodes.llm_email_node import LLMEmailNode
+from threadline.agents.nodes.summary_node import SummaryNode
+from threadline.models import EmailMessage, LLMBatchJob, LLMBatchRequest
+from threadline.services.llm_batch import (
+    LLMBatchClient,
+    build_resume_value,
+    cleanup_finished_batches,
+    list_ready_threads,
+    poll_batch_jobs,
+    refresh_waiting_checkpoints,
+    register_deferred_requests,
+    submit_pending_requests,
+)
+from threadline.tests.fixtures.llm_batch_stub import LLMBatchStubServer
+
+BATCH_SETTINGS = {
+    "enabled": True,
+    "trigger_sources": ["command_batch"],
+    "nodes": ["llm_email", "summary"],
+    "api_base": "",
+    "completion_window": "24h",
+    "max_requests_per_job": 1000,
+}
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "llm-batch-tests",
+    }
+}
+
+
+def _state(**overrides):
+    state = {
+        "id": "1",
+        "subject": "Release plan",
+        "text_content": "Release on Friday after QA sign-off.",
+        "llm_content": "",
+        "attachments": [],
+        "user_timezone": "UTC",
+        "trigger_source": "command_batch",
+        "text_llm_model": "gpt-4o-mini",
+        "prompt_config": {
+            "email_content_prompt": "Normalize the email.",
+            "summary_prompt": "Summarize the email.",
+            "summary_title_prompt": "Write a title.",
+        },
+        "node_errors": {},
+        "force": False,
+    }
+    state.update(overrides)
+    return state
+
+
+def _single_node_graph(name, node):
+    workflow = StateGraph(EmailState)
+    workflow.add_node(name, node)
+    workflow.add_edge(START, name)
+    workflow.add_edge(name, END)
+    return workflow.compile(checkpointer=InMemorySaver())
+
+
+def _config(thread_id):
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": "email_processing",
+        }
+    }
+
+
+@override_settings(THREADLINE_LLM_BATCH=BATCH_SETTINGS)
+def test_batch_mode_requires_listed_node_and_trigger_source():
+    assert is_llm_batch_enabled(_state(), "llm_email")
+    assert not is_llm_batch_enabled(_state(), "metadata")
+    assert not is_llm_batch_enabled(
+        _state(trigger_source="api_retry"), "llm_email"
+    )
+    assert not is_llm_batch_enabled(
+        _state(task_config={"llm_batch": {"enabled": False}}), "summary"
+    )
+
+
+@override_settings(
+    THREADLINE_LLM_BATCH=BATCH_SETTINGS, ENABLE_COST_TRACKING=True
+)
+def test_llm_email_node_interrupts_and_resumes_with_batch_result():
+    graph = _single_node_graph("llm_email", LLMEmailNode())
+    config = _config("email_workflow_test_llm")
+
+    result = graph.invoke(_state(), config=config)
+
+    payloads = collect_batch_interrupts(result)
+    assert len(payloads) == 1
+    assert payloads[0]["node_name"] == "llm_email_node"
+    request = payloads[0]["requests"]["content"]
+    assert request["body"]["model"] == "gpt-4o-mini"
+    assert request["body"]["messages"][0]["content"] == (
+        "Normalize the email."
+    )
+
+    resumed = graph.invoke(
+        Command(
+            resume={
+                "content": {
+                    "content": "Deferred body",
+                    "usage": {"model": "gpt-4o-mini", "total_tokens": 15},
+                }
+            }
+        ),
+        config=config,
+    )
+
+    assert "__interrupt__" not in resumed
+    assert resumed["llm_content"] == "Deferred body"
+    assert resumed["llm_calls"][-1]["execution_mode"] == "batch"
+    assert resumed["node_errors"] == {}
+
+
+@override_settings(THREADLINE_LLM_BATCH=BATCH_SETTINGS)
+def test_summary_node_defers_title_and_json_in_one_interrupt():
+    graph = _single_node_graph("summary", SummaryNode())
+    config = _config("email_workflow_test_summary")
+
+    result = graph.invoke(
+        _state(llm_content="Release on Friday."), config=config
+    )
+
+    payloads = collect_batch_interrupts(result)
+    assert sorted(payloads[0]["requests"]) == ["summary", "title"]
+    assert payloads[0]["requests"]["summary"]["json_mode"] is True
+
+    resumed = graph.invoke(
+        Command(
+            resume={
+                "title": {"content": "Release plan", "usage": {}},
+                "summary": {
+                    "content": '{"details": "Ship Friday", "todos": []}',
+                    "usage": {},
+                },
+            }
+        ),
+        config=config,
+    )
+
+    assert resumed["summary_title"] == "Release plan"
+    assert resumed["summary_data"]["details"] == "Ship Friday"
+
+
+@pytest.mark.django_db
+class TestLLMBatchService:
+    @pytest.fixture
+    def email(self):
+        user = User.objects.create_user(
+            username=f"batch-{uuid4().hex[:8]}", password="password123"
+        )
+        return EmailMessage.objects.create(
+            user=user,
+            message_id=f"<{uuid4().hex}@example.com>",
+            subject="Batch",
+            sender="sender@example.com",
+            recipients="recipient@example.com",
+            received_at=timezone.now(),
+            text_content="Hello",
+        )
+
+    @staticmethod
+    def _payload(node_name, keys):
+        return {
+            "kind": "llm_batch",
+            "node_name": node_name,
+            "llm_config_uuid": None,
+            "requests": {
+                key: {
+                    "body": {
+                        "messages": [{"role": "user", "content": key}],
+                    },
+                    "json_mode": False,
+                }
+                for key in keys
+            },
+        }
+
+    def test_stub_round_trip_resumes_thread_once(self, email):
+        def responder(body):
+            if body["messages"][0]["content"] == "broken":
+                raise ValueError("content filtered")
+            return f"answer:{body['model']}"
+
+        register_deferred_requests(
+            email,
+            "email_workflow_1",
+            [self._payload("summary_node", ["title", "broken"])],
+        )
+
+        with LLMBatchStubServer(
+            responder, complete_after_polls=2
+        ) as stub:
+
+            def client_factory(_uuid):
+                return LLMBatchClient(stub.api_base), "stub-model"
+
+            submitted = submit_pending_requests(client_factory=client_factory)
+            assert submitted["submitted_count"] == 2
+            assert len(submitted["jobs"]) == 1
+
+            first_poll = poll_batch_jobs(client_factory=client_factory)
+            assert first_poll["ready_threads"] == []
+
+            second_poll = poll_batch_jobs(client_factory=client_factory)
+
+        assert second_poll["ready_threads"] == ["email_workflow_1"]
+        job = LLMBatchJob.objects.get()
+        assert job.status == LLMBatchJob.JobStatus.COMPLETED
+        assert job.request_count == 2
+
+        resume_value = build_resume_value("email_workflow_1")
+        assert resume_value["email_id"] == email.id
+        assert resume_value["resume"]["title"]["content"] == (
+            "answer:stub-model"
+        )
+        assert resume_value["resume"]["title"]["usage"]["total_tokens"] == 15
+        assert resume_value["resume"]["broken"] == {
+            "error": "content filtered"
+        }
+        assert build_resume_value("email_workflow_1") is None
+
+    def test_thread_is_not_ready_while_requests_are_open(self, email):
+        register_deferred_requests(
+            email,
+            "email_workflow_2",
+            [self._payload("llm_email_node", ["content"])],
+        )
+
+        assert build_resume_value("email_workflow_2") is None
+        assert (
+            LLMBatchRequest.objects.get().status
+            == LLMBatchRequest.RequestStatus.PENDING
+        )
+
+    @override_settings(
+        THREADLINE_LLM_BATCH={**BATCH_SETTINGS, "max_submit_attempts": 2}
+    )
+    def test_failed_submissions_give_up_after_max_attempts(self, email):
+        register_deferred_requests(
+            email,
+            "email_workflow_3",
+            [self._payload("summary_node", ["title"])],
+        )
+
+        def client_factory(_uuid):
+            raise RuntimeError("no api key")
+
+        first = submit_pending_requests(client_factory=client_factory)
+        assert (first["failed_count"], first["given_up_count"]) == (1, 0)
+        assert list_ready_threads() == []
+
+        second = submit_pending_requests(client_factory=client_factory)
+        assert second["given_up_count"] == 1
+        request = LLMBatchRequest.objects.get()
+        assert request.status == LLMBatchRequest.RequestStatus.FAILED
+        assert request.submit_attempts == 2
+        assert "no api key" in request.error_message
+        assert list_ready_threads() == ["email_workflow_3"]
+        assert build_resume_value("email_workflow_3")["resume"]["title"][
+            "error"
+        ].startswith("Batch submission failed after 2 attempts")
+
+    def test_waiting_checkpoints_are_refreshed_once_per_interval(
+        self, email, settings
+    ):
+        settings.CACHES = LOCMEM_CACHES
+        cache.clear()
+        register_deferred_requests(
+            email,
+            "email_workflow_4",
+            [self._payload("summary_node", ["title", "summary"])],
+        )
+        register_deferred_requests(
+            email,
+            "email_workflow_5",
+            [self._payload("summary_node", ["title"])],
+        )
+        LLMBatchRequest.objects.filter(thread_id="email_workflow_5").update(
+            resumed_at=timezone.now()
+        )
+
+        class FakeCheckpointManager:
+            refreshed = []
+
+            def refresh_thread_ttl(self, thread_id):
+                self.refreshed.append(thread_id)
+                return True
+
+        manager = FakeCheckpointManager()
+        assert refresh_waiting_checkpoints(manager) == 1
+        assert refresh_waiting_checkpoints(manager) == 0
+        assert manager.refreshed == ["email_workflow_4"]
+
+    def test_cleanup_removes_rows_of_old_resumed_threads(self, email):
+        register_deferred_requests(
+            email,
+            "email_workflow_6",
+            [self._payload("summary_node", ["title"])],
+        )
+        register_deferred_requests(
+            email,
+            "email_workflow_7",
+            [self._payload("summary_node", ["title"])],
+        )
+        old = timezone.now() - timedelta(days=10)
+        job = LLMBatchJob.objects.create(
+            provider_batch_id="batch_old", completed_at=old
+        )
+        LLMBatchRequest.objects.filter(thread_id="email_workflow_6").update(
+            batch_job=job, resumed_at=old
+        )
+
+        cutoff = timezone.now() - timedelta(days=3)
+        assert cleanup_finished_batches(cutoff) == 1
+        assert list(
+            LLMBatchRequest.objects.values_list("thread_id", flat=True)
+        ) == ["email_workflow_7"]
+        assert not LLMBatchJob.objects.exists()
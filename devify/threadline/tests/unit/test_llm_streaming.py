@@ -0,0 +1,184 @@
+"""Unit tests for streaming LLM calls with progress and output guard."""
+
+from unittest.mock import patch
+
+import pytest
+from django.test import override_settings
+
+from core.tracking.llm_tracker import LLMTracker
+from threadline.agents.llm_streaming import resolve_llm_streaming
+from threadline.agents.nodes.llm_email_node import LLMEmailNode
+
+USAGE = {
+    "model": "gpt-4o-mini",
+    "prompt_tokens": 12,
+    "completion_tokens": 40,
+    "total_tokens": 52,
+}
+
+STREAMING_SETTINGS = {
+    "enabled": True,
+    "nodes": ["llm_email", "summary"],
+    "progress_interval_sec": 0,
+    "max_output_tokens": {"llm_email": 8000, "summary": 4000},
+}
+
+
+class FakeStream:
+    """Generator-like stream of (kind, text) deltas with a final usage."""
+
+    def __init__(self, deltas, usage=None):
+        self._deltas = iter(deltas)
+        self._usage = usage
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration(None)
+        try:
+            return next(self._deltas)
+        except StopIteration:
+            raise StopIteration(self._usage)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_stream():
+    holder = {}
+
+    def install(deltas, usage=None):
+        holder["stream"] = FakeStream(deltas, usage)
+        return holder["stream"]
+
+    with patch(
+        "core.tracking.llm_tracker.ensure_default_llm_config"
+    ), patch(
+        "core.tracking.llm_tracker.AgentcoreLLMTracker.call_and_track",
+        side_effect=lambda **kwargs: holder["stream"],
+    ) as call:
+        install.call = call
+        yield install
+
+
+def _content_deltas(count, size=64):
+    return [("content", "x" * size) for _ in range(count)]
+
+
+def test_stream_reports_progress_and_returns_provider_usage(fake_stream):
+    fake_stream([("reasoning", "thinking")] + _content_deltas(3), USAGE)
+    progress = []
+
+    content, returned = LLMTracker.stream_and_track(
+        "Normalize.",
+        "Body",
+        on_progress=lambda tokens, elapsed: progress.append(tokens),
+        progress_interval_sec=0,
+    )
+
+    assert content == "x" * 192
+    assert returned == USAGE
+    assert len(progress) == 3
+    assert progress == sorted(progress)
+    assert fake_stream.call.call_args.kwargs["stream"] is True
+
+
+def test_progress_callbacks_are_bounded_by_interval(fake_stream):
+    fake_stream(_content_deltas(50), USAGE)
+    progress = []
+
+    LLMTracker.stream_and_track(
+        "Normalize.",
+        on_progress=lambda tokens, elapsed: progress.append(tokens),
+        progress_interval_sec=3600,
+    )
+
+    assert progress == []
+
+
+def test_output_guard_closes_stream_and_marks_truncated(fake_stream):
+    stream = fake_stream(_content_deltas(100))
+    state = {"llm_calls": []}
+
+    content, usage = LLMTracker.stream_and_track(
+        "Normalize.",
+        "Body",
+        state=state,
+        node_name="llm_email_node",
+        max_output_tokens=20,
+    )
+
+    assert stream.closed
+    assert len(content) < 64 * 100
+    assert usage["truncated"] is True
+    assert usage["estimated"] is True
+    assert usage["completion_tokens"] >= 20
+
+
+def test_json_mode_parses_streamed_content(fake_stream):
+    fake_stream(
+        [("content", '{"details": "Ship'), ("content", ' Friday"}')],
+        USAGE,
+    )
+
+    content, _usage = LLMTracker.stream_and_track(
+        "Summarize.", "Body", json_mode=True
+    )
+
+    assert content == {"details": "Ship Friday"}
+
+
+@override_settings(THREADLINE_LLM_STREAMING=STREAMING_SETTINGS)
+def test_resolve_streaming_respects_nodes_and_overrides():
+    options = resolve_llm_streaming({}, "summary")
+    assert options.max_output_tokens == 4000
+    assert options.expected_output_tokens == 4000
+
+    assert resolve_llm_streaming({}, "metadata") is None
+    assert (
+        resolve_llm_streaming(
+            {"task_config": {"llm_streaming": {"enabled": False}}},
+            "llm_email",
+        )
+        is None
+    )
+
+
+@override_settings(THREADLINE_LLM_STREAMING=STREAMING_SETTINGS)
+def test_llm_email_node_records_stream_progress_steps(fake_stream):
+    fake_stream(_content_deltas(2), USAGE)
+    steps = []
+
+    class Tracer:
+        def context_summary(self):
+            return ""
+
+        def append_task(self, action, message, payload):
+            steps.append((action, payload))
+
+    state = {
+        "id": "1",
+        "subject": "Release plan",
+        "text_content": "Release on Friday.",
+        "attachments": [],
+        "prompt_config": {"email_content_prompt": "Normalize the email."},
+        "node_errors": {},
+        "force": True,
+    }
+    with patch(
+        "threadline.agents.nodes.base_node.get_current_task_tracer",
+        return_value=Tracer(),
+    ):
+        result = LLMEmailNode()(state)
+
+    assert result["llm_content"] == "x" * 128
+    progress = [
+        payload for action, payload in steps if action == "LLM_CALL_PROGRESS"
+    ]
+    assert progress
+    assert all(0.25 <= p["progress_ratio"] <= 0.95 for p in progress)
+    assert progress[-1]["output_tokens"] > 0
@@ -0,0 +1,226 @@
+"""Unit tests for per-user merge micro-batching."""
+
+from datetime import timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+
+from threadline.models import EmailMessage
+from threadline.services import merge_batch
+from threadline.tasks.email_fetch import _queue_merge_for_saved_email
+from threadline.tasks.email_merge import process_user_merge_batch
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "merge-batch-tests",
+    }
+}
+
+BODY = (
+    "Please review the deployment runbook and the rollback plan before "
+    "the Friday release window and confirm the on-call rotation is "
+    "staffed for the weekend shift."
+)
+
+
+@pytest.fixture(autouse=True)
+def merge_batch_settings(settings):
+    settings.CACHES = LOCMEM_CACHES
+    settings.THREADLINE_EMAIL_MERGE = {
+        "micro_batch": True,
+        "batch_window_sec": 5,
+        "batch_max_size": 200,
+    }
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username=f"batch_{uuid4().hex[:8]}",
+        email="batch@example.com",
+        password="password123",
+    )
+
+
+def _create_email(user, received_at, **kwargs):
+    defaults = {
+        "user": user,
+        "message_id": f"<{uuid4().hex}@example.com>",
+        "subject": "Release checklist",
+        "sender": "sender@example.com",
+        "recipients": "recipient@example.com",
+        "received_at": received_at,
+        "text_content": BODY,
+        "status": "fetched",
+        "merge_pending": True,
+    }
+    defaults.update(kwargs)
+    return EmailMessage.objects.create(**defaults)
+
+
+@patch("threadline.tasks.email_merge.process_user_merge_batch.apply_async")
+@patch("threadline.tasks.email_fetch.process_email_merge.delay")
+def test_saved_emails_schedule_one_batch_per_window(
+    mock_merge_delay, mock_apply_async, user
+):
+    now = timezone.now()
+    first = _create_email(user, now)
+    second = _create_email(user, now + timedelta(seconds=1))
+
+    _queue_merge_for_saved_email(first)
+    _queue_merge_for_saved_email(second)
+
+    mock_apply_async.assert_called_once_with(args=[str(user.id)], countdown=5)
+    mock_merge_delay.assert_not_called()
+
+
+@patch("threadline.tasks.email_fetch.process_email_merge.delay")
+def test_saved_email_falls_back_when_batch_cannot_be_scheduled(
+    mock_merge_delay, user
+):
+    email = _create_email(user, timezone.now())
+
+    with patch.object(merge_batch.cache, "add", side_effect=ConnectionError):
+        _queue_merge_for_saved_email(email)
+
+    mock_merge_delay.assert_called_once_with(str(email.id))
+    email.refresh_from_db()
+    assert not email.merge_pending
+
+
+@pytest.mark.django_db(transaction=True)
+@patch("threadline.tasks.email_merge.process_email_merge.delay")
+@patch("threadline.tasks.email_merge.process_email_workflow.delay")
+def test_batch_reconciles_in_received_order(
+    mock_workflow_delay, mock_merge_delay, user
+):
+    now = timezone.now()
+    newest = _create_email(user, now)
+    oldest = _create_email(user, now - timedelta(minutes=2))
+    other_user = User.objects.create_user(username=f"other_{uuid4().hex[:8]}")
+    _create_email(other_user, now)
+
+    result = process_user_merge_batch(str(user.id))
+
+    assert result["email_count"] == 2
+    assert result["merged_count"] == 1
+    oldest.refresh_from_db()
+    newest.refresh_from_db()
+    assert {oldest.merged_into_id, newest.merged_into_id} in (
+        {None, oldest.id},
+        {None, newest.id},
+    )
+    queued = [call.args[0] for call in mock_workflow_delay.call_args_list]
+    assert queued == [str(oldest.id), str(newest.id)]
+    mock_merge_delay.assert_not_called()
+
+    # Claimed emails are unflagged, so the next batch does not reprocess
+    # them.
+    mock_workflow_delay.reset_mock()
+    assert process_user_merge_batch(str(user.id))["email_count"] == 0
+    mock_workflow_delay.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=True)
+@patch("threadline.tasks.email_merge.process_email_merge.delay")
+@patch("threadline.tasks.email_merge.process_email_workflow.delay")
+def test_batch_claims_emails_flagged_after_newer_ones(
+    mock_workflow_delay, mock_merge_delay, user
+):
+    now = timezone.now()
+    # Still writing its attachments when the first batch runs.
+    late = _create_email(user, now, merge_pending=False)
+    early = _create_email(
+        user, now + timedelta(seconds=1), subject="Standup notes"
+    )
+
+    result = process_user_merge_batch(str(user.id))
+    assert mock_workflow_delay.call_args_list[0].args == (str(early.id),)
+    assert result["email_count"] == 1
+
+    EmailMessage.objects.filter(pk=late.pk).update(merge_pending=True)
+    mock_workflow_delay.reset_mock()
+
+    result = process_user_merge_batch(str(user.id))
+    assert result["email_count"] == 1
+    mock_workflow_delay.assert_called_once_with(
+        str(late.id), trigger_source="merge_batch"
+    )
+    assert not EmailMessage.objects.filter(
+        user=user, merge_pending=True
+    ).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@patch("threadline.tasks.email_merge.process_email_merge.delay")
+@patch("threadline.tasks.email_merge.process_email_workflow.delay")
+def test_batch_falls_back_to_per_email_merge_on_error(
+    mock_workflow_delay, mock_merge_delay, user
+):
+    email = _create_email(user, timezone.now())
+
+    with patch(
+        "threadline.services.merge_batch.EmailMergeService.reconcile",
+        side_effect=RuntimeError("lock wait timeout"),
+    ):
+        result = process_user_merge_batch(str(user.id))
+
+    assert result["failed_count"] == 1
+    mock_workflow_delay.assert_not_called()
+    mock_merge_delay.assert_called_once_with(
+        str(email.id), trigger_source="merge_batch_fallback"
+    )
+    email.refresh_from_db()
+    assert not email.merge_pending
+
+
+@patch("threadline.tasks.email_merge.process_user_merge_batch.apply_async")
+def test_running_batch_reschedules_instead_of_overlapping(
+    mock_apply_async, user
+):
+    assert merge_batch.acquire_user_merge_batch(user.id)
+
+    result = process_user_merge_batch(str(user.id))
+
+    assert result["status"] == "rescheduled"
+    mock_apply_async.assert_called_once_with(args=[str(user.id)], countdown=5)
+
+
+@patch("threadline.tasks.scheduler.process_email_workflow.delay")
+@patch("threadline.tasks.scheduler.process_email_merge.delay")
+def test_stuck_email_reset_requeues_emails_of_lost_batches(
+    mock_merge_delay, mock_workflow_delay, user, settings
+):
+    from threadline.tasks.scheduler import (
+        schedule_reset_stuck_processing_emails,
+    )
+
+    now = timezone.now()
+    lost = _create_email(user, now)
+    lost_processing = _create_email(user, now, status="processing")
+    fresh = _create_email(user, now)
+    stale_at = now - timedelta(
+        seconds=5 + settings.TASK_TIMEOUT_MINUTES * 60 + 1
+    )
+    EmailMessage.objects.filter(
+        pk__in=[lost.pk, lost_processing.pk]
+    ).update(updated_at=stale_at)
+
+    result = schedule_reset_stuck_processing_emails(timeout_minutes=30)
+
+    mock_merge_delay.assert_called_once_with(
+        str(lost.id), trigger_source="merge_batch_sweep"
+    )
+    mock_workflow_delay.assert_not_called()
+    assert result["merge_requeued_count"] == 1
+    assert set(
+        EmailMessage.objects.filter(merge_pending=True).values_list(
+            "id", flat=True
+        )
+    ) == {fresh.id}
@@ -0,0 +1,155 @@
+"""Unit tests for the materialized merge clusters."""
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from threadline.models import EmailMessage, Issue
+from threadline.serializers.email_message import _collect_issue_cluster
+from threadline.services import ManualMergeService
+from threadline.services.merge_cluster import walk_merge_cluster
+from threadline.views.email_message import _serialize_issue_cluster
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username=f"cluster_{uuid4().hex[:8]}",
+        email="cluster@example.com",
+        password="password123",
+    )
+
+
+def _create_email(user, minutes_ago=0, **kwargs):
+    defaults = {
+        "user": user,
+        "message_id": f"<{uuid4().hex}@example.com>",
+        "subject": "Cluster",
+        "sender": "sender@example.com",
+        "recipients": "recipient@example.com",
+        "received_at": timezone.now() - timedelta(minutes=minutes_ago),
+        "text_content": "Hello",
+    }
+    defaults.update(kwargs)
+    return EmailMessage.objects.create(**defaults)
+
+
+def _merge(source, canonical):
+    source.merged_into = canonical
+    source.save(update_fields=["merged_into"])
+
+
+def _cluster_columns(*emails):
+    rows = {
+        email_id: (root_id, depth)
+        for email_id, root_id, depth in EmailMessage.objects.filter(
+            pk__in=[email.id for email in emails]
+        ).values_list("id", "cluster_root_id", "cluster_depth")
+    }
+    return [rows[email.id] for email in emails]
+
+
+def test_merging_a_cluster_head_re_roots_its_members(user):
+    leaf = _create_email(user, minutes_ago=3)
+    middle = _create_email(user, minutes_ago=2)
+    head = _create_email(user, minutes_ago=1)
+
+    _merge(leaf, middle)
+    assert _cluster_columns(leaf, middle) == [(middle.id, 1), (None, 0)]
+
+    _merge(middle, head)
+    assert _cluster_columns(leaf, middle, head) == [
+        (head.id, 2),
+        (head.id, 1),
+        (None, 0),
+    ]
+
+
+def test_manual_merge_materializes_the_new_cluster(user):
+    first = _create_email(user, minutes_ago=2)
+    second = _create_email(user, minutes_ago=1)
+    child = _create_email(user, minutes_ago=3)
+    _merge(child, second)
+
+    result = ManualMergeService().merge(
+        user=user, source_messages=[first, second]
+    )
+
+    canonical = result.canonical_message
+    assert _cluster_columns(canonical, first, second, child) == [
+        (None, 0),
+        (canonical.id, 1),
+        (canonical.id, 1),
+        (canonical.id, 2),
+    ]
+
+
+def test_deleting_a_cluster_head_splits_the_cluster(user):
+    leaf = _create_email(user, minutes_ago=3)
+    middle = _create_email(user, minutes_ago=2)
+    head = _create_email(user, minutes_ago=1)
+    _merge(leaf, middle)
+    _merge(middle, head)
+
+    head.delete()
+
+    assert _cluster_columns(leaf, middle) == [(middle.id, 1), (None, 0)]
+
+
+def test_walk_merge_cluster_keeps_recursive_walk_order(user):
+    head = _create_email(user, minutes_ago=1)
+    older = _create_email(user, minutes_ago=5)
+    newer = _create_email(user, minutes_ago=2)
+    grandchild = _create_email(user, minutes_ago=6)
+    _merge(older, head)
+    _merge(newer, head)
+    _merge(grandchild, older)
+
+    older = EmailMessage.objects.get(pk=older.pk)
+    nodes = walk_merge_cluster(older)
+
+    assert [(node.id, depth) for node, depth in nodes] == [
+        (older.id, 0),
+        (head.id, 1),
+        (newer.id, 2),
+        (grandchild.id, 1),
+    ]
+    assert nodes[0][0].merged_into is nodes[1][0]
+
+
+def test_issue_cluster_serializers_load_cluster_in_fixed_queries(
+    user, django_assert_num_queries
+):
+    head = _create_email(user, minutes_ago=1)
+    children = [_create_email(user, minutes_ago=2 + index) for index in range(4)]
+    for index, child in enumerate(children):
+        _merge(child, head if index == 0 else children[index - 1])
+        Issue.objects.create(
+            user=user,
+            email_message=child,
+            title="Issue",
+            description="Issue",
+            priority="low",
+            engine="jira",
+            external_id=f"REQ-{index}",
+        )
+    head = EmailMessage.objects.prefetch_related("issues").get(pk=head.pk)
+
+    # Cluster rows and their issues; the head keeps its own prefetch.
+    with django_assert_num_queries(2):
+        data = _serialize_issue_cluster(head)
+    with django_assert_num_queries(2):
+        cluster = _collect_issue_cluster(head)
+
+    assert data["node_count"] == 5
+    assert data["issue_count"] == 4
+    assert [node["depth"] for node in data["nodes"]] == [0, 1, 2, 3, 4]
+    assert [item["issue_external_id"] for item in cluster] == [
+        "REQ-0",
+        "REQ-1",
+        "REQ-2",
+        "REQ-3",
+    ]
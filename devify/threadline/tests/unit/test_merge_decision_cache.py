@@ -0,0 +1,147 @@
+"""Unit tests for memoized merge decisions."""
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+
+from threadline.models import EmailMessage
+from threadline.services import EmailMergeService
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "merge-decision-cache-tests",
+    }
+}
+
+BODY = (
+    "Please review the deployment runbook and the rollback plan before "
+    "the Friday release window and confirm the on-call rotation is "
+    "staffed for the weekend shift."
+)
+
+
+@pytest.fixture(autouse=True)
+def decision_cache_settings(settings):
+    settings.CACHES = LOCMEM_CACHES
+    settings.THREADLINE_EMAIL_MERGE = {
+        "decision_cache": True,
+        "decision_cache_ttl_sec": 60,
+    }
+    cache.clear()
+
+
+def _create_user():
+    return User.objects.create_user(username=f"memo_{uuid4().hex[:8]}")
+
+
+def _create_email(user, minutes_ago=0, **kwargs):
+    defaults = {
+        "user": user,
+        "message_id": f"<{uuid4().hex}@example.com>",
+        "subject": "Release checklist",
+        "sender": "sender@example.com",
+        "recipients": "recipient@example.com",
+        "received_at": timezone.now() - timedelta(minutes=minutes_ago),
+        "text_content": BODY,
+    }
+    defaults.update(kwargs)
+    return EmailMessage.objects.create(**defaults)
+
+
+@pytest.fixture
+def emails(db):
+    user = _create_user()
+    older = _create_email(user, minutes_ago=10)
+    newer = _create_email(user, minutes_ago=1)
+    return older, newer
+
+
+def test_repeat_decision_is_served_from_cache(emails):
+    older, newer = emails
+    service = EmailMergeService()
+
+    first = service.decide(newer)
+    second = service.decide(newer)
+
+    assert first.stats["cached"] is False
+    assert second.stats["cached"] is True
+    # Only the target and sources are reloaded; no candidate scan.
+    assert second.stats["queries"] == 1
+    assert second.stats["candidates"] == 0
+    assert second.target.id == first.target.id == older.id
+    assert second.reason == first.reason
+    assert [s.id for s in second.sources] == [s.id for s in first.sources]
+
+
+def test_insert_in_user_window_invalidates_cached_decision(
+    emails, django_capture_on_commit_callbacks
+):
+    older, newer = emails
+    service = EmailMergeService()
+    service.decide(newer)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _create_email(_create_user(), subject="Other user")
+    assert service.decide(newer).stats["cached"] is True
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        _create_email(older.user, minutes_ago=5, subject="Unrelated")
+    # The version is only bumped once the insert commits.
+    assert service.decide(newer).stats["cached"] is True
+
+    for callback in callbacks:
+        callback()
+    assert service.decide(newer).stats["cached"] is False
+
+
+def test_retry_after_reconcile_hits_cache(
+    emails, django_capture_on_commit_callbacks
+):
+    older, newer = emails
+    service = EmailMergeService()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _, decision = service.reconcile(newer)
+    assert decision.should_merge
+    older.refresh_from_db()
+    assert older.merged_into_id == newer.id
+
+    newer.refresh_from_db()
+    _, retried = service.reconcile(newer)
+    assert retried.stats["cached"] is True
+    assert retried.target.id == older.id
+
+
+def test_no_merge_retry_hits_cache(db, django_capture_on_commit_callbacks):
+    user = _create_user()
+    lone = _create_email(user, subject="Lunch", text_content="Pizza")
+    other = _create_email(user, subject="Invoice", text_content="Attached")
+    service = EmailMergeService()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _, decision = service.reconcile(lone)
+    assert not decision.should_merge
+
+    # Reconciling another canonical email does not bump the version.
+    with django_capture_on_commit_callbacks(execute=True):
+        service.reconcile(other)
+
+    lone.refresh_from_db()
+    with django_capture_on_commit_callbacks(execute=True):
+        _, retried = service.reconcile(lone)
+    assert retried.stats["cached"] is True
+
+
+def test_decisions_are_not_cached_when_disabled(emails, settings):
+    settings.THREADLINE_EMAIL_MERGE = {"decision_cache": False}
+    _, newer = emails
+    service = EmailMergeService()
+
+    service.decide(newer)
+
+    assert service.decide(newer).stats["cached"] is False
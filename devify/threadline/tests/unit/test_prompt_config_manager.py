@@ -1,10 +1,15 @@
 """
-Unit tests for prompt config runtime metadata preservation.
+Unit tests for prompt config runtime metadata preservation and caching.
 """
 
+import os
+
 import pytest
 
-from threadline.utils.prompt_config_manager import PromptConfigManager
+from threadline.utils.prompt_config_manager import (
+    PromptConfigManager,
+    get_prompt_config_manager,
+)
 
 
 class TestPromptConfigManager:
@@ -91,3 +96,99 @@ common:
         )
         assert "headings or labels" in config["image_intent_prompt"]
         assert config["email_content_prompt"].startswith("Respond in ")
+
+    def test_get_prompt_config_is_memoized_per_scene_and_language(
+        self,
+        prompt_config_dir,
+    ):
+        manager = PromptConfigManager()
+
+        first = manager.get_prompt_config("chat", "zh")
+        first["summary_prompt"] = "mutated by caller"
+        second = manager.get_prompt_config("chat", "zh")
+
+        assert second["summary_prompt"].startswith("Summarize in Chinese")
+        assert list(manager._prompt_config_cache) == [("chat", "zh")]
+        assert manager.get_prompt_config("chat", "en")["language"] == "en-US"
+
+    def test_reload_if_changed_picks_up_edited_prompt_files(
+        self,
+        prompt_config_dir,
+    ):
+        manager = PromptConfigManager()
+        version = manager.version
+        assert manager.get_prompt_config("chat", "en")[
+            "email_content_prompt"
+        ] == "Respond in English"
+
+        chat_path = prompt_config_dir / "prompts" / "chat.yaml"
+        chat_path.write_text(
+            'common:\n  email_content_prompt: "Reply in {language}"\n',
+            encoding="utf-8",
+        )
+        stat = chat_path.stat()
+        os.utime(chat_path, (stat.st_atime, stat.st_mtime + 10))
+
+        assert manager.reload_if_changed(force_check=True) is True
+        assert manager.get_prompt_config("chat", "en")[
+            "email_content_prompt"
+        ] == "Reply in English"
+        assert manager.version != version
+        assert manager.reload_if_changed(force_check=True) is False
+
+    def test_version_does_not_change_as_scenes_load(
+        self,
+        prompt_config_dir,
+    ):
+        manager = PromptConfigManager()
+        version = manager.version
+
+        manager.get_prompt_config("chat", "en")
+
+        assert manager.version == version
+        assert PromptConfigManager().version == version
+
+    def test_edits_to_unloaded_scenes_are_picked_up(
+        self,
+        prompt_config_dir,
+    ):
+        manager = PromptConfigManager()
+        version = manager.version
+
+        chat_path = prompt_config_dir / "prompts" / "chat.yaml"
+        stat = chat_path.stat()
+        os.utime(chat_path, (stat.st_atime, stat.st_mtime + 10))
+
+        assert manager.reload_if_changed(force_check=True) is True
+        assert manager.version != version
+
+    def test_shared_manager_is_reused_per_config_dir(
+        self,
+        prompt_config_dir,
+        tmp_path,
+        monkeypatch,
+    ):
+        manager = get_prompt_config_manager()
+
+        assert get_prompt_config_manager() is manager
+
+        other_dir = tmp_path / "other"
+        other_dir.mkdir()
+        for name in ("languages.yaml", "scenarios.yaml"):
+            (other_dir / name).write_text(
+                (prompt_config_dir / name).read_text(encoding="utf-8"),
+                encoding="utf-8",
+            )
+        (other_dir / "prompts").mkdir()
+        (other_dir / "prompts" / "default.yaml").write_text(
+            (prompt_config_dir / "prompts" / "default.yaml").read_text(
+                encoding="utf-8"
+            ),
+            encoding="utf-8",
+        )
+        monkeypatch.setattr(
+            "threadline.utils.prompt_config_manager.settings.THREADLINE_CONFIG_PATH",
+            str(other_dir),
+        )
+
+        assert get_prompt_config_manager() is not manager
@@ -0,0 +1,177 @@
+"""Unit tests for token-budgeted prompt context building."""
+
+from django.test import override_settings
+
+from threadline.agents.nodes.image_intent_node import ImageIntentNode
+from threadline.agents.nodes.summary_node import SummaryNode
+from threadline.agents.prompt_context import (
+    TRUNCATION_MARKER,
+    build_budgeted_context,
+    estimate_tokens,
+    fit_text_to_budget,
+    resolve_model_family,
+    resolve_token_budget,
+    strip_signature,
+    trim_quoted_replies,
+)
+
+REPLY_BODY = (
+    "Thanks, the fix works on staging.\n"
+    "Please deploy tomorrow.\n"
+    "\n"
+    "On Mon, Apr 14, 2025 at 9:00 AM Bob <bob@example.com> wrote:\n"
+    "> Can you verify the login fix?\n"
+    "> " + "Old quoted discussion. " * 200 + "\n"
+)
+
+SIGNED_BODY = (
+    "Meeting moved to 3pm.\n"
+    "\n"
+    "-- \n"
+    "Alice Example\n"
+    "Senior Engineer, Example Corp\n"
+    "+1 555 0100\n"
+)
+
+
+def test_estimate_tokens_uses_model_family_ratios():
+    text = "a" * 400
+
+    assert estimate_tokens("") == 0
+    assert estimate_tokens(text, "gpt-4o-mini") == 100
+    assert estimate_tokens(text, "claude-3-5-sonnet") > 100
+    assert estimate_tokens("测试" * 50, "gpt-4o") == 100
+    assert estimate_tokens("测试" * 50, "qwen-plus") < 100
+
+
+def test_resolve_model_family_handles_provider_prefixes():
+    assert resolve_model_family("openai/gpt-4o") == "openai"
+    assert resolve_model_family("dashscope/qwen-max") == "qwen"
+    assert resolve_model_family(None) == "default"
+
+
+def test_trim_quoted_replies_drops_reply_chain():
+    trimmed = trim_quoted_replies(REPLY_BODY)
+
+    assert "Please deploy tomorrow." in trimmed
+    assert "wrote:" not in trimmed
+    assert "Old quoted discussion" not in trimmed
+
+
+def test_trim_quoted_replies_drops_outlook_header_block():
+    body = (
+        "Approved, go ahead.\n"
+        "\n"
+        "From: Bob <bob@example.com>\n"
+        "Sent: Monday, April 14, 2025 9:00 AM\n"
+        "To: Alice <alice@example.com>\n"
+        "Subject: Budget\n"
+        "\n"
+        "Old quoted discussion.\n"
+    )
+
+    assert trim_quoted_replies(body) == "Approved, go ahead."
+
+
+def test_trim_quoted_replies_keeps_from_lines_in_prose():
+    body = (
+        "Quarterly numbers are in.\n"
+        "From: the finance team, with thanks to everyone involved.\n"
+        "Revenue grew 12% over the last quarter.\n"
+    )
+
+    assert trim_quoted_replies(body) == body
+
+
+def test_strip_signature_removes_trailing_block():
+    stripped = strip_signature(SIGNED_BODY)
+
+    assert stripped == "Meeting moved to 3pm."
+
+
+def test_fit_text_to_budget_trims_in_order():
+    fitted = fit_text_to_budget(REPLY_BODY, budget=200)
+
+    assert fitted.steps == ("quoted_replies",)
+    assert fitted.estimated_tokens <= 200
+    assert fitted.original_tokens > fitted.estimated_tokens
+
+
+def test_fit_text_to_budget_truncates_as_last_resort():
+    fitted = fit_text_to_budget("word " * 2000, budget=100)
+
+    assert fitted.steps == ("truncate",)
+    assert fitted.text.endswith(TRUNCATION_MARKER)
+    assert fitted.estimated_tokens <= 100
+
+
+def test_fit_text_to_budget_is_noop_without_budget():
+    fitted = fit_text_to_budget(REPLY_BODY, budget=None)
+
+    assert fitted.text == REPLY_BODY
+    assert not fitted.trimmed
+
+
+@override_settings(THREADLINE_PROMPT_TOKEN_BUDGETS={"summary": 500})
+def test_resolve_token_budget_prefers_task_config():
+    assert resolve_token_budget("summary") == 500
+    assert (
+        resolve_token_budget(
+            "summary", {"token_budgets": {"summary": 50}}
+        )
+        == 50
+    )
+    assert (
+        resolve_token_budget("summary", {"token_budgets": {"summary": 0}})
+        is None
+    )
+    assert resolve_token_budget("unknown") is None
+
+
+def test_build_budgeted_context_counts_reserved_text():
+    state = {"task_config": {"token_budgets": {"llm_email": 120}}}
+
+    fitted = build_budgeted_context(
+        state,
+        "llm_email",
+        "word " * 200,
+        reserved_text="x" * 200,
+    )
+
+    assert fitted.budget == 120
+    assert fitted.estimated_tokens <= 120 - estimate_tokens("x" * 200)
+
+
+def test_summary_prompt_context_applies_budget():
+    node = SummaryNode()
+    state = {
+        "subject": "Deploy",
+        "llm_content": REPLY_BODY,
+        "user_timezone": "UTC",
+        "prompt_config": {
+            "summary_prompt": "Summarize.",
+            "summary_title_prompt": "Title.",
+        },
+        "task_config": {"token_budgets": {"summary": 300}},
+    }
+
+    context = node._build_prompt_context(state)
+
+    assert "Please deploy tomorrow." in context
+    assert "Old quoted discussion" not in context
+    assert context.startswith("Subject: Deploy")
+
+
+def test_image_intent_context_applies_budget():
+    node = ImageIntentNode()
+    state = {
+        "subject": "Bug report",
+        "text_content": "Screenshot attached.\n" + "details " * 5000,
+        "task_config": {"token_budgets": {"image_intent": 200}},
+    }
+
+    context = node._build_conversation_context(state, "Explain the image.")
+
+    assert context.startswith("Subject: Bug report")
+    assert context.endswith(TRUNCATION_MARKER)
+    assert estimate_tokens(context) <= 200
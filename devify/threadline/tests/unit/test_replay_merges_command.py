@@ -0,0 +1,88 @@
+"""
+Unit tests for the replay_merges management command.
+"""
+
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from threadline.models import EmailMessage
+from ..fixtures.factories import EmailMessageFactory, UserFactory
+
+LONG_TEXT = (
+    "Please review the deployment runbook and the rollback plan before "
+    "the Friday release window and confirm the on-call rotation is "
+    "staffed for the weekend shift."
+)
+OTHER_TEXT = (
+    "The quarterly budget review moves to Thursday afternoon; please send "
+    "the updated forecasts and headcount plans to finance before Tuesday "
+    "so the numbers can be consolidated."
+)
+
+
+class ReplayMergesCommandTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory(username="replay-command-user")
+        now = timezone.now()
+        self.first = self._create_message(
+            subject="Release", text_content=LONG_TEXT, received_at=now
+        )
+        self.second = self._create_message(
+            subject="Release",
+            text_content=LONG_TEXT,
+            received_at=now + timedelta(minutes=5),
+        )
+        self.first.merged_into = self.second
+        self.first.merge_reason = EmailMessage.MergeReason.TEXT_SIMILARITY
+        self.first.save(update_fields=["merged_into", "merge_reason"])
+        # Recorded as separate conversations despite identical bodies.
+        self.third = self._create_message(
+            subject="Budget",
+            text_content=OTHER_TEXT,
+            received_at=now + timedelta(minutes=10),
+        )
+        self.fourth = self._create_message(
+            subject="Budget",
+            text_content=OTHER_TEXT,
+            received_at=now + timedelta(minutes=15),
+        )
+
+    def _create_message(self, **kwargs):
+        return EmailMessageFactory(user=self.user, **kwargs)
+
+    def test_replay_reports_accuracy_without_writing(self):
+        out = StringIO()
+
+        call_command("replay_merges", user=self.user.username, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("4 email(s)", output)
+        self.assertIn("Precision: 50.0% (1/2 pairs)", output)
+        self.assertIn("Recall: 100.0% (1/1 emails)", output)
+        self.assertIn("no changes were written", output)
+        self.first.refresh_from_db()
+        self.fourth.refresh_from_db()
+        self.assertEqual(self.first.merged_into_id, self.second.id)
+        self.assertIsNone(self.fourth.merged_into_id)
+
+    def test_json_report_includes_overrides_and_timings(self):
+        out = StringIO()
+
+        call_command(
+            "replay_merges",
+            user=self.user.username,
+            content_window_days=0,
+            json=True,
+            stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["overrides"], {"CONTENT_WINDOW_DAYS": 0})
+        self.assertEqual(report["emails"], 4)
+        self.assertEqual(report["merged"], 0)
+        self.assertEqual(report["timings"]["count"], 4)
@@ -0,0 +1,166 @@
+"""Unit tests for the per-user runtime context cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+
+from threadline.agents.nodes.workflow_prepare import WorkflowPrepareNode
+from threadline.models import EmailTodo, Settings
+from threadline.services import runtime_context
+from threadline.services.runtime_context import get_user_runtime_context
+from threadline.services.workflow_config import (
+    get_threadline_workflow_config,
+)
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "runtime-context-tests",
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def runtime_context_settings(settings, monkeypatch):
+    settings.CACHES = LOCMEM_CACHES
+    settings.THREADLINE_RUNTIME_CONTEXT = {"enabled": True, "ttl_sec": 60}
+    monkeypatch.setattr(runtime_context, "_cache_retry_at", 0.0)
+    cache.clear()
+
+
+def _loader():
+    return MagicMock(
+        side_effect=lambda: {"user_id": "1", "prompt_config": {"scene": "chat"}}
+    )
+
+
+def test_context_is_loaded_once_per_user_and_override():
+    loader = _loader()
+
+    first = get_user_runtime_context(1, loader)
+    second = get_user_runtime_context(1, loader)
+    get_user_runtime_context(1, loader, language="zh-CN")
+
+    assert first == second
+    assert loader.call_count == 2
+
+
+def test_failed_prompt_config_is_not_cached():
+    loader = MagicMock(return_value={"user_id": "1", "prompt_config": None})
+
+    get_user_runtime_context(1, loader)
+    get_user_runtime_context(1, loader)
+
+    assert loader.call_count == 2
+
+
+def test_disabled_cache_returns_none(settings):
+    settings.THREADLINE_RUNTIME_CONTEXT = {"enabled": False}
+    loader = _loader()
+
+    assert get_user_runtime_context(1, loader) is None
+    loader.assert_not_called()
+
+
+def test_cache_errors_fall_back_to_loader_and_back_off(monkeypatch):
+    loader = _loader()
+    monkeypatch.setattr(
+        runtime_context.cache,
+        "get_many",
+        MagicMock(side_effect=ConnectionError("down")),
+    )
+
+    get_user_runtime_context(1, loader)
+    get_user_runtime_context(1, loader)
+
+    assert loader.call_count == 2
+    assert runtime_context.cache.get_many.call_count == 1
+
+
+@pytest.mark.django_db
+def test_settings_change_invalidates_only_that_user(test_user):
+    loader = _loader()
+    get_user_runtime_context(test_user.id, loader)
+    get_user_runtime_context(test_user.id + 1, loader)
+
+    Settings.objects.create(
+        user=test_user, key="issue_config", value={"enable": False}
+    )
+    get_user_runtime_context(test_user.id, loader)
+    get_user_runtime_context(test_user.id + 1, loader)
+
+    assert loader.call_count == 3
+
+
+@pytest.mark.django_db
+def test_workflow_config_change_invalidates_every_user(test_user):
+    loader = _loader()
+    get_user_runtime_context(test_user.id, loader)
+
+    config = get_threadline_workflow_config()
+    config.task_config = {"llm_batch": {"enabled": False}}
+    config.save()
+    get_user_runtime_context(test_user.id, loader)
+
+    assert loader.call_count == 2
+
+
+@pytest.mark.django_db
+def test_llm_config_change_invalidates_every_user(test_user):
+    from agentcore_metering.adapters.django.models import LLMConfig
+
+    loader = _loader()
+    get_user_runtime_context(test_user.id, loader)
+
+    llm_config = LLMConfig.objects.create(
+        scope=LLMConfig.Scope.GLOBAL,
+        model_type=LLMConfig.MODEL_TYPE_LLM,
+        provider="openai",
+        config={"model": "gpt-4o"},
+    )
+    get_user_runtime_context(test_user.id, loader)
+    llm_config.delete()
+    get_user_runtime_context(test_user.id, loader)
+
+    assert loader.call_count == 3
+
+
+def test_prompt_config_change_invalidates_every_user(monkeypatch):
+    loader = _loader()
+    monkeypatch.setattr(runtime_context, "_prompt_version", lambda: "v1")
+    get_user_runtime_context(1, loader)
+    get_user_runtime_context(1, loader)
+
+    monkeypatch.setattr(runtime_context, "_prompt_version", lambda: "v2")
+    get_user_runtime_context(1, loader)
+
+    assert loader.call_count == 2
+
+
+@pytest.mark.django_db
+def test_prepare_loads_email_relations_in_one_prefetch(
+    test_email_message,
+    test_issue,
+    django_assert_max_num_queries,
+):
+    EmailTodo.objects.create(
+        user=test_email_message.user,
+        email_message=test_email_message,
+        content="Follow up",
+    )
+    node = WorkflowPrepareNode()
+
+    with django_assert_max_num_queries(6):
+        node.before_processing({"id": test_email_message.id})
+        todos = node._load_todos_data()
+        related_issue_keys = node._load_related_issue_keys()
+        issue_id = node._load_existing_issue_metadata(
+            trigger_source="api_retry"
+        )[0]
+        attachments = node._load_attachments_data()
+
+    assert [todo["content"] for todo in todos] == ["Follow up"]
+    assert related_issue_keys == [test_issue.external_id]
+    assert issue_id == test_issue.id
+    assert attachments == []
@@ -0,0 +1,166 @@
+"""Unit tests for the full-text search index."""
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from threadline.models import EmailAttachment, EmailMessage, SearchDocument
+from threadline.services.search import filter_by_search
+from threadline.utils.search_index import (
+    FullTextSearchBackend,
+    MySQLFulltextSearchBackend,
+    PostgresSearchBackend,
+    SQLiteFTS5SearchBackend,
+    get_search_backend,
+    parse_search_keywords,
+)
+
+# Search documents are written on commit.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _create_email(user, **kwargs):
+    defaults = {
+        "user": user,
+        "message_id": f"<{uuid4().hex}@example.com>",
+        "subject": "Weekly sync",
+        "sender": "alice@example.com",
+        "recipients": "team@example.com",
+        "received_at": timezone.now() - timedelta(minutes=1),
+        "text_content": "Agenda for the weekly sync.",
+    }
+    defaults.update(kwargs)
+    return EmailMessage.objects.create(**defaults)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username=f"search_{uuid4().hex[:8]}")
+
+
+def _search(user, search):
+    queryset = EmailMessage.objects.filter(user=user)
+    return set(
+        filter_by_search(
+            queryset, parse_search_keywords(search), user_id=user.id
+        ).values_list("id", flat=True)
+    )
+
+
+def test_updates_are_indexed_on_commit(user):
+    with transaction.atomic():
+        email = _create_email(user, subject="Planning")
+        assert _search(user, "planning") == {email.id}
+
+        email.summary_title = "Roadmap"
+        email.save(update_fields=["summary_title"])
+        email.save(update_fields=["status"])
+        assert _search(user, "roadmap") == set()
+
+    assert _search(user, "roadmap planning") == {email.id}
+
+
+def test_sqlite_uses_fts5_index():
+    backend = get_search_backend(connection)
+
+    assert isinstance(backend, SQLiteFTS5SearchBackend)
+    sql, params = backend.match_sql(["deploy", "plan"])
+    assert "MATCH" in sql
+    assert params == ['"deploy"* AND "plan"*']
+
+
+def test_postgres_splits_on_token_separators():
+    backend = PostgresSearchBackend(min_token_length=3)
+
+    sql, params = backend.match_sql(backend.keyword_tokens("report.pdf"))
+    assert "regexp_replace(document, '[@./:+-]', ' ', 'g')" in sql
+    assert params == ["report:* & pdf:*"]
+
+
+def test_mysql_stopwords_are_left_to_substring_match():
+    backend = MySQLFulltextSearchBackend(min_token_length=3)
+
+    assert backend.keyword_tokens("bob@example.com") == ["bob", "example"]
+    assert backend.keyword_tokens("www.com") is None
+    assert backend.keyword_tokens("with") is None
+
+
+def test_like_backend_never_builds_index_queries(settings):
+    settings.THREADLINE_SEARCH = {"backend": "like"}
+    backend = get_search_backend(connection)
+
+    assert not isinstance(backend, FullTextSearchBackend)
+    assert not hasattr(backend, "match_sql")
+    assert backend.keyword_tokens("deploy") is None
+
+
+def test_every_keyword_must_match_some_column(user):
+    both = _create_email(
+        user, subject="Deployment plan", summary_content="Rollback steps"
+    )
+    subject_only = _create_email(user, subject="Deployment notes")
+    _create_email(user, subject="Lunch", text_content="Pizza on Friday")
+
+    assert _search(user, "deploy") == {both.id, subject_only.id}
+    assert _search(user, "deploy, rollback") == {both.id}
+    assert _search(user, "DEPLOYMENT rollback missing") == set()
+
+
+def test_search_is_scoped_and_follows_saves(user):
+    email = _create_email(user, subject="Budget review")
+    other_user = User.objects.create_user(username=f"other_{uuid4().hex[:8]}")
+    _create_email(other_user, subject="Budget review")
+
+    assert _search(user, "budget") == {email.id}
+
+    email.llm_content = "Quarterly forecast"
+    email.save(update_fields=["llm_content"])
+    assert _search(user, "forecast") == {email.id}
+
+    email.delete()
+    assert _search(user, "budget") == set()
+    assert not SearchDocument.objects.filter(
+        kind=SearchDocument.Kind.EMAIL, object_id=email.id
+    ).exists()
+
+
+def test_keywords_outside_the_index_match_substrings(user):
+    email = _create_email(
+        user, subject="项目进度", sender="bob_smith@example.com"
+    )
+    other = _create_email(user, subject="Other", sender="bob@example.com")
+
+    # Non-ASCII and "_" keywords, short tokens, and multi-token keywords
+    # that must stay contiguous.
+    assert _search(user, "进度") == {email.id}
+    assert _search(user, "bob_smith") == {email.id}
+    assert _search(user, "smith@example.com") == {email.id}
+    assert _search(user, "ob") == {email.id, other.id}
+
+
+def test_attachment_search(user):
+    email = _create_email(user)
+    attachment = EmailAttachment.objects.create(
+        user=user,
+        email_message=email,
+        filename="Q3-report.pdf",
+        safe_filename="q3-report.pdf",
+        content_type="application/pdf",
+        file_size=10,
+        file_path="/tmp/q3-report.pdf",
+    )
+    queryset = EmailAttachment.objects.filter(email_message__user=user)
+
+    def search(keyword):
+        return filter_by_search(queryset, [keyword], user_id=user.id)
+
+    assert list(search("report.pdf")) == [attachment]
+    assert list(search("application")) == [attachment]
+    assert not search("image").exists()
+    # "q3" is below the minimum token length; "report" comes from the index.
+    assert list(search("q3-report")) == [attachment]
+    assert not search("q4-report").exists()
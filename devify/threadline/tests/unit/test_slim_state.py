@@ -0,0 +1,143 @@
+"""Unit tests for slim checkpoint state references."""
+
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from threadline.agents import state_refs
+from threadline.agents.nodes.base_node import BaseLangGraphNode
+from threadline.agents.state_refs import (
+    STATE_REF_KEY,
+    StateRefError,
+    resolve_state,
+    slim_state,
+)
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "slim-state-tests",
+    }
+}
+
+BODY = "Release notes " * 500
+
+
+def _state():
+    return {
+        "id": "42",
+        "subject": "Release",
+        "html_content": f"<p>{BODY}</p>",
+        "text_content": BODY,
+        "prompt_config": {"summary_prompt": "Summarize. " * 200},
+        "issue_config": {"enabled": False},
+        "attachments": [
+            {"id": "1", "filename": "a.png", "ocr_content": "pixels " * 400},
+        ],
+        "node_errors": {},
+    }
+
+
+@pytest.fixture(autouse=True)
+def slim_settings(settings):
+    settings.CACHES = LOCMEM_CACHES
+    settings.THREADLINE_CHECKPOINT = {
+        "slim_state": True,
+        "slim_min_bytes": 256,
+        "measure_bytes": True,
+    }
+    cache.clear()
+    state_refs._local_refs.clear()
+    yield
+    state_refs._local_refs.clear()
+
+
+def test_slim_state_references_bulky_fields_only():
+    slim = slim_state(_state())
+
+    assert STATE_REF_KEY in slim["html_content"]
+    assert STATE_REF_KEY in slim["text_content"]
+    assert STATE_REF_KEY in slim["prompt_config"]
+    assert STATE_REF_KEY in slim["attachments"][0]["ocr_content"]
+    # Small values stay inline.
+    assert slim["issue_config"] == {"enabled": False}
+    assert slim["subject"] == "Release"
+
+    assert resolve_state(slim) == _state()
+
+
+def test_resolve_falls_back_to_shared_cache_for_other_workers():
+    slim = slim_state(_state())
+    # A resumed run on another worker has an empty process-local cache.
+    state_refs._local_refs.clear()
+
+    assert resolve_state(slim)["prompt_config"] == _state()["prompt_config"]
+
+
+def test_expired_reference_raises():
+    slim = slim_state(_state())
+    state_refs._local_refs.clear()
+    cache.clear()
+
+    with pytest.raises(StateRefError):
+        resolve_state({"id": "42", "prompt_config": slim["prompt_config"]})
+
+
+def test_resolve_refreshes_reference_ttl():
+    slim = slim_state(_state())
+    state_refs._local_refs.clear()
+
+    with patch.object(cache, "touch", wraps=cache.touch) as touch:
+        resolve_state({"id": "42", "prompt_config": slim["prompt_config"]})
+        # Process-local hits within the refresh interval stay local.
+        resolve_state({"id": "42", "prompt_config": slim["prompt_config"]})
+
+    touch.assert_called_once()
+    assert touch.call_args.args[1] == 86400
+
+
+def test_checkpoint_bytes_are_not_measured_by_default(settings):
+    settings.THREADLINE_CHECKPOINT = {"slim_state": True}
+
+    state, size = state_refs.checkpoint_state(_state())
+
+    assert STATE_REF_KEY in state["text_content"]
+    assert size is None
+
+
+class EchoNode(BaseLangGraphNode):
+    def __init__(self):
+        super().__init__("echo_node")
+        self.seen = None
+
+    def execute_processing(self, state):
+        self.seen = state
+        return {**state, "summary_title": "Done"}
+
+
+def test_node_resolves_input_and_reports_checkpoint_bytes():
+    steps = []
+
+    class Tracer:
+        def context_summary(self):
+            return ""
+
+        def append_task(self, action, message, payload):
+            steps.append((action, payload))
+
+    node = EchoNode()
+    slim_input = slim_state(_state())
+    with patch(
+        "threadline.agents.nodes.base_node.get_current_task_tracer",
+        return_value=Tracer(),
+    ):
+        result = node(slim_input)
+
+    assert node.seen["text_content"] == BODY
+    assert STATE_REF_KEY in result["text_content"]
+    assert result["summary_title"] == "Done"
+
+    complete = dict(steps)["NODE_COMPLETE"]
+    full_bytes = len(state_refs._encode(_state()))
+    assert 0 < complete["checkpoint_bytes"] < full_bytes / 4
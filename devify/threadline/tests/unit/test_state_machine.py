@@ -12,6 +12,7 @@ from threadline.state_machine import (
     EmailStatus,
     can_transition_to,
     get_next_states,
+    get_previous_states,
     get_status_description,
     get_initial_email_status,
     EMAIL_STATE_MACHINE
@@ -116,6 +117,25 @@ class StateMachineTest(TestCase):
         actual_success_states = get_next_states('success', EMAIL_STATE_MACHINE)
         self.assertEqual(actual_success_states, expected_success_states)
 
+    def test_get_previous_states(self):
+        """
+        Test getting the states allowed before a target state.
+
+        Verifies that get_previous_states inverts get_next_states, as
+        used by the compare-and-set status update.
+        """
+        self.assertEqual(
+            set(get_previous_states('processing', EMAIL_STATE_MACHINE)),
+            {'fetched', 'failed', 'success'},
+        )
+        self.assertEqual(
+            get_previous_states('success', EMAIL_STATE_MACHINE),
+            ['processing'],
+        )
+        self.assertEqual(
+            get_previous_states('fetched', EMAIL_STATE_MACHINE), []
+        )
+
     def test_initial_states(self):
         """
         Test initial states for new objects.
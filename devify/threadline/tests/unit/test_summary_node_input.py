@@ -0,0 +1,117 @@
+"""Unit tests for SummaryNode input modes."""
+
+from threadline.agents.nodes.summary_node import (
+    SUMMARY_INPUT_COMPACT,
+    SUMMARY_INPUT_LLM_CONTENT,
+    SUMMARY_INPUT_RAW,
+    SummaryNode,
+)
+from threadline.agents.prompt_context import build_attachment_digest
+
+
+def _state(**overrides):
+    state = {
+        "subject": "Release plan",
+        "text_content": "See diagram [IMAGE: plan.png] for the timeline.",
+        "llm_content": "Release on Friday after QA sign-off.",
+        "user_timezone": "UTC",
+        "attachments": [
+            {
+                "id": "att-1",
+                "filename": "plan.png",
+                "safe_filename": "plan.png",
+                "is_image": True,
+                "llm_content": "Gantt chart with QA ending Thursday. " * 20,
+            }
+        ],
+        "prompt_config": {
+            "summary_prompt": "Summarize the email.",
+            "summary_title_prompt": "Write a title.",
+        },
+        "text_llm_config_uuid": "33333333-3333-3333-3333-333333333333",
+        "force": False,
+    }
+    state.update(overrides)
+    return state
+
+
+def test_summary_input_mode_defaults_to_llm_content():
+    node = SummaryNode()
+
+    assert node._summary_input_mode(_state()) == SUMMARY_INPUT_LLM_CONTENT
+    assert (
+        node._summary_input_mode(
+            _state(task_config={"summary_input_mode": "unknown"})
+        )
+        == SUMMARY_INPUT_LLM_CONTENT
+    )
+
+
+def test_compact_input_appends_attachment_digest():
+    node = SummaryNode()
+    state = _state()
+
+    summary_input = node._build_summary_input(state, SUMMARY_INPUT_COMPACT)
+
+    assert summary_input.startswith(state["llm_content"])
+    assert "Attachments:\n- plan.png: Gantt chart" in summary_input
+    assert len(summary_input) < len(
+        node._build_summary_input(state, SUMMARY_INPUT_RAW)
+    )
+
+
+def test_raw_input_expands_image_placeholders():
+    node = SummaryNode()
+
+    summary_input = node._build_summary_input(_state(), SUMMARY_INPUT_RAW)
+
+    assert "--- Attachment Content for plan.png ---" in summary_input
+    assert "Release on Friday" not in summary_input
+
+
+def test_attachment_digest_limits_items_and_length():
+    attachments = [
+        {"filename": f"file-{index}.pdf", "llm_content": "x" * 500}
+        for index in range(4)
+    ]
+
+    digest = build_attachment_digest(attachments, max_items=2, max_chars=10)
+
+    assert digest.splitlines() == [
+        "- file-0.pdf: xxxxxxxxxx...",
+        "- file-1.pdf: xxxxxxxxxx...",
+        "- ... 2 more attachment(s)",
+    ]
+
+
+def test_summary_calls_record_input_mode(monkeypatch):
+    node = SummaryNode()
+    state = _state(task_config={"summary_input_mode": "compact"})
+    captured = []
+
+    def fake_call_and_track(
+        prompt,
+        content=None,
+        json_mode=False,
+        max_retries=0,
+        state=None,
+        node_name="unknown",
+        model_uuid=None,
+        tracking_tags=None,
+    ):
+        captured.append(tracking_tags)
+        if json_mode:
+            return {"details": "Details", "key_process": [], "todos": []}, {}
+        return "Release plan", {}
+
+    monkeypatch.setattr(
+        "threadline.agents.nodes.summary_node.LLMTracker.call_and_track",
+        fake_call_and_track,
+    )
+
+    updated_state = node.execute_processing(state)
+
+    assert updated_state["summary_title"] == "Release plan"
+    assert len(captured) == 2
+    assert all(tags["input_mode"] == "compact" for tags in captured)
+    assert all(tags["estimated_input_tokens"] > 0 for tags in captured)
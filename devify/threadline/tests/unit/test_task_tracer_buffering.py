@@ -0,0 +1,182 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+from agentcore_task.adapters.django.models import TaskExecution
+
+from threadline.models import TaskStep
+from threadline.utils.task_tracer import TaskTracer, use_task_tracer
+
+PROGRESS_PLAN = {"llm": {"start": 0, "span": 100}}
+
+
+def _append_steps(tracer, count):
+    for index in range(count):
+        tracer.append_task(
+            f"STEP_{index}",
+            "Working",
+            {
+                "email_id": 42,
+                "progress_plan": PROGRESS_PLAN,
+                "progress_stage": "llm",
+                "progress_ratio": (index + 1) / count,
+            },
+        )
+
+
+def test_buffered_tracer_flushes_on_step_count(monkeypatch):
+    tracer = TaskTracer(
+        "EMAIL_WORKFLOW",
+        buffered=True,
+        flush_interval_sec=3600,
+        flush_max_steps=5,
+    )
+    # Stand-in for the real update, which resets the pending counter.
+    sync_mock = Mock(
+        side_effect=lambda *args, **kwargs: setattr(
+            tracer, "_pending_steps", 0
+        )
+    )
+    monkeypatch.setattr(tracer, "_sync_agentcore_update", sync_mock)
+    monkeypatch.setattr(tracer, "_write_progress_snapshot", Mock())
+
+    with patch(
+        "threadline.utils.task_tracer.publish_processing_progress"
+    ) as publish_mock:
+        _append_steps(tracer, 12)
+
+    assert len(tracer._agentcore_metadata["steps"]) == 12
+    assert sync_mock.call_count == 2
+    publish_mock.assert_called()
+
+
+def test_buffered_tracer_publishes_progress_and_defers_row_write(
+    monkeypatch,
+):
+    tracer = TaskTracer(
+        "EMAIL_WORKFLOW",
+        buffered=True,
+        flush_interval_sec=3600,
+        flush_max_steps=100,
+    )
+    sync_mock = Mock()
+    write_mock = Mock()
+    monkeypatch.setattr(tracer, "_sync_agentcore_update", sync_mock)
+    monkeypatch.setattr(tracer, "_write_progress_snapshot", write_mock)
+
+    with patch(
+        "threadline.utils.task_tracer.publish_processing_progress"
+    ) as publish_mock:
+        _append_steps(tracer, 4)
+
+    sync_mock.assert_not_called()
+    write_mock.assert_not_called()
+    published = [call.args[1] for call in publish_mock.call_args_list]
+    assert published == sorted(published)
+    assert published[-1] == 100
+
+    tracer.flush()
+
+    sync_mock.assert_called_once_with("STARTED")
+    write_mock.assert_called_once_with(42, 100, None)
+
+
+def test_terminal_states_write_buffered_steps(monkeypatch):
+    tracer = TaskTracer(
+        "EMAIL_WORKFLOW",
+        buffered=True,
+        flush_interval_sec=3600,
+        flush_max_steps=100,
+    )
+    sync_mock = Mock()
+    monkeypatch.setattr(tracer, "_sync_agentcore_update", sync_mock)
+    monkeypatch.setattr(tracer, "_write_progress_snapshot", Mock())
+
+    with patch("threadline.utils.task_tracer.publish_processing_progress"):
+        _append_steps(tracer, 3)
+        tracer.complete_task({"email_id": 42})
+
+    sync_mock.assert_called_once()
+    assert sync_mock.call_args.args[0] == "SUCCESS"
+    assert len(tracer._agentcore_metadata["steps"]) == 3
+
+
+def test_use_task_tracer_flushes_pending_steps_on_exit(monkeypatch):
+    tracer = TaskTracer(
+        "EMAIL_MERGE",
+        buffered=True,
+        flush_interval_sec=3600,
+        flush_max_steps=100,
+    )
+    sync_mock = Mock()
+    monkeypatch.setattr(tracer, "_sync_agentcore_update", sync_mock)
+
+    with use_task_tracer(tracer):
+        tracer.append_task("STEP", "Merging", {"email_id": 1})
+        sync_mock.assert_not_called()
+
+    sync_mock.assert_called_once_with("STARTED")
+
+
+@pytest.mark.django_db
+def test_table_step_storage_keeps_metadata_to_progress_summary():
+    tracer = TaskTracer(
+        "EMAIL_MERGE",
+        buffered=True,
+        flush_interval_sec=3600,
+        flush_max_steps=3,
+        step_storage="table",
+    )
+    tracer.create_task({"email_id": 7})
+    for index in range(5):
+        tracer.append_task(
+            f"STEP_{index}",
+            "Merging",
+            {"email_id": 7, "progress_percent": (index + 1) * 20},
+        )
+
+    # First three steps flushed as one batch, the rest still buffered.
+    assert TaskStep.objects.filter(task_id=tracer.task_id).count() == 3
+
+    tracer.complete_task({"email_id": 7})
+
+    steps = list(
+        TaskStep.objects.filter(task_id=tracer.task_id).order_by("seq")
+    )
+    assert [step.seq for step in steps] == [1, 2, 3, 4, 5]
+    assert steps[0].action == "STEP_0"
+    assert steps[0].payload["raw_message"] == "Merging"
+    assert "context" not in steps[0].payload
+
+    execution = TaskExecution.objects.get(task_id=tracer.task_id)
+    assert "steps" not in execution.metadata
+    assert "task_logs" not in execution.metadata
+    assert execution.metadata["step_storage"] == "table"
+    assert execution.metadata["step_count"] == 5
+    assert execution.metadata["progress_percent"] == 100
+
+
+def test_live_progress_persists_snapshot_only_at_finish(monkeypatch):
+    monkeypatch.setattr(
+        "threadline.utils.task_tracer.is_live_progress_enabled",
+        lambda: True,
+    )
+    tracer = TaskTracer("EMAIL_WORKFLOW", buffered=False)
+    monkeypatch.setattr(tracer, "_sync_agentcore_registration", Mock())
+    monkeypatch.setattr(tracer, "_sync_agentcore_update", Mock())
+    write_mock = Mock()
+    monkeypatch.setattr(tracer, "_write_progress_snapshot", write_mock)
+
+    with patch(
+        "threadline.utils.task_tracer.publish_processing_progress",
+        return_value=True,
+    ) as publish_mock:
+        tracer.create_task({"email_id": 42, "progress_percent": 0})
+        _append_steps(tracer, 4)
+        write_mock.assert_not_called()
+        tracer.complete_task({"email_id": 42})
+
+    assert publish_mock.call_count >= 4
+    write_mock.assert_called_once()
+    assert write_mock.call_args.args[:2] == (42, 100)
+    assert write_mock.call_args.kwargs == {"final": True}
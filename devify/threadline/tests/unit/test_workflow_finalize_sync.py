@@ -0,0 +1,78 @@
+"""Unit tests for the batched attachment and TODO sync in finalize."""
+
+import pytest
+
+from threadline.agents.nodes.workflow_finalize import WorkflowFinalizeNode
+from threadline.models import EmailAttachment, EmailTodo
+
+
+@pytest.mark.django_db
+def test_attachments_are_synced_with_bulk_update(
+    test_email_message,
+    test_email_attachment,
+    django_assert_max_num_queries,
+):
+    second = EmailAttachment.objects.create(
+        user=test_email_message.user,
+        email_message=test_email_message,
+        filename="scan.png",
+        safe_filename="scan.png",
+        content_type="image/png",
+        file_size=2048,
+        file_path="/uploads/scan.png",
+        is_image=True,
+    )
+    state = {
+        "attachments": [
+            {"id": str(test_email_attachment.id), "llm_content": "Invoice"},
+            {"id": str(second.id), "ocr_content": "Total: 42"},
+            {"id": "", "ocr_content": "ignored"},
+        ]
+    }
+
+    with django_assert_max_num_queries(2):
+        WorkflowFinalizeNode()._sync_email_attachments(state)
+
+    test_email_attachment.refresh_from_db()
+    second.refresh_from_db()
+    assert test_email_attachment.llm_content == "Invoice"
+    assert second.ocr_content == "Total: 42"
+
+
+@pytest.mark.django_db
+def test_todos_are_created_and_updated_in_bulk(
+    test_email_message,
+    django_assert_max_num_queries,
+):
+    existing = EmailTodo.objects.create(
+        user=test_email_message.user,
+        email_message=test_email_message,
+        content="Review contract",
+        priority="low",
+    )
+    state = {
+        "todos": [
+            {"content": "Review contract", "priority": "high"},
+            {"content": "Book room", "owner": "alice"},
+            {"content": "Book room", "owner": "bob"},
+            {"content": "  "},
+            {
+                "content": "Send report",
+                "deadline_processed": "2026-01-05 10:00",
+            },
+        ]
+    }
+
+    with django_assert_max_num_queries(3):
+        WorkflowFinalizeNode()._sync_todos(test_email_message, state)
+
+    todos = {
+        todo.content: todo
+        for todo in EmailTodo.objects.filter(email_message=test_email_message)
+    }
+    assert set(todos) == {"Review contract", "Book room", "Send report"}
+    assert todos["Review contract"].id == existing.id
+    assert todos["Review contract"].priority == "high"
+    assert todos["Book room"].owner == "bob"
+    assert todos["Send report"].deadline is not None
+    assert todos["Send report"].user_id == test_email_message.user_id
@@ -0,0 +1,157 @@
+"""Unit tests for resuming failed workflows from their checkpoints."""
+
+from collections import Counter
+from typing import TypedDict
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from threadline.agents.checkpoint_manager import is_resume_trigger_source
+from threadline.agents.workflow import (
+    _find_resume_snapshot,
+    _resume_failed_run,
+)
+
+NODES = [
+    "workflow_prepare",
+    "credits_check",
+    "image_intent",
+    "llm_email",
+    "summary",
+    "metadata",
+    "workflow_finalize",
+]
+
+
+class ToyState(TypedDict, total=False):
+    id: str
+    steps: list
+    node_errors: dict
+    force: bool
+    trigger_source: str
+    checkpoint_policy: str
+    credits_consumed: bool
+    credits_transaction_id: str
+    credits_refunded: bool
+
+
+def _build_graph(calls, failing):
+    """Linear stand-in for the email graph; ``failing`` nodes error once."""
+
+    def make_node(name):
+        def node(state):
+            calls[name] += 1
+            if state.get("node_errors"):
+                return {}
+            update = {"steps": state["steps"] + [name]}
+            if name == "credits_check":
+                update["credits_consumed"] = True
+            if name in failing:
+                failing.discard(name)
+                update["node_errors"] = {name: ["timeout"]}
+            return update
+
+        return node
+
+    builder = StateGraph(ToyState)
+    for name in NODES:
+        builder.add_node(name, make_node(name))
+    builder.add_edge(START, NODES[0])
+    for current, following in zip(NODES, NODES[1:]):
+        builder.add_edge(current, following)
+    builder.add_edge(NODES[-1], END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def _run_failed(failing):
+    calls = Counter()
+    graph = _build_graph(calls, set(failing))
+    graph.invoke(
+        {"id": "7", "steps": [], "node_errors": {}},
+        {"configurable": {"thread_id": "email_workflow_7"}},
+    )
+    return graph, calls
+
+
+def test_finds_checkpoint_before_failed_node():
+    graph, _ = _run_failed({"summary"})
+
+    snapshot = _find_resume_snapshot(graph, "email_workflow_7")
+
+    assert snapshot.next == ("summary",)
+    assert snapshot.values["steps"] == NODES[:4]
+
+
+def test_successful_or_unknown_runs_are_not_resumed():
+    graph, _ = _run_failed(set())
+
+    assert _find_resume_snapshot(graph, "email_workflow_7") is None
+    assert _find_resume_snapshot(graph, "email_workflow_8") is None
+
+
+def test_credit_failures_restart_the_whole_run():
+    graph, _ = _run_failed({"credits_check"})
+
+    assert _find_resume_snapshot(graph, "email_workflow_7") is None
+
+
+def test_resume_reruns_only_from_failed_node():
+    graph, calls = _run_failed({"summary"})
+    snapshot = _find_resume_snapshot(graph, "email_workflow_7")
+    email = MagicMock(id=7)
+
+    with patch(
+        "threadline.agents.nodes.credits_check_node.CreditsCheckNode"
+    ) as credits_node:
+        credits_node.return_value.side_effect = lambda state: {
+            **state,
+            "credits_consumed": True,
+        }
+        result = _resume_failed_run(
+            graph, email, snapshot, "api_retry", MagicMock()
+        )
+
+    assert result["node_errors"] == {}
+    assert result["steps"] == NODES
+    assert result["trigger_source"] == "api_retry"
+    assert calls["image_intent"] == 1
+    assert calls["summary"] == 2
+    email.set_status.assert_called_once_with("processing")
+
+
+def test_resume_falls_back_when_credits_are_insufficient():
+    graph, calls = _run_failed({"summary"})
+    snapshot = _find_resume_snapshot(graph, "email_workflow_7")
+    email = MagicMock(id=7)
+
+    with patch(
+        "threadline.agents.nodes.credits_check_node.CreditsCheckNode"
+    ) as credits_node:
+        credits_node.return_value.side_effect = lambda state: {
+            **state,
+            "node_errors": {"credits_check": ["INSUFFICIENT_CREDITS"]},
+        }
+        result = _resume_failed_run(
+            graph, email, snapshot, "api_retry", MagicMock()
+        )
+
+    assert result is None
+    assert calls["summary"] == 1
+    email.set_status.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "config, trigger_source, expected",
+    [
+        ({}, "api_retry", True),
+        ({}, "email_fetch", False),
+        ({"resume_failed": False}, "api_retry", False),
+        ({"resume_trigger_sources": ["manual"]}, "manual", True),
+    ],
+)
+def test_resume_trigger_sources(settings, config, trigger_source, expected):
+    settings.THREADLINE_CHECKPOINT = config
+
+    assert is_resume_trigger_source(trigger_source) is expected
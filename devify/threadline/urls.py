@@ -23,6 +23,7 @@ from .views import (
     EmailMessageBatchRetryAPIView,
     EmailMessageIssueClusterAPIView,
     EmailMessageMetadataAPIView,
+    EmailMessageProgressAPIView,
     EmailTodoAPIView,
     EmailTodoDetailAPIView,
     EmailTodoStatsAPIView,
@@ -112,6 +113,11 @@ urlpatterns = [
         EmailMessageIssueClusterAPIView.as_view(),
         name="threadlines-issue-cluster",
     ),
+    path(
+        "threadlines/<uuid:uuid>/progress",
+        EmailMessageProgressAPIView.as_view(),
+        name="threadlines-progress",
+    ),
     path(
         "threadlines/<uuid:uuid>/share-link",
         ThreadlineShareLinkAPIView.as_view(),
@@ -0,0 +1,116 @@
+"""
+Normalized-text fingerprints for the email merge matchers.
+
+EmailMessage.save() persists the fingerprint of the subject and body so
+EmailMergeService can prefilter candidates in SQL (same normalized
+subject, or a body length that allows containment) and, optionally,
+skip RapidFuzz for bodies whose SimHash signatures are far apart.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Optional
+
+SUBJECT_PREFIX_PATTERN = re.compile(r"^\s*((re|fw|fwd)\s*:\s*)+", re.I)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+QUOTED_LINE_PATTERN = re.compile(r"(?m)^\s*>.*$")
+SEPARATOR_LINE_PATTERN = re.compile(r"(?m)^-----.*?-----$")
+
+SIMHASH_BITS = 64
+# Character shingles keep the signature language-agnostic (CJK bodies
+# have no word boundaries to split on).
+SIMHASH_SHINGLE_SIZE = 4
+_SIMHASH_MASK = (1 << SIMHASH_BITS) - 1
+_SIGNED_LIMIT = 1 << (SIMHASH_BITS - 1)
+
+
+def normalize_subject(subject: Optional[str]) -> str:
+    """
+    Lowercase a subject and strip Re:/Fw:/Fwd: prefixes.
+    """
+    subject = subject or ""
+    subject = SUBJECT_PREFIX_PATTERN.sub("", subject)
+    subject = subject.strip().lower()
+    return WHITESPACE_PATTERN.sub(" ", subject)
+
+
+def normalize_text(content: Optional[str]) -> str:
+    """
+    Lowercase a body and drop quoted lines and separator banners.
+    """
+    content = content or ""
+    content = QUOTED_LINE_PATTERN.sub("", content)
+    content = SEPARATOR_LINE_PATTERN.sub("", content)
+    content = content.replace("\r", "\n")
+    content = WHITESPACE_PATTERN.sub(" ", content)
+    return content.strip().lower()
+
+
+def subject_hash(normalized_subject: str) -> str:
+    """
+    MD5 of a normalized subject, or "" for an empty subject.
+    """
+    if not normalized_subject:
+        return ""
+    return hashlib.md5(normalized_subject.encode("utf-8")).hexdigest()
+
+
+def simhash(normalized_text: str) -> Optional[int]:
+    """
+    64-bit SimHash of a normalized body, as a signed integer.
+
+    The value is signed so it fits a BigIntegerField; hamming_distance()
+    masks it back. Returns None for an empty body.
+    """
+    if not normalized_text:
+        return None
+
+    size = min(SIMHASH_SHINGLE_SIZE, len(normalized_text))
+    shingles = Counter(
+        normalized_text[index : index + size]
+        for index in range(len(normalized_text) - size + 1)
+    )
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in shingles.items():
+        digest = int.from_bytes(
+            hashlib.blake2b(
+                shingle.encode("utf-8"), digest_size=SIMHASH_BITS // 8
+            ).digest(),
+            "big",
+        )
+        for bit in range(SIMHASH_BITS):
+            if digest >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value - (1 << SIMHASH_BITS) if value >= _SIGNED_LIMIT else value
+
+
+def hamming_distance(left: int, right: int) -> int:
+    """
+    Number of differing bits between two SimHash signatures.
+    """
+    return ((left ^ right) & _SIMHASH_MASK).bit_count()
+
+
+def merge_fingerprint(
+    subject: Optional[str], text_content: Optional[str]
+) -> dict:
+    """
+    Fingerprint fields persisted on EmailMessage.
+
+    Returns:
+        dict: merge_subject_hash, merge_text_length, merge_text_simhash
+    """
+    text = normalize_text(text_content)
+    return {
+        "merge_subject_hash": subject_hash(normalize_subject(subject)),
+        "merge_text_length": len(text),
+        "merge_text_simhash": simhash(text),
+    }
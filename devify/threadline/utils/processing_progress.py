@@ -0,0 +1,269 @@
+"""
+Live processing progress side channel.
+
+Workflow progress changes many times per run while the UI only needs the
+latest percentage. Publishing it to the cache (and a Redis pub/sub channel
+per email) lets the tracer skip the EmailMessage read/save per step; the
+row keeps a persisted snapshot that is written at finalize (or on buffered
+flushes), serializers overlay the live value while an email is processing,
+and the progress endpoint polls or streams it as server-sent events.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_CACHE_KEY_PREFIX = "threadline:processing_progress"
+
+# Lazily created pub/sub client. After a failed connect, retry only once
+# REDIS_RETRY_SEC has passed so workers do not hit Redis on every step.
+REDIS_RETRY_SEC = 60
+_redis_client = None
+_redis_retry_at = 0.0
+
+
+def progress_cache_key(email_id) -> str:
+    return f"{PROGRESS_CACHE_KEY_PREFIX}:{email_id}"
+
+
+def progress_channel(email_id) -> str:
+    return f"{PROGRESS_CACHE_KEY_PREFIX}:channel:{email_id}"
+
+
+def _progress_config() -> Dict:
+    return dict(getattr(settings, "THREADLINE_TASK_TRACER", None) or {})
+
+
+def _progress_ttl() -> int:
+    try:
+        return int(_progress_config().get("progress_cache_ttl_sec") or 3600)
+    except (TypeError, ValueError):
+        return 3600
+
+
+def is_live_progress_enabled() -> bool:
+    """
+    Whether workflow progress is published live and persisted at finalize.
+    """
+    return bool(_progress_config().get("progress_live"))
+
+
+def _get_redis_client():
+    global _redis_client, _redis_retry_at
+
+    if _redis_client is not None:
+        return _redis_client
+    if not _progress_config().get("progress_pubsub", True):
+        return None
+    if time.monotonic() < _redis_retry_at:
+        return None
+
+    url = _progress_config().get("progress_redis_url") or getattr(
+        settings, "CELERY_BROKER_URL", "redis://localhost:6379"
+    )
+    try:
+        # Deferred: redis-py is only needed once progress is published.
+        import redis
+
+        client = redis.Redis.from_url(
+            url, socket_connect_timeout=1, socket_timeout=2
+        )
+        client.ping()
+        _redis_client = client
+    except Exception as exc:
+        logger.warning(f"Progress pub/sub unavailable: {exc}")
+        _redis_retry_at = time.monotonic() + REDIS_RETRY_SEC
+    return _redis_client
+
+
+def publish_processing_progress(
+    email_id, percent: int, *, final: bool = False
+) -> bool:
+    """
+    Publish the latest progress percent for an email.
+
+    Stores the value under the email's cache key and announces it on the
+    email's pub/sub channel for streaming subscribers.
+
+    Args:
+        email_id: EmailMessage id
+        percent: Normalized 0-100 percentage
+        final: The workflow reached a terminal state
+
+    Returns:
+        bool: False when the cache is unavailable
+    """
+    progress = {
+        "percent": max(0, min(100, int(percent))),
+        "updated_at": timezone.now().isoformat(),
+        "final": final,
+    }
+    try:
+        cache.set(progress_cache_key(email_id), progress, _progress_ttl())
+    except Exception as exc:
+        logger.debug(
+            f"Failed to publish processing progress for {email_id}: {exc}"
+        )
+        return False
+
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            client.publish(
+                progress_channel(email_id),
+                json.dumps({"email_id": str(email_id), **progress}),
+            )
+        except Exception as exc:
+            logger.debug(
+                f"Failed to announce processing progress for "
+                f"{email_id}: {exc}"
+            )
+    return True
+
+
+def get_live_processing_progress(email_id) -> Optional[Dict]:
+    """
+    Return the published progress for one email, if any.
+    """
+    return get_live_processing_progress_many([email_id]).get(str(email_id))
+
+
+def get_live_processing_progress_many(
+    email_ids: Iterable,
+) -> Dict[str, Dict]:
+    """
+    Return published progress keyed by str(email_id) in one cache read.
+    """
+    keys = {
+        progress_cache_key(email_id): str(email_id) for email_id in email_ids
+    }
+    if not keys:
+        return {}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as exc:
+        logger.debug(f"Failed to read processing progress: {exc}")
+        return {}
+    return {
+        keys[key]: value
+        for key, value in found.items()
+        if isinstance(value, dict)
+    }
+
+
+def overlay_processing_progress(metadata: Optional[Dict], live: Dict) -> Dict:
+    """
+    Return metadata with processing_progress replaced by the live value.
+    """
+    metadata = dict(metadata or {})
+    metadata["processing_progress"] = {
+        "percent": live.get("percent"),
+        "updated_at": live.get("updated_at"),
+    }
+    return metadata
+
+
+def _sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _next_progress(pubsub, email_id, wait_sec: float) -> Optional[Dict]:
+    """
+    Wait up to ``wait_sec`` for the next progress value.
+    """
+    if pubsub is None:
+        time.sleep(wait_sec)
+        return get_live_processing_progress(email_id)
+
+    message = pubsub.get_message(timeout=wait_sec)
+    if not message or message.get("type") != "message":
+        return None
+    try:
+        return json.loads(message["data"])
+    except (TypeError, ValueError):
+        return None
+
+
+def stream_processing_progress(
+    email_id,
+    initial: Dict,
+    *,
+    timeout_sec: float = 30.0,
+    heartbeat_sec: float = 15.0,
+    poll_interval_sec: float = 1.0,
+) -> Iterator[str]:
+    """
+    Yield server-sent events for an email's progress.
+
+    Emits the initial snapshot, then every change announced on the
+    email's channel (or polled from the cache when pub/sub is
+    unavailable) until a final value arrives or ``timeout_sec`` passes.
+    Under sync gunicorn workers each open stream holds a worker thread
+    for its whole duration, so keep ``timeout_sec`` short and let
+    clients reconnect.
+
+    Args:
+        email_id: EmailMessage id
+        initial: Snapshot sent as the first event
+        timeout_sec: Max stream duration; clients reconnect afterwards
+        heartbeat_sec: Idle interval between keep-alive comments
+        poll_interval_sec: Wait per pub/sub read or cache poll
+
+    Yields:
+        str: SSE frames
+    """
+    yield _sse_event("progress", initial)
+    if initial.get("final"):
+        return
+
+    pubsub = None
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(progress_channel(email_id))
+        except Exception as exc:
+            logger.debug(f"Progress subscribe failed for {email_id}: {exc}")
+            pubsub = None
+
+    started_at = last_event_at = time.monotonic()
+    last_percent = initial.get("percent")
+    # Re-read once after subscribing so an update published in between
+    # is not lost.
+    progress = get_live_processing_progress(email_id)
+    try:
+        while True:
+            now = time.monotonic()
+            if progress and (
+                progress.get("final")
+                or progress.get("percent") != last_percent
+            ):
+                last_percent = progress.get("percent")
+                last_event_at = now
+                yield _sse_event("progress", progress)
+                if progress.get("final"):
+                    return
+            elif now - last_event_at >= heartbeat_sec:
+                last_event_at = now
+                yield ": keep-alive\n\n"
+
+            if now - started_at >= timeout_sec:
+                break
+            progress = _next_progress(pubsub, email_id, poll_interval_sec)
+
+        yield _sse_event("timeout", {"email_id": str(email_id)})
+    finally:
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
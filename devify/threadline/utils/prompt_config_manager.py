@@ -4,18 +4,35 @@ Multi-language prompt configuration manager for Threadline
 This module manages YAML-based prompt templates for different
 languages and scenes. It provides dynamic language detection and
 fallback mechanisms for international users.
+
+Use get_prompt_config_manager() for the process-wide instance: it keeps
+rendered prompt configs per (scene, language) and reloads the YAML files
+when their modification times change.
 """
 
+import hashlib
 import logging
 import os
 import re
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Min seconds between mtime checks of the loaded YAML files.
+RELOAD_CHECK_INTERVAL_SEC = 5.0
+
+
+def _file_mtime(file_path: str) -> Optional[float]:
+    try:
+        return os.stat(file_path).st_mtime
+    except OSError:
+        return None
+
 
 class PromptConfigManager:
     """
@@ -28,38 +45,125 @@ class PromptConfigManager:
 
     def __init__(self):
         self.config_dir = settings.THREADLINE_CONFIG_PATH
+        self._lock = threading.RLock()
+        self._load_configs()
 
-        self.languages_config = self._load_yaml_file(
-            os.path.join(self.config_dir, "languages.yaml")
+    def _load_configs(self) -> None:
+        """
+        Load languages, scenarios and default prompts and reset caches.
+
+        Raises:
+            FileNotFoundError: If a required configuration file is missing
+        """
+        file_mtimes = {}
+        languages_config = self._load_yaml_file(
+            os.path.join(self.config_dir, "languages.yaml"), file_mtimes
         )
-        self.scenarios_config = self._load_yaml_file(
-            os.path.join(self.config_dir, "scenarios.yaml")
+        scenarios_config = self._load_yaml_file(
+            os.path.join(self.config_dir, "scenarios.yaml"), file_mtimes
         )
 
-        default_prompt_path = os.path.join(
-            self.config_dir,
-            self.scenarios_config.get(
-                "default_prompt_file", "prompts/default.yaml"
-            ),
-        )
-        self.default_prompts = self._load_yaml_file(default_prompt_path)
+        default_prompts = None
+        if scenarios_config:
+            default_prompt_path = os.path.join(
+                self.config_dir,
+                scenarios_config.get(
+                    "default_prompt_file", "prompts/default.yaml"
+                ),
+            )
+            default_prompts = self._load_yaml_file(
+                default_prompt_path, file_mtimes
+            )
 
-        if not all(
-            [
-                self.languages_config,
-                self.scenarios_config,
-                self.default_prompts,
-            ]
-        ):
+        if not all([languages_config, scenarios_config, default_prompts]):
             raise FileNotFoundError(
                 f"Required configuration files not found in: "
                 f"{self.config_dir}"
             )
 
-        self.scene_prompts_cache = {}
+        # Scene files load lazily; record their times now so every process
+        # watches, and versions, the same set of files.
+        for scene_info in (scenarios_config.get("scenarios") or {}).values():
+            prompt_file = (scene_info or {}).get("prompt_file")
+            if prompt_file:
+                path = os.path.join(self.config_dir, prompt_file)
+                file_mtimes.setdefault(path, _file_mtime(path))
+        version = hashlib.sha256(
+            repr(
+                sorted(
+                    (os.path.relpath(path, self.config_dir), mtime)
+                    for path, mtime in file_mtimes.items()
+                )
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+
+        with self._lock:
+            self.languages_config = languages_config
+            self.scenarios_config = scenarios_config
+            self.default_prompts = default_prompts
+            self.scene_prompts_cache = {}
+            self._prompt_config_cache: Dict[Tuple, Dict[str, Any]] = {}
+            self._file_mtimes = file_mtimes
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    @property
+    def version(self) -> str:
+        """
+        Identifier of the configuration files and their modification times.
+
+        Computed when the configuration loads, over the base files and
+        every scene file listed in scenarios.yaml, so it does not change
+        as scenes are first used and matches across processes reading the
+        same files.
+        """
+        return self._version
+
+    def reload_if_changed(self, force_check: bool = False) -> bool:
+        """
+        Reload configuration when a loaded YAML file changed on disk.
+
+        File times are checked at most every RELOAD_CHECK_INTERVAL_SEC.
+        A failed reload keeps the previous configuration.
+
+        Args:
+            force_check: Check file times regardless of the interval
+
+        Returns:
+            bool: True if the configuration was reloaded
+        """
+        now = time.monotonic()
+        if (
+            not force_check
+            and now - self._checked_at < RELOAD_CHECK_INTERVAL_SEC
+        ):
+            return False
+        self._checked_at = now
 
-    def _load_yaml_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        changed = [
+            path
+            for path, mtime in list(self._file_mtimes.items())
+            if _file_mtime(path) != mtime
+        ]
+        if not changed:
+            return False
+
+        logger.info(f"Prompt config files changed, reloading: {changed}")
+        try:
+            self._load_configs()
+        except FileNotFoundError as e:
+            logger.error(f"Prompt config reload failed, keeping previous: {e}")
+            return False
+        return True
+
+    def _load_yaml_file(
+        self, file_path: str, file_mtimes: Optional[Dict] = None
+    ) -> Optional[Dict[str, Any]]:
         """Load YAML configuration file"""
+        if file_mtimes is not None:
+            # Record the time before reading so a write during the read
+            # triggers another reload.
+            file_mtimes[file_path] = _file_mtime(file_path)
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 config = yaml.safe_load(f)
@@ -79,8 +183,7 @@ class PromptConfigManager:
         """
         Load scene-specific prompts from prompts/{scene}.yaml
 
-        Note: Scene prompts are cached but language-specific rendering
-        happens at runtime, so language changes take effect immediately.
+        Note: Scene prompts are cached until the configuration reloads.
         """
         if scene in self.scene_prompts_cache:
             logger.debug(f"Using cached scene prompts for scene: {scene}")
@@ -270,7 +373,29 @@ class PromptConfigManager:
         """
         Get prompt configuration for specific scene and language
         Loads scene prompts, merges with defaults, and renders variables
+
+        Rendered configs are memoized per (scene, language) until the
+        configuration reloads; callers get a shallow copy.
         """
+        self.reload_if_changed()
+        cache_key = (scene, language)
+        cached = self._prompt_config_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(
+                f"Using cached prompt config: scene={scene}, "
+                f"language={language}"
+            )
+            return dict(cached)
+
+        prompt_config = self._build_prompt_config(scene, language)
+        with self._lock:
+            self._prompt_config_cache[cache_key] = prompt_config
+        return dict(prompt_config)
+
+    def _build_prompt_config(
+        self, scene: str, language: str
+    ) -> Dict[str, Any]:
+        """Render the prompt configuration for a scene and language"""
         lang = self._normalize_language(language)
         logger.info(
             f"Loading prompt config: scene={scene}, "
@@ -535,3 +660,33 @@ class PromptConfigManager:
 
         # Generate complete prompt_config dynamically
         return self.get_prompt_config(scene, language)
+
+
+_prompt_config_manager: Optional[PromptConfigManager] = None
+_prompt_config_manager_lock = threading.Lock()
+
+
+def get_prompt_config_manager() -> PromptConfigManager:
+    """
+    Get the process-wide prompt configuration manager.
+
+    The instance is rebuilt when THREADLINE_CONFIG_PATH changes.
+
+    Returns:
+        PromptConfigManager: Shared manager instance
+
+    Raises:
+        FileNotFoundError: If required configuration files are missing
+    """
+    global _prompt_config_manager
+    manager = _prompt_config_manager
+    config_dir = settings.THREADLINE_CONFIG_PATH
+    if manager is None or manager.config_dir != config_dir:
+        with _prompt_config_manager_lock:
+            manager = _prompt_config_manager
+            if manager is None or manager.config_dir != config_dir:
+                manager = PromptConfigManager()
+                _prompt_config_manager = manager
+                return manager
+    manager.reload_if_changed()
+    return manager
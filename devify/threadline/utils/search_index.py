@@ -0,0 +1,318 @@
+"""
+Full-text search backends for the threadline search index.
+
+Searchable text of emails and attachments is denormalized into one
+SearchDocument row per object (see threadline.services.search), and each
+backend indexes that table with the database's native full-text engine:
+
+- MySQL: FULLTEXT index queried in BOOLEAN MODE
+- PostgreSQL: GIN index on to_tsvector('simple', document), with the
+  token separators replaced by spaces first (the default parser keeps
+  "bob@example.com" and "report.pdf" as single tokens)
+- SQLite: FTS5 external-content table kept in sync by triggers (local
+  development and tests)
+
+Keywords are split into tokens on TOKEN_SEPARATOR_PATTERN and the tokens
+are matched as word prefixes by the index. Tokens the index cannot look up
+(non-ASCII text, tokens shorter than the backend's minimum token length,
+MySQL stopwords, unusual punctuation) are left to a case-insensitive
+substring match of the whole keyword on the document, so every keyword is
+still required.
+
+Known gap: the index does not segment CJK text (MySQL and PostgreSQL have
+no word boundaries to split it on), so CJK keywords are answered by the
+substring scan alone. Search callers pass the user, which keeps that scan
+to the user's own documents.
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection as default_connection
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DOCUMENT_TABLE = "threadline_searchdocument"
+KEYWORD_SEPARATOR_PATTERN = re.compile(r"[,\s]+")
+# Punctuation every backend treats as a word separator (PostgreSQL after
+# POSTGRES_SEPARATOR_REGEX); keywords with any other punctuation (e.g. "_",
+# "'") are not split into index tokens.
+TOKEN_SEPARATOR_PATTERN = re.compile(r"[@.\-/:+]+")
+POSTGRES_SEPARATOR_REGEX = "[@./:+-]"
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
+# InnoDB's default full-text stopwords; they are never indexed.
+MYSQL_STOPWORDS = frozenset(
+    {
+        "a", "about", "an", "are", "as", "at", "be", "by", "com", "de",
+        "en", "for", "from", "how", "i", "in", "is", "it", "la", "of",
+        "on", "or", "that", "the", "this", "to", "was", "what", "when",
+        "where", "who", "will", "with", "und", "www",
+    }
+)
+
+EMAIL_SEARCH_FIELDS = (
+    "subject",
+    "sender",
+    "recipients",
+    "summary_title",
+    "summary_content",
+    "llm_content",
+    "text_content",
+    "message_id",
+)
+ATTACHMENT_SEARCH_FIELDS = ("filename", "content_type")
+
+
+def parse_search_keywords(search: Optional[str]) -> list[str]:
+    """
+    Split a search query on spaces and commas.
+    """
+    if not search:
+        return []
+    return [
+        keyword.strip()
+        for keyword in KEYWORD_SEPARATOR_PATTERN.split(search)
+        if keyword.strip()
+    ]
+
+
+def build_search_document(obj, fields: Iterable[str]) -> str:
+    """
+    Join the searchable columns of an object, one per line.
+    """
+    return "\n".join(
+        str(value) for value in (getattr(obj, field, None) for field in fields)
+        if value
+    )
+
+
+def _search_config() -> dict:
+    return dict(getattr(settings, "THREADLINE_SEARCH", None) or {})
+
+
+class SearchBackend:
+    """
+    LIKE-based search without a full-text index.
+    """
+
+    name = "like"
+    uses_index = False
+    stopwords: frozenset = frozenset()
+
+    def __init__(self, min_token_length: int = 1):
+        self.min_token_length = min_token_length
+
+    def install(self, connection) -> None:
+        """
+        Create the full-text index; safe to call repeatedly.
+        """
+
+    def uninstall(self, connection) -> None:
+        """
+        Drop the full-text index.
+        """
+
+    @staticmethod
+    def _execute(connection, statements: Iterable[str]) -> None:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def keyword_tokens(self, keyword: str) -> Optional[list[str]]:
+        """
+        Index tokens that must all prefix-match for a keyword.
+
+        Tokens the index cannot look up are dropped; unless the keyword
+        is a single indexed token, the caller also matches it as a
+        substring.
+
+        Returns:
+            list[str]: Lowercase tokens, or None when the keyword has to
+                be matched as a substring only
+        """
+        if not self.uses_index:
+            return None
+        tokens = [
+            token
+            for token in (
+                part.lower()
+                for part in TOKEN_SEPARATOR_PATTERN.split(keyword)
+            )
+            if TOKEN_PATTERN.match(token)
+            and len(token) >= self.min_token_length
+            and token not in self.stopwords
+        ]
+        return tokens or None
+
+
+class FullTextSearchBackend(SearchBackend, ABC):
+    """
+    Search backed by the database's full-text index.
+    """
+
+    uses_index = True
+
+    @abstractmethod
+    def install(self, connection) -> None:
+        ...
+
+    @abstractmethod
+    def uninstall(self, connection) -> None:
+        ...
+
+    @abstractmethod
+    def match_sql(self, tokens: list[str]) -> tuple[str, list]:
+        """
+        SQL selecting the ids of SearchDocument rows matching every token.
+        """
+
+
+class SQLiteFTS5SearchBackend(FullTextSearchBackend):
+    name = "sqlite_fts5"
+    fts_table = f"{SEARCH_DOCUMENT_TABLE}_fts"
+
+    def install(self, connection) -> None:
+        table, fts = SEARCH_DOCUMENT_TABLE, self.fts_table
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"document, content='{table}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+            f"BEGIN INSERT INTO {fts}(rowid, document) "
+            "VALUES (new.id, new.document); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+            f"BEGIN INSERT INTO {fts}({fts}, rowid, document) "
+            "VALUES ('delete', old.id, old.document); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} "
+            f"BEGIN INSERT INTO {fts}({fts}, rowid, document) "
+            "VALUES ('delete', old.id, old.document); "
+            f"INSERT INTO {fts}(rowid, document) "
+            "VALUES (new.id, new.document); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        self._execute(connection, statements)
+
+    def uninstall(self, connection) -> None:
+        self._execute(
+            connection,
+            [
+                *(
+                    f"DROP TRIGGER IF EXISTS {self.fts_table}_{suffix}"
+                    for suffix in ("ai", "ad", "au")
+                ),
+                f"DROP TABLE IF EXISTS {self.fts_table}",
+            ],
+        )
+
+    def match_sql(self, tokens: list[str]) -> tuple[str, list]:
+        query = " AND ".join(f'"{token}"*' for token in tokens)
+        return (
+            f"SELECT rowid FROM {self.fts_table} "
+            f"WHERE {self.fts_table} MATCH %s",
+            [query],
+        )
+
+
+class MySQLFulltextSearchBackend(FullTextSearchBackend):
+    name = "mysql_fulltext"
+    stopwords = MYSQL_STOPWORDS
+    index_name = f"{SEARCH_DOCUMENT_TABLE}_ft"
+
+    def install(self, connection) -> None:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, SEARCH_DOCUMENT_TABLE
+            )
+        if self.index_name in constraints:
+            return
+        self._execute(
+            connection,
+            [
+                f"ALTER TABLE {SEARCH_DOCUMENT_TABLE} "
+                f"ADD FULLTEXT INDEX {self.index_name} (document)"
+            ],
+        )
+
+    def uninstall(self, connection) -> None:
+        self._execute(
+            connection,
+            [
+                f"ALTER TABLE {SEARCH_DOCUMENT_TABLE} "
+                f"DROP INDEX {self.index_name}"
+            ],
+        )
+
+    def match_sql(self, tokens: list[str]) -> tuple[str, list]:
+        query = " ".join(f"+{token}*" for token in tokens)
+        return (
+            f"SELECT id FROM {SEARCH_DOCUMENT_TABLE} "
+            "WHERE MATCH (document) AGAINST (%s IN BOOLEAN MODE)",
+            [query],
+        )
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+    name = "postgres_tsvector"
+    index_name = f"{SEARCH_DOCUMENT_TABLE}_tsv"
+    # Queries must repeat the indexed expression verbatim to use the index.
+    document_vector = (
+        "to_tsvector('simple', regexp_replace("
+        f"document, '{POSTGRES_SEPARATOR_REGEX}', ' ', 'g'))"
+    )
+
+    def install(self, connection) -> None:
+        self._execute(
+            connection,
+            [
+                f"CREATE INDEX IF NOT EXISTS {self.index_name} "
+                f"ON {SEARCH_DOCUMENT_TABLE} "
+                f"USING GIN ({self.document_vector})"
+            ],
+        )
+
+    def uninstall(self, connection) -> None:
+        self._execute(
+            connection, [f"DROP INDEX IF EXISTS {self.index_name}"]
+        )
+
+    def match_sql(self, tokens: list[str]) -> tuple[str, list]:
+        query = " & ".join(f"{token}:*" for token in tokens)
+        return (
+            f"SELECT id FROM {SEARCH_DOCUMENT_TABLE} "
+            f"WHERE {self.document_vector} "
+            "@@ to_tsquery('simple', %s)",
+            [query],
+        )
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteFTS5SearchBackend,
+    "mysql": MySQLFulltextSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(connection=None) -> SearchBackend:
+    """
+    Search backend configured by THREADLINE_SEARCH for a connection.
+
+    ``backend`` is "auto" (the full-text backend of the database vendor)
+    or "like" (substring matching on the search documents only).
+    """
+    connection = connection or default_connection
+    config = _search_config()
+    min_token_length = int(config.get("min_token_length", 3))
+    if config.get("backend", "auto") == "like":
+        return SearchBackend()
+
+    backend_class = VENDOR_BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        logger.debug(
+            f"No full-text search backend for {connection.vendor}, "
+            "using LIKE"
+        )
+        return SearchBackend()
+    return backend_class(min_token_length=min_token_length)
@@ -4,12 +4,24 @@ Task Tracer Utility
 Records task execution state in agentcore-task's TaskExecution records.
 Legacy EmailTask tracking has been removed; task visibility now comes
 from agentcore only.
+
+In buffered mode (THREADLINE_TASK_TRACER["buffered"]) steps are coalesced
+in memory and written on a time/size interval and on terminal states,
+while the user-facing percentage goes through the processing progress
+cache side channel on every step. With THREADLINE_TASK_TRACER
+["progress_live"] the percentage is only published during the run and
+persisted on the EmailMessage once, at complete/fail.
+
+With THREADLINE_TASK_TRACER["step_storage"] = "table" steps are appended
+to the TaskStep table in bulk_create batches and the TaskExecution
+metadata only keeps the latest progress summary.
 """
 
 from __future__ import annotations
 
 import math
 import logging
+import time
 from contextlib import contextmanager
 from contextvars import ContextVar
 from copy import deepcopy
@@ -17,8 +29,14 @@ from uuid import uuid4
 from typing import Dict, Optional
 
 from celery import current_task
+from django.conf import settings
 from django.utils import timezone
 
+from threadline.utils.processing_progress import (
+    is_live_progress_enabled,
+    publish_processing_progress,
+)
+
 logger = logging.getLogger(__name__)
 _current_task_tracer: ContextVar["TaskTracer | None"] = ContextVar(
     "current_task_tracer",
@@ -104,6 +122,25 @@ def use_task_tracer(tracer: "TaskTracer"):
         yield tracer
     finally:
         _current_task_tracer.reset(token)
+        tracer.flush()
+
+
+STEP_STORAGE_METADATA = "metadata"
+STEP_STORAGE_TABLE = "table"
+
+# Log entry keys stored in TaskStep columns or already on the task.
+_STEP_ROW_EXCLUDED_KEYS = (
+    "timestamp",
+    "step",
+    "name",
+    "action",
+    "level",
+    "context",
+)
+
+
+def _tracer_config() -> Dict:
+    return dict(getattr(settings, "THREADLINE_TASK_TRACER", None) or {})
 
 
 class TaskTracer:
@@ -115,9 +152,59 @@ class TaskTracer:
         self,
         task_type: str,
         module: str = "threadline",
+        *,
+        buffered: Optional[bool] = None,
+        flush_interval_sec: Optional[float] = None,
+        flush_max_steps: Optional[int] = None,
+        step_storage: Optional[str] = None,
     ):
+        """
+        Args:
+            task_type: agentcore task name
+            module: agentcore module name
+            buffered: Coalesce step writes; None reads
+                THREADLINE_TASK_TRACER["buffered"]
+            flush_interval_sec: Max seconds between buffered flushes
+            flush_max_steps: Max pending steps before a buffered flush
+            step_storage: "metadata" (steps list in the TaskExecution
+                metadata) or "table" (TaskStep rows); None reads
+                THREADLINE_TASK_TRACER["step_storage"]
+        """
+        config = _tracer_config()
         self.task_type = task_type
         self.module = module
+        self.buffered = bool(
+            config.get("buffered", False) if buffered is None else buffered
+        )
+        self.flush_interval_sec = float(
+            config.get("flush_interval_sec", 5.0)
+            if flush_interval_sec is None
+            else flush_interval_sec
+        )
+        self.flush_max_steps = int(
+            config.get("flush_max_steps", 20)
+            if flush_max_steps is None
+            else flush_max_steps
+        )
+        self.step_storage = (
+            step_storage or config.get("step_storage") or STEP_STORAGE_METADATA
+        )
+        if self.step_storage not in (
+            STEP_STORAGE_METADATA,
+            STEP_STORAGE_TABLE,
+        ):
+            logger.warning(
+                f"Unknown task step storage '{self.step_storage}', "
+                f"using '{STEP_STORAGE_METADATA}'"
+            )
+            self.step_storage = STEP_STORAGE_METADATA
+        self.live_progress = is_live_progress_enabled()
+        self._step_seq = 0
+        self._pending_step_rows: list = []
+        self._pending_steps = 0
+        self._last_flush_at = time.monotonic()
+        self._pending_progress_percent: Optional[int] = None
+        self._persisted_progress_percent: Optional[int] = None
         self._task_id: Optional[str] = None
         self._agentcore_task_id: Optional[str] = None
         self._agentcore_metadata: Dict = {}
@@ -153,6 +240,8 @@ class TaskTracer:
             )
             self._agentcore_task_id = task_id
             self._agentcore_metadata = _normalize_metadata(initial_details)
+            if self.step_storage == STEP_STORAGE_TABLE:
+                self._agentcore_metadata["step_storage"] = STEP_STORAGE_TABLE
             self._merge_context(initial_details)
             register_task_execution(
                 task_id=task_id,
@@ -181,6 +270,7 @@ class TaskTracer:
         if metadata:
             self._agentcore_metadata.update(_normalize_metadata(metadata))
 
+        self._write_step_rows()
         try:
             TaskTracker.update_task_status(
                 task_id=self._agentcore_task_id,
@@ -191,10 +281,72 @@ class TaskTracer:
             )
         except Exception as exc:
             logger.debug(f"Failed to sync agentcore task update: {exc}")
+        # Every update writes the full metadata, buffered steps included.
+        self._pending_steps = 0
+        self._last_flush_at = time.monotonic()
+
+    def _queue_step_row(self, log_entry: Dict) -> None:
+        self._step_seq += 1
+        self._pending_step_rows.append(
+            {
+                "seq": self._step_seq,
+                "action": str(log_entry.get("action") or "")[:100],
+                "level": str(log_entry.get("level") or "INFO")[:16],
+                "ts": timezone.now(),
+                "payload": {
+                    key: value
+                    for key, value in log_entry.items()
+                    if key not in _STEP_ROW_EXCLUDED_KEYS
+                },
+            }
+        )
+
+    def _write_step_rows(self) -> None:
+        if not self._pending_step_rows or not self._agentcore_task_id:
+            return
+
+        rows, self._pending_step_rows = self._pending_step_rows, []
+        try:
+            from threadline.models import TaskStep
+
+            TaskStep.objects.bulk_create(
+                [
+                    TaskStep(task_id=self._agentcore_task_id, **row)
+                    for row in rows
+                ],
+                batch_size=500,
+            )
+        except Exception as exc:
+            logger.warning(
+                f"{self.context_summary()} failed to write "
+                f"{len(rows)} task step(s): {exc}"
+            )
+
+    def _should_flush(self) -> bool:
+        if self._pending_steps >= max(self.flush_max_steps, 1):
+            return True
+        return (
+            time.monotonic() - self._last_flush_at
+            >= self.flush_interval_sec
+        )
+
+    def flush(self) -> None:
+        """
+        Write buffered steps and the pending progress snapshot.
+
+        No-op in unbuffered mode or when nothing is pending.
+        """
+        if self._pending_steps:
+            self._sync_agentcore_update("STARTED")
+        if not self.live_progress:
+            self._persist_pending_progress()
 
     def _sync_threadline_progress_snapshot(
         self,
         details: Optional[Dict] = None,
+        *,
+        defer: bool = False,
+        final: bool = False,
     ) -> None:
         """
         Mirror workflow progress onto the user-facing EmailMessage row.
@@ -203,6 +355,11 @@ class TaskTracer:
         Merge coordination stays out of the user-facing percent bar so
         manual merge does not make the workflow look closer to finished
         than it really is.
+
+        With ``defer`` the percent is only published to the progress
+        side channel; the row write waits for the next buffered flush or,
+        in live progress mode, for complete/fail. ``final`` marks the
+        terminal snapshot.
         """
         if self.task_type != "EMAIL_WORKFLOW":
             return
@@ -251,6 +408,34 @@ class TaskTracer:
                 min(100, int(round(20 + normalized * 0.8))),
             )
 
+        if defer:
+            if normalized == self._pending_progress_percent:
+                return
+            self._pending_progress_percent = normalized
+            published = publish_processing_progress(email_id, normalized)
+            if published or not self.live_progress:
+                return
+            # No side channel: fall back to writing the row.
+
+        self._pending_progress_percent = None
+        self._write_progress_snapshot(
+            email_id, normalized, payload.get("progress_step"), final=final
+        )
+
+    def _persist_pending_progress(self) -> None:
+        percent = self._pending_progress_percent
+        email_id = self._context.get("email_id")
+        self._pending_progress_percent = None
+        if percent is None or not email_id:
+            return
+        if percent == self._persisted_progress_percent:
+            return
+        self._write_progress_snapshot(email_id, percent, None)
+
+    def _write_progress_snapshot(
+        self, email_id, normalized: int, progress_step, *, final=False
+    ) -> None:
+        self._persisted_progress_percent = normalized
         try:
             from threadline.models import EmailMessage
 
@@ -262,18 +447,21 @@ class TaskTracer:
             if not message:
                 return
 
-            message.set_processing_progress(normalized)
+            if final:
+                message.set_processing_progress(normalized, final=True)
+            else:
+                message.set_processing_progress(normalized)
             logger.info(
                 "%s synced threadline progress percent=%s step=%s",
                 self.context_summary(
                     {
                         "email_id": email_id,
                         "progress_percent": normalized,
-                        "progress_step": payload.get("progress_step"),
+                        "progress_step": progress_step,
                     }
                 ),
                 normalized,
-                payload.get("progress_step"),
+                progress_step,
             )
         except Exception as exc:
             logger.debug(
@@ -511,12 +699,20 @@ class TaskTracer:
                 TaskExecution.objects.filter(
                     task_id=self._agentcore_task_id
                 ).update(task_id=self._task_id)
+                if self.step_storage == STEP_STORAGE_TABLE:
+                    from threadline.models import TaskStep
+
+                    TaskStep.objects.filter(
+                        task_id=self._agentcore_task_id
+                    ).update(task_id=self._task_id)
                 self._agentcore_task_id = self._task_id
             except Exception as e:
                 logger.error(f"Failed to update agentcore task_id: {e}")
 
     def create_task(self, initial_details: Dict = None) -> str:
         self._threadline_progress_percent = None
+        self._pending_progress_percent = None
+        self._persisted_progress_percent = None
         self._merge_context(initial_details)
         if initial_details:
             self.set_progress_total_steps(
@@ -526,7 +722,9 @@ class TaskTracer:
         self._task_id = self._task_id or _current_celery_task_id()
         if self._task_id:
             self._merge_context({"task_id": self._task_id})
-        self._sync_threadline_progress_snapshot(initial_details)
+        self._sync_threadline_progress_snapshot(
+            initial_details, defer=self.live_progress
+        )
         self._sync_agentcore_registration(initial_details or {})
         logger.info(f"{self.context_summary(initial_details)} started")
         return self._agentcore_task_id or self._task_id
@@ -570,7 +768,9 @@ class TaskTracer:
             result=deepcopy(details),
             metadata=completion_details,
         )
-        self._sync_threadline_progress_snapshot(completion_details)
+        self._sync_threadline_progress_snapshot(
+            completion_details, final=True
+        )
         logger.info(f"{self.context_summary(details)} completed")
 
     def fail_task(self, details: Dict, error_msg: str) -> None:
@@ -585,7 +785,7 @@ class TaskTracer:
             error=error_msg,
             metadata=failure_metadata,
         )
-        self._sync_threadline_progress_snapshot(failure_metadata)
+        self._sync_threadline_progress_snapshot(failure_metadata, final=True)
 
         self._queue_failure_notification(failure_metadata, error_msg)
         logger.error(f"{self.context_summary(details)} failed: {error_msg}")
@@ -663,10 +863,14 @@ class TaskTracer:
         else:
             logger.debug(f"{context} step {action}: {message}")
 
-        self._agentcore_metadata.setdefault("steps", [])
-        self._agentcore_metadata["steps"].append(log_entry)
-        self._agentcore_metadata.setdefault("task_logs", [])
-        self._agentcore_metadata["task_logs"].append(log_entry)
+        if self.step_storage == STEP_STORAGE_TABLE:
+            self._queue_step_row(log_entry)
+            self._agentcore_metadata["step_count"] = self._step_seq
+        else:
+            self._agentcore_metadata.setdefault("steps", [])
+            self._agentcore_metadata["steps"].append(log_entry)
+            self._agentcore_metadata.setdefault("task_logs", [])
+            self._agentcore_metadata["task_logs"].append(log_entry)
         for key in (
             "progress_percent",
             "progress_message",
@@ -687,15 +891,31 @@ class TaskTracer:
             )
             if key in log_entry
         }
-        self._sync_agentcore_update(
-            "STARTED",
-            metadata={
+        if self.buffered:
+            # The entry already lives in _agentcore_metadata; only the
+            # write is deferred.
+            self._pending_steps += 1
+            self._sync_threadline_progress_snapshot(
+                progress_metadata, defer=True
+            )
+            if self._should_flush():
+                self.flush()
+            return
+
+        if self.step_storage == STEP_STORAGE_TABLE:
+            step_metadata = {"step_count": self._step_seq}
+        else:
+            step_metadata = {
                 "steps": self._agentcore_metadata["steps"],
                 "task_logs": self._agentcore_metadata["task_logs"],
-                **progress_metadata,
-            },
+            }
+        self._sync_agentcore_update(
+            "STARTED",
+            metadata={**step_metadata, **progress_metadata},
+        )
+        self._sync_threadline_progress_snapshot(
+            progress_metadata, defer=self.live_progress
         )
-        self._sync_threadline_progress_snapshot(progress_metadata)
 
     def update_task_status(self, new_status: str) -> None:
         agentcore_status = "STARTED"
@@ -27,6 +27,7 @@ from .email_message import (
     EmailMessageDetailAPIView,
     EmailMessageMetadataAPIView,
     EmailMessageIssueClusterAPIView,
+    EmailMessageProgressAPIView,
     EmailMessageBatchMergeAPIView,
     EmailMessageBatchRetryAPIView,
 )
@@ -66,6 +67,7 @@ __all__ = [
     "EmailMessageDetailAPIView",
     "EmailMessageMetadataAPIView",
     "EmailMessageIssueClusterAPIView",
+    "EmailMessageProgressAPIView",
     "EmailMessageBatchMergeAPIView",
     "EmailMessageBatchRetryAPIView",
     "AdminConversationListAPIView",
@@ -6,7 +6,8 @@ from __future__ import annotations
 
 from datetime import datetime, time as dt_time
 
-from django.db.models import Count, Q
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.utils import extend_schema
@@ -19,12 +20,18 @@ from agentcore_task.adapters.django.models import TaskExecution
 from agentcore_task.adapters.django.serializers import (
     TaskExecutionSerializer,
 )
-from threadline.models import EmailMessage
+from threadline.models import EmailMessage, TaskStep
+from threadline.services.search import filter_by_search
 from threadline.serializers import (
     AdminConversationListSerializer,
     AdminConversationTaskListSerializer,
+    AdminTaskStepSerializer,
     EmailMessageSerializer,
 )
+from threadline.utils.search_index import parse_search_keywords
+
+TASK_STEPS_PAGE_SIZE = 50
+TASK_STEPS_MAX_PAGE_SIZE = 200
 
 
 def _apply_date_boundaries(queryset, start_date=None, end_date=None):
@@ -71,6 +78,75 @@ def _apply_email_filters(queryset, conversation):
     return queryset.filter(email_filters)
 
 
+def _task_step_counts():
+    """Subquery counting TaskStep rows per TaskExecution.task_id."""
+    return Coalesce(
+        Subquery(
+            TaskStep.objects.filter(task_id=OuterRef("task_id"))
+            .order_by()
+            .values("task_id")
+            .annotate(total=Count("id"))
+            .values("total")[:1]
+        ),
+        0,
+    )
+
+
+def _task_steps_page(task, request):
+    """
+    Return one page of a task's step timeline.
+
+    Steps come from the TaskStep table when the tracer wrote them there;
+    older executions fall back to the steps list in their metadata.
+    """
+    try:
+        page_size = min(
+            int(
+                request.query_params.get(
+                    "steps_page_size", TASK_STEPS_PAGE_SIZE
+                )
+            ),
+            TASK_STEPS_MAX_PAGE_SIZE,
+        )
+    except (TypeError, ValueError):
+        page_size = TASK_STEPS_PAGE_SIZE
+    page_size = max(page_size, 1)
+    try:
+        page = max(int(request.query_params.get("steps_page", 1)), 1)
+    except (TypeError, ValueError):
+        page = 1
+
+    start = (page - 1) * page_size
+    end = start + page_size
+    steps = TaskStep.objects.filter(task_id=task.task_id).order_by("seq")
+    total = steps.count()
+    if total:
+        items = AdminTaskStepSerializer(steps[start:end], many=True).data
+    else:
+        legacy_steps = (task.metadata or {}).get("steps") or []
+        total = len(legacy_steps)
+        items = legacy_steps[start:end]
+
+    return {
+        "list": items,
+        "pagination": {
+            "total": total,
+            "page": page,
+            "pageSize": page_size,
+            "next": (
+                f"?steps_page={page + 1}&steps_page_size={page_size}"
+                if end < total
+                else None
+            ),
+            "previous": (
+                f"?steps_page={page - 1}&steps_page_size={page_size}"
+                if page > 1
+                else None
+            ),
+        },
+    }
+
+
 class AdminConversationListAPIView(APIView):
     """
     Read-only admin list for threadline conversations.
@@ -100,19 +176,9 @@ class AdminConversationListAPIView(APIView):
     def get(self, request):
         queryset = self.get_queryset()
 
-        search = (request.query_params.get("search") or "").strip()
-        if search:
-            for keyword in [part for part in search.replace(",", " ").split() if part]:
-                queryset = queryset.filter(
-                    Q(subject__icontains=keyword)
-                    | Q(sender__icontains=keyword)
-                    | Q(recipients__icontains=keyword)
-                    | Q(summary_title__icontains=keyword)
-                    | Q(summary_content__icontains=keyword)
-                    | Q(llm_content__icontains=keyword)
-                    | Q(text_content__icontains=keyword)
-                    | Q(message_id__icontains=keyword)
-                )
+        keywords = parse_search_keywords(request.query_params.get("search"))
+        if keywords:
+            queryset = filter_by_search(queryset, keywords)
 
         status_value = (request.query_params.get("status") or "").strip()
         if status_value:
@@ -282,6 +348,7 @@ class AdminConversationTasksAPIView(APIView):
                 "traceback",
                 "metadata",
             )
+            .annotate(step_count=_task_step_counts())
         )
         queryset = queryset.order_by("-created_at", "-id")
 
@@ -343,7 +410,11 @@ class AdminConversationTaskDetailAPIView(APIView):
     @extend_schema(
         operation_id="admin_threadline_conversation_task_detail",
         summary="Retrieve admin task execution for conversation",
-        description="Get the full task execution details for one task linked to a threadline message.",
+        description=(
+            "Get the full task execution details for one task linked to a "
+            "threadline message, with one page of its step timeline "
+            "(steps_page, steps_page_size)."
+        ),
         responses={
             200: response(TaskExecutionSerializer),
             401: error_response(),
@@ -374,10 +445,12 @@ class AdminConversationTaskDetailAPIView(APIView):
             task,
             context={"request": request},
         )
+        data = dict(serializer.data)
+        data["steps"] = _task_steps_page(task, request)
         return Response(
             {
                 "code": 200,
                 "message": "Conversation task execution retrieved successfully",
-                "data": serializer.data,
+                "data": data,
             }
         )
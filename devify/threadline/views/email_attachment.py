@@ -9,10 +9,14 @@ from rest_framework import status, serializers
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from core.swagger import response, error_response, pagination_response
+from core.paginations import InvalidCursor, KeysetPagination
+from core.swagger import (
+    response, error_response, pagination_response, cursor_params
+)
 
 from .base import BaseAPIView
 from ..models import EmailAttachment
+from ..services.search import filter_by_search
 from ..serializers import (
     EmailAttachmentSerializer,
     EmailAttachmentCreateSerializer,
@@ -35,9 +39,9 @@ class EmailAttachmentAPIView(BaseAPIView):
 
     def filter_by_user(self, queryset):
         """
-        Filter attachments by user through email message
+        Filter attachments by their owner (the owner of their email)
         """
-        return queryset.filter(email_message__user=self.request.user)
+        return queryset.filter(user=self.request.user)
 
     @extend_schema(
         operation_id='email_attachments_list',
@@ -73,7 +77,8 @@ class EmailAttachmentAPIView(BaseAPIView):
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
                 description='Order by field (e.g., filename, created_at)'
-            )
+            ),
+            *cursor_params()
         ],
         responses={
             200: pagination_response(EmailAttachmentSerializer),
@@ -88,11 +93,10 @@ class EmailAttachmentAPIView(BaseAPIView):
             queryset = self.filter_by_user(self.get_queryset())
 
             # Search functionality
-            search = request.query_params.get('search', None)
+            search = (request.query_params.get('search') or '').strip()
             if search:
-                queryset = queryset.filter(
-                    Q(filename__icontains=search) |
-                    Q(content_type__icontains=search)
+                queryset = filter_by_search(
+                    queryset, [search], user_id=request.user.id
                 )
 
             # Filter by status
@@ -115,15 +119,28 @@ class EmailAttachmentAPIView(BaseAPIView):
             if ordering:
                 queryset = queryset.order_by(ordering)
 
-            # Pagination
-            page_size = min(int(request.query_params.get('page_size', 10)), 100)
-            page = int(request.query_params.get('page', 1))
-
-            start = (page - 1) * page_size
-            end = start + page_size
-
-            total = queryset.count()
-            items = queryset[start:end]
+            # Pagination: keyset cursor on request (infinite scroll),
+            # page numbers otherwise
+            if KeysetPagination.requested(request):
+                paginator = KeysetPagination(('created_at',), '-created_at')
+                items = paginator.paginate_queryset(queryset, request)
+                pagination = paginator.get_pagination()
+            else:
+                page_size = min(int(request.query_params.get('page_size', 10)), 100)
+                page = int(request.query_params.get('page', 1))
+
+                start = (page - 1) * page_size
+                end = start + page_size
+
+                total = queryset.count()
+                items = queryset[start:end]
+                pagination = {
+                    'total': total,
+                    'page': page,
+                    'pageSize': page_size,
+                    'next': f"?page={page + 1}&page_size={page_size}" if end < total else None,
+                    'previous': f"?page={page - 1}&page_size={page_size}" if page > 1 else None
+                }
 
             serializer = EmailAttachmentSerializer(items, many=True, context={'request': request})
 
@@ -132,18 +149,18 @@ class EmailAttachmentAPIView(BaseAPIView):
                 'message': 'Email attachments retrieved successfully',
                 'data': {
                     'list': serializer.data,
-                    'pagination': {
-                        'total': total,
-                        'page': page,
-                        'pageSize': page_size,
-                        'next': f"?page={page + 1}&page_size={page_size}" if end < total else None,
-                        'previous': f"?page={page - 1}&page_size={page_size}" if page > 1 else None
-                    }
+                    'pagination': pagination
                 }
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
+        except InvalidCursor as e:
+            return Response({
+                'code': 400,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error listing email attachments: {str(e)}")
             return Response({
@@ -205,9 +222,9 @@ class EmailAttachmentDetailAPIView(BaseAPIView):
 
     def filter_by_user(self, queryset):
         """
-        Filter attachments by user through email message
+        Filter attachments by their owner (the owner of their email)
         """
-        return queryset.filter(email_message__user=self.request.user)
+        return queryset.filter(user=self.request.user)
 
     @extend_schema(
         operation_id='email_attachments_retrieve',
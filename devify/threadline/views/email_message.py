@@ -5,19 +5,29 @@ This module contains APIView classes for EmailMessage model CRUD operations.
 """
 
 import logging
-import re
 
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status, serializers
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
-from django.db.models import Q
+from rest_framework.settings import api_settings
+from django.db.models import Prefetch
 from django.db import transaction
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from core.swagger import response, error_response, pagination_response
+from core.paginations import InvalidCursor, KeysetPagination
+from core.swagger import (
+    cursor_params,
+    error_response,
+    pagination_response,
+    response,
+)
 
 from .base import BaseAPIView
-from ..models import EmailMessage
+from ..state_machine import EmailStatus
+from ..models import EmailMessage, Issue
 from ..serializers import (
     EmailMessageSerializer,
     EmailMessageListSerializer,
@@ -26,11 +36,19 @@ from ..serializers import (
     EmailMessageMergeSerializer,
     EmailMessageBatchRetrySerializer,
 )
+from ..utils.processing_progress import (
+    get_live_processing_progress,
+    stream_processing_progress,
+)
 from ..services import (
     ManualMergeService,
     enqueue_merge_workflow as _enqueue_merge_workflow,
     enqueue_merge_workflows as _enqueue_merge_workflows,
+    enqueue_workflow_batch as _enqueue_workflow_batch,
 )
+from ..services.merge_cluster import walk_merge_cluster
+from ..services.search import filter_by_search
+from ..utils.search_index import parse_search_keywords
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +57,6 @@ def _serialize_issue_cluster(message: EmailMessage) -> dict:
     """
     Serialize the merge cluster for on-demand issue inspection.
     """
-    visited: set[int] = set()
     nodes: list[dict] = []
 
     def get_direct_issue(obj: EmailMessage):
@@ -52,11 +69,10 @@ def _serialize_issue_cluster(message: EmailMessage) -> dict:
 
         return obj.issues.order_by("-created_at", "-id").first()
 
-    def walk(obj: EmailMessage, depth: int = 0):
-        if not obj or obj.id in visited:
-            return
-        visited.add(obj.id)
-
+    cluster_queryset = EmailMessage.objects.prefetch_related(
+        Prefetch("issues", queryset=Issue.objects.order_by("-created_at", "-id"))
+    )
+    for obj, depth in walk_merge_cluster(message, cluster_queryset):
         issue = get_direct_issue(obj)
         nodes.append(
             {
@@ -77,14 +93,6 @@ def _serialize_issue_cluster(message: EmailMessage) -> dict:
             }
         )
 
-        if obj.merged_into_id and obj.merged_into:
-            walk(obj.merged_into, depth + 1)
-
-        for child in obj.merged_children.all():
-            walk(child, depth + 1)
-
-    walk(message)
-
     return {
         "root": {
             "email_id": message.id,
@@ -146,7 +154,10 @@ class EmailMessageAPIView(BaseAPIView):
                 name="search",
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description="Search in subject, sender, recipients fields",
+                description=(
+                    "Search in subject, sender, recipients and content "
+                    "fields; every keyword must match"
+                ),
             ),
             OpenApiParameter(
                 name="status",
@@ -160,6 +171,7 @@ class EmailMessageAPIView(BaseAPIView):
                 location=OpenApiParameter.QUERY,
                 description="Order by field (e.g., received_at, created_at)",
             ),
+            *cursor_params(),
         ],
         responses={
             200: pagination_response(EmailMessageListSerializer),
@@ -175,33 +187,18 @@ class EmailMessageAPIView(BaseAPIView):
             self.request = request
             queryset = self.filter_by_user(self.get_queryset())
 
-            # Enhanced search functionality with multi-keyword AND logic
-            search = request.query_params.get("search", None)
-            if search:
-                # Parse multiple keywords from search query
-                # Support space or comma separated keywords
-                # This will split "lizengyuan project" into
-                # ["lizengyuan", "project"]
-                # But keep "lizengyuan" as a single keyword
-                keywords = [
-                    k.strip() for k in re.split(r"[,\s]+", search) if k.strip()
-                ]
-
+            # Multi-keyword search: every keyword must match at least one
+            # searchable column; answered by the full-text search index.
+            # Space or comma separated, so "lizengyuan project" becomes
+            # ["lizengyuan", "project"].
+            keywords = parse_search_keywords(
+                request.query_params.get("search", None)
+            )
+            if keywords:
                 logger.info(f"Search query parsed into keywords: {keywords}")
-
-                if keywords:
-                # Build AND logic: each keyword must match at least one field.
-                    for keyword in keywords:
-                        logger.debug(f"Filtering by keyword: '{keyword}'")
-                        queryset = queryset.filter(
-                            Q(subject__icontains=keyword)
-                            | Q(sender__icontains=keyword)
-                            | Q(recipients__icontains=keyword)
-                            | Q(summary_title__icontains=keyword)
-                            | Q(summary_content__icontains=keyword)
-                            | Q(llm_content__icontains=keyword)
-                            | Q(text_content__icontains=keyword)
-                        )
+                queryset = filter_by_search(
+                    queryset, keywords, user_id=request.user.id
+                )
 
             # Filter by status
             message_status = request.query_params.get("status", None)
@@ -219,17 +216,40 @@ class EmailMessageAPIView(BaseAPIView):
                 ordering = "-received_at"
             queryset = queryset.order_by(ordering)
 
-            # Pagination
-            page_size = min(
-                int(request.query_params.get("page_size", 10)), 100
-            )
-            page = int(request.query_params.get("page", 1))
-
-            start = (page - 1) * page_size
-            end = start + page_size
-
-            total = queryset.count()
-            items = queryset[start:end]
+            # Pagination: keyset cursor on request (infinite scroll),
+            # page numbers otherwise
+            if KeysetPagination.requested(request):
+                paginator = KeysetPagination(
+                    ("received_at", "created_at"), "-received_at"
+                )
+                items = paginator.paginate_queryset(queryset, request)
+                pagination = paginator.get_pagination()
+            else:
+                page_size = min(
+                    int(request.query_params.get("page_size", 10)), 100
+                )
+                page = int(request.query_params.get("page", 1))
+
+                start = (page - 1) * page_size
+                end = start + page_size
+
+                total = queryset.count()
+                items = queryset[start:end]
+                pagination = {
+                    "total": total,
+                    "page": page,
+                    "pageSize": page_size,
+                    "next": (
+                        f"?page={page + 1}&page_size={page_size}"
+                        if end < total
+                        else None
+                    ),
+                    "previous": (
+                        f"?page={page - 1}&page_size={page_size}"
+                        if page > 1
+                        else None
+                    ),
+                }
 
             serializer = EmailMessageListSerializer(
                 items, many=True, context={"request": request}
@@ -240,26 +260,17 @@ class EmailMessageAPIView(BaseAPIView):
                 "message": "Threadlines retrieved successfully",
                 "data": {
                     "list": serializer.data,
-                    "pagination": {
-                        "total": total,
-                        "page": page,
-                        "pageSize": page_size,
-                        "next": (
-                            f"?page={page + 1}&page_size={page_size}"
-                            if end < total
-                            else None
-                        ),
-                        "previous": (
-                            f"?page={page - 1}&page_size={page_size}"
-                            if page > 1
-                            else None
-                        ),
-                    },
+                    "pagination": pagination,
                 },
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
+        except InvalidCursor as e:
+            return Response(
+                {"code": 400, "message": str(e), "data": None},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             logger.error(f"Error listing email messages: {str(e)}")
             return Response(
@@ -536,7 +547,12 @@ class EmailMessageBatchRetryAPIView(BaseAPIView):
                     }
                 )
 
-            results = _enqueue_merge_workflows(
+            enqueue = (
+                _enqueue_workflow_batch
+                if serializer.validated_data.get("batch")
+                else _enqueue_merge_workflows
+            )
+            results = enqueue(
                 messages,
                 force=force,
                 language=language,
@@ -959,6 +975,129 @@ class EmailMessageIssueClusterAPIView(BaseAPIView):
             )
 
 
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accepts ``text/event-stream`` so SSE clients pass content negotiation.
+
+    The progress view returns a StreamingHttpResponse for such requests,
+    so this renderer never has to render data itself.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class EmailMessageProgressAPIView(BaseAPIView):
+    """
+    APIView for polling or streaming workflow processing progress.
+
+    Progress is read from the live side channel while the email is
+    processing, so clients do not need to reload the whole threadline.
+    """
+
+    lookup_field = "uuid"
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        EventStreamRenderer,
+    ]
+
+    def get_object(self, uuid):
+        return EmailMessage.objects.only(
+            "id", "uuid", "status", "metadata"
+        ).get(uuid=uuid, user=self.request.user)
+
+    def _snapshot(self, message: EmailMessage) -> dict:
+        progress = None
+        processing = message.status == EmailStatus.PROCESSING.value
+        if processing:
+            progress = get_live_processing_progress(message.id)
+        if not progress:
+            progress = (message.metadata or {}).get(
+                "processing_progress"
+            ) or {}
+        return {
+            "uuid": str(message.uuid),
+            "status": message.status,
+            "percent": progress.get("percent"),
+            "updated_at": progress.get("updated_at"),
+            # Queued (fetched) emails have not started yet; only a
+            # terminal status ends the stream.
+            "final": message.status in (
+                EmailStatus.SUCCESS.value,
+                EmailStatus.FAILED.value,
+            ),
+        }
+
+    def _wants_stream(self, request) -> bool:
+        if request.query_params.get("stream") in ("1", "true"):
+            return True
+        accepted = getattr(request, "accepted_renderer", None)
+        return isinstance(accepted, EventStreamRenderer)
+
+    @extend_schema(
+        operation_id="threadlines_progress",
+        summary="Get processing progress",
+        description=(
+            "Get the processing progress of a threadline. Pass stream=1 "
+            "or Accept: text/event-stream to receive server-sent progress "
+            "events until processing finishes."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="stream",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Stream progress as server-sent events",
+            ),
+        ],
+        responses={
+            200: response(serializers.DictField),
+            401: error_response(),
+            404: error_response(),
+        },
+    )
+    def get(self, request, uuid):
+        try:
+            message = self.get_object(uuid)
+        except EmailMessage.DoesNotExist:
+            return Response(
+                {"code": 404, "message": "Threadline not found", "data": None},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        snapshot = self._snapshot(message)
+        if not self._wants_stream(request):
+            return Response(
+                {
+                    "code": 200,
+                    "message": "Progress retrieved successfully",
+                    "data": snapshot,
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        config = getattr(settings, "THREADLINE_TASK_TRACER", None) or {}
+        stream = StreamingHttpResponse(
+            stream_processing_progress(
+                message.id,
+                snapshot,
+                timeout_sec=float(
+                    config.get("progress_stream_timeout_sec") or 30
+                ),
+            ),
+            content_type="text/event-stream",
+        )
+        stream["Cache-Control"] = "no-cache"
+        # Keep reverse proxies from buffering the event stream.
+        stream["X-Accel-Buffering"] = "no"
+        return stream
+
+
 class EmailMessageMetadataAPIView(BaseAPIView):
     """
     APIView for partial updates to EmailMessage.metadata field only.
@@ -9,7 +9,10 @@ from rest_framework import status, serializers
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from core.swagger import response, error_response, pagination_response
+from core.paginations import InvalidCursor, KeysetPagination
+from core.swagger import (
+    response, error_response, pagination_response, cursor_params
+)
 
 from .base import BaseAPIView
 from ..models import EmailTask
@@ -33,6 +36,14 @@ class EmailTaskAPIView(BaseAPIView):
         """
         return EmailTask.objects.all()
 
+    def filter_by_user(self, queryset):
+        """
+        Tasks are system-wide records without an owner; only staff see them
+        """
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.none()
+
     @extend_schema(
         operation_id='email_tasks_list',
         summary='List email tasks',
@@ -49,7 +60,8 @@ class EmailTaskAPIView(BaseAPIView):
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
                 description='Order by field (e.g., created_at, started_at)'
-            )
+            ),
+            *cursor_params()
         ],
         responses={
             200: pagination_response(EmailTaskSerializer),
@@ -73,15 +85,28 @@ class EmailTaskAPIView(BaseAPIView):
             if ordering:
                 queryset = queryset.order_by(ordering)
 
-            # Pagination
-            page_size = min(int(request.query_params.get('page_size', 10)), 100)
-            page = int(request.query_params.get('page', 1))
-
-            start = (page - 1) * page_size
-            end = start + page_size
-
-            total = queryset.count()
-            items = queryset[start:end]
+            # Pagination: keyset cursor on request (infinite scroll),
+            # page numbers otherwise
+            if KeysetPagination.requested(request):
+                paginator = KeysetPagination(('created_at',), '-created_at')
+                items = paginator.paginate_queryset(queryset, request)
+                pagination = paginator.get_pagination()
+            else:
+                page_size = min(int(request.query_params.get('page_size', 10)), 100)
+                page = int(request.query_params.get('page', 1))
+
+                start = (page - 1) * page_size
+                end = start + page_size
+
+                total = queryset.count()
+                items = queryset[start:end]
+                pagination = {
+                    'total': total,
+                    'page': page,
+                    'pageSize': page_size,
+                    'next': f"?page={page + 1}&page_size={page_size}" if end < total else None,
+                    'previous': f"?page={page - 1}&page_size={page_size}" if page > 1 else None
+                }
 
             serializer = EmailTaskSerializer(items, many=True, context={'request': request})
 
@@ -90,18 +115,18 @@ class EmailTaskAPIView(BaseAPIView):
                 'message': 'Email tasks retrieved successfully',
                 'data': {
                     'list': serializer.data,
-                    'pagination': {
-                        'total': total,
-                        'page': page,
-                        'pageSize': page_size,
-                        'next': f"?page={page + 1}&page_size={page_size}" if end < total else None,
-                        'previous': f"?page={page - 1}&page_size={page_size}" if page > 1 else None
-                    }
+                    'pagination': pagination
                 }
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
+        except InvalidCursor as e:
+            return Response({
+                'code': 400,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error listing email tasks: {str(e)}")
             return Response({
@@ -161,6 +186,14 @@ class EmailTaskDetailAPIView(BaseAPIView):
         """
         return EmailTask.objects.all()
 
+    def filter_by_user(self, queryset):
+        """
+        Tasks are system-wide records without an owner; only staff see them
+        """
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.none()
+
     @extend_schema(
         operation_id='email_tasks_retrieve',
         summary='Get email task details',
@@ -10,9 +10,10 @@ from django.db.models import Count
 from rest_framework import status, serializers
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
+from core.paginations import InvalidCursor, KeysetPagination
 from core.swagger import (
     response, error_response, pagination_response,
-    pagination_params, ordering_param, search_param
+    pagination_params, ordering_param, search_param, cursor_params
 )
 
 from .base import BaseAPIView
@@ -47,7 +48,7 @@ class EmailTodoAPIView(BaseAPIView):
             search_param(),
             EmailTodoFilterSerializer,
             ordering_param('-created_at')
-        ],
+        ] + cursor_params(),
         responses={
             200: pagination_response(EmailTodoListSerializer),
             401: error_response()
@@ -100,17 +101,38 @@ class EmailTodoAPIView(BaseAPIView):
             if ordering:
                 queryset = queryset.order_by(ordering)
 
-            # Pagination
-            page_size = min(
-                int(request.query_params.get('page_size', 20)), 100
-            )
-            page = int(request.query_params.get('page', 1))
-
-            start = (page - 1) * page_size
-            end = start + page_size
-
-            total = queryset.count()
-            items = queryset[start:end]
+            # Pagination: keyset cursor on request (infinite scroll),
+            # page numbers otherwise
+            if KeysetPagination.requested(request):
+                paginator = KeysetPagination(
+                    ('created_at',), '-created_at', page_size=20
+                )
+                items = paginator.paginate_queryset(queryset, request)
+                pagination = paginator.get_pagination()
+            else:
+                page_size = min(
+                    int(request.query_params.get('page_size', 20)), 100
+                )
+                page = int(request.query_params.get('page', 1))
+
+                start = (page - 1) * page_size
+                end = start + page_size
+
+                total = queryset.count()
+                items = queryset[start:end]
+                pagination = {
+                    'total': total,
+                    'page': page,
+                    'pageSize': page_size,
+                    'next': (
+                        f"?page={page + 1}&page_size={page_size}"
+                        if end < total else None
+                    ),
+                    'previous': (
+                        f"?page={page - 1}&page_size={page_size}"
+                        if page > 1 else None
+                    )
+                }
 
             serializer = EmailTodoListSerializer(
                 items, many=True, context={'request': request}
@@ -121,24 +143,18 @@ class EmailTodoAPIView(BaseAPIView):
                 'message': 'TODOs retrieved successfully',
                 'data': {
                     'list': serializer.data,
-                    'pagination': {
-                        'total': total,
-                        'page': page,
-                        'pageSize': page_size,
-                        'next': (
-                            f"?page={page + 1}&page_size={page_size}"
-                            if end < total else None
-                        ),
-                        'previous': (
-                            f"?page={page - 1}&page_size={page_size}"
-                            if page > 1 else None
-                        )
-                    }
+                    'pagination': pagination
                 }
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
+        except InvalidCursor as e:
+            return Response({
+                'code': 400,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error listing TODOs: {str(e)}")
             return Response({